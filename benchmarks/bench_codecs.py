@@ -0,0 +1,151 @@
+"""
+Codec Benchmark
+编解码基准测试
+
+Compares the generated model codecs with the hand-written to_dict/from_dict code and
+the per-field enum handling ProjectLoader used before the codec layer existed.
+比较生成的模型编解码器与之前手写的 to_dict/from_dict 以及 ProjectLoader 逐字段的枚举处理。
+
+    python benchmarks/bench_codecs.py [--number N]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from modules.project_model.codec import get_codec  # noqa: E402
+from modules.project_model.project_info_model import (  # noqa: E402
+    ProjectInfoModel, GameType, TargetPlatform, GameStyle, TimeSetting, TargetAudience
+)
+from modules.project_model.scene_info_model import SceneInfoModel, SceneType  # noqa: E402
+
+
+def legacy_encode_project(project_info: ProjectInfoModel) -> dict:
+    """原 ProjectInfoModel.to_dict / ProjectSaver 的写法"""
+    return {
+        "name": project_info.name,
+        "description": project_info.description,
+        "game_type": project_info.game_type.name if project_info.game_type else None,
+        "target_platforms": [platform.name for platform in project_info.target_platforms],
+        "game_style": project_info.game_style.name if project_info.game_style else None,
+        "time_setting": project_info.time_setting.name if project_info.time_setting else None,
+        "target_audience": [audience.name for audience in project_info.target_audience] if project_info.target_audience else None
+    }
+
+
+def legacy_decode_project(project_info: dict) -> ProjectInfoModel:
+    """原 ProjectLoader.load_project 的写法（去掉了打印）"""
+    game_type = None
+    if "game_type" in project_info and project_info["game_type"]:
+        try:
+            game_type = GameType[project_info["game_type"]]
+        except KeyError:
+            pass
+
+    target_platforms = []
+    if "target_platforms" in project_info and project_info["target_platforms"]:
+        for platform in project_info["target_platforms"]:
+            try:
+                target_platforms.append(TargetPlatform[platform])
+            except KeyError:
+                pass
+
+    game_style = None
+    if "game_style" in project_info and project_info["game_style"]:
+        try:
+            game_style = GameStyle[project_info["game_style"]]
+        except KeyError:
+            pass
+
+    time_setting = None
+    if "time_setting" in project_info and project_info["time_setting"]:
+        try:
+            time_setting = TimeSetting[project_info["time_setting"]]
+        except KeyError:
+            pass
+
+    target_audiences = []
+    if "target_audience" in project_info and project_info["target_audience"]:
+        if isinstance(project_info["target_audience"], list):
+            for audience in project_info["target_audience"]:
+                try:
+                    target_audiences.append(TargetAudience[audience])
+                except KeyError:
+                    pass
+        else:
+            try:
+                target_audiences.append(TargetAudience[project_info["target_audience"]])
+            except KeyError:
+                pass
+
+    return ProjectInfoModel(
+        name=project_info["name"],
+        description=project_info.get("description"),
+        game_type=game_type,
+        target_platforms=target_platforms,
+        game_style=game_style,
+        time_setting=time_setting,
+        target_audience=target_audiences
+    )
+
+
+def legacy_encode_scene(scene_info: SceneInfoModel) -> dict:
+    """原 SceneInfoModel.to_dict 的写法"""
+    return {"name": scene_info.name, "scene_type": scene_info.scene_type.name}
+
+
+def legacy_decode_scene(data: dict) -> SceneInfoModel:
+    """原 SceneInfoModel.from_dict 按名称解析的正确写法"""
+    return SceneInfoModel(name=data["name"], scene_type=SceneType[data["scene_type"]])
+
+
+def bench(label: str, legacy, generated, number: int):
+    legacy_time = min(timeit.repeat(legacy, number=number, repeat=7))
+    generated_time = min(timeit.repeat(generated, number=number, repeat=7))
+    print(f"{label:<24} legacy {legacy_time / number * 1e6:7.2f} us   "
+          f"codec {generated_time / number * 1e6:7.2f} us   "
+          f"x{legacy_time / generated_time:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    project = ProjectInfoModel(
+        name="Benchmark",
+        description="codec benchmark",
+        game_type=GameType.RPG,
+        target_platforms=[TargetPlatform.PC, TargetPlatform.MOBILE, TargetPlatform.CONSOLE],
+        game_style=GameStyle.PIXEL,
+        time_setting=TimeSetting.FANTASY,
+        target_audience=[TargetAudience.TEENAGERS, TargetAudience.ADULTS],
+    )
+    scene = SceneInfoModel(name="Battle", scene_type=SceneType.BATTLE_SCENE)
+
+    project_codec = get_codec(ProjectInfoModel)
+    scene_codec = get_codec(SceneInfoModel)
+    project_data = project_codec.encode(project)
+    scene_data = scene_codec.encode(scene)
+    assert project_data == legacy_encode_project(project)
+    assert project_codec.decode(project_data) == legacy_decode_project(project_data) == project
+    assert scene_codec.decode(scene_data) == legacy_decode_scene(scene_data) == scene
+
+    number = args.number
+    bench("ProjectInfoModel encode", lambda: legacy_encode_project(project),
+          lambda: project_codec.encode(project), number)
+    bench("ProjectInfoModel decode", lambda: legacy_decode_project(project_data),
+          lambda: project_codec.decode(project_data), number)
+    bench("ProjectInfoModel round", lambda: legacy_decode_project(legacy_encode_project(project)),
+          lambda: project_codec.decode(project_codec.encode(project)), number)
+    bench("SceneInfoModel encode", lambda: legacy_encode_scene(scene),
+          lambda: scene_codec.encode(scene), number)
+    bench("SceneInfoModel decode", lambda: legacy_decode_scene(scene_data),
+          lambda: scene_codec.decode(scene_data), number)
+
+
+if __name__ == "__main__":
+    main()
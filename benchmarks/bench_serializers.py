@@ -0,0 +1,96 @@
+"""
+Serializer Benchmark
+序列化基准测试
+
+Measures encode time, decode time and bytes on disk for every serializer backend on
+synthetic scenes of increasing size, and shows which backend the default policy picks.
+在逐渐增大的合成场景上测量每种序列化后端的编码时间、解码时间和文件大小，
+并显示默认策略选择的后端。
+
+    python benchmarks/bench_serializers.py [--sizes 100,1000,10000] [--repeat N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from modules.file_manager.serializers import (  # noqa: E402
+    COMPACT, PRETTY, ZLIB, LZMA, KIND_SCENE, get_policy, get_serializer
+)
+
+NODE_TYPES = ["CONTAINER", "SPRITE", "TEXT", "BUTTON", "IMAGE"]
+
+
+def make_scene(node_count: int, seed: int = 0) -> dict:
+    """生成场景字典，节点组成宽度为8的树"""
+    rng = random.Random(seed)
+    root = {
+        "id": "root", "name": "Root", "node_type": "CONTAINER",
+        "position": [0.0, 0.0], "size": [1920.0, 1080.0], "properties": {}, "children": []
+    }
+    nodes = [root]
+    for index in range(node_count):
+        node = {
+            "id": f"node_{index}",
+            "name": f"{rng.choice(NODE_TYPES).title()} {index}",
+            "node_type": rng.choice(NODE_TYPES),
+            "position": [round(rng.uniform(0, 4000), 2), round(rng.uniform(0, 4000), 2)],
+            "size": [round(rng.uniform(10, 400), 2), round(rng.uniform(10, 400), 2)],
+            "properties": {
+                "description": f"节点 {index} 的说明",
+                "visible": rng.random() > 0.1,
+                "layer": rng.randint(0, 10),
+            },
+            "children": [],
+        }
+        nodes[index // 8]["children"].append(node)
+        nodes.append(node)
+    return {"name": f"scene_{node_count}", "root_node": root,
+            "background_color": "#1e1e1e", "grid_size": 20, "snap_to_grid": True}
+
+
+def measure(func, repeat: int) -> float:
+    """多次运行取最短时间（毫秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000",
+                        help="逗号分隔的场景节点数")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    policy = get_policy()
+    print(f"{'nodes':>8} {'backend':<8} {'encode ms':>10} {'decode ms':>10} {'bytes':>12} {'ratio':>7}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        scene = make_scene(size)
+        baseline = None
+        for name in (PRETTY, COMPACT, ZLIB, LZMA):
+            serializer = get_serializer(name)
+            raw = serializer.encode(scene)
+            assert serializer.decode(raw) == scene
+            encode_ms = measure(lambda: serializer.encode(scene), args.repeat)
+            decode_ms = measure(lambda: serializer.decode(raw), args.repeat)
+            if baseline is None:
+                baseline = len(raw)
+            print(f"{size:>8} {name:<8} {encode_ms:>10.2f} {decode_ms:>10.2f} "
+                  f"{len(raw):>12,} {len(raw) / baseline:>7.2f}")
+        compact_size = len(get_serializer(COMPACT).encode(scene))
+        policy_ms = measure(lambda: policy.dumps(scene, KIND_SCENE), args.repeat)
+        print(f"{size:>8} {'policy':<8} {policy_ms:>10.2f} {'':>10} "
+              f"{len(policy.dumps(scene, KIND_SCENE)):>12,}   -> {policy.choose(KIND_SCENE, compact_size)}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,19 @@ src_dir = os.path.join(current_dir, "src")
 sys.path.insert(0, current_dir)
 sys.path.insert(0, src_dir)
 
-from src.main_window import MainWindow
+from modules.profiler.startup_profiler import StartupProfiler
+
+# 启动分析从这里开始计时，带 --profile-startup 参数时还记录每个模块的导入时间
+startup = StartupProfiler.get_instance()
+if startup.requested():
+    startup.enable_detailed()
+
+with startup.phase("导入主窗口"):
+    from src.main_window import MainWindow
+from modules.log_manager.api import LogManagerAPI
+from modules.log_manager.logging_bridge import install_logging_bridge
+from modules.profiler.stall_detector import install_stall_detector
+from modules.file_manager.save_service import SaveService
 
 def main():
     """应用程序入口"""
@@ -20,16 +32,36 @@ def main():
     )
     
     # 创建应用程序
-    app = QApplication(sys.argv)
+    with startup.phase("创建应用程序"):
+        app = QApplication(sys.argv)
+    
+    # 将日志记录转发到日志面板
+    install_logging_bridge(logging.DEBUG)
+    
+    # 日志写入文件，退出前写完剩余的条目
+    log_manager = LogManagerAPI.get_instance()
+    with startup.phase("日志持久化"):
+        log_manager.enable_persistence()
+    app.aboutToQuit.connect(log_manager.shutdown)
+    
+    # 主线程卡顿时采样调用栈并报告到日志
+    stall_detector = install_stall_detector()
+    app.aboutToQuit.connect(stall_detector.stop)
     
     # 创建主窗口
-    main_window = MainWindow()
+    with startup.phase("创建主窗口"):
+        main_window = MainWindow()
     
     # 显示主窗口
-    main_window.show()
+    with startup.phase("显示主窗口"):
+        main_window.show()
     
     # 运行应用程序
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    # 用户选择强制退出时不等待仍在运行的后台保存
+    if SaveService.get_instance().is_abandoned():
+        os._exit(exit_code)
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -6,27 +6,57 @@ This is the main entry point of the application.
 这是应用程序的主入口点。
 """
 
+import os
 import sys
 from PyQt6.QtWidgets import QApplication
-from main_window import MainWindow
+from modules.profiler.startup_profiler import StartupProfiler
+
+# 启动分析从这里开始计时，带 --profile-startup 参数时还记录每个模块的导入时间
+startup = StartupProfiler.get_instance()
+if startup.requested():
+    startup.enable_detailed()
+
+with startup.phase("导入主窗口"):
+    from main_window import MainWindow
+from modules.log_manager.api import LogManagerAPI
+from modules.log_manager.logging_bridge import install_logging_bridge
+from modules.profiler.stall_detector import install_stall_detector
+from modules.file_manager.save_service import SaveService
 
 def main():
     """主函数"""
     try:
-        app = QApplication(sys.argv)
+        with startup.phase("创建应用程序"):
+            app = QApplication(sys.argv)
         
         # 设置应用程序信息
         app.setApplicationName("游戏设计编辑器")
         app.setApplicationVersion("1.0.0")
         app.setOrganizationName("UnityMindFlowPro")
         
-        print("创建主窗口...")
-        window = MainWindow()
-        print("显示主窗口...")
-        window.show()
+        # 将日志记录转发到日志面板
+        install_logging_bridge()
+        
+        # 日志写入文件，退出前写完剩余的条目
+        log_manager = LogManagerAPI.get_instance()
+        with startup.phase("日志持久化"):
+            log_manager.enable_persistence()
+        app.aboutToQuit.connect(log_manager.shutdown)
+        
+        # 主线程卡顿时采样调用栈并报告到日志
+        stall_detector = install_stall_detector()
+        app.aboutToQuit.connect(stall_detector.stop)
+        
+        with startup.phase("创建主窗口"):
+            window = MainWindow()
+        with startup.phase("显示主窗口"):
+            window.show()
         
-        print("运行应用程序...")
-        sys.exit(app.exec())
+        exit_code = app.exec()
+        # 用户选择强制退出时不等待仍在运行的后台保存
+        if SaveService.get_instance().is_abandoned():
+            os._exit(exit_code)
+        sys.exit(exit_code)
     except Exception as e:
         print(f"错误: {str(e)}")
         import traceback
@@ -2,38 +2,71 @@
 Main Window
 主窗口模块
 
-This module implements the main window of the application.
-此模块实现应用程序的主窗口。
+This module implements the main window of the application. Panels that are not
+visible in the first frame are built after the window has been painted.
+此模块实现应用程序的主窗口。第一帧中不可见的面板在窗口绘制之后再创建。
 """
 
 import sys
-print("Importing PyQt6 widgets...")
-from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
+from typing import Callable, Optional
+from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QMessageBox,
                           QHBoxLayout, QDockWidget, QApplication)
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 
-print("Importing custom modules...")
 from modules.menu_bar.menu_bar import MenuBar
 from modules.project_info.project_info_panel import ProjectInfoPanel
 from modules.scene_editor.api import SceneEditorAPI
 from modules.log_manager.log_panel import LogPanel
-from modules.ai_assistant.ai_assistant_panel import AIAssistantPanel
 from modules.project_info.api import ProjectInfoAPI
 from modules.log_manager.api import LogManagerAPI
-from modules.ai_assistant.api import AIAssistantAPI
+from modules.file_manager.save_service import SaveService
+from modules.profiler.startup_profiler import StartupProfiler
+from styles.theme import ThemeManager
+
+class LazyDockWidget(QDockWidget):
+    """首次显示时才创建内容的停靠窗口，创建推迟到主窗口首次绘制之后"""
+    
+    def __init__(self, title: str, factory: Callable[[], QWidget], parent=None):
+        super().__init__(title, parent)
+        self._factory: Optional[Callable[[], QWidget]] = factory
+        self.visibilityChanged.connect(self._handle_visibility_changed)
+        
+    def is_loaded(self) -> bool:
+        """内容是否已创建"""
+        return self._factory is None
+        
+    def ensure_loaded(self) -> QWidget:
+        """立即创建内容"""
+        if self._factory is not None:
+            factory, self._factory = self._factory, None
+            with StartupProfiler.get_instance().phase(f"{self.windowTitle()}面板", kind="panel"):
+                self.setWidget(factory())
+        return self.widget()
+        
+    def _handle_visibility_changed(self, visible: bool):
+        if visible and self._factory is not None:
+            StartupProfiler.get_instance().call_after_first_paint(self.ensure_loaded)
 
 class MainWindow(QMainWindow):
     """主窗口"""
     
+    # 关闭时等待后台保存的时间（毫秒），超过后提示用户
+    SAVE_WAIT_MS = 500
+    
     def __init__(self):
-        print("Initializing MainWindow...")
         super().__init__()
+        startup = StartupProfiler.get_instance()
         self.setWindowTitle("游戏设计编辑器")
         
+        # 应用主题，之后创建的控件直接按应用程序的样式表设置外观
+        with startup.phase("主题"):
+            ThemeManager.get_instance().apply_theme()
+        
         # 存储dock widgets的引用
         self.project_info_dock = None
         self.log_dock = None
         self.assistant_dock = None
+        self.profiler_dock = None
         
         # 设置窗口大小和位置
         screen = QApplication.primaryScreen().geometry()
@@ -43,39 +76,59 @@ class MainWindow(QMainWindow):
         y = (screen.height() - window_height) // 2
         self.setGeometry(x, y, window_width, window_height)
         
-        print("Creating menu bar...")
         # 创建菜单栏
-        self.menu_bar = MenuBar(self)
-        self.setMenuBar(self.menu_bar)
+        with startup.phase("菜单栏", kind="panel"):
+            self.menu_bar = MenuBar(self)
+            self.setMenuBar(self.menu_bar)
         
-        print("Setting up dock widgets...")
         # 创建并添加停靠窗口
-        self.setup_dock_widgets()
-        
-        print("Setting up styles...")
-        # 设置样式
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #1e1e1e;
-            }
-            QDockWidget {
-                background-color: #2d2d2d;
-                color: #ffffff;
-                border: 1px solid #3d3d3d;
-            }
-            QDockWidget::title {
-                background-color: #2d2d2d;
-                color: #ffffff;
-                padding: 4px;
-            }
-            QDockWidget::close-button, QDockWidget::float-button {
-                background-color: transparent;
-                border: none;
-            }
-            QDockWidget::close-button:hover, QDockWidget::float-button:hover {
-                background-color: #3d3d3d;
-            }
-        """)
+        with startup.phase("停靠窗口"):
+            self.setup_dock_widgets()
+        
+        # 记录首次绘制的时间，之后再创建推迟的面板
+        startup.watch_first_paint(self)
+        
+    def closeEvent(self, event):
+        """关闭窗口前等待后台保存完成，保存较慢时提示用户，可以取消关闭或强制退出"""
+        if self._wait_for_saves():
+            # 编辑日志在后台成组同步，退出前同步最后写入的记录
+            api = SceneEditorAPI.get_instance()
+            journal = api.get_journal()
+            if journal:
+                journal.close()
+            api.save_search_index()
+            super().closeEvent(event)
+        else:
+            event.ignore()
+            
+    def _wait_for_saves(self) -> bool:
+        """
+        等待后台保存完成
+        
+        Returns:
+            bool: 是否可以关闭窗口，用户取消时返回False
+        """
+        service = SaveService.get_instance()
+        if not service.is_busy() or service.wait_for_done(self.SAVE_WAIT_MS):
+            return True
+            
+        box = QMessageBox(QMessageBox.Icon.Information, "正在保存",
+                          "正在等待后台保存完成，完成后将自动退出。", parent=self)
+        force_button = box.addButton("强制退出", QMessageBox.ButtonRole.DestructiveRole)
+        box.addButton("取消", QMessageBox.ButtonRole.RejectRole)
+        # 保存完成后自动关闭提示
+        timer = QTimer(box)
+        timer.timeout.connect(lambda: box.accept() if not service.is_busy() else None)
+        timer.start(100)
+        box.exec()
+        timer.stop()
+        
+        if not service.is_busy():
+            return True
+        if box.clickedButton() is force_button:
+            service.abandon()
+            return True
+        return False
         
     def get_project_info_dock(self) -> QDockWidget:
         """获取项目信息dock widget"""
@@ -89,15 +142,30 @@ class MainWindow(QMainWindow):
         """获取AI助手dock widget"""
         return self.assistant_dock
         
+    def get_assistant_panel(self) -> QWidget:
+        """获取AI助手面板，尚未创建时立即创建"""
+        return self.assistant_dock.ensure_loaded()
+        
+    def get_profiler_dock(self) -> QDockWidget:
+        """获取性能分析dock widget"""
+        return self.profiler_dock
+        
     def get_scene_editor(self) -> QWidget:
         """获取场景编辑器widget"""
         return self.scene_editor
         
+    def get_profiler_panel(self) -> QWidget:
+        """获取性能分析面板，尚未创建时立即创建"""
+        return self.profiler_dock.ensure_loaded()
+        
     def setup_dock_widgets(self):
         """设置停靠窗口"""
+        startup = StartupProfiler.get_instance()
+        
         # 1. 项目信息面板（左侧）
         self.project_info_dock = QDockWidget("项目信息", self)
-        self.project_info_panel = ProjectInfoPanel()  # 创建面板实例
+        with startup.phase("项目信息面板", kind="panel"):
+            self.project_info_panel = ProjectInfoPanel()  # 创建面板实例
         ProjectInfoAPI.get_instance().set_panel(self.project_info_panel)  # 注册面板到API
         self.project_info_dock.setWidget(self.project_info_panel)  # 设置面板到dock中
         self.project_info_dock.setFeatures(
@@ -108,12 +176,14 @@ class MainWindow(QMainWindow):
         self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.project_info_dock)
         
         # 2. 场景编辑器（中央）
-        self.scene_editor = SceneEditorAPI.get_instance().create_scene_editor()  # 创建并存储场景编辑器实例
+        with startup.phase("场景编辑器", kind="panel"):
+            self.scene_editor = SceneEditorAPI.get_instance().create_scene_editor()  # 创建并存储场景编辑器实例
         self.setCentralWidget(self.scene_editor)  # 使用存储的实例
         
         # 3. 日志面板（底部）
         self.log_dock = QDockWidget("日志", self)
-        self.log_panel = LogPanel()  # 创建日志面板实例
+        with startup.phase("日志面板", kind="panel"):
+            self.log_panel = LogPanel()  # 创建日志面板实例
         LogManagerAPI.get_instance().set_panel(self.log_panel)  # 注册面板到API
         self.log_dock.setWidget(self.log_panel)
         self.log_dock.setFeatures(
@@ -123,11 +193,8 @@ class MainWindow(QMainWindow):
         )
         self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.log_dock)
         
-        # 4. AI助手面板（右侧）
-        self.assistant_dock = QDockWidget("AI助手", self)
-        self.assistant_panel = AIAssistantPanel()  # 创建AI助手面板实例
-        AIAssistantAPI.get_instance().set_panel(self.assistant_panel)  # 注册面板到API
-        self.assistant_dock.setWidget(self.assistant_panel)
+        # 4. AI助手面板（右侧），首次显示时创建
+        self.assistant_dock = LazyDockWidget("AI助手", self._create_assistant_panel, self)
         self.assistant_dock.setFeatures(
             QDockWidget.DockWidgetFeature.DockWidgetClosable |
             QDockWidget.DockWidgetFeature.DockWidgetMovable |
@@ -135,6 +202,16 @@ class MainWindow(QMainWindow):
         )
         self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.assistant_dock)
         
+        # 5. 性能分析面板（与日志面板叠放为标签页），切换到该标签页时创建
+        self.profiler_dock = LazyDockWidget("性能分析", self._create_profiler_panel, self)
+        self.profiler_dock.setFeatures(
+            QDockWidget.DockWidgetFeature.DockWidgetClosable |
+            QDockWidget.DockWidgetFeature.DockWidgetMovable |
+            QDockWidget.DockWidgetFeature.DockWidgetFloatable
+        )
+        self.tabifyDockWidget(self.log_dock, self.profiler_dock)
+        self.log_dock.raise_()
+        
         # 设置初始布局和大小
         self.resizeDocks([self.project_info_dock], [300], Qt.Orientation.Horizontal)
         self.resizeDocks([self.assistant_dock], [300], Qt.Orientation.Horizontal)
@@ -146,4 +223,23 @@ class MainWindow(QMainWindow):
         self.log_dock.setMinimumHeight(100)
         
         # 应用默认布局
-        self.menuBar().restore_default_layout()
+        with startup.phase("默认布局"):
+            self.menuBar().restore_default_layout()
+        
+    def _create_assistant_panel(self) -> QWidget:
+        """创建AI助手面板并注册到API"""
+        from modules.ai_assistant.ai_assistant_panel import AIAssistantPanel
+        from modules.ai_assistant.api import AIAssistantAPI
+        
+        panel = AIAssistantPanel()
+        AIAssistantAPI.get_instance().set_panel(panel)
+        return panel
+        
+    def _create_profiler_panel(self) -> QWidget:
+        """创建性能分析面板并注册到API"""
+        from modules.profiler.api import ProfilerAPI
+        from modules.profiler.profiler_panel import ProfilerPanel
+        
+        panel = ProfilerPanel()
+        ProfilerAPI.get_instance().set_panel(panel)
+        return panel
@@ -29,17 +29,9 @@ class AIAssistantPanel(QWidget):
         
         # 创建对话历史文本编辑器
         self.chat_history = QTextEdit()
+        self.chat_history.setObjectName("AssistantChatHistory")
         self.chat_history.setReadOnly(True)
         
-        # 设置对话历史的样式
-        self.chat_history.setStyleSheet("""
-            QTextEdit {
-                background-color: #1e1e1e;
-                color: #ffffff;
-                font-family: "Microsoft YaHei", "微软雅黑", sans-serif;
-                font-size: 12px;
-            }
-        """)
         
         # 创建输入区域
         input_layout = QHBoxLayout()
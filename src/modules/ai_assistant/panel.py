@@ -21,6 +21,7 @@ class AIAssistantPanel(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.setObjectName("AssistantPanel")
         self.api = AIAssistantAPI()
         self.setup_ui()
         
@@ -43,21 +44,7 @@ class AIAssistantPanel(QWidget):
         # 发送按钮
         self.send_button = QPushButton("发送")
         self.send_button.clicked.connect(self.send_request)
-        self.send_button.setStyleSheet("""
-            QPushButton {
-                background-color: #0d47a1;
-                color: white;
-                border: none;
-                padding: 8px;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #1565c0;
-            }
-            QPushButton:pressed {
-                background-color: #0a3d91;
-            }
-        """)
+        self.send_button.setObjectName("AssistantSendButton")
         
         # 响应区域
         self.response_edit = QTextEdit()
@@ -71,9 +58,6 @@ class AIAssistantPanel(QWidget):
         layout.addWidget(self.send_button)
         layout.addWidget(self.response_edit)
         
-        # 应用样式
-        self.apply_style()
-        
     def send_request(self):
         """Send request to AI and get response."""
         query = self.input_edit.toPlainText()
@@ -94,49 +78,4 @@ class AIAssistantPanel(QWidget):
     def get_suggestions(self, context: str):
         """Get suggestions based on context."""
         suggestions = self.api.generate_suggestions(context)
-        return [s.content for s in suggestions]
-        
-    def apply_style(self):
-        """Apply styling to the panel."""
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #2d2d2d;
-                color: #ffffff;
-            }
-            QLabel {
-                font-size: 13px;
-            }
-            QComboBox {
-                background-color: #333333;
-                border: 1px solid #444444;
-                border-radius: 4px;
-                padding: 5px;
-                min-height: 25px;
-            }
-            QComboBox::drop-down {
-                border: none;
-            }
-            QComboBox::down-arrow {
-                image: url(down_arrow.png);
-                width: 12px;
-                height: 12px;
-            }
-            QComboBox:on {
-                border: 1px solid #0d47a1;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #333333;
-                border: 1px solid #444444;
-                selection-background-color: #0d47a1;
-            }
-            QTextEdit {
-                background-color: #1e1e1e;
-                border: 1px solid #3d3d3d;
-                border-radius: 4px;
-                padding: 5px;
-                font-size: 13px;
-            }
-            QTextEdit:focus {
-                border: 1px solid #0d47a1;
-            }
-        """) 
\ No newline at end of file
+        return [s.content for s in suggestions]
\ No newline at end of file
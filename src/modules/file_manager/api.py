@@ -8,11 +8,20 @@ Other modules should only use the methods defined in this file.
 其他模块只能使用此文件中定义的方法。
 """
 
-from typing import Optional, Dict, Any
+import logging
+import os
+from typing import Optional, Dict, Any, List
 from .project_saver import ProjectSaver
 from .project_loader import ProjectLoader
+from .save_service import SaveService
+from .project_opener import ProjectOpener
+from .resource_store import ResourceStore, ImportResult
+from .project_exporter import ProjectExporter, ExportResult
+from .edit_journal import EditJournal, JournalTarget
 from ..project_model.project_info_model import ProjectInfoModel
 
+logger = logging.getLogger(__name__)
+
 class FileManagerAPI:
     """文件管理器API类"""
     
@@ -20,6 +29,11 @@ class FileManagerAPI:
         self._saver = ProjectSaver()
         self._loader = ProjectLoader()
         self._current_project_path: Optional[str] = None
+        self._pending_saves: Dict[str, str] = {}
+        self._save_signal_connected = False
+        self._journal: Optional[EditJournal] = None
+        self._opener: Optional[ProjectOpener] = None
+        self._resource_store: Optional[ResourceStore] = None
         
     def save_project(self, project_info: ProjectInfoModel, project_path: str) -> bool:
         """
@@ -39,9 +53,70 @@ class FileManagerAPI:
                 self._current_project_path = project_path
             return success
         except Exception as e:
-            print(f"保存项目失败: {str(e)}")
+            logger.error("保存项目失败: %s", e)
             return False
             
+    def save_project_async(self, project_info: ProjectInfoModel, project_path: str) -> str:
+        """
+        后台保存项目
+        Save project in the background
+        
+        项目信息在调用时生成快照，序列化和写入在工作线程中进行，
+        进度和结果通过 SaveService 的信号通知。
+        
+        Args:
+            project_info: 项目信息对象
+            project_path: 项目保存路径
+            
+        Returns:
+            str: 写入的项目描述文件路径
+        """
+        service = SaveService.get_instance()
+        if not self._save_signal_connected:
+            service.save_finished.connect(self._on_save_finished)
+            self._save_signal_connected = True
+        dep_file = service.save_project(project_info, project_path)
+        self._pending_saves[dep_file] = project_path
+        return dep_file
+        
+    def _on_save_finished(self, file_path: str, success: bool, error: str):
+        """后台保存完成后更新当前项目路径"""
+        project_path = self._pending_saves.pop(file_path, None)
+        if project_path and success:
+            self._current_project_path = project_path
+            
+    def update_project_info(self, project_info: ProjectInfoModel, changes: Dict[str, Any]) -> bool:
+        """
+        修改项目信息并追加到编辑日志
+        Update project info and append the change to the edit journal
+        
+        Args:
+            project_info: 项目信息对象
+            changes: 要修改的字段及新值
+            
+        Returns:
+            bool: 是否修改成功
+        """
+        try:
+            for key, value in changes.items():
+                setattr(project_info, key, value)
+            if self._journal:
+                info = project_info.to_dict()
+                self._journal.record(JournalTarget.PROJECT, "set_info",
+                                     payload={key: info[key] for key in changes if key in info})
+            return True
+        except Exception as e:
+            logger.error("修改项目信息失败: %s", e)
+            return False
+            
+    def set_journal(self, journal: Optional[EditJournal]):
+        """设置当前项目的编辑日志"""
+        self._journal = journal
+        
+    def get_journal(self) -> Optional[EditJournal]:
+        """获取当前项目的编辑日志"""
+        return self._journal
+        
     def load_project(self, project_path: str) -> Optional[ProjectInfoModel]:
         """
         加载项目
@@ -59,9 +134,34 @@ class FileManagerAPI:
                 self._current_project_path = project_path
             return project_info
         except Exception as e:
-            print(f"加载项目失败: {str(e)}")
+            logger.error("加载项目失败: %s", e)
             return None
             
+    def load_project_async(self, project_path: str) -> ProjectOpener:
+        """
+        后台加载项目
+        Load project in the background
+        
+        先读取项目描述文件并通过 project_info_loaded 信号通知，
+        然后在线程池中并行加载场景和公式文件，逐个通过信号通知。
+        正在进行的加载会被取消。
+        
+        Args:
+            project_path: 项目文件路径
+            
+        Returns:
+            ProjectOpener: 项目打开器，用于连接进度信号和取消加载
+        """
+        if self._opener is None:
+            self._opener = ProjectOpener()
+            self._opener.project_info_loaded.connect(self._on_project_info_loaded)
+        self._opener.open(project_path)
+        return self._opener
+        
+    def _on_project_info_loaded(self, project_path: str, project_info: ProjectInfoModel):
+        """项目描述文件读取完成后更新当前项目路径"""
+        self._current_project_path = project_path
+        
     def get_project_info(self) -> Optional[Dict[str, Any]]:
         """
         获取当前项目信息
@@ -75,9 +175,23 @@ class FileManagerAPI:
         try:
             return self._loader.get_project_info(self._current_project_path)
         except Exception as e:
-            print(f"获取项目信息失败: {str(e)}")
+            logger.error("获取项目信息失败: %s", e)
             return None
             
+    def get_project_files(self) -> Dict[str, list]:
+        """
+        获取当前项目的场景、公式和资源文件列表
+        Get scene, formula and resource file names of the current project
+        
+        目录列表按目录修改时间缓存，重复调用只需对每个目录做一次stat。
+        
+        Returns:
+            Dict[str, list]: 分类名 -> 文件名列表，无项目时为空字典
+        """
+        if not self._current_project_path:
+            return {}
+        return self._loader.scan_project_files(self._current_project_path)
+            
     def get_project_directory(self) -> Optional[str]:
         """
         获取当前项目目录
@@ -86,4 +200,69 @@ class FileManagerAPI:
         Returns:
             Optional[str]: 项目目录路径，无项目时返回None
         """
-        return self._current_project_path 
\ No newline at end of file
+        return self._current_project_path
+        
+    def get_resource_store(self) -> Optional[ResourceStore]:
+        """
+        获取当前项目的资源存储
+        Get the resource store of the current project
+        
+        Returns:
+            Optional[ResourceStore]: 资源存储，无当前项目时返回None
+        """
+        if not self._current_project_path:
+            return None
+        project_dir = os.path.dirname(self._current_project_path)
+        if self._resource_store is None or self._resource_store.project_dir != os.path.abspath(project_dir):
+            self._resource_store = ResourceStore(project_dir)
+        return self._resource_store
+        
+    def import_resources(self, source_paths: List[str], prefix: str = "") -> List[ImportResult]:
+        """
+        导入资源文件，相同内容只保存一份
+        Import resource files with deduplication
+        
+        Args:
+            source_paths: 源文件或目录路径
+            prefix: 资源名称前缀（逻辑目录）
+            
+        Returns:
+            List[ImportResult]: 导入结果
+        """
+        store = self.get_resource_store()
+        if store is None:
+            return []
+        results = []
+        files = []
+        for path in source_paths:
+            if os.path.isdir(path):
+                results.extend(store.import_directory(path, f"{prefix}/{os.path.basename(path)}" if prefix else os.path.basename(path)))
+            else:
+                files.append(path)
+        if files:
+            results.extend(store.import_files(files, prefix))
+        return results
+        
+    def export_project(self, export_path: str, progress=None, cancel=None) -> Optional[ExportResult]:
+        """
+        将当前项目打包导出
+        Package the current project into an archive
+        
+        文件在线程池中并行压缩，内容未变化的文件使用上次导出缓存的压缩数据。
+        
+        Args:
+            export_path: 归档文件路径
+            progress: 进度回调 progress(已完成文件数, 文件总数)
+            cancel: threading.Event，设置后停止导出
+            
+        Returns:
+            Optional[ExportResult]: 导出结果，失败或取消时返回None
+        """
+        if not self._current_project_path:
+            return None
+        try:
+            exporter = ProjectExporter(os.path.dirname(self._current_project_path))
+            return exporter.export(export_path, progress, cancel)
+        except Exception as e:
+            logger.error("导出项目失败: %s", e)
+            return None
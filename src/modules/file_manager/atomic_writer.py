@@ -0,0 +1,104 @@
+"""
+Atomic Writer Module
+原子写入模块
+
+This module writes files atomically: data goes to a temporary file in the same
+directory, is flushed with fsync, and then replaces the target with os.replace.
+此模块以原子方式写入文件：数据先写入同目录下的临时文件并fsync，再用os.replace替换目标文件。
+"""
+
+import os
+import json
+import stat
+import tempfile
+from typing import Any
+
+DEFAULT_FILE_MODE = 0o644
+
+
+def atomic_write(file_path: str, data: bytes):
+    """
+    原子写入文件
+
+    写入过程中崩溃时，目标文件要么保持旧内容，要么是完整的新内容。
+
+    Args:
+        file_path: 目标文件路径
+        data: 要写入的数据
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+
+    # 保留已有文件的权限，mkstemp 默认创建 0600 文件
+    try:
+        mode = stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        mode = DEFAULT_FILE_MODE
+
+    fd, temp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(file_path)}.", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    fsync_directory(directory)
+
+
+def atomic_copy(source_path: str, file_path: str, hasher: Any = None, chunk_size: int = 1024 * 1024):
+    """
+    原子复制文件，分块读取，大文件不会整个载入内存
+
+    Args:
+        source_path: 源文件路径
+        file_path: 目标文件路径
+        hasher: 可选的 hashlib 对象，复制的同时计算内容哈希
+        chunk_size: 每次读取的字节数
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(file_path)}.", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "wb") as dst, open(source_path, "rb") as src:
+            for chunk in iter(lambda: src.read(chunk_size), b""):
+                if hasher is not None:
+                    hasher.update(chunk)
+                dst.write(chunk)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.chmod(temp_path, DEFAULT_FILE_MODE)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    fsync_directory(directory)
+
+
+def atomic_write_json(file_path: str, data: Any, indent: int = 4):
+    """原子写入JSON文件"""
+    content = json.dumps(data, ensure_ascii=False, indent=indent)
+    atomic_write(file_path, content.encode("utf-8"))
+
+
+def fsync_directory(directory: str):
+    """同步目录项，确保重命名操作落盘（Windows不支持，直接跳过）"""
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,198 @@
+"""
+Directory Cache Module
+目录缓存模块
+
+This module caches project directory listings built with os.scandir. Each directory
+listing is revalidated with a single stat of the directory, and small metadata files
+such as project.dep are cached by their mtime and size.
+此模块缓存基于 os.scandir 的项目目录列表。每次使用前只需对目录做一次stat即可判断缓存是否有效，
+project.dep 等小文件按修改时间和大小缓存解析结果。
+"""
+
+import os
+import copy
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 项目目录下各类文件所在的子目录及扩展名，None表示不过滤
+PROJECT_FILE_CATEGORIES: Dict[str, Optional[Tuple[str, ...]]] = {
+    "scenes": (".scene", ".json", ".bscene"),
+    "formulas": (".formula",),
+    "resources": None,
+}
+
+# 目录修改时间距扫描时间小于该值时，同一时间片内的后续修改可能不会改变mtime，下次仍需重新扫描
+MTIME_GRANULARITY_NS = 2_000_000_000
+
+
+@dataclass(frozen=True)
+class DirEntryInfo:
+    """目录项信息"""
+    name: str
+    path: str
+    is_dir: bool
+    size: int
+    mtime: float
+
+
+@dataclass
+class _CachedDirectory:
+    """缓存的目录列表"""
+    mtime_ns: int
+    scanned_ns: int
+    entries: Tuple[DirEntryInfo, ...]
+
+    def is_valid(self, mtime_ns: int) -> bool:
+        return mtime_ns == self.mtime_ns and self.scanned_ns - mtime_ns > MTIME_GRANULARITY_NS
+
+
+@dataclass
+class _CachedFile:
+    """缓存的文件解析结果"""
+    mtime_ns: int
+    size: int
+    value: Any
+
+
+class DirectoryCache:
+    """目录缓存类"""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls) -> 'DirectoryCache':
+        """获取单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        if DirectoryCache._instance is not None:
+            raise Exception("This class is a singleton!")
+        DirectoryCache._instance = self
+        self._lock = threading.Lock()
+        self._directories: Dict[str, _CachedDirectory] = {}
+        self._files: Dict[Tuple[str, str], _CachedFile] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def list_dir(self, directory: str) -> Tuple[DirEntryInfo, ...]:
+        """
+        获取目录列表
+
+        目录的mtime未变化时直接返回缓存；增删或重命名文件会改变目录mtime并触发重新扫描。
+        已有文件内容的修改不会改变目录mtime，因此目录项中的 size/mtime 是扫描时的值。
+
+        Args:
+            directory: 目录路径
+
+        Returns:
+            Tuple[DirEntryInfo, ...]: 按名称排序的目录项，目录不存在时为空
+        """
+        directory = os.path.abspath(directory)
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            self.invalidate(directory)
+            return ()
+
+        with self._lock:
+            cached = self._directories.get(directory)
+            if cached is not None and cached.is_valid(mtime_ns):
+                self.hits += 1
+                return cached.entries
+            self.misses += 1
+
+        scanned_ns = time.time_ns()
+        entries = []
+        with os.scandir(directory) as iterator:
+            for entry in iterator:
+                try:
+                    stat = entry.stat()
+                    is_dir = entry.is_dir()
+                except OSError:
+                    # 扫描过程中被删除的文件
+                    continue
+                entries.append(DirEntryInfo(entry.name, entry.path, is_dir, stat.st_size, stat.st_mtime))
+        entries.sort(key=lambda item: item.name)
+        result = tuple(entries)
+
+        with self._lock:
+            self._directories[directory] = _CachedDirectory(mtime_ns, scanned_ns, result)
+        return result
+
+    def list_files(self, directory: str, extensions: Optional[Tuple[str, ...]] = None) -> List[DirEntryInfo]:
+        """获取目录下的文件，可按扩展名过滤"""
+        return [
+            entry for entry in self.list_dir(directory)
+            if not entry.is_dir and (extensions is None or entry.name.endswith(extensions))
+        ]
+
+    def scan_project(self, project_dir: str) -> Dict[str, List[DirEntryInfo]]:
+        """
+        一次扫描项目的所有分类目录
+
+        Returns:
+            Dict[str, List[DirEntryInfo]]: 分类名 -> 文件列表，见 PROJECT_FILE_CATEGORIES
+        """
+        return {
+            category: self.list_files(os.path.join(project_dir, category), extensions)
+            for category, extensions in PROJECT_FILE_CATEGORIES.items()
+        }
+
+    def load_file(self, file_path: str, loader: Callable[[str], Any], key: str = "") -> Any:
+        """
+        按修改时间和大小缓存文件解析结果
+
+        Args:
+            file_path: 文件路径
+            loader: 解析函数，参数为文件路径
+            key: 同一文件使用不同解析函数时用于区分缓存
+
+        Returns:
+            Any: 解析结果
+        """
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        cache_key = (file_path, key)
+        with self._lock:
+            cached = self._files.get(cache_key)
+            if cached is not None and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+                self.hits += 1
+                return cached.value
+            self.misses += 1
+        value = loader(file_path)
+        with self._lock:
+            self._files[cache_key] = _CachedFile(stat.st_mtime_ns, stat.st_size, value)
+        return value
+
+    def load_json(self, file_path: str) -> Any:
+        """读取JSON文件，返回缓存结果的副本，调用方可以随意修改"""
+        return copy.deepcopy(self.load_file(file_path, _read_json, "json"))
+
+    def invalidate(self, path: Optional[str] = None):
+        """
+        使缓存失效
+
+        Args:
+            path: 目录或文件路径，None表示清空全部缓存
+        """
+        with self._lock:
+            if path is None:
+                self._directories.clear()
+                self._files.clear()
+                return
+            path = os.path.abspath(path)
+            self._directories.pop(path, None)
+            self._directories.pop(os.path.dirname(path), None)
+            for cache_key in [k for k in self._files if k[0] == path]:
+                del self._files[cache_key]
+
+
+def _read_json(file_path: str) -> Any:
+    """读取JSON文件，压缩格式根据内容识别"""
+    from .serializers import load_file
+    
+    return load_file(file_path)
@@ -0,0 +1,524 @@
+"""
+Edit Journal Module
+编辑日志模块
+
+This module keeps a per-project append-only journal of model edits. Every edit is
+appended as one JSON line, so saving after a small edit costs O(edit size). The
+journal is compacted into the base project.dep, scene and blueprint files
+periodically or on explicit save, and replayed after a crash to recover unsaved work.
+此模块为每个项目维护只追加的编辑日志。每次编辑追加一行JSON，小改动的保存开销与改动大小成正比。
+日志会定期或在显式保存时合并到 project.dep、场景和蓝图文件中，崩溃重启后可回放日志恢复未保存的修改。
+
+日志中的操作都是幂等的，重复回放到已经包含这些修改的文件上结果不变，
+因此合并过程中途崩溃也不会损坏数据。
+
+fsync 在后台线程中成组进行，连续的多次编辑只同步一次；合并在后台保存服务中进行，
+UI线程只负责读取日志快照和截掉已合并的记录。
+"""
+
+import logging
+import os
+import json
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, ContextManager, Dict, List, Optional
+
+from .atomic_writer import atomic_write
+from .serializers import KIND_BLUEPRINT, KIND_PROJECT, dump_file, load_file
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE_NAME = "project.journal"
+BLUEPRINT_DIR = "scripts"
+BLUEPRINT_EXT = ".blueprint.json"
+
+
+class JournalTarget(Enum):
+    """日志记录的目标类型"""
+    PROJECT = "project"      # 项目信息
+    SCENE = "scene"          # 场景节点
+    BLUEPRINT = "blueprint"  # 蓝图
+
+
+@dataclass
+class JournalRecord:
+    """日志记录"""
+    seq: int
+    target: JournalTarget
+    op: str
+    key: str = ""
+    payload: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        """转换为字典"""
+        return {
+            "seq": self.seq,
+            "time": self.timestamp,
+            "target": self.target.value,
+            "op": self.op,
+            "key": self.key,
+            "payload": self.payload
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'JournalRecord':
+        """从字典创建"""
+        return cls(
+            seq=data["seq"],
+            target=JournalTarget(data["target"]),
+            op=data["op"],
+            key=data.get("key", ""),
+            payload=data.get("payload", {}),
+            timestamp=data.get("time", 0.0)
+        )
+
+
+class EditJournal:
+    """编辑日志类"""
+
+    def __init__(self, project_dir: str, compact_threshold: int = 500, durable: bool = True,
+                 sync_delay: float = 0.05):
+        """
+        Args:
+            project_dir: 项目目录
+            compact_threshold: 日志记录数达到该值时需要合并
+            durable: 记录写入后是否fsync
+            sync_delay: 后台fsync前等待的秒数，期间写入的记录合并为一次同步
+        """
+        self.project_dir = project_dir
+        self.journal_path = os.path.join(project_dir, JOURNAL_FILE_NAME)
+        self.compact_threshold = compact_threshold
+        self.durable = durable
+        self.sync_delay = sync_delay
+        self._file = None
+        self._file_lock = threading.Lock()
+        self._sync_wanted = threading.Event()
+        self._sync_thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._compacting = False
+        self._applied_seq = 0
+        self._truncated_seq = 0
+        records = self.read_records()
+        self._pending_count = len(records)
+        self._next_seq = records[-1].seq + 1 if records else 1
+
+    # ------------------------------------------------------------------
+    # 记录
+    # ------------------------------------------------------------------
+
+    def record(self, target: JournalTarget, op: str, key: str = "",
+               payload: Optional[Dict[str, Any]] = None) -> JournalRecord:
+        """
+        追加一条编辑记录
+
+        Args:
+            target: 目标类型
+            op: 操作名称
+            key: 目标名称（场景名、蓝图名）
+            payload: 操作数据，必须可以JSON序列化
+
+        Returns:
+            JournalRecord: 写入的记录
+        """
+        entry = JournalRecord(self._next_seq, target, op, key, payload or {})
+        f = self._open()
+        f.write(_encode_record(entry))
+        f.flush()
+        if self.durable:
+            self._request_sync()
+        self._next_seq += 1
+        self._pending_count += 1
+        return entry
+
+    def sync(self):
+        """将已写入的记录立即同步到磁盘"""
+        with self._file_lock:
+            if self._file:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def _request_sync(self):
+        """请求后台线程同步，UI线程不等待磁盘"""
+        if self._sync_thread is None:
+            self._closing = False
+            self._sync_thread = threading.Thread(
+                target=self._sync_loop, name="EditJournalSync", daemon=True)
+            self._sync_thread.start()
+        self._sync_wanted.set()
+
+    def _sync_loop(self):
+        """后台同步线程，等待期间追加的记录由同一次fsync落盘"""
+        while not self._closing:
+            self._sync_wanted.wait()
+            if not self._closing:
+                time.sleep(self.sync_delay)
+            self._sync_wanted.clear()
+            try:
+                with self._file_lock:
+                    if self._file:
+                        os.fsync(self._file.fileno())
+            except (OSError, ValueError) as e:
+                logger.error("同步编辑日志失败: %s", e)
+
+    @property
+    def pending_count(self) -> int:
+        """尚未合并的记录数"""
+        return self._pending_count
+
+    def has_pending(self) -> bool:
+        """是否有尚未合并的记录"""
+        return self._pending_count > 0
+
+    def needs_compaction(self) -> bool:
+        """是否需要合并，已有合并在进行时返回False"""
+        return not self._compacting and self._pending_count >= self.compact_threshold
+
+    def read_records(self) -> List[JournalRecord]:
+        """
+        读取全部日志记录
+
+        末尾因崩溃而写了一半的记录会被忽略。
+        """
+        records = []
+        if not os.path.exists(self.journal_path):
+            return records
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    records.append(JournalRecord.from_dict(json.loads(line)))
+                except (ValueError, KeyError):
+                    logger.warning("编辑日志记录损坏，忽略之后的记录: %s", self.journal_path)
+                    break
+        return records
+
+    # ------------------------------------------------------------------
+    # 合并与恢复
+    # ------------------------------------------------------------------
+
+    def compact(self) -> bool:
+        """
+        在当前线程中将日志合并到项目基础文件并清空日志
+
+        只有被日志修改过的文件会被重写。编辑过程中应使用 SaveService.compact_journal 在后台合并。
+
+        Returns:
+            bool: 是否合并成功
+        """
+        try:
+            records = self.begin_compaction()
+            if records:
+                self.apply_compaction(records)
+            self.finish_compaction()
+            return True
+        except Exception as e:
+            self._compacting = False
+            logger.error("合并编辑日志失败: %s", e)
+            return False
+
+    def begin_compaction(self) -> List[JournalRecord]:
+        """
+        开始合并，在UI线程中调用
+
+        读取日志快照，并释放映射着将被重写的二进制场景文件的懒加载场景。
+
+        Returns:
+            List[JournalRecord]: 要合并的记录，之后追加的记录留待下次合并
+        """
+        from ..scene_editor.scene_binary import SCENE_BINARY_EXT, release_scene_file
+
+        if self._file:
+            self._file.flush()
+        records = self.read_records()
+        if not records:
+            return records
+        self._compacting = True
+        scenes_dir = os.path.join(self.project_dir, "scenes")
+        for scene_name in {r.key for r in records if r.target == JournalTarget.SCENE}:
+            release_scene_file(os.path.join(scenes_dir, f"{scene_name}{SCENE_BINARY_EXT}"))
+        return records
+
+    def apply_compaction(self, records: List[JournalRecord],
+                         lock_file: Optional[Callable[[str], ContextManager]] = None):
+        """
+        将日志快照应用到项目基础文件，可以在工作线程中调用
+
+        Args:
+            records: begin_compaction 返回的记录
+            lock_file: 返回文件写入锁的函数，每个文件在锁内读取和重写
+        """
+        apply_records_to_files(self.project_dir, records, lock_file)
+        with self._file_lock:
+            self._applied_seq = max(self._applied_seq, records[-1].seq)
+
+    def finish_compaction(self):
+        """结束合并，在UI线程中调用，从日志中截掉已经应用到基础文件的记录"""
+        self._compacting = False
+        with self._file_lock:
+            applied_seq = self._applied_seq
+        if applied_seq <= self._truncated_seq:
+            return
+        self._close_file()
+        kept = [r for r in self.read_records() if r.seq > applied_seq]
+        atomic_write(self.journal_path, b"".join(_encode_record(r) for r in kept))
+        self._truncated_seq = applied_seq
+        self._pending_count = len(kept)
+
+    def recover(self) -> bool:
+        """崩溃后回放日志，恢复未保存的修改"""
+        return self.compact()
+
+    def discard(self):
+        """丢弃日志中未合并的修改"""
+        self._reset()
+
+    def close(self):
+        """同步并关闭日志文件，停止后台同步线程"""
+        self._close_file()
+        if self._sync_thread is not None:
+            self._closing = True
+            self._sync_wanted.set()
+            self._sync_thread.join()
+            self._sync_thread = None
+            self._sync_wanted.clear()
+
+    def _close_file(self):
+        """同步并关闭日志文件"""
+        with self._file_lock:
+            if self._file:
+                self._file.flush()
+                if self.durable:
+                    os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+
+    def _open(self):
+        """以追加方式打开日志文件"""
+        if self._file is None:
+            self._truncate_partial_tail()
+            self._file = open(self.journal_path, "ab")
+        return self._file
+
+    def _truncate_partial_tail(self):
+        """截掉末尾不完整的记录，避免新记录接在半行之后"""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def _reset(self):
+        """清空日志"""
+        self._close_file()
+        atomic_write(self.journal_path, b"")
+        self._pending_count = 0
+
+
+def _encode_record(entry: JournalRecord) -> bytes:
+    """将记录编码为一行日志"""
+    line = json.dumps(entry.to_dict(), ensure_ascii=False, separators=(",", ":"))
+    return line.encode("utf-8") + b"\n"
+
+
+# ----------------------------------------------------------------------
+# 回放
+# ----------------------------------------------------------------------
+
+def apply_records_to_files(project_dir: str, records: List[JournalRecord],
+                           lock_file: Optional[Callable[[str], ContextManager]] = None):
+    """
+    将日志记录应用到项目基础文件
+
+    Args:
+        project_dir: 项目目录
+        records: 日志记录
+        lock_file: 返回文件写入锁的函数，默认不加锁
+    """
+    lock_file = lock_file or (lambda path: nullcontext())
+    project_records = [r for r in records if r.target == JournalTarget.PROJECT]
+    scene_records: Dict[str, List[JournalRecord]] = {}
+    blueprint_records: Dict[str, List[JournalRecord]] = {}
+    for entry in records:
+        if entry.target == JournalTarget.SCENE:
+            scene_records.setdefault(entry.key, []).append(entry)
+        elif entry.target == JournalTarget.BLUEPRINT:
+            blueprint_records.setdefault(entry.key, []).append(entry)
+
+    if project_records:
+        dep_file = os.path.join(project_dir, "project.dep")
+        with lock_file(dep_file):
+            if os.path.exists(dep_file):
+                project_structure = load_file(dep_file)
+                for entry in project_records:
+                    apply_project_record(project_structure, entry)
+                dump_file(dep_file, project_structure, KIND_PROJECT)
+
+    for scene_name, entries in scene_records.items():
+        _apply_scene_file(project_dir, scene_name, entries, lock_file)
+
+    for blueprint_name, entries in blueprint_records.items():
+        blueprint_file = os.path.join(project_dir, BLUEPRINT_DIR, f"{blueprint_name}{BLUEPRINT_EXT}")
+        with lock_file(blueprint_file):
+            blueprint = {"name": blueprint_name, "nodes": {}, "connections": []}
+            if os.path.exists(blueprint_file):
+                blueprint = load_file(blueprint_file)
+            for entry in entries:
+                apply_blueprint_record(blueprint, entry)
+            dump_file(blueprint_file, blueprint, KIND_BLUEPRINT)
+
+
+def _apply_scene_file(project_dir: str, scene_name: str, entries: List[JournalRecord],
+                      lock_file: Callable[[str], ContextManager]):
+    """
+    将日志记录应用到场景文件
+
+    两种格式的文件都在写入锁内处理，保存场景时切换格式会删除另一种格式的文件。
+    """
+    from ..scene_editor.api import SceneEditorAPI
+    from ..scene_editor.scene_binary import SCENE_BINARY_EXT, SCENE_JSON_EXT, BinarySceneReader
+
+    scenes_dir = os.path.join(project_dir, "scenes")
+    binary_file = os.path.join(scenes_dir, f"{scene_name}{SCENE_BINARY_EXT}")
+    json_file = os.path.join(scenes_dir, f"{scene_name}{SCENE_JSON_EXT}")
+
+    with lock_file(binary_file), lock_file(json_file):
+        scene_data = None
+        scene_file = json_file
+        if os.path.exists(binary_file):
+            scene_file = binary_file
+            with BinarySceneReader(binary_file) as reader:
+                scene_data = reader.read_scene_dict()
+        elif os.path.exists(json_file):
+            scene_data = load_file(json_file)
+
+        scene_data = apply_scene_records(scene_data, entries)
+        if scene_data is None:
+            logger.warning("场景 %s 没有基础文件，无法回放编辑日志", scene_name)
+            return
+        # 映射着该文件的懒加载场景已在 begin_compaction 中释放
+        data = SceneEditorAPI.serialize_scene(scene_data, scene_file)
+        atomic_write(scene_file, data)
+
+
+def apply_project_record(project_structure: dict, entry: JournalRecord):
+    """将项目信息记录应用到项目结构字典"""
+    if entry.op == "set_info":
+        project_structure.setdefault("project_info", {}).update(entry.payload)
+
+
+def apply_scene_records(scene_data: Optional[dict], entries: List[JournalRecord]) -> Optional[dict]:
+    """
+    将一组场景记录应用到场景字典
+
+    Args:
+        scene_data: 场景字典，场景尚未保存过时为None
+        entries: 同一场景的日志记录
+
+    Returns:
+        Optional[dict]: 应用后的场景字典
+    """
+    index = _SceneDictIndex(scene_data) if scene_data is not None else None
+    for entry in entries:
+        payload = entry.payload
+        if entry.op == "create_scene":
+            scene_data = payload["scene"]
+            index = _SceneDictIndex(scene_data)
+            continue
+        if index is None:
+            continue
+
+        if entry.op == "add_node":
+            node = payload["node"]
+            if node["id"] in index.nodes:
+                # 节点已存在时原位替换，保持兄弟节点顺序
+                index.replace(node)
+            elif payload["parent_id"] in index.nodes:
+                index.append(payload["parent_id"], node)
+        elif entry.op == "update_node":
+            node = index.nodes.get(payload["node_id"])
+            if node is not None:
+                node.update(payload["fields"])
+        elif entry.op == "delete_node":
+            index.remove(payload["node_id"])
+    return scene_data
+
+
+class _SceneDictIndex:
+    """场景字典的节点索引，回放时避免重复遍历整棵树"""
+
+    def __init__(self, scene_data: dict):
+        self.nodes: Dict[str, dict] = {}
+        self.parents: Dict[str, Optional[dict]] = {}
+        self._add_subtree(scene_data["root_node"], None)
+
+    def _add_subtree(self, node: dict, parent: Optional[dict]):
+        stack = [(node, parent)]
+        while stack:
+            current, current_parent = stack.pop()
+            self.nodes[current["id"]] = current
+            self.parents[current["id"]] = current_parent
+            for child in current.get("children", []):
+                stack.append((child, current))
+
+    def _remove_subtree(self, node: dict):
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self.nodes.pop(current["id"], None)
+            self.parents.pop(current["id"], None)
+            stack.extend(current.get("children", []))
+
+    def append(self, parent_id: str, node: dict):
+        parent = self.nodes[parent_id]
+        parent.setdefault("children", []).append(node)
+        self._add_subtree(node, parent)
+
+    def replace(self, node: dict):
+        old = self.nodes[node["id"]]
+        parent = self.parents[node["id"]]
+        self._remove_subtree(old)
+        if parent is not None:
+            siblings = parent["children"]
+            siblings[next(i for i, child in enumerate(siblings) if child is old)] = node
+            self._add_subtree(node, parent)
+        else:
+            # 替换根节点时保留原字典对象，场景字典仍然引用它
+            old.clear()
+            old.update(node)
+            self._add_subtree(old, None)
+
+    def remove(self, node_id: str):
+        node = self.nodes.get(node_id)
+        parent = self.parents.get(node_id)
+        if node is None or parent is None:
+            return
+        parent["children"] = [child for child in parent["children"] if child is not node]
+        self._remove_subtree(node)
+
+
+def apply_blueprint_record(blueprint: dict, entry: JournalRecord):
+    """将蓝图记录应用到蓝图字典"""
+    payload = entry.payload
+    nodes = blueprint.setdefault("nodes", {})
+    connections = blueprint.setdefault("connections", [])
+    if entry.op == "add_node":
+        nodes[payload["name"]] = payload
+    elif entry.op == "remove_node":
+        name = payload["name"]
+        nodes.pop(name, None)
+        blueprint["connections"] = [
+            c for c in connections
+            if c["output_node"] != name and c["input_node"] != name
+        ]
+    elif entry.op == "add_connection":
+        if payload not in connections:
+            connections.append(payload)
+    elif entry.op == "remove_connection":
+        if payload in connections:
+            connections.remove(payload)
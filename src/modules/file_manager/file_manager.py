@@ -6,10 +6,15 @@ This module handles all file operations including saving, loading, and managing
 此模块处理所有文件操作，包括保存、加载和管理项目文件。
 """
 
+import logging
 import os
-import json
 from typing import Any, Dict
 from ..project_model.project_info_model import ProjectInfoModel
+from .atomic_writer import atomic_write
+from .serializers import KIND_PROJECT, dump_file, dumps, load_file
+from .project_exporter import ProjectExporter
+
+logger = logging.getLogger(__name__)
 
 class FileManager:
     """文件管理器类"""
@@ -31,33 +36,42 @@ class FileManager:
             # 将项目信息转换为字典
             project_data = project_info.to_dict()
             
-            # 保存到文件
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(project_data, f, ensure_ascii=False, indent=4)
+            # 原子保存到文件
+            dump_file(file_path, project_data, KIND_PROJECT)
                 
             self.current_project_path = file_path
             return True
             
         except Exception as e:
-            print(f"保存项目失败: {str(e)}")
+            logger.error("保存项目失败: %s", e)
             return False
             
     def load_project(self, file_path: str) -> ProjectInfoModel:
         """从文件加载项目"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                project_data = json.load(f)
+            project_data = load_file(file_path)
                 
             self.current_project_path = file_path
             return ProjectInfoModel.from_dict(project_data)
             
         except Exception as e:
-            print(f"加载项目失败: {str(e)}")
+            logger.error("加载项目失败: %s", e)
             return None
             
     def export_project(self, project_info: ProjectInfoModel, export_path: str) -> bool:
-        """导出项目"""
+        """
+        导出项目
+
+        项目已保存到磁盘时，将项目描述文件和各项目目录打包为归档；
+        项目尚未保存时只能导出项目信息。
+        """
         try:
+            project_dir = self.get_project_directory()
+            if project_dir and os.path.isdir(project_dir):
+                result = ProjectExporter(project_dir).export(export_path)
+                logger.info("导出项目: %s 个文件，重新压缩 %s 个", result.files, result.compressed)
+                return True
+                
             # 确保目录存在
             os.makedirs(os.path.dirname(export_path), exist_ok=True)
             
@@ -65,13 +79,12 @@ class FileManager:
             project_data = project_info.to_dict()
             
             # 导出到文件
-            with open(export_path, 'w', encoding='utf-8') as f:
-                json.dump(project_data, f, ensure_ascii=False, indent=4)
+            atomic_write(export_path, dumps(project_data, KIND_PROJECT))
                 
             return True
             
         except Exception as e:
-            print(f"导出项目失败: {str(e)}")
+            logger.error("导出项目失败: %s", e)
             return False
             
     def get_project_directory(self) -> str:
@@ -0,0 +1,368 @@
+"""
+Project Exporter Module
+项目导出模块
+
+This module packages a project into a tar archive. project.dep and the project
+directories are streamed from disk, each file is gzip-compressed on a thread pool, and
+the compressed members are written to the archive in a fixed order while later files
+are still being compressed. An export manifest records each file's size, mtime and
+content hash together with a cache of compressed blobs, so the next export neither
+re-hashes nor re-compresses files whose content has not changed.
+此模块将项目打包为 tar 归档。project.dep 和项目各目录的文件从磁盘流式读取，
+每个文件在线程池中单独进行 gzip 压缩，压缩结果按固定顺序写入归档，写入的同时后续文件仍在压缩。
+导出清单记录每个文件的大小、修改时间和内容哈希，并缓存压缩后的数据，
+下次导出时内容未变化的文件既不需要重新计算哈希，也不需要重新压缩。
+"""
+
+import logging
+import io
+import os
+import gzip
+import hashlib
+import tarfile
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .atomic_writer import fsync_directory
+from .project_saver import PROJECT_DIRECTORIES
+from .resource_store import RESOURCES_DIR, STORE_DIR, HASH_CACHE_FILE
+from .serializers import KIND_CONFIG, dump_file, dumps, load_file
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = ".export"
+EXPORT_MANIFEST_FILE = "manifest.json"
+EXPORT_BLOBS_DIR = "blobs"
+ARCHIVE_MANIFEST_NAME = "export_manifest.json"
+EXPORT_MANIFEST_VERSION = 1
+
+COMPRESSED_SUFFIX = ".gz"
+CHUNK_SIZE = 1024 * 1024
+
+
+class ExportCancelled(Exception):
+    """导出被取消"""
+
+
+@dataclass
+class ExportResult:
+    """导出结果"""
+    files: int = 0
+    compressed: int = 0   # 重新压缩的文件数
+    reused: int = 0       # 使用缓存压缩数据的文件数
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+
+@dataclass
+class _FileRecord:
+    """导出清单中的文件记录"""
+    path: str
+    size: int
+    mtime_ns: int
+    hash: str
+
+
+class ProjectExporter:
+    """项目导出器类"""
+
+    def __init__(self, project_dir: str, max_workers: Optional[int] = None, compress_level: int = 6):
+        """
+        Args:
+            project_dir: 项目目录
+            max_workers: 压缩线程数，默认由 ThreadPoolExecutor 决定
+            compress_level: gzip 压缩级别
+        """
+        self.project_dir = os.path.abspath(project_dir)
+        self.export_dir = os.path.join(self.project_dir, EXPORT_DIR)
+        self.blobs_dir = os.path.join(self.export_dir, EXPORT_BLOBS_DIR)
+        self.manifest_path = os.path.join(self.export_dir, EXPORT_MANIFEST_FILE)
+        self.max_workers = max_workers
+        self.compress_level = compress_level
+        self._blob_lock = threading.Lock()
+        self._blob_jobs: Dict[str, Future] = {}   # 内容哈希 -> 本次导出中压缩该内容的任务
+
+    def collect_files(self) -> List[str]:
+        """
+        需要导出的文件，相对项目目录的路径，按固定顺序排列
+
+        Returns:
+            List[str]: 使用 / 分隔的相对路径
+        """
+        files = []
+        if os.path.exists(os.path.join(self.project_dir, "project.dep")):
+            files.append("project.dep")
+        for directory in PROJECT_DIRECTORIES:
+            root_dir = os.path.join(self.project_dir, directory)
+            for root, dirs, names in os.walk(root_dir):
+                dirs.sort()
+                for name in sorted(names):
+                    relative = os.path.relpath(os.path.join(root, name), self.project_dir).replace(os.sep, "/")
+                    if not self._is_excluded(relative):
+                        files.append(relative)
+        return files
+
+    def export(self, export_path: str,
+               progress: Optional[Callable[[int, int], None]] = None,
+               cancel: Optional[threading.Event] = None) -> ExportResult:
+        """
+        导出项目
+
+        Args:
+            export_path: 归档文件路径
+            progress: 进度回调 progress(已完成文件数, 文件总数)，在调用线程中执行
+            cancel: 设置后停止导出，已写入的临时归档会被删除
+
+        Returns:
+            ExportResult: 导出结果
+
+        Raises:
+            ExportCancelled: 导出被取消
+        """
+        files = self.collect_files()
+        previous = self._load_manifest()
+        records: Dict[str, _FileRecord] = {}
+        result = ExportResult(files=len(files))
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        self._blob_jobs = {}
+
+        export_path = os.path.abspath(export_path)
+        directory = os.path.dirname(export_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(export_path)}.", suffix=".tmp", dir=directory)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor, \
+                    os.fdopen(fd, "wb") as archive_file, \
+                    tarfile.open(fileobj=archive_file, mode="w", format=tarfile.PAX_FORMAT) as archive:
+                # 按提交顺序取结果，前面的文件写入归档时后面的文件仍在压缩
+                futures = [executor.submit(self._prepare, path, previous.get(path), cancel) for path in files]
+                try:
+                    for index, future in enumerate(futures):
+                        record, blob_path, reused = future.result()
+                        records[record.path] = record
+                        self._add_member(archive, record, blob_path)
+                        result.bytes_in += record.size
+                        result.bytes_out += os.path.getsize(blob_path)
+                        if reused:
+                            result.reused += 1
+                        else:
+                            result.compressed += 1
+                        if progress:
+                            progress(index + 1, len(files))
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+                self._add_bytes(archive, ARCHIVE_MANIFEST_NAME, dumps({
+                    "version": EXPORT_MANIFEST_VERSION,
+                    "compression": "gzip",
+                    "files": [
+                        {"path": record.path, "size": record.size, "hash": record.hash}
+                        for record in (records[path] for path in files)
+                    ]
+                }, KIND_CONFIG))
+                archive_file.flush()
+                os.fsync(archive_file.fileno())
+            os.replace(temp_path, export_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        fsync_directory(directory)
+
+        self._save_manifest(records)
+        self._prune_blobs({record.hash for record in records.values()})
+        return result
+
+    # ------------------------------------------------------------------
+    # 工作线程
+    # ------------------------------------------------------------------
+
+    def _prepare(self, path: str, previous: Optional[_FileRecord],
+                 cancel: Optional[threading.Event]) -> Tuple[_FileRecord, str, bool]:
+        """
+        计算文件哈希并准备压缩数据
+
+        Returns:
+            Tuple[_FileRecord, str, bool]: (文件记录, 压缩数据路径, 是否使用了缓存)
+        """
+        if cancel is not None and cancel.is_set():
+            raise ExportCancelled()
+        file_path = os.path.join(self.project_dir, path)
+        stat = os.stat(file_path)
+        if previous is not None and previous.size == stat.st_size and previous.mtime_ns == stat.st_mtime_ns:
+            digest = previous.hash
+        else:
+            digest = self._known_hash(path) or _hash_file(file_path, cancel)
+        digest, blob_path, reused = self._prepare_blob(file_path, digest, cancel)
+        return _FileRecord(path, stat.st_size, stat.st_mtime_ns, digest), blob_path, reused
+
+    def _prepare_blob(self, file_path: str, digest: str,
+                      cancel: Optional[threading.Event]) -> Tuple[str, str, bool]:
+        """
+        准备文件内容的压缩数据，同一内容在一次导出中只压缩一次
+
+        内容相同的文件共用一个压缩任务，其余文件等待该任务完成，同一个缓存文件不会被并发写入。
+        压缩时重新计算哈希，文件在计算哈希后又被修改时按实际内容存放。
+
+        Returns:
+            Tuple[str, str, bool]: (实际内容的哈希, 压缩数据路径, 是否使用了已有的压缩数据)
+        """
+        while True:
+            blob_path = self._blob_path(digest)
+            with self._blob_lock:
+                job = self._blob_jobs.get(digest)
+                if job is None:
+                    if os.path.exists(blob_path):
+                        return digest, blob_path, True
+                    job = self._blob_jobs[digest] = Future()
+                    break
+            # 同一内容正在其他线程中压缩；该线程发现文件已被修改时重新申请
+            if job.result() == digest:
+                return digest, blob_path, True
+
+        try:
+            temp_path, actual = self._compress(file_path, cancel)
+        except BaseException as e:
+            with self._blob_lock:
+                del self._blob_jobs[digest]
+            job.set_exception(e)
+            raise
+        if actual == digest:
+            os.replace(temp_path, blob_path)
+            job.set_result(digest)
+            return digest, blob_path, False
+
+        # 计算哈希后文件被修改，等待同一哈希的文件重新申请压缩
+        actual_path = self._blob_path(actual)
+        with self._blob_lock:
+            del self._blob_jobs[digest]
+            placed = actual not in self._blob_jobs and not os.path.exists(actual_path)
+            if placed:
+                os.replace(temp_path, actual_path)
+        job.set_result(actual)
+        if placed:
+            return actual, actual_path, False
+        os.remove(temp_path)
+        return self._prepare_blob(file_path, actual, cancel)
+
+    def _blob_path(self, digest: str) -> str:
+        """内容对应的压缩缓存路径"""
+        return os.path.join(self.blobs_dir, digest + COMPRESSED_SUFFIX)
+
+    def _compress(self, file_path: str, cancel: Optional[threading.Event]) -> Tuple[str, str]:
+        """
+        流式压缩文件到临时文件，同时计算实际内容的哈希
+
+        Returns:
+            Tuple[str, str]: (临时文件路径, 实际内容的哈希)
+        """
+        hasher = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=self.blobs_dir)
+        try:
+            with os.fdopen(fd, "wb") as raw, open(file_path, "rb") as src:
+                # mtime=0 使相同内容的压缩结果完全一致
+                with gzip.GzipFile(filename="", mode="wb", fileobj=raw,
+                                   compresslevel=self.compress_level, mtime=0) as dst:
+                    for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                        if cancel is not None and cancel.is_set():
+                            raise ExportCancelled()
+                        hasher.update(chunk)
+                        dst.write(chunk)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return temp_path, hasher.hexdigest()
+
+    def _known_hash(self, path: str) -> Optional[str]:
+        """资源存储中的文件以内容哈希命名，不需要重新计算"""
+        parts = path.split("/")
+        if len(parts) == 4 and parts[0] == RESOURCES_DIR and parts[1] == STORE_DIR \
+                and len(parts[3]) == 64 and parts[3].startswith(parts[2]):
+            return parts[3]
+        return None
+
+    # ------------------------------------------------------------------
+    # 归档
+    # ------------------------------------------------------------------
+
+    def _add_member(self, archive: tarfile.TarFile, record: _FileRecord, blob_path: str):
+        """将压缩数据流式写入归档"""
+        info = tarfile.TarInfo(record.path + COMPRESSED_SUFFIX)
+        info.size = os.path.getsize(blob_path)
+        info.mtime = record.mtime_ns // 1_000_000_000
+        info.mode = 0o644
+        with open(blob_path, "rb") as f:
+            archive.addfile(info, f)
+
+    def _add_bytes(self, archive: tarfile.TarFile, name: str, data: bytes):
+        """写入内存中的数据"""
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mode = 0o644
+        archive.addfile(info, io.BytesIO(data))
+
+    # ------------------------------------------------------------------
+    # 导出清单
+    # ------------------------------------------------------------------
+
+    def _is_excluded(self, relative: str) -> bool:
+        """临时文件和本机相关的缓存不导出"""
+        name = relative.rsplit("/", 1)[-1]
+        if name.startswith(".") and name.endswith(".tmp"):
+            return True
+        return relative == f"{RESOURCES_DIR}/{STORE_DIR}/{HASH_CACHE_FILE}"
+
+    def _load_manifest(self) -> Dict[str, _FileRecord]:
+        """读取上次导出的清单"""
+        try:
+            if not os.path.exists(self.manifest_path):
+                return {}
+            data = load_file(self.manifest_path)
+            if data.get("version") != EXPORT_MANIFEST_VERSION:
+                return {}
+            return {
+                path: _FileRecord(path, item["size"], item["mtime_ns"], item["hash"])
+                for path, item in data.get("files", {}).items()
+            }
+        except Exception as e:
+            logger.error("读取导出清单失败: %s", e)
+            return {}
+
+    def _save_manifest(self, records: Dict[str, _FileRecord]):
+        """保存本次导出的清单"""
+        try:
+            dump_file(self.manifest_path, {
+                "version": EXPORT_MANIFEST_VERSION,
+                "files": {
+                    path: {"size": record.size, "mtime_ns": record.mtime_ns, "hash": record.hash}
+                    for path, record in sorted(records.items())
+                }
+            }, KIND_CONFIG)
+        except Exception as e:
+            logger.error("保存导出清单失败: %s", e)
+
+    def _prune_blobs(self, referenced: set):
+        """删除本次导出没有用到的压缩缓存"""
+        for name in os.listdir(self.blobs_dir):
+            if name.endswith(COMPRESSED_SUFFIX) and name[:-len(COMPRESSED_SUFFIX)] not in referenced:
+                try:
+                    os.remove(os.path.join(self.blobs_dir, name))
+                except OSError:
+                    pass
+
+
+def _hash_file(file_path: str, cancel: Optional[threading.Event] = None) -> str:
+    """流式计算文件的 SHA-256"""
+    hasher = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            if cancel is not None and cancel.is_set():
+                raise ExportCancelled()
+            hasher.update(chunk)
+    return hasher.hexdigest()
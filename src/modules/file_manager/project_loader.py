@@ -6,19 +6,22 @@ This module handles project loading operations.
 此模块处理项目加载操作。
 """
 
+import logging
 import os
-import json
 from typing import Dict, Any, Optional
-from ..project_model.project_info_model import (
-    ProjectInfoModel, GameType, TargetPlatform,
-    GameStyle, TimeSetting, TargetAudience
-)
+from .directory_cache import DirectoryCache, PROJECT_FILE_CATEGORIES
+from .resource_store import RESOURCES_DIR, MANIFEST_FILE, is_store_file
+from .serializers import load_file
+from ..project_model.project_info_model import ProjectInfoModel
+
+logger = logging.getLogger(__name__)
 
 class ProjectLoader:
     """项目加载器类"""
     
     def __init__(self):
         self.project_structure: Dict[str, Any] = {}
+        self._cache = DirectoryCache.get_instance()
         
     def load_project(self, project_path: str) -> Optional[ProjectInfoModel]:
         """
@@ -34,73 +37,16 @@ class ProjectLoader:
             # 读取项目描述文件
             dep_file = os.path.join(os.path.dirname(project_path), "project.dep")
             if not os.path.exists(dep_file):
-                print(f"项目描述文件不存在: {dep_file}")
+                logger.warning("项目描述文件不存在: %s", dep_file)
                 return None
                 
-            with open(dep_file, 'r', encoding='utf-8') as f:
-                self.project_structure = json.load(f)
+            self.project_structure = self._cache.load_json(dep_file)
                 
-            project_info = self.project_structure.get("project_info", {})
-            
-            # 转换枚举值
-            game_type = None
-            if "game_type" in project_info and project_info["game_type"]:
-                try:
-                    game_type = GameType[project_info["game_type"]]
-                except KeyError:
-                    print(f"无效的游戏类型: {project_info['game_type']}")
-            
-            target_platforms = []
-            if "target_platforms" in project_info and project_info["target_platforms"]:
-                for platform in project_info["target_platforms"]:
-                    try:
-                        target_platforms.append(TargetPlatform[platform])
-                    except KeyError:
-                        print(f"无效的目标平台: {platform}")
-            
-            game_style = None
-            if "game_style" in project_info and project_info["game_style"]:
-                try:
-                    game_style = GameStyle[project_info["game_style"]]
-                except KeyError:
-                    print(f"无效的游戏风格: {project_info['game_style']}")
-            
-            time_setting = None
-            if "time_setting" in project_info and project_info["time_setting"]:
-                try:
-                    time_setting = TimeSetting[project_info["time_setting"]]
-                except KeyError:
-                    print(f"无效的时代背景: {project_info['time_setting']}")
-            
-            target_audiences = []
-            if "target_audience" in project_info and project_info["target_audience"]:
-                if isinstance(project_info["target_audience"], list):
-                    for audience in project_info["target_audience"]:
-                        try:
-                            target_audiences.append(TargetAudience[audience])
-                        except KeyError:
-                            print(f"无效的目标受众: {audience}")
-                else:
-                    try:
-                        target_audiences.append(TargetAudience[project_info["target_audience"]])
-                    except KeyError:
-                        print(f"无效的目标受众: {project_info['target_audience']}")
-            
-            # 创建项目信息对象
-            project_info = ProjectInfoModel(
-                name=project_info["name"],
-                description=project_info.get("description"),
-                game_type=game_type,
-                target_platforms=target_platforms,
-                game_style=game_style,
-                time_setting=time_setting,
-                target_audience=target_audiences
-            )
-            
-            return project_info
+            # 枚举的名称和值都可以识别，无效的枚举值会被忽略
+            return ProjectInfoModel.from_dict(self.project_structure.get("project_info", {}))
             
         except Exception as e:
-            print(f"加载项目失败: {str(e)}")
+            logger.error("加载项目失败: %s", e)
             return None
             
     def get_project_info(self, project_path: str) -> Optional[Dict[str, Any]]:
@@ -118,11 +64,10 @@ class ProjectLoader:
             if not os.path.exists(dep_file):
                 return None
                 
-            with open(dep_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self._cache.load_json(dep_file)
                 
         except Exception as e:
-            print(f"获取项目信息失败: {str(e)}")
+            logger.error("获取项目信息失败: %s", e)
             return None
             
     def get_scene_files(self, project_path: str) -> list:
@@ -136,14 +81,10 @@ class ProjectLoader:
             list: 场景文件列表
         """
         try:
-            scenes_dir = os.path.join(os.path.dirname(project_path), "scenes")
-            if not os.path.exists(scenes_dir):
-                return []
-                
-            return [f for f in os.listdir(scenes_dir) if f.endswith('.scene')]
+            return self._list_category(project_path, "scenes")
             
         except Exception as e:
-            print(f"获取场景文件失败: {str(e)}")
+            logger.error("获取场景文件失败: %s", e)
             return []
             
     def get_formula_files(self, project_path: str) -> list:
@@ -157,14 +98,10 @@ class ProjectLoader:
             list: 公式文件列表
         """
         try:
-            formulas_dir = os.path.join(os.path.dirname(project_path), "formulas")
-            if not os.path.exists(formulas_dir):
-                return []
-                
-            return [f for f in os.listdir(formulas_dir) if f.endswith('.formula')]
+            return self._list_category(project_path, "formulas")
             
         except Exception as e:
-            print(f"获取公式文件失败: {str(e)}")
+            logger.error("获取公式文件失败: %s", e)
             return []
             
     def get_resource_files(self, project_path: str) -> list:
@@ -178,12 +115,46 @@ class ProjectLoader:
             list: 资源文件列表
         """
         try:
-            resources_dir = os.path.join(os.path.dirname(project_path), "resources")
-            if not os.path.exists(resources_dir):
-                return []
-                
-            return os.listdir(resources_dir)
+            return self._list_resources(project_path, self._list_category(project_path, "resources"))
+            
+        except Exception as e:
+            logger.error("获取资源文件失败: %s", e)
+            return []
+            
+    def scan_project_files(self, project_path: str) -> Dict[str, list]:
+        """
+        一次获取场景、公式和资源文件列表
+        
+        Args:
+            project_path: 项目文件路径
             
+        Returns:
+            Dict[str, list]: 分类名 -> 文件名列表
+        """
+        try:
+            scan = self._cache.scan_project(os.path.dirname(project_path))
+            files = {category: [entry.name for entry in entries] for category, entries in scan.items()}
+            files["resources"] = self._list_resources(project_path, files["resources"])
+            return files
         except Exception as e:
-            print(f"获取资源文件失败: {str(e)}")
-            return [] 
\ No newline at end of file
+            logger.error("扫描项目文件失败: %s", e)
+            return {category: [] for category in PROJECT_FILE_CATEGORIES}
+            
+    def _list_category(self, project_path: str, category: str) -> list:
+        """获取项目某个分类目录下的文件名"""
+        directory = os.path.join(os.path.dirname(project_path), category)
+        extensions = PROJECT_FILE_CATEGORIES[category]
+        return [entry.name for entry in self._cache.list_files(directory, extensions)]
+        
+    def _list_resources(self, project_path: str, loose_files: list) -> list:
+        """资源存储清单中的资源名称，以及直接放在资源目录中的文件"""
+        manifest = os.path.join(os.path.dirname(project_path), RESOURCES_DIR, MANIFEST_FILE)
+        names = set(name for name in loose_files if not is_store_file(name))
+        if os.path.exists(manifest):
+            names.update(self._cache.load_file(manifest, _read_resource_names, "resource_names"))
+        return sorted(names)
+
+
+def _read_resource_names(manifest_path: str) -> list:
+    """读取资源清单中的资源名称"""
+    return list(load_file(manifest_path).get("resources", {}))
@@ -0,0 +1,231 @@
+"""
+Project Opener Module
+项目打开模块
+
+This module opens projects asynchronously. project.dep is read first so the project
+info can be shown immediately; scene and formula files are then parsed in parallel on
+a thread pool and streamed back to the UI thread through signals. Opening can be
+cancelled at any time.
+此模块异步打开项目。先读取 project.dep 以便立即显示项目信息，然后在线程池中并行解析
+场景和公式文件，并通过信号逐个送回UI线程。打开过程可以随时取消。
+"""
+
+import logging
+import os
+import json
+import time
+import threading
+from typing import Any, Callable, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from .directory_cache import DirectoryCache
+from .project_loader import ProjectLoader
+from ..profiler.api import ProfilerAPI, timed
+
+logger = logging.getLogger(__name__)
+
+
+class _OpenTask(QRunnable):
+    """打开项目的后台任务"""
+
+    def __init__(self, opener: 'ProjectOpener', generation: int, work: Callable[[], None]):
+        super().__init__()
+        self.opener = opener
+        self.generation = generation
+        self.work = work
+
+    def run(self):
+        opener = self.opener
+        try:
+            if not opener._is_cancelled(self.generation):
+                self.work()
+        except Exception as e:
+            logger.error("打开项目任务失败: %s", e)
+        finally:
+            opener._task_done(self.generation)
+
+
+class ProjectOpener(QObject):
+    """异步项目打开器类"""
+
+    project_info_loaded = pyqtSignal(str, object)  # 项目文件路径, ProjectInfoModel
+    scene_loaded = pyqtSignal(str, object)         # 场景名称, Scene
+    formula_loaded = pyqtSignal(str, object)       # 公式名称, 公式数据
+    file_failed = pyqtSignal(str, str)             # 文件路径, 错误信息
+    progress = pyqtSignal(int, int)                # 已完成文件数, 文件总数
+    finished = pyqtSignal(str, bool, str)          # 项目文件路径, 是否成功, 错误信息
+
+    def __init__(self, parent=None, max_threads: Optional[int] = None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        if max_threads:
+            self._pool.setMaxThreadCount(max_threads)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._cancelled = False
+        self._pending = 0
+        self._total = 0
+        self._done = 0
+        self._failed = False
+        self._project_path = ""
+        self._started = 0.0
+
+    def open(self, project_path: str) -> int:
+        """
+        开始打开项目，正在进行的打开操作会被取消
+
+        Args:
+            project_path: 项目文件路径
+
+        Returns:
+            int: 本次打开的编号
+        """
+        self.cancel()
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._cancelled = False
+            self._pending = 0
+            self._total = 0
+            self._done = 0
+            self._failed = False
+            self._project_path = project_path
+            self._started = time.perf_counter()
+        self._submit(generation, lambda: self._load_project_info(generation, project_path))
+        return generation
+
+    def cancel(self):
+        """取消正在进行的打开操作，尚未开始的文件不再加载"""
+        with self._lock:
+            if self._pending == 0 or self._cancelled:
+                return
+            # 排队中的任务开始运行时检查到取消后直接返回，最后一个任务结束时发送完成信号
+            self._cancelled = True
+
+    def is_running(self) -> bool:
+        """是否正在打开项目"""
+        with self._lock:
+            return self._pending > 0
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """等待所有任务结束"""
+        return self._pool.waitForDone(msecs)
+
+    # ------------------------------------------------------------------
+    # 后台任务
+    # ------------------------------------------------------------------
+
+    @timed("project.load_info")
+    def _load_project_info(self, generation: int, project_path: str):
+        """读取项目描述文件，然后提交场景和公式文件的加载任务"""
+        loader = ProjectLoader()
+        project_info = loader.load_project(project_path)
+        if project_info is None:
+            with self._lock:
+                self._failed = True
+            return
+        self.project_info_loaded.emit(project_path, project_info)
+
+        project_dir = os.path.dirname(project_path)
+        files = DirectoryCache.get_instance().scan_project(project_dir)
+        scenes = self._unique_scene_files(files["scenes"])
+        formulas = files["formulas"]
+        with self._lock:
+            self._total = len(scenes) + len(formulas)
+        self.progress.emit(0, self._total)
+
+        for entry in scenes:
+            self._submit(generation, lambda path=entry.path: self._load_scene(generation, path))
+        for entry in formulas:
+            self._submit(generation, lambda path=entry.path: self._load_formula(generation, path))
+
+    def _load_scene(self, generation: int, file_path: str):
+        """解析场景文件"""
+        from ..scene_editor.api import SceneEditorAPI
+
+        try:
+            scene = SceneEditorAPI.load_scene_file(file_path)
+            if scene is None:
+                raise ValueError("无法解析场景文件")
+            if not self._is_cancelled(generation):
+                self.scene_loaded.emit(os.path.splitext(os.path.basename(file_path))[0], scene)
+        except Exception as e:
+            self.file_failed.emit(file_path, str(e))
+        self._file_done(generation)
+
+    def _load_formula(self, generation: int, file_path: str):
+        """解析公式文件，JSON格式的公式解析为字典，否则保留文本"""
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                content = f.read()
+            try:
+                formula: Any = json.loads(content)
+            except ValueError:
+                formula = content
+            if not self._is_cancelled(generation):
+                self.formula_loaded.emit(os.path.splitext(os.path.basename(file_path))[0], formula)
+        except Exception as e:
+            self.file_failed.emit(file_path, str(e))
+        self._file_done(generation)
+
+    @staticmethod
+    def _unique_scene_files(entries: list) -> list:
+        """同名场景同时存在两种格式时只加载二进制文件，与 SceneEditorAPI.load_scene 一致"""
+        from ..scene_editor.scene_binary import SCENE_BINARY_EXT
+
+        chosen = {}
+        for entry in entries:
+            name, ext = os.path.splitext(entry.name)
+            if name not in chosen or ext == SCENE_BINARY_EXT:
+                chosen[name] = entry
+        return [chosen[name] for name in sorted(chosen)]
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    def _submit(self, generation: int, work: Callable[[], None]):
+        """提交后台任务"""
+        with self._lock:
+            if generation != self._generation or self._cancelled:
+                return
+            self._pending += 1
+        self._pool.start(_OpenTask(self, generation, work))
+
+    def _is_cancelled(self, generation: int) -> bool:
+        with self._lock:
+            return self._cancelled or generation != self._generation
+
+    def _file_done(self, generation: int):
+        """一个文件加载完成"""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._done += 1
+            done, total = self._done, self._total
+        self.progress.emit(done, total)
+
+    def _task_done(self, generation: int):
+        """任务结束，全部任务结束时发送完成信号"""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._pending -= 1
+            if self._pending > 0:
+                return
+            cancelled = self._cancelled
+            failed = self._failed
+            project_path = self._project_path
+            elapsed = time.perf_counter() - self._started
+        if not cancelled and not failed:
+            # 从开始打开到最后一个文件加载完成
+            profiler = ProfilerAPI.get_instance()
+            if profiler.is_enabled():
+                profiler.record("project.open", elapsed)
+        if cancelled:
+            self.finished.emit(project_path, False, "已取消")
+        elif failed:
+            self.finished.emit(project_path, False, "无法读取项目描述文件")
+        else:
+            self.finished.emit(project_path, True, "")
@@ -6,10 +6,24 @@ This module handles project saving operations.
 此模块处理项目保存操作。
 """
 
+import logging
 import os
 import json
 from typing import Dict, Any
 from ..project_model.project_info_model import ProjectInfoModel
+from .atomic_writer import atomic_write
+from .serializers import KIND_PROJECT, dumps
+
+logger = logging.getLogger(__name__)
+
+# 项目目录结构
+PROJECT_DIRECTORIES = [
+    "scenes",    # 场景目录
+    "formulas",  # 公式目录
+    "resources", # 资源目录
+    "configs",   # 配置目录
+    "scripts"    # 脚本目录
+]
 
 class ProjectSaver:
     """项目保存器类"""
@@ -26,53 +40,71 @@ class ProjectSaver:
             bool: 是否保存成功
         """
         try:
-            # 创建项目目录
-            project_dir = os.path.dirname(project_path)
-            if not os.path.exists(project_dir):
-                os.makedirs(project_dir)
-            
-            # 创建项目结构
-            project_structure = {
-                "version": "1.0.0",
-                "project_info": {
-                    "name": project_info.name,
-                    "description": project_info.description,
-                    "game_type": project_info.game_type.name if project_info.game_type else None,
-                    "target_platforms": [platform.name for platform in project_info.target_platforms],
-                    "game_style": project_info.game_style.name if project_info.game_style else None,
-                    "time_setting": project_info.time_setting.name if project_info.time_setting else None,
-                    "target_audience": [audience.name for audience in project_info.target_audience] if project_info.target_audience else None
-                },
-                "scenes": [],
-                "formulas": [],
-                "resources": []
-            }
-            
-            # 保存项目描述文件
-            dep_file = os.path.join(project_dir, "project.dep")
-            with open(dep_file, 'w', encoding='utf-8') as f:
-                json.dump(project_structure, f, ensure_ascii=False, indent=4)
-            
-            # 创建其他目录
-            self._create_project_directories(project_dir)
-            
+            project_structure = self.build_project_structure(project_info)
+            self.write_project_structure(project_structure, project_path)
             return True
             
         except Exception as e:
-            print(f"保存项目失败: {str(e)}")
+            logger.error("保存项目失败: %s", e)
             return False
             
+    @staticmethod
+    def build_project_structure(project_info: ProjectInfoModel) -> Dict[str, Any]:
+        """
+        创建项目结构快照
+        
+        Args:
+            project_info: 项目信息对象
+            
+        Returns:
+            Dict[str, Any]: 项目描述文件内容，不再引用模型对象
+        """
+        return {
+            "version": "1.0.0",
+            "project_info": project_info.to_dict(),
+            "scenes": [],
+            "formulas": [],
+            "resources": []
+        }
+        
+    @staticmethod
+    def serialize_project_structure(project_structure: Dict[str, Any]) -> bytes:
+        """将项目结构序列化为项目描述文件内容"""
+        return dumps(project_structure, KIND_PROJECT)
+        
+    def write_project_structure(self, project_structure: Dict[str, Any], project_path: str):
+        """
+        写入项目描述文件并创建项目目录结构
+        
+        Args:
+            project_structure: build_project_structure 生成的项目结构
+            project_path: 项目保存路径
+        """
+        self.write_project_data(self.serialize_project_structure(project_structure), project_path)
+        
+    def write_project_data(self, data: bytes, project_path: str):
+        """
+        原子写入已序列化的项目描述文件并创建项目目录结构
+        
+        Args:
+            data: 项目描述文件内容
+            project_path: 项目保存路径
+        """
+        # 创建项目目录
+        project_dir = os.path.dirname(project_path)
+        if not os.path.exists(project_dir):
+            os.makedirs(project_dir, exist_ok=True)
+        
+        # 保存项目描述文件
+        dep_file = os.path.join(project_dir, "project.dep")
+        atomic_write(dep_file, data)
+        
+        # 创建其他目录
+        self._create_project_directories(project_dir)
+            
     def _create_project_directories(self, project_dir: str):
         """创建项目目录结构"""
-        directories = [
-            "scenes",    # 场景目录
-            "formulas",  # 公式目录
-            "resources", # 资源目录
-            "configs",   # 配置目录
-            "scripts"    # 脚本目录
-        ]
-        
-        for directory in directories:
+        for directory in PROJECT_DIRECTORIES:
             dir_path = os.path.join(project_dir, directory)
             if not os.path.exists(dir_path):
-                os.makedirs(dir_path) 
\ No newline at end of file
+                os.makedirs(dir_path, exist_ok=True)
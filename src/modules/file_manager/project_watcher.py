@@ -0,0 +1,216 @@
+"""
+Project Watcher Module
+项目监视模块
+
+This module watches the project directories for external changes with
+QFileSystemWatcher. Directory notifications do not cover in-place edits of existing
+files on every platform, so all watched directories are also rescanned on a periodic
+poll, which is the only source of changes where native watching is unavailable.
+Bursts of notifications are coalesced, each affected directory is rescanned once and
+diffed against its previous snapshot, and per-file added/changed/removed events are
+published so caches and indexes can update incrementally.
+此模块使用 QFileSystemWatcher 监视项目目录的外部修改。目录通知并非在所有平台上都包含
+对已有文件的原地修改，因此所有监视的目录还会定期轮询扫描；无法使用系统通知的目录只依靠轮询。
+短时间内的大量通知会被合并，每个受影响的目录只重新扫描一次并与上次的快照比较，
+然后逐个文件发布新增、修改、删除事件，缓存和索引可以据此增量更新。
+"""
+
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from .directory_cache import DirectoryCache
+from .project_saver import PROJECT_DIRECTORIES
+
+FILE_ADDED = "added"
+FILE_CHANGED = "changed"
+FILE_REMOVED = "removed"
+
+# 目录快照: 文件名 -> (大小, 修改时间)
+_Snapshot = Dict[str, Tuple[int, float]]
+
+
+class ProjectWatcher(QObject):
+    """项目目录监视器类"""
+
+    file_added = pyqtSignal(str)      # 文件路径
+    file_changed = pyqtSignal(str)    # 文件路径
+    file_removed = pyqtSignal(str)    # 文件路径
+    files_changed = pyqtSignal(list)  # 一次合并后的全部事件 [(事件类型, 文件路径), ...]
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls) -> 'ProjectWatcher':
+        """获取单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, coalesce_ms: int = 300, poll_interval_ms: int = 2000):
+        """
+        Args:
+            coalesce_ms: 收到通知后等待更多通知的时间
+            poll_interval_ms: 定期扫描所有监视目录的间隔
+        """
+        if ProjectWatcher._instance is not None:
+            raise Exception("This class is a singleton!")
+        super().__init__()
+        ProjectWatcher._instance = self
+        self._cache = DirectoryCache.get_instance()
+        self._project_dir: Optional[str] = None
+        self._snapshots: Dict[str, _Snapshot] = {}
+        self._pending: Set[str] = set()
+        self._polled: Set[str] = set()
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+
+        self._coalesce_timer = QTimer(self)
+        self._coalesce_timer.setSingleShot(True)
+        self._coalesce_timer.setInterval(coalesce_ms)
+        self._coalesce_timer.timeout.connect(self.process_pending)
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(poll_interval_ms)
+        self._poll_timer.timeout.connect(self._poll)
+
+    def start(self, project_dir: str, use_polling: bool = False):
+        """
+        开始监视项目目录
+
+        Args:
+            project_dir: 项目目录
+            use_polling: 强制使用轮询（例如网络文件系统上系统通知不可靠时）
+        """
+        self.stop()
+        self._project_dir = os.path.abspath(project_dir)
+        for directory in self._watched_directories():
+            self._watch(directory, use_polling)
+
+    def stop(self):
+        """停止监视"""
+        self._coalesce_timer.stop()
+        self._poll_timer.stop()
+        watched = self._watcher.directories()
+        if watched:
+            self._watcher.removePaths(watched)
+        self._project_dir = None
+        self._snapshots.clear()
+        self._pending.clear()
+        self._polled.clear()
+
+    def project_dir(self) -> Optional[str]:
+        """正在监视的项目目录"""
+        return self._project_dir
+
+    def is_polling(self, directory: str) -> bool:
+        """目录是否处于轮询模式"""
+        return os.path.abspath(directory) in self._polled
+
+    def process_pending(self) -> List[Tuple[str, str]]:
+        """
+        立即处理积累的目录通知
+
+        Returns:
+            List[Tuple[str, str]]: (事件类型, 文件路径)
+        """
+        self._coalesce_timer.stop()
+        pending, self._pending = self._pending, set()
+        events: List[Tuple[str, str]] = []
+        for directory in sorted(pending):
+            events.extend(self._rescan(directory))
+        if events:
+            for event, path in events:
+                if event == FILE_ADDED:
+                    self.file_added.emit(path)
+                elif event == FILE_CHANGED:
+                    self.file_changed.emit(path)
+                else:
+                    self.file_removed.emit(path)
+            self.files_changed.emit(events)
+        return events
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    def _watched_directories(self) -> List[str]:
+        """项目目录及 ProjectSaver 创建的各子目录"""
+        return [self._project_dir] + [
+            os.path.join(self._project_dir, directory) for directory in PROJECT_DIRECTORIES
+        ]
+
+    def _watch(self, directory: str, use_polling: bool):
+        """监视目录，系统通知不可用时只依靠轮询"""
+        if not os.path.isdir(directory):
+            return
+        self._cache.invalidate(directory)
+        self._snapshots[directory] = self._snapshot(directory)
+        if use_polling or not self._watcher.addPath(directory):
+            self._polled.add(directory)
+        if not self._poll_timer.isActive():
+            self._poll_timer.start()
+
+    def _on_directory_changed(self, directory: str):
+        """目录变化通知，等待一段时间合并后续通知"""
+        self._pending.add(directory)
+        self._coalesce_timer.start()
+
+    def _poll(self):
+        """
+        定期检查所有监视的目录
+
+        Linux 上原地修改已有文件不会产生目录通知，系统通知可用的目录同样需要比较快照。
+        """
+        self._pending.update(self._snapshots)
+        self.process_pending()
+
+    def _rescan(self, directory: str) -> List[Tuple[str, str]]:
+        """重新扫描目录并与快照比较"""
+        self._cache.invalidate(directory)
+        if not os.path.isdir(directory):
+            # 子目录被删除，其中所有文件视为删除
+            old = self._snapshots.pop(directory, {})
+            self._polled.discard(directory)
+            return [(FILE_REMOVED, os.path.join(directory, name)) for name in sorted(old)]
+
+        old = self._snapshots.get(directory, {})
+        new = self._snapshot(directory)
+        self._snapshots[directory] = new
+
+        events = []
+        for name, info in new.items():
+            if name not in old:
+                events.append((FILE_ADDED, os.path.join(directory, name)))
+            elif old[name] != info:
+                events.append((FILE_CHANGED, os.path.join(directory, name)))
+        for name in old:
+            if name not in new:
+                events.append((FILE_REMOVED, os.path.join(directory, name)))
+
+        if directory == self._project_dir:
+            # 项目子目录可能是之后才创建的
+            polling = bool(self._polled)
+            for subdirectory in self._watched_directories()[1:]:
+                if subdirectory not in self._snapshots and os.path.isdir(subdirectory):
+                    self._watch(subdirectory, polling)
+                    events.extend(
+                        (FILE_ADDED, os.path.join(subdirectory, name))
+                        for name in sorted(self._snapshots[subdirectory])
+                    )
+        return events
+
+    def _snapshot(self, directory: str) -> _Snapshot:
+        """目录中文件的 (大小, 修改时间) 快照"""
+        return {
+            entry.name: (entry.size, entry.mtime)
+            for entry in self._cache.list_dir(directory)
+            if not entry.is_dir and not _is_temporary(entry.name)
+        }
+
+
+def _is_temporary(name: str) -> bool:
+    """原子写入过程中产生的临时文件"""
+    return name.startswith(".") and name.endswith(".tmp")
@@ -0,0 +1,360 @@
+"""
+Resource Store Module
+资源存储模块
+
+This module keeps project resources in a content-addressed store under
+resources/.store, where each file is saved once under its SHA-256 hash. A manifest maps
+logical resource names to content hashes, so the same texture imported into many
+folders or under many names is stored only once. A persisted (size, mtime) -> hash
+cache lets re-imports skip hashing files that have not changed.
+此模块将项目资源保存在 resources/.store 下的内容寻址存储中，每个文件按 SHA-256 哈希只保存一份。
+清单将资源的逻辑名称映射到内容哈希，同一张贴图以不同名称或导入到不同目录时也只保存一次。
+持久化的 (大小, 修改时间) -> 哈希 缓存使重新导入时无需再次计算未修改文件的哈希。
+"""
+
+import logging
+import os
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .atomic_writer import atomic_copy
+from .serializers import KIND_CONFIG, dump_file, load_file
+
+logger = logging.getLogger(__name__)
+
+RESOURCES_DIR = "resources"
+STORE_DIR = ".store"
+MANIFEST_FILE = ".manifest.json"
+HASH_CACHE_FILE = "hash_cache.json"
+MANIFEST_VERSION = 1
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# 导入结果
+IMPORTED = "imported"          # 新内容，已写入存储
+DEDUPLICATED = "deduplicated"  # 存储中已有相同内容，只更新清单
+UNCHANGED = "unchanged"        # 名称已指向相同内容
+
+
+@dataclass(frozen=True)
+class ResourceEntry:
+    """清单中的资源项"""
+    name: str
+    hash: str
+    size: int
+
+
+@dataclass(frozen=True)
+class ImportResult:
+    """资源导入结果"""
+    name: str
+    hash: str
+    status: str
+
+
+class ResourceStore:
+    """内容寻址资源存储类"""
+
+    def __init__(self, project_dir: str):
+        """
+        Args:
+            project_dir: 项目目录
+        """
+        self.project_dir = os.path.abspath(project_dir)
+        self.resources_dir = os.path.join(self.project_dir, RESOURCES_DIR)
+        self.store_dir = os.path.join(self.resources_dir, STORE_DIR)
+        self.manifest_path = os.path.join(self.resources_dir, MANIFEST_FILE)
+        self.hash_cache_path = os.path.join(self.store_dir, HASH_CACHE_FILE)
+        self._lock = threading.RLock()
+        self._manifest: Dict[str, ResourceEntry] = {}
+        # 源文件路径 -> (大小, 修改时间ns, 哈希)
+        self._hash_cache: Dict[str, Tuple[int, int, str]] = {}
+        self._dirty = False
+        self.load()
+
+    # ------------------------------------------------------------------
+    # 清单
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """加载清单和哈希缓存"""
+        with self._lock:
+            self._manifest.clear()
+            self._hash_cache.clear()
+            try:
+                if os.path.exists(self.manifest_path):
+                    data = load_file(self.manifest_path)
+                    for name, item in data.get("resources", {}).items():
+                        self._manifest[name] = ResourceEntry(name, item["hash"], item["size"])
+                if os.path.exists(self.hash_cache_path):
+                    for path, (size, mtime_ns, digest) in load_file(self.hash_cache_path).items():
+                        self._hash_cache[path] = (size, mtime_ns, digest)
+            except Exception as e:
+                logger.error("加载资源清单失败: %s", e)
+            self._dirty = False
+
+    def save(self) -> bool:
+        """保存清单和哈希缓存"""
+        with self._lock:
+            if not self._dirty:
+                return True
+            try:
+                manifest = {
+                    "version": MANIFEST_VERSION,
+                    "resources": {
+                        name: {"hash": entry.hash, "size": entry.size}
+                        for name, entry in sorted(self._manifest.items())
+                    }
+                }
+                dump_file(self.manifest_path, manifest, KIND_CONFIG)
+                dump_file(self.hash_cache_path, {
+                    path: list(value) for path, value in self._hash_cache.items()
+                }, KIND_CONFIG)
+                self._dirty = False
+                return True
+            except Exception as e:
+                logger.error("保存资源清单失败: %s", e)
+                return False
+
+    def names(self) -> List[str]:
+        """所有资源名称"""
+        with self._lock:
+            return sorted(self._manifest)
+
+    def get_entry(self, name: str) -> Optional[ResourceEntry]:
+        """获取资源项"""
+        with self._lock:
+            return self._manifest.get(_normalize_name(name))
+
+    def resolve(self, name: str) -> Optional[str]:
+        """
+        获取资源内容所在的文件路径
+
+        Args:
+            name: 资源名称
+
+        Returns:
+            Optional[str]: 存储中的文件路径，资源不存在时返回None
+        """
+        entry = self.get_entry(name)
+        return self.blob_path(entry.hash) if entry else None
+
+    def blob_path(self, digest: str) -> str:
+        """内容哈希对应的存储路径，按前两位分目录"""
+        return os.path.join(self.store_dir, digest[:2], digest)
+
+    # ------------------------------------------------------------------
+    # 导入
+    # ------------------------------------------------------------------
+
+    def import_file(self, source_path: str, name: Optional[str] = None, save: bool = True) -> ImportResult:
+        """
+        导入资源文件
+
+        Args:
+            source_path: 源文件路径
+            name: 资源名称，默认为文件名
+            save: 是否立即保存清单，批量导入时由调用方统一保存
+
+        Returns:
+            ImportResult: 导入结果
+        """
+        name = _normalize_name(name or os.path.basename(source_path))
+        digest, size = self.hash_file(source_path)
+        with self._lock:
+            entry = self._manifest.get(name)
+            if entry is not None and entry.hash == digest and os.path.exists(self.blob_path(digest)):
+                return ImportResult(name, digest, UNCHANGED)
+
+            if os.path.exists(self.blob_path(digest)):
+                status = DEDUPLICATED
+            else:
+                digest = self._copy_to_store(source_path, digest)
+                status = IMPORTED
+            self._manifest[name] = ResourceEntry(name, digest, size)
+            self._dirty = True
+        if save:
+            self.save()
+        return ImportResult(name, digest, status)
+
+    def import_files(self, source_paths: Iterable[str], prefix: str = "") -> List[ImportResult]:
+        """
+        批量导入资源文件
+
+        Args:
+            source_paths: 源文件路径
+            prefix: 资源名称前缀（逻辑目录）
+
+        Returns:
+            List[ImportResult]: 导入结果，失败的文件不包含在内
+        """
+        results = []
+        try:
+            for source_path in source_paths:
+                name = _join_name(prefix, os.path.basename(source_path))
+                try:
+                    results.append(self.import_file(source_path, name, save=False))
+                except OSError as e:
+                    logger.error("导入资源失败 %s: %s", source_path, e)
+        finally:
+            self.save()
+        return results
+
+    def import_directory(self, directory: str, prefix: str = "") -> List[ImportResult]:
+        """
+        导入目录下的所有文件，资源名称保留相对路径
+
+        Args:
+            directory: 源目录
+            prefix: 资源名称前缀（逻辑目录）
+
+        Returns:
+            List[ImportResult]: 导入结果
+        """
+        results = []
+        try:
+            for root, dirs, files in os.walk(directory):
+                dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+                relative = os.path.relpath(root, directory)
+                for file_name in sorted(files):
+                    if file_name.startswith("."):
+                        continue
+                    name = _join_name(prefix, file_name if relative == "." else os.path.join(relative, file_name))
+                    try:
+                        results.append(self.import_file(os.path.join(root, file_name), name, save=False))
+                    except OSError as e:
+                        logger.error("导入资源失败 %s: %s", file_name, e)
+        finally:
+            self.save()
+        return results
+
+    def hash_file(self, file_path: str) -> Tuple[str, int]:
+        """
+        计算文件的内容哈希，(大小, 修改时间) 未变化时使用缓存
+
+        Returns:
+            Tuple[str, int]: (哈希, 大小)
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._hash_cache.get(path)
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2], stat.st_size
+
+        hasher = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        with self._lock:
+            self._hash_cache[path] = (stat.st_size, stat.st_mtime_ns, digest)
+            self._dirty = True
+        return digest, stat.st_size
+
+    # ------------------------------------------------------------------
+    # 删除与清理
+    # ------------------------------------------------------------------
+
+    def rename(self, name: str, new_name: str) -> bool:
+        """重命名资源，只修改清单"""
+        name, new_name = _normalize_name(name), _normalize_name(new_name)
+        with self._lock:
+            entry = self._manifest.pop(name, None)
+            if entry is None:
+                return False
+            self._manifest[new_name] = ResourceEntry(new_name, entry.hash, entry.size)
+            self._dirty = True
+        return self.save()
+
+    def remove(self, name: str) -> bool:
+        """从清单中移除资源，存储中的内容由 collect_garbage 清理"""
+        with self._lock:
+            if self._manifest.pop(_normalize_name(name), None) is None:
+                return False
+            self._dirty = True
+        return self.save()
+
+    def collect_garbage(self) -> int:
+        """
+        删除没有被清单引用的存储文件
+
+        Returns:
+            int: 删除的文件数
+        """
+        with self._lock:
+            referenced = {entry.hash for entry in self._manifest.values()}
+            removed = 0
+            if not os.path.isdir(self.store_dir):
+                return 0
+            for shard in os.listdir(self.store_dir):
+                shard_dir = os.path.join(self.store_dir, shard)
+                if not os.path.isdir(shard_dir):
+                    continue
+                for digest in os.listdir(shard_dir):
+                    if digest not in referenced:
+                        os.remove(os.path.join(shard_dir, digest))
+                        removed += 1
+                if not os.listdir(shard_dir):
+                    os.rmdir(shard_dir)
+            # 已不存在的源文件不再保留哈希缓存
+            stale = [path for path in self._hash_cache if not os.path.exists(path)]
+            for path in stale:
+                del self._hash_cache[path]
+            if stale:
+                self._dirty = True
+        self.save()
+        return removed
+
+    def get_stats(self) -> Dict[str, int]:
+        """存储统计：资源数、不同内容数、逻辑大小和实际占用"""
+        with self._lock:
+            unique = {}
+            for entry in self._manifest.values():
+                unique[entry.hash] = entry.size
+            return {
+                "resources": len(self._manifest),
+                "blobs": len(unique),
+                "logical_size": sum(entry.size for entry in self._manifest.values()),
+                "stored_size": sum(unique.values()),
+            }
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    def _copy_to_store(self, source_path: str, digest: str) -> str:
+        """
+        复制文件到存储
+
+        复制时重新计算哈希，源文件在计算哈希后又被修改时按实际内容存放。
+
+        Returns:
+            str: 实际内容的哈希
+        """
+        hasher = hashlib.sha256()
+        target = self.blob_path(digest)
+        atomic_copy(source_path, target, hasher, HASH_CHUNK_SIZE)
+        actual = hasher.hexdigest()
+        if actual != digest:
+            actual_target = self.blob_path(actual)
+            os.makedirs(os.path.dirname(actual_target), exist_ok=True)
+            os.replace(target, actual_target)
+            self._hash_cache.pop(os.path.abspath(source_path), None)
+        return actual
+
+
+def _normalize_name(name: str) -> str:
+    """资源名称统一使用 / 分隔的相对路径"""
+    return name.replace("\\", "/").strip("/")
+
+
+def _join_name(prefix: str, name: str) -> str:
+    return _normalize_name(f"{prefix}/{name}" if prefix else name)
+
+
+def is_store_file(name: str) -> bool:
+    """资源目录中属于存储本身的文件（清单、存储目录和临时文件）"""
+    return name.startswith(".")
@@ -0,0 +1,260 @@
+"""
+Save Service Module
+保存服务模块
+
+This module saves projects and scenes in the background. The model is snapshotted
+on the UI thread; serialization and the atomic write happen on a worker thread.
+此模块在后台保存项目和场景。模型快照在UI线程生成，序列化与原子写入在工作线程中完成。
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from .atomic_writer import atomic_write
+from .project_saver import ProjectSaver
+from ..project_model.project_info_model import ProjectInfoModel
+from ..profiler.api import timed
+
+logger = logging.getLogger(__name__)
+
+
+class _SaveTask(QRunnable):
+    """后台保存任务"""
+
+    def __init__(self, service: 'SaveService', file_path: str, generation: int,
+                 serialize: Callable[[], bytes],
+                 write: Optional[Callable[[bytes], None]] = None,
+                 finalize: Optional[Callable[[], None]] = None):
+        super().__init__()
+        self.service = service
+        self.file_path = file_path
+        self.generation = generation
+        self.serialize = serialize
+        self.write = write
+        self.finalize = finalize
+
+    def run(self):
+        """执行保存"""
+        service = self.service
+        path = self.file_path
+        try:
+            with service._path_lock(path):
+                # 同一文件已有更新的保存请求时跳过，避免旧快照覆盖新内容
+                if not service._is_latest(path, self.generation):
+                    return
+                service.save_progress.emit(path, 10)
+                data = self.serialize()
+                service.save_progress.emit(path, 60)
+                if self.write:
+                    self.write(data)
+                else:
+                    atomic_write(path, data)
+                if self.finalize:
+                    self.finalize()
+                service.save_progress.emit(path, 100)
+            service.save_finished.emit(path, True, "")
+        except Exception as e:
+            logger.error("后台保存失败: %s", e)
+            service.save_finished.emit(path, False, str(e))
+        finally:
+            service._task_done(path, self.generation)
+
+
+class SaveService(QObject):
+    """后台保存服务类"""
+
+    save_started = pyqtSignal(str)             # 文件路径
+    save_progress = pyqtSignal(str, int)       # 文件路径, 进度百分比
+    save_finished = pyqtSignal(str, bool, str) # 文件路径, 是否成功, 错误信息
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls) -> 'SaveService':
+        """获取单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        if SaveService._instance is not None:
+            raise Exception("This class is a singleton!")
+        super().__init__()
+        SaveService._instance = self
+        self._pool = QThreadPool(self)
+        self._lock = threading.Lock()
+        self._generations: Dict[str, int] = {}
+        self._path_locks: Dict[str, List[Any]] = {}   # 规范化路径 -> [写入锁, 使用者数]
+        self._pending: Dict[str, int] = {}
+        self._abandoned = False
+        self._saver = ProjectSaver()
+        self._journals: Dict[str, Any] = {}
+        # 先于其他模块连接，合并完成的通知发出时日志已经截断
+        self.save_finished.connect(self._on_compaction_finished)
+
+    def save_project(self, project_info: ProjectInfoModel, project_path: str) -> str:
+        """
+        后台保存项目
+
+        Args:
+            project_info: 项目信息对象
+            project_path: 项目保存路径
+
+        Returns:
+            str: 写入的项目描述文件路径，完成情况通过 save_finished 信号通知
+        """
+        # 在UI线程生成快照，之后对模型的修改不会影响本次保存
+        project_structure = self._saver.build_project_structure(project_info)
+        dep_file = os.path.join(os.path.dirname(project_path), "project.dep")
+        return self.submit(
+            dep_file,
+            lambda: self._saver.serialize_project_structure(project_structure),
+            write=lambda data: self._saver.write_project_data(data, project_path)
+        )
+
+    @timed("scene.snapshot")
+    def save_scene(self, scene: Any, use_binary: Optional[bool] = None) -> Optional[str]:
+        """
+        后台保存场景
+
+        Args:
+            scene: 场景对象
+            use_binary: 是否使用二进制格式，None表示沿用场景文件现有的格式
+
+        Returns:
+            Optional[str]: 场景文件路径，无当前项目时返回None
+        """
+        from ..scene_editor.api import SceneEditorAPI
+
+        scene_file = SceneEditorAPI.get_scene_file(scene.name, use_binary)
+        if not scene_file:
+            return None
+        scene_data = scene.to_dict()
+        # 快照已包含全部节点，关闭映射的旧文件，后台线程才能替换它
+        SceneEditorAPI.release_scene_files(scene_file)
+        return self.submit(
+            scene_file,
+            lambda: SceneEditorAPI.serialize_scene(scene_data, scene_file),
+            finalize=lambda: SceneEditorAPI.remove_stale_scene_file(scene_file)
+        )
+
+    def compact_journal(self, journal: Any) -> Optional[str]:
+        """
+        后台将编辑日志合并到项目基础文件
+
+        Args:
+            journal: 编辑日志
+
+        Returns:
+            Optional[str]: 日志文件路径，日志为空时返回None，完成情况通过 save_finished 信号通知
+        """
+        # 在UI线程读取日志快照，之后追加的记录留待下次合并
+        records = journal.begin_compaction()
+        if not records:
+            return None
+        self._journals[journal.journal_path] = journal
+        # 合并直接重写各个基础文件，没有要写入日志路径的数据；
+        # 每个文件在其写入锁内读取和重写，与同一文件的后台保存串行执行
+        return self.submit(
+            journal.journal_path,
+            lambda: b"",
+            write=lambda data: journal.apply_compaction(records, self._path_lock)
+        )
+
+    def _on_compaction_finished(self, file_path: str, success: bool, error: str):
+        """日志合并完成后在UI线程中截掉已合并的记录"""
+        journal = self._journals.get(file_path)
+        if journal is None:
+            return
+        with self._lock:
+            if file_path not in self._pending:
+                del self._journals[file_path]
+        journal.finish_compaction()
+
+    def submit(self, file_path: str, serialize: Callable[[], bytes],
+               write: Optional[Callable[[bytes], None]] = None,
+               finalize: Optional[Callable[[], None]] = None) -> str:
+        """
+        提交后台保存任务
+
+        Args:
+            file_path: 目标文件路径
+            serialize: 在工作线程中调用，返回要写入的数据；只能引用快照数据
+            write: 自定义写入函数，默认原子写入 file_path
+            finalize: 写入成功后在工作线程中调用
+
+        Returns:
+            str: 目标文件路径
+        """
+        with self._lock:
+            generation = self._generations.get(file_path, 0) + 1
+            self._generations[file_path] = generation
+            self._pending[file_path] = self._pending.get(file_path, 0) + 1
+        self.save_started.emit(file_path)
+        self._pool.start(_SaveTask(self, file_path, generation, serialize, write, finalize))
+        return file_path
+
+    def is_busy(self) -> bool:
+        """是否有未完成的保存任务"""
+        with self._lock:
+            return bool(self._pending)
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """
+        等待所有保存任务完成，用于退出程序前
+
+        Args:
+            msecs: 最长等待时间（毫秒），-1表示一直等待
+
+        Returns:
+            bool: 是否全部完成
+        """
+        return self._pool.waitForDone(msecs)
+
+    def abandon(self):
+        """用户选择不等待未完成的保存而强制退出，程序入口据此跳过退出时的等待"""
+        with self._lock:
+            pending = sorted(self._pending)
+        logger.warning("强制退出，未完成的保存: %s", ", ".join(pending))
+        self._abandoned = True
+
+    def is_abandoned(self) -> bool:
+        """是否已放弃未完成的保存"""
+        return self._abandoned
+
+    @contextmanager
+    def _path_lock(self, file_path: str) -> Iterator[None]:
+        """持有文件对应的写入锁，没有使用者后释放锁对象"""
+        key = os.path.normcase(os.path.abspath(file_path))
+        with self._lock:
+            entry = self._path_locks.get(key)
+            if entry is None:
+                entry = self._path_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._path_locks[key]
+
+    def _is_latest(self, file_path: str, generation: int) -> bool:
+        """判断任务是否为该文件最新的保存请求"""
+        with self._lock:
+            return self._generations.get(file_path) == generation
+
+    def _task_done(self, file_path: str, generation: int):
+        """记录任务结束"""
+        with self._lock:
+            count = self._pending.get(file_path, 0) - 1
+            if count > 0:
+                self._pending[file_path] = count
+            else:
+                self._pending.pop(file_path, None)
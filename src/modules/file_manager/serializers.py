@@ -0,0 +1,266 @@
+"""
+Serializers Module
+序列化模块
+
+This module provides the serializer backends used for project, scene and blueprint
+files: compact JSON, pretty JSON for readable diffs, and zlib- or lzma-compressed JSON
+for large scenes. The backend is chosen per file from its kind and encoded size, and
+files are sniffed on load so every backend can be read regardless of the extension.
+此模块提供项目、场景和蓝图文件使用的序列化后端：紧凑JSON、便于比较差异的格式化JSON，
+以及用于大型场景的 zlib 或 lzma 压缩JSON。每个文件按类型和编码后的大小选择后端，
+加载时根据文件内容识别格式，因此与扩展名无关，任何后端写入的文件都可以读取。
+"""
+
+import json
+import lzma
+import zlib
+from typing import Any, Dict, Optional
+
+# 文件类型
+KIND_PROJECT = "project"
+KIND_SCENE = "scene"
+KIND_BLUEPRINT = "blueprint"
+KIND_CONFIG = "config"
+
+# 后端名称
+COMPACT = "compact"
+PRETTY = "pretty"
+ZLIB = "zlib"
+LZMA = "lzma"
+
+# 紧凑编码后超过该大小的场景改用压缩后端
+DEFAULT_COMPRESS_THRESHOLD = 256 * 1024
+
+_XZ_MAGIC = b"\xfd7zXZ\x00"
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+
+class Serializer:
+    """序列化后端基类"""
+
+    name = ""
+
+    def encode(self, data: Any) -> bytes:
+        """将数据编码为字节"""
+        raise NotImplementedError
+
+    def decode(self, raw: bytes) -> Any:
+        """从字节解码数据"""
+        raise NotImplementedError
+
+    def sniff(self, raw: bytes) -> bool:
+        """判断字节是否由该后端写入"""
+        raise NotImplementedError
+
+
+class CompactJsonSerializer(Serializer):
+    """紧凑JSON，没有缩进和多余空格"""
+
+    name = COMPACT
+
+    def encode(self, data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, raw: bytes) -> Any:
+        if raw.startswith(_UTF8_BOM):
+            raw = raw[len(_UTF8_BOM):]
+        return json.loads(raw)
+
+    def sniff(self, raw: bytes) -> bool:
+        stripped = raw.lstrip(b" \t\r\n")
+        return stripped.startswith(_UTF8_BOM) or stripped[:1] in (b"{", b"[", b'"') \
+            or stripped[:1].isdigit() or stripped[:1] in (b"-", b"t", b"f", b"n")
+
+
+class PrettyJsonSerializer(CompactJsonSerializer):
+    """格式化JSON，便于版本管理中查看差异"""
+
+    name = PRETTY
+
+    def __init__(self, indent: int = 2):
+        self.indent = indent
+
+    def encode(self, data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False, indent=self.indent).encode("utf-8")
+
+
+class ZlibJsonSerializer(Serializer):
+    """zlib 压缩的紧凑JSON，压缩和解压都很快"""
+
+    name = ZLIB
+
+    def __init__(self, level: int = 6):
+        self.level = level
+        self._json = CompactJsonSerializer()
+
+    def encode(self, data: Any) -> bytes:
+        return self.compress(self._json.encode(data))
+
+    def compress(self, compact: bytes) -> bytes:
+        """压缩已经编码的紧凑JSON"""
+        return zlib.compress(compact, self.level)
+
+    def decode(self, raw: bytes) -> Any:
+        return json.loads(zlib.decompress(raw))
+
+    def sniff(self, raw: bytes) -> bool:
+        # zlib 头：CMF 为 0x78，且 CMF*256+FLG 是31的倍数
+        return len(raw) >= 2 and raw[0] == 0x78 and (raw[0] * 256 + raw[1]) % 31 == 0
+
+
+class LzmaJsonSerializer(Serializer):
+    """lzma(xz) 压缩的紧凑JSON，压缩率最高但编码较慢"""
+
+    name = LZMA
+
+    def __init__(self, preset: int = 6):
+        self.preset = preset
+        self._json = CompactJsonSerializer()
+
+    def encode(self, data: Any) -> bytes:
+        return self.compress(self._json.encode(data))
+
+    def compress(self, compact: bytes) -> bytes:
+        """压缩已经编码的紧凑JSON"""
+        return lzma.compress(compact, format=lzma.FORMAT_XZ, preset=self.preset)
+
+    def decode(self, raw: bytes) -> Any:
+        return json.loads(lzma.decompress(raw))
+
+    def sniff(self, raw: bytes) -> bool:
+        return raw.startswith(_XZ_MAGIC)
+
+
+_serializers: Dict[str, Serializer] = {}
+# 识别顺序：带文件头的压缩格式优先
+_sniff_order = []
+
+
+def register_serializer(serializer: Serializer, sniff_first: bool = False):
+    """
+    注册序列化后端
+
+    Args:
+        serializer: 序列化后端
+        sniff_first: 加载时是否优先尝试识别该格式
+    """
+    _serializers[serializer.name] = serializer
+    if serializer not in _sniff_order:
+        if sniff_first:
+            _sniff_order.insert(0, serializer)
+        else:
+            _sniff_order.append(serializer)
+
+
+def get_serializer(name: str) -> Serializer:
+    """按名称获取序列化后端"""
+    serializer = _serializers.get(name)
+    if serializer is None:
+        raise ValueError(f"未知的序列化后端: {name}")
+    return serializer
+
+
+register_serializer(LzmaJsonSerializer())
+register_serializer(ZlibJsonSerializer())
+register_serializer(CompactJsonSerializer())
+register_serializer(PrettyJsonSerializer())
+
+
+class SerializationPolicy:
+    """按文件类型和大小选择序列化后端"""
+
+    def __init__(self, compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+                 large_backend: str = ZLIB):
+        """
+        Args:
+            compress_threshold: 场景紧凑编码后超过该字节数时压缩
+            large_backend: 大型场景使用的压缩后端，ZLIB 或 LZMA
+        """
+        self.compress_threshold = compress_threshold
+        self.large_backend = large_backend
+        # 各类型的缩进，与之前手写的 json.dump 保持一致，文件差异最小
+        self.indents: Dict[str, int] = {
+            KIND_PROJECT: 4,
+            KIND_SCENE: 2,
+            KIND_BLUEPRINT: 2,
+            KIND_CONFIG: 2,
+        }
+
+    def dumps(self, data: Any, kind: str) -> bytes:
+        """
+        序列化数据
+
+        小文件使用格式化JSON；场景紧凑编码后超过阈值时，直接压缩紧凑编码的结果。
+
+        Args:
+            data: 要序列化的数据
+            kind: 文件类型
+
+        Returns:
+            bytes: 文件内容
+        """
+        if kind == KIND_SCENE:
+            compact = _serializers[COMPACT].encode(data)
+            if len(compact) > self.compress_threshold:
+                return get_serializer(self.large_backend).compress(compact)
+        indent = self.indents.get(kind, 2)
+        return json.dumps(data, ensure_ascii=False, indent=indent).encode("utf-8")
+
+    def choose(self, kind: str, size: int) -> str:
+        """给定紧凑编码的大小，返回将使用的后端名称"""
+        if kind == KIND_SCENE and size > self.compress_threshold:
+            return self.large_backend
+        return PRETTY
+
+
+_policy = SerializationPolicy()
+
+
+def get_policy() -> SerializationPolicy:
+    """获取当前的序列化策略"""
+    return _policy
+
+
+def set_policy(policy: SerializationPolicy):
+    """替换序列化策略"""
+    global _policy
+    _policy = policy
+
+
+def sniff(raw: bytes) -> Optional[Serializer]:
+    """识别字节内容的序列化后端"""
+    for serializer in _sniff_order:
+        if serializer.sniff(raw):
+            return serializer
+    return None
+
+
+def dumps(data: Any, kind: str) -> bytes:
+    """按当前策略序列化数据"""
+    return _policy.dumps(data, kind)
+
+
+def loads(raw: bytes) -> Any:
+    """
+    反序列化数据，格式根据内容识别
+
+    Raises:
+        ValueError: 无法识别或解析
+    """
+    serializer = sniff(raw)
+    if serializer is None:
+        raise ValueError("无法识别的文件格式")
+    return serializer.decode(raw)
+
+
+def load_file(file_path: str) -> Any:
+    """读取并反序列化文件"""
+    with open(file_path, "rb") as f:
+        return loads(f.read())
+
+
+def dump_file(file_path: str, data: Any, kind: str):
+    """序列化数据并原子写入文件"""
+    from .atomic_writer import atomic_write
+
+    atomic_write(file_path, dumps(data, kind))
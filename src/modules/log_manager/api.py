@@ -6,11 +6,18 @@ This module provides the API interface for logging functionality.
 此模块提供日志功能的API接口。
 """
 
+import time
+import queue
+import threading
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime
 
+from .log_store import LogStore, DEFAULT_CAPACITY
+from .log_persistence import LogPersistence, write_entries, export_format_for
+from .log_throttle import LogThrottle
+
 class LogLevel(Enum):
     """Log level enumeration."""
     DEBUG = "调试"
@@ -27,6 +34,33 @@ class LogEntry:
     timestamp: datetime = field(default_factory=datetime.now)
     source: str = ""
     details: Dict[str, Any] = field(default_factory=dict)
+    seq: int = 0
+    repeat_count: int = 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the entry to a JSON-serializable dictionary."""
+        return {
+            "seq": self.seq,
+            "level": self.level.name,
+            "message": self.message,
+            "timestamp": self.timestamp.isoformat(),
+            "source": self.source,
+            "details": self.details,
+            "repeat_count": self.repeat_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LogEntry':
+        """Create an entry from a dictionary produced by to_dict."""
+        return cls(
+            level=LogLevel[data["level"]],
+            message=data["message"],
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            source=data.get("source", ""),
+            details=data.get("details") or {},
+            seq=data.get("seq", 0),
+            repeat_count=data.get("repeat_count", 1),
+        )
 
 class LogManagerAPI:
     """Log manager API interface class."""
@@ -44,11 +78,112 @@ class LogManagerAPI:
         if LogManagerAPI._instance is not None:
             raise Exception("This class is a singleton!")
         LogManagerAPI._instance = self
-        self.entries: List[LogEntry] = []
+        self._store = LogStore(DEFAULT_CAPACITY)
+        # 其他线程添加的条目先放入队列，由UI线程批量取出
+        self._incoming: queue.SimpleQueue = queue.SimpleQueue()
+        self._pending_scheduled = False
+        self._persistence: Optional[LogPersistence] = None
+        self._throttle = LogThrottle()
         self.log_added_callbacks = []
+        self.log_updated_callbacks = []
         self.log_cleared_callbacks = []
+        self.entries_pending_callbacks = []
         self._panel = None
     
+    @property
+    def entries(self) -> List[LogEntry]:
+        """Snapshot of the entries currently held in the ring buffer."""
+        return self._store.entries()
+
+    def get_store(self) -> LogStore:
+        """Get the underlying ring-buffer store."""
+        return self._store
+
+    def set_capacity(self, capacity: int):
+        """Set the maximum number of entries kept in memory."""
+        self._store.set_capacity(capacity)
+
+    def set_spill_path(self, spill_path: Optional[str]):
+        """Set the JSON Lines file that evicted entries are appended to."""
+        self._store.set_spill_path(spill_path)
+
+    def set_coalesce_window(self, seconds: float):
+        """Set the window in which identical entries are folded into the first one; 0 disables it."""
+        self._throttle.coalesce_window = seconds
+        self._throttle.clear_recent()
+        if self._persistence is not None:
+            self._persistence.write_delay = seconds
+
+    def set_rate_limit(self, rate: Optional[float], burst: Optional[int] = None):
+        """Set the per-source limit in entries per second; None disables it."""
+        if threading.current_thread() is threading.main_thread():
+            self._report_suppressed(force=True)
+        self._throttle.rate = rate
+        if burst is not None:
+            self._throttle.burst = burst
+
+    def enable_persistence(self, log_dir: Optional[str] = None,
+                           max_bytes: Optional[int] = None,
+                           backup_count: Optional[int] = None) -> LogPersistence:
+        """Start writing every new entry to rotating JSON Lines files.
+
+        Sequence numbers continue from the last persisted entry, so they stay unique
+        across sessions. Call before any view of the entries is created. Entries are
+        written one coalescing window after they are added, once their repeat count
+        is final.
+        """
+        if self._persistence is None:
+            kwargs = {key: value for key, value in (
+                ("log_dir", log_dir), ("max_bytes", max_bytes), ("backup_count", backup_count)
+            ) if value is not None}
+            self._persistence = LogPersistence(write_delay=self._throttle.coalesce_window, **kwargs)
+            self._store.rebase(self._persistence.last_seq() + 1)
+            self._persistence.start()
+            for entry in self._store.entries():
+                self._persistence.submit(entry)
+        return self._persistence
+
+    def get_persistence(self) -> Optional[LogPersistence]:
+        """Get the persistence stage, or None if it is not enabled."""
+        return self._persistence
+
+    def shutdown(self):
+        """Deliver queued entries and stop the persistence writer."""
+        if threading.current_thread() is threading.main_thread():
+            self.process_pending()
+            self._report_suppressed(force=True)
+        if self._persistence is not None:
+            self._persistence.close()
+            self._persistence = None
+        self._store.flush()
+
+    def export_entries(self, export_path: str, level: Optional[LogLevel] = None,
+                       source: Optional[str] = None, progress=None) -> int:
+        """Export entries to a file, streaming from the persisted files when available.
+
+        The format follows the extension: .jsonl/.json writes JSON Lines, anything
+        else writes one formatted line per entry. Safe to call from a worker thread.
+        Returns the number of exported entries.
+        """
+        if self._persistence is not None:
+            return self._persistence.export(export_path, level=level, source=source, progress=progress)
+        return write_entries(export_path, self._store.entries(level, source),
+                             export_format_for(export_path), progress)
+
+    def export_entries_async(self, export_path: str, level: Optional[LogLevel] = None,
+                             source: Optional[str] = None) -> threading.Thread:
+        """Export entries on a worker thread and report the result as a log entry."""
+        def run():
+            try:
+                count = self.export_entries(export_path, level, source)
+                self.info(f"已导出 {count} 条日志: {export_path}", source="日志管理")
+            except Exception as e:
+                self.error(f"导出日志失败: {str(e)}", source="日志管理")
+
+        thread = threading.Thread(target=run, name="LogExport", daemon=True)
+        thread.start()
+        return thread
+
     def set_panel(self, panel):
         """Set the log panel."""
         self._panel = panel
@@ -83,48 +218,148 @@ class LogManagerAPI:
     
     def add_entry(self, level: LogLevel, message: str,
                  source: str = "", details: Dict[str, Any] = None) -> LogEntry:
-        """Add a new log entry."""
+        """Add a new log entry.
+
+        Called from a thread other than the UI thread, the entry is queued with
+        post_entry instead, so callbacks that touch widgets only ever run on the
+        UI thread. Its seq is assigned when the queue is processed.
+
+        An entry identical to one added within the coalescing window only raises
+        that entry's repeat_count, and the earlier entry is returned. An entry over
+        its source's rate limit is dropped and counted; the count is reported in a
+        warning from the same source once the source is allowed again. In both
+        cases the returned entry keeps seq 0 if it was not stored.
+        """
         entry = LogEntry(
             level=level,
             message=message,
             source=source,
             details=details or {}
         )
-        self.entries.append(entry)
-        self._notify_log_added(entry)
-        return entry
+        if threading.current_thread() is not threading.main_thread():
+            self.post_entry(entry)
+            return entry
+        return self._append(entry)
+
+    def post_entry(self, entry: LogEntry):
+        """Queue an entry from any thread for delivery on the UI thread.
+
+        Never blocks on the UI. The entries-pending callbacks are invoked only
+        when the queue goes from drained to non-empty, not once per entry.
+        """
+        self._incoming.put(entry)
+        if not self._pending_scheduled:
+            self._pending_scheduled = True
+            self._notify_entries_pending()
+
+    def process_pending(self, max_count: Optional[int] = None) -> int:
+        """Add queued entries to the store and notify listeners. UI thread only.
+
+        Returns the number of entries processed. If max_count stops the batch
+        early, the entries-pending callbacks are invoked again for the rest.
+        """
+        # 先清除标记再取队列，取出之后放入的条目会重新触发通知
+        self._pending_scheduled = False
+        count = 0
+        while max_count is None or count < max_count:
+            try:
+                entry = self._incoming.get_nowait()
+            except queue.Empty:
+                break
+            self._append(entry)
+            count += 1
+        if count == max_count and not self._incoming.empty() and not self._pending_scheduled:
+            self._pending_scheduled = True
+            self._notify_entries_pending()
+        return count
     
+    def _append(self, entry: LogEntry) -> LogEntry:
+        """Coalesce and rate-limit an entry, then store it. UI thread only.
+
+        Returns the entry now representing it, which for a repeat is the earlier one.
+        """
+        now = time.monotonic()
+        throttle = self._throttle
+        repeated = throttle.coalesce(entry.level, entry.source, entry.message, now)
+        if repeated is not None:
+            self._notify_log_updated(repeated)
+            return repeated
+        if throttle.is_suppressing():
+            self._report_suppressed(now)
+        if not throttle.allow(entry.source, now):
+            return entry
+        throttle.track(entry, now)
+        self._store_entry(entry)
+        return entry
+
+    def _report_suppressed(self, now: Optional[float] = None, force: bool = False):
+        """Add a warning for each source whose rate-limited entries can now be reported."""
+        for source, count in self._throttle.take_suppressed(now or time.monotonic(), force):
+            self._store_entry(LogEntry(
+                level=LogLevel.WARNING,
+                message=f"已抑制 {count} 条日志（超出速率限制）",
+                source=source,
+                details={"suppressed": count},
+            ))
+
+    def _store_entry(self, entry: LogEntry):
+        """Store, persist and announce an entry. UI thread only."""
+        self._store.append(entry)
+        if self._persistence is not None:
+            self._persistence.submit(entry)
+        self._notify_log_added(entry)
+
     def get_entries(self, level: Optional[LogLevel] = None,
                    source: Optional[str] = None) -> List[LogEntry]:
-        """Get log entries with optional filtering."""
-        filtered = self.entries
-        
-        if level:
-            filtered = [e for e in filtered if e.level == level]
-            
-        if source:
-            filtered = [e for e in filtered if e.source == source]
-            
-        return filtered
+        """Get log entries with optional filtering, using the level and source indexes."""
+        return self._store.entries(level or None, source or None)
+
+    def get_entry(self, seq: int) -> Optional[LogEntry]:
+        """Get an entry by sequence number, or None if it has been evicted."""
+        return self._store.get(seq)
+
+    def count_entries(self, level: Optional[LogLevel] = None,
+                      source: Optional[str] = None) -> int:
+        """Count log entries with optional filtering."""
+        return self._store.count(level or None, source or None)
     
     def clear_entries(self):
         """Clear all log entries."""
-        self.entries.clear()
+        self._store.clear()
+        self._throttle.clear_recent()
         self._notify_log_cleared()
     
     def register_log_added_callback(self, callback):
         """Register a callback for log entry addition."""
         self.log_added_callbacks.append(callback)
     
+    def register_log_updated_callback(self, callback):
+        """Register a callback for an entry whose repeat count changed."""
+        self.log_updated_callbacks.append(callback)
+    
     def register_log_cleared_callback(self, callback):
         """Register a callback for log clearing."""
         self.log_cleared_callbacks.append(callback)
     
+    def register_entries_pending_callback(self, callback):
+        """Register a callback invoked, possibly from a worker thread, when queued entries are waiting."""
+        self.entries_pending_callbacks.append(callback)
+    
+    def _notify_entries_pending(self):
+        """Notify all registered callbacks that queued entries are waiting."""
+        for callback in self.entries_pending_callbacks:
+            callback()
+    
     def _notify_log_added(self, entry: LogEntry):
         """Notify all registered callbacks about new log entry."""
         for callback in self.log_added_callbacks:
             callback(entry)
     
+    def _notify_log_updated(self, entry: LogEntry):
+        """Notify all registered callbacks about an updated log entry."""
+        for callback in self.log_updated_callbacks:
+            callback(entry)
+    
     def _notify_log_cleared(self):
         """Notify all registered callbacks about log clearing."""
         for callback in self.log_cleared_callbacks:
@@ -0,0 +1,44 @@
+"""
+Log Format
+日志格式
+
+This module turns log entries into the single-line text shown in the log view and
+written by the text export, and into the JSON Lines records written to log files. It
+does not depend on Qt, so the background export can use it without loading the widget
+modules.
+此模块将日志条目转换为日志视图显示和文本导出使用的单行文本，以及写入日志文件的 JSON Lines 记录。
+模块不依赖 Qt，后台导出使用它时不会加载界面模块。
+"""
+
+import json
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .api import LogEntry
+
+
+def repeat_suffix(entry: 'LogEntry') -> str:
+    """重复消息的计数后缀"""
+    return f" (×{entry.repeat_count})" if entry.repeat_count > 1 else ""
+
+
+def format_entry(entry: 'LogEntry') -> str:
+    """日志条目的单行文本"""
+    source = f"[{entry.source}] " if entry.source else ""
+    return (f"[{entry.timestamp.strftime('%H:%M:%S')}] [{entry.level.value}] "
+            f"{source}{entry.message}{repeat_suffix(entry)}")
+
+
+def entry_to_json(entry: 'LogEntry') -> Optional[str]:
+    """
+    日志条目的 JSON Lines 记录
+
+    details 中无法序列化的值按 str() 写入。
+
+    Returns:
+        Optional[str]: 单行 JSON，仍无法序列化（例如循环引用）时返回None，调用方跳过该条目
+    """
+    try:
+        return json.dumps(entry.to_dict(), ensure_ascii=False, separators=(",", ":"), default=str)
+    except (TypeError, ValueError):
+        return None
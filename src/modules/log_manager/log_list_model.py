@@ -0,0 +1,287 @@
+"""
+Log List Model
+日志列表模型
+
+This module provides the list model and item delegate behind the log panel. The model
+holds only the sequence numbers of the visible entries and reads the entries from the
+log store on demand. New entries are queued and inserted in one batch per timer tick,
+and the delegate paints each single-line row directly, so only the rows on screen are
+ever formatted. The view is a single-column QTableView with fixed row heights: unlike
+QListView, which lays out every row on each insert or reset, its row positions are
+computed arithmetically, so a million rows cost no more than a hundred.
+此模块提供日志面板使用的列表模型和绘制代理。模型只保存可见条目的序号，需要时从日志存储中读取条目。
+新条目先进入队列，每次定时器触发时一次性插入，绘制代理直接绘制单行内容，
+因此只有屏幕上的行才会被格式化。视图是行高固定的单列 QTableView：QListView 每次插入或重置时
+都会对所有行布局，而固定行高时行位置直接计算，一百万行与一百行的开销相同。
+"""
+
+import bisect
+from typing import List, Optional, Set
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer, QSize
+from PyQt6.QtGui import QColor, QFontMetrics
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle, QTableView, QHeaderView, QAbstractItemView
+
+from .api import LogManagerAPI, LogLevel, LogEntry
+from .log_format import format_entry, repeat_suffix
+
+# 各日志级别的颜色
+LEVEL_COLORS = {
+    LogLevel.DEBUG: "#90a4ae",     # 灰色
+    LogLevel.INFO: "#4fc3f7",      # 蓝色
+    LogLevel.WARNING: "#ffb74d",   # 橙色
+    LogLevel.ERROR: "#e57373",     # 红色
+    LogLevel.CRITICAL: "#f06292",  # 粉色
+}
+TIMESTAMP_COLOR = "#666666"
+SOURCE_COLOR = "#81c784"
+
+EntryRole = Qt.ItemDataRole.UserRole + 1
+SeqRole = Qt.ItemDataRole.UserRole + 2
+
+
+class LogListModel(QAbstractListModel):
+    """
+    日志列表模型
+
+    行号 r 对应 self._seqs[self._start + r]。日志存储淘汰旧条目后，
+    下次批量插入时从头部移除对应的行，只移动 _start，定期压缩列表。
+    重复消息增加计数时，对应的行也在下次批量更新时刷新。
+    """
+
+    FLUSH_INTERVAL_MS = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.api = LogManagerAPI.get_instance()
+        self._store = self.api.get_store()
+        self._level: Optional[LogLevel] = None
+        self._seqs: List[int] = []
+        self._start = 0
+        self._pending: List[LogEntry] = []
+        self._updated: Set[int] = set()
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+
+        self.api.register_log_added_callback(self._on_log_added)
+        self.api.register_log_cleared_callback(self._on_log_cleared)
+        self.api.register_log_updated_callback(self._on_log_updated)
+        self._reload()
+
+    # ------------------------------------------------------------------
+    # 过滤与查询
+    # ------------------------------------------------------------------
+
+    def set_level(self, level: Optional[LogLevel]):
+        """设置显示的日志级别，None表示全部"""
+        if level is self._level:
+            return
+        self._level = level
+        self._reload()
+
+    def level(self) -> Optional[LogLevel]:
+        return self._level
+
+    def entry_at(self, row: int) -> Optional[LogEntry]:
+        """获取行对应的条目，已被淘汰时返回None"""
+        if 0 <= row < len(self._seqs) - self._start:
+            return self._store.get(self._seqs[self._start + row])
+        return None
+
+    def row_for_seq(self, seq: int) -> int:
+        """
+        获取序号所在的行
+
+        Returns:
+            int: 行号，该条目不在模型中时返回-1
+        """
+        self.flush()
+        index = bisect.bisect_left(self._seqs, seq, self._start)
+        if index < len(self._seqs) and self._seqs[index] == seq:
+            return index - self._start
+        return -1
+
+    # ------------------------------------------------------------------
+    # QAbstractListModel 接口
+    # ------------------------------------------------------------------
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._seqs) - self._start
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == SeqRole:
+            return self._seqs[self._start + index.row()]
+        entry = self.entry_at(index.row())
+        if entry is None:
+            return None
+        if role == EntryRole:
+            return entry
+        if role == Qt.ItemDataRole.DisplayRole or role == Qt.ItemDataRole.ToolTipRole:
+            return format_entry(entry)
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return QColor(LEVEL_COLORS[entry.level])
+        return None
+
+    # ------------------------------------------------------------------
+    # 批量更新
+    # ------------------------------------------------------------------
+
+    def flush(self):
+        """将排队的新条目一次性插入模型，并刷新重复计数变化的行"""
+        self._flush_timer.stop()
+        self._trim_evicted()
+        self._refresh_updated()
+        pending, self._pending = self._pending, []
+        level = self._level
+        first_seq = self._store.first_seq
+        seqs = [entry.seq for entry in pending
+                if entry.seq >= first_seq and (level is None or entry.level is level)]
+        if not seqs:
+            return
+        row = self.rowCount()
+        self.beginInsertRows(QModelIndex(), row, row + len(seqs) - 1)
+        self._seqs.extend(seqs)
+        self.endInsertRows()
+
+    def _on_log_added(self, entry: LogEntry):
+        self._pending.append(entry)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _on_log_updated(self, entry: LogEntry):
+        self._updated.add(entry.seq)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _on_log_cleared(self):
+        self._pending.clear()
+        self._updated.clear()
+        self._flush_timer.stop()
+        self.beginResetModel()
+        self._seqs = []
+        self._start = 0
+        self.endResetModel()
+
+    def _reload(self):
+        """按当前过滤条件从日志存储重新加载所有序号"""
+        self._pending.clear()
+        self._updated.clear()
+        self._flush_timer.stop()
+        self.beginResetModel()
+        self._seqs = self._store.seqs(self._level)
+        self._start = 0
+        self.endResetModel()
+
+    def _refresh_updated(self):
+        """通知视图重绘重复计数变化的行，尚未插入的条目插入时自然显示最新计数"""
+        updated, self._updated = self._updated, set()
+        for seq in updated:
+            index = bisect.bisect_left(self._seqs, seq, self._start)
+            if index < len(self._seqs) and self._seqs[index] == seq:
+                model_index = self.index(index - self._start)
+                self.dataChanged.emit(model_index, model_index)
+
+    def _trim_evicted(self):
+        """移除已被日志存储淘汰的行"""
+        first_seq = self._store.first_seq
+        if self._start >= len(self._seqs) or self._seqs[self._start] >= first_seq:
+            return
+        end = bisect.bisect_left(self._seqs, first_seq, self._start)
+        self.beginRemoveRows(QModelIndex(), 0, end - self._start - 1)
+        self._start = end
+        if self._start > len(self._seqs) // 2:
+            del self._seqs[:self._start]
+            self._start = 0
+        self.endRemoveRows()
+
+
+class LogItemDelegate(QStyledItemDelegate):
+    """日志行绘制代理：依次绘制时间戳、级别、来源和消息，超出宽度的部分省略"""
+
+    PADDING = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._timestamp_color = QColor(TIMESTAMP_COLOR)
+        self._source_color = QColor(SOURCE_COLOR)
+        self._level_colors = {level: QColor(color) for level, color in LEVEL_COLORS.items()}
+
+    def paint(self, painter, option, index):
+        entry = index.data(EntryRole)
+        if entry is None:
+            return
+        painter.save()
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        painter.setFont(option.font)
+        metrics = option.fontMetrics
+        rect = option.rect.adjusted(self.PADDING, 0, -self.PADDING, 0)
+        flags = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+        level_color = self._level_colors[entry.level]
+
+        x = rect.left()
+        pieces = [
+            (f"[{entry.timestamp.strftime('%H:%M:%S')}] ", self._timestamp_color),
+            (f"[{entry.level.value}] ", level_color),
+        ]
+        if entry.source:
+            pieces.append((f"[{entry.source}] ", self._source_color))
+        for text, color in pieces:
+            painter.setPen(color)
+            painter.drawText(x, rect.top(), rect.right() - x, rect.height(), flags, text)
+            x += metrics.horizontalAdvance(text)
+            if x >= rect.right():
+                painter.restore()
+                return
+
+        message = entry.message.replace("\n", " ") + repeat_suffix(entry)
+        painter.setPen(level_color)
+        painter.drawText(x, rect.top(), rect.right() - x, rect.height(), flags,
+                         metrics.elidedText(message, Qt.TextElideMode.ElideRight, rect.right() - x))
+        painter.restore()
+
+    def sizeHint(self, option, index) -> QSize:
+        # 所有行等高，LogListView 使用相同的行高
+        return QSize(0, QFontMetrics(option.font).height() + self.PADDING)
+
+
+class LogListView(QTableView):
+    """日志列表视图：单列、隐藏表头、固定行高"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setItemDelegate(LogItemDelegate(self))
+        self.setShowGrid(False)
+        self.setWordWrap(False)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.horizontalHeader().hide()
+        self.horizontalHeader().setStretchLastSection(True)
+        vertical_header = self.verticalHeader()
+        vertical_header.hide()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self._update_row_height()
+
+    def is_at_bottom(self) -> bool:
+        """是否停留在底部"""
+        scroll_bar = self.verticalScrollBar()
+        return scroll_bar.value() >= scroll_bar.maximum()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == event.Type.FontChange:
+            self._update_row_height()
+
+    def _update_row_height(self):
+        row_height = QFontMetrics(self.font()).height() + LogItemDelegate.PADDING
+        self.verticalHeader().setMinimumSectionSize(1)
+        self.verticalHeader().setDefaultSectionSize(row_height)
@@ -7,10 +7,12 @@ This module implements the log manager panel.
 """
 
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTextEdit,
-                           QHBoxLayout, QPushButton, QComboBox, QLabel)
+                           QHBoxLayout, QPushButton, QComboBox, QLabel, QFileDialog)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QTextCharFormat, QColor, QTextCursor
 
+from .api import LogManagerAPI, LogLevel
+
 class LogManagerPanel(QWidget):
     """日志管理面板类"""
     def __init__(self, parent=None):
@@ -34,6 +36,7 @@ class LogManagerPanel(QWidget):
         # 添加清除按钮
         clear_button = QPushButton("清除")
         export_button = QPushButton("导出")
+        export_button.clicked.connect(self._export_logs)
         
         toolbar.addWidget(self.level_combo)
         toolbar.addStretch()
@@ -42,17 +45,9 @@ class LogManagerPanel(QWidget):
         
         # 创建日志文本编辑器
         self.log_text = QTextEdit()
+        self.log_text.setObjectName("LogManagerText")
         self.log_text.setReadOnly(True)
         
-        # 设置日志文本编辑器的样式
-        self.log_text.setStyleSheet("""
-            QTextEdit {
-                background-color: #1e1e1e;
-                color: #ffffff;
-                font-family: Consolas, Monaco, monospace;
-                font-size: 12px;
-            }
-        """)
         
         # 将组件添加到主布局
         main_layout.addLayout(toolbar)
@@ -81,4 +76,15 @@ class LogManagerPanel(QWidget):
             
         cursor = self.log_text.textCursor()
         cursor.movePosition(QTextCursor.MoveOperation.End)
-        cursor.insertText(f"[{level.upper()}] {message}\n", format) 
\ No newline at end of file
+        cursor.insertText(f"[{level.upper()}] {message}\n", format)
+        
+    def _export_logs(self):
+        """导出日志，级别按当前选择过滤"""
+        export_path, _ = QFileDialog.getSaveFileName(
+            self, "导出日志", "logs.txt", "文本文件 (*.txt);;JSON Lines (*.jsonl)"
+        )
+        if not export_path:
+            return
+        level_text = self.level_combo.currentText()
+        level = next((level for level in LogLevel if level.value == level_text), None)
+        LogManagerAPI.get_instance().export_entries_async(export_path, level)
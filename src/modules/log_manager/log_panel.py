@@ -7,11 +7,15 @@ This module provides the log panel implementation.
 """
 
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QToolBar,
-                           QLabel, QPushButton, QComboBox, QTextEdit)
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QAction, QTextCharFormat, QColor, QTextCursor
+                           QLabel, QPushButton, QComboBox, QFileDialog,
+                           QLineEdit, QListWidget, QListWidgetItem, QSplitter)
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QAction, QColor
 
-from .api import LogManagerAPI, LogLevel, LogEntry
+from .api import LogManagerAPI, LogLevel
+from .log_list_model import LogListModel, LogListView, LEVEL_COLORS
+from .log_format import format_entry
+from .log_search import LogSearcher, LogSearchQuery, LogSearchError, MAX_RESULTS
 
 class LogPanel(QWidget):
     """日志面板类"""
@@ -20,7 +24,6 @@ class LogPanel(QWidget):
         super().__init__(parent)
         self.api = LogManagerAPI.get_instance()
         self.setup_ui()
-        self.setup_formats()
         self.setup_connections()
         
     def setup_ui(self):
@@ -33,60 +36,36 @@ class LogPanel(QWidget):
         toolbar = self.create_toolbar()
         layout.addWidget(toolbar)
         
-        # 日志显示区域
-        self.log_edit = QTextEdit()
-        self.log_edit.setReadOnly(True)
-        self.log_edit.setStyleSheet("""
-            QTextEdit {
-                background-color: #1e1e1e;
-                color: #ffffff;
-                border: 1px solid #3d3d3d;
-                font-family: 'Consolas', monospace;
-                font-size: 13px;
-                padding: 8px;
-            }
-        """)
-        layout.addWidget(self.log_edit)
+        # 日志显示区域：模型只保存序号，代理只绘制可见的行
+        self.log_model = LogListModel(self)
+        self.log_view = LogListView()
+        self.log_view.setModel(self.log_model)
+        self.log_view.setObjectName("LogView")
+        
+        # 搜索结果，点击后定位到日志视图中的条目
+        self.search_results = QListWidget()
+        self.search_results.setUniformItemSizes(True)
+        self.search_results.hide()
+        self.search_status = QLabel()
+        self.search_status.hide()
+        
+        self.splitter = QSplitter(Qt.Orientation.Vertical)
+        self.splitter.addWidget(self.log_view)
+        self.splitter.addWidget(self.search_results)
+        self.splitter.setStretchFactor(0, 3)
+        self.splitter.setStretchFactor(1, 1)
+        layout.addWidget(self.splitter)
+        layout.addWidget(self.search_status)
+        
+        self.searcher = LogSearcher(self)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(250)
         
     def create_toolbar(self) -> QToolBar:
         """创建工具栏"""
         toolbar = QToolBar()
-        toolbar.setStyleSheet("""
-            QToolBar {
-                background-color: #2d2d2d;
-                border: none;
-                spacing: 4px;
-                padding: 4px;
-            }
-            QToolButton {
-                background-color: transparent;
-                border: none;
-                padding: 4px;
-                color: #ffffff;
-            }
-            QToolButton:hover {
-                background-color: #3d3d3d;
-            }
-            QToolButton:pressed {
-                background-color: #1e1e1e;
-            }
-            QComboBox {
-                background-color: #3d3d3d;
-                border: 1px solid #4d4d4d;
-                border-radius: 3px;
-                color: #ffffff;
-                padding: 4px;
-                min-width: 100px;
-            }
-            QComboBox::drop-down {
-                border: none;
-            }
-            QComboBox::down-arrow {
-                image: url(down_arrow.png);
-                width: 12px;
-                height: 12px;
-            }
-        """)
+        toolbar.setObjectName("PanelToolBar")
         
         # 日志级别过滤
         self.level_combo = QComboBox()
@@ -97,94 +76,165 @@ class LogPanel(QWidget):
         toolbar.addWidget(self.level_combo)
         toolbar.addSeparator()
         
+        # 搜索
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("搜索日志")
+        self.search_edit.setClearButtonEnabled(True)
+        toolbar.addWidget(self.search_edit)
+        self.regex_action = QAction("正则", self)
+        self.regex_action.setCheckable(True)
+        toolbar.addAction(self.regex_action)
+        self.case_action = QAction("区分大小写", self)
+        self.case_action.setCheckable(True)
+        toolbar.addAction(self.case_action)
+        toolbar.addSeparator()
+        
         # 清除按钮
         clear = QAction("清除日志", self)
         clear.triggered.connect(self._clear_logs)
         toolbar.addAction(clear)
         
-        return toolbar
+        # 导出按钮
+        export = QAction("导出日志", self)
+        export.triggered.connect(self._export_logs)
+        toolbar.addAction(export)
         
-    def setup_formats(self):
-        """设置不同日志级别的文本格式"""
-        self.formats = {
-            LogLevel.DEBUG: self._create_format("#90a4ae"),    # 灰色
-            LogLevel.INFO: self._create_format("#4fc3f7"),     # 蓝色
-            LogLevel.WARNING: self._create_format("#ffb74d"),   # 橙色
-            LogLevel.ERROR: self._create_format("#e57373"),     # 红色
-            LogLevel.CRITICAL: self._create_format("#f06292")   # 粉色
-        }
-        
-    def _create_format(self, color: str) -> QTextCharFormat:
-        """创建指定颜色的文本格式"""
-        fmt = QTextCharFormat()
-        fmt.setForeground(QColor(color))
-        return fmt
+        return toolbar
         
     def setup_connections(self):
         """设置信号连接"""
-        self.api.register_log_added_callback(self._handle_log_added)
-        self.api.register_log_cleared_callback(self._handle_log_cleared)
         self.level_combo.currentTextChanged.connect(self._handle_level_changed)
-        
-    def _handle_log_added(self, entry: LogEntry):
-        """处理新日志条目"""
-        # 检查是否需要显示此级别的日志
-        current_level = self.level_combo.currentText()
-        if current_level != "全部" and entry.level.value != current_level:
-            return
-            
-        # 获取对应格式
-        fmt = self.formats[entry.level]
-        
-        # 添加日志条目
-        cursor = self.log_edit.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        
-        # 添加时间戳
-        cursor.insertText(
-            f"[{entry.timestamp.strftime('%H:%M:%S')}] ",
-            self._create_format("#666666")  # 时间戳使用暗灰色
-        )
-        
-        # 添加日志级别
-        cursor.insertText(
-            f"[{entry.level.value}] ",
-            fmt
-        )
-        
-        # 添加来源（如果有）
-        if entry.source:
-            cursor.insertText(
-                f"[{entry.source}] ",
-                self._create_format("#81c784")  # 来源使用绿色
-            )
-        
-        # 添加消息
-        cursor.insertText(f"{entry.message}\n", fmt)
-        
-        # 滚动到底部
-        self.log_edit.setTextCursor(cursor)
-        
-    def _handle_log_cleared(self):
-        """处理日志清除"""
-        self.log_edit.clear()
+        self.log_model.rowsAboutToBeInserted.connect(self._handle_rows_about_to_be_inserted)
+        self.log_model.rowsInserted.connect(self._handle_rows_inserted)
+        self._follow_tail = True
+        self._jumping = False
+        
+        self.search_edit.textChanged.connect(lambda _: self._search_timer.start())
+        self.search_edit.returnPressed.connect(self._select_next_result)
+        self.regex_action.toggled.connect(lambda _: self._start_search())
+        self.case_action.toggled.connect(lambda _: self._start_search())
+        self._search_timer.timeout.connect(self._start_search)
+        self.searcher.matches_found.connect(self._handle_matches_found)
+        self.searcher.search_failed.connect(self._handle_search_failed)
+        self.searcher.finished.connect(self._handle_search_finished)
+        self.search_results.currentItemChanged.connect(self._handle_result_selected)
+        
+    def _handle_rows_about_to_be_inserted(self):
+        """记录插入前是否停留在底部"""
+        self._follow_tail = self.log_view.is_at_bottom()
+        
+    def _handle_rows_inserted(self):
+        """停留在底部时跟随新日志滚动"""
+        if self._follow_tail:
+            self.log_view.scrollToBottom()
         
     def _handle_level_changed(self, level: str):
         """处理日志级别过滤变化"""
-        self.log_edit.clear()
-        
-        # 获取过滤后的日志条目
         if level == "全部":
-            entries = self.api.get_entries()
+            self.log_model.set_level(None)
         else:
-            entries = self.api.get_entries(
-                level=next(l for l in LogLevel if l.value == level)
-            )
-            
-        # 重新显示过滤后的日志
-        for entry in entries:
-            self._handle_log_added(entry)
+            self.log_model.set_level(next(l for l in LogLevel if l.value == level))
+        self.log_view.scrollToBottom()
+        if self.search_edit.text() and not self._jumping:
+            self._start_search()
             
     def _clear_logs(self):
         """清除所有日志"""
-        self.api.clear_entries() 
\ No newline at end of file
+        self.api.clear_entries()
+        
+    def _export_logs(self):
+        """按当前级别过滤导出日志"""
+        export_path, _ = QFileDialog.getSaveFileName(
+            self, "导出日志", "logs.txt", "文本文件 (*.txt);;JSON Lines (*.jsonl)"
+        )
+        if export_path:
+            self.api.export_entries_async(export_path, self.log_model.level())
+        
+    def _start_search(self):
+        """按当前条件重新开始搜索，之前的搜索会被取消"""
+        self._search_timer.stop()
+        self.search_results.clear()
+        text = self.search_edit.text()
+        if not text:
+            self.searcher.cancel()
+            self.search_results.hide()
+            self.search_status.hide()
+            return
+        query = LogSearchQuery(
+            text=text,
+            regex=self.regex_action.isChecked(),
+            case_sensitive=self.case_action.isChecked(),
+            level=self.log_model.level()
+        )
+        try:
+            self.searcher.search(query)
+        except LogSearchError as e:
+            self.searcher.cancel()
+            self.search_status.setText(str(e))
+            self.search_status.show()
+            return
+        self.search_results.show()
+        self.search_status.setText("正在搜索...")
+        self.search_status.show()
+        
+    def _handle_matches_found(self, generation: int, matches: list):
+        """添加一批搜索结果"""
+        if generation != self.searcher.generation():
+            return
+        self.search_results.setUpdatesEnabled(False)
+        for match in matches:
+            text = format_entry(match)
+            if not match.in_memory:
+                text = f"(历史) {text}"
+            item = QListWidgetItem(text)
+            item.setData(Qt.ItemDataRole.UserRole, match.seq)
+            item.setForeground(QColor(LEVEL_COLORS[match.level]))
+            self.search_results.addItem(item)
+        self.search_results.setUpdatesEnabled(True)
+        
+    def _handle_search_failed(self, generation: int, error: str):
+        """搜索出错"""
+        if generation == self.searcher.generation():
+            self.search_status.setText(f"搜索失败: {error}")
+        
+    def _handle_search_finished(self, generation: int, count: int, cancelled: bool):
+        """搜索结束"""
+        if generation != self.searcher.generation() or cancelled:
+            return
+        if count >= MAX_RESULTS:
+            self.search_status.setText(f"找到超过 {MAX_RESULTS} 条，只显示前 {MAX_RESULTS} 条")
+        else:
+            self.search_status.setText(f"找到 {count} 条")
+        
+    def _select_next_result(self):
+        """回车时选中下一条搜索结果"""
+        count = self.search_results.count()
+        if count:
+            self.search_results.setCurrentRow((self.search_results.currentRow() + 1) % count)
+        
+    def _handle_result_selected(self, item: QListWidgetItem, previous=None):
+        """定位到搜索结果对应的日志条目"""
+        if item is not None:
+            self.jump_to_seq(item.data(Qt.ItemDataRole.UserRole))
+        
+    def jump_to_seq(self, seq: int) -> bool:
+        """
+        滚动到序号对应的日志条目并选中
+        
+        Returns:
+            bool: 条目是否在日志视图中
+        """
+        row = self.log_model.row_for_seq(seq)
+        if row < 0 and self.log_model.level() is not None:
+            # 被级别过滤隐藏时切换到全部，保留当前的搜索结果
+            self._jumping = True
+            self.level_combo.setCurrentText("全部")
+            self._jumping = False
+            row = self.log_model.row_for_seq(seq)
+        if row < 0:
+            self.search_status.setText("该条目只在历史日志文件中")
+            return False
+        index = self.log_model.index(row)
+        self.log_view.scrollTo(index, LogListView.ScrollHint.PositionAtCenter)
+        self.log_view.setCurrentIndex(index)
+        return True
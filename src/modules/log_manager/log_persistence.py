@@ -0,0 +1,418 @@
+"""
+Log Persistence
+日志持久化
+
+This module writes log entries to JSON Lines files on a background writer thread.
+Entries are handed over through a queue and written in batches with one flush per
+batch, and the active file is rotated once it exceeds a size limit, keeping a fixed
+number of older files. Entries can be held back for a short delay before they are
+serialized, so repeats coalesced into them in the meantime are written with the final
+count. Reading back, exporting and searching stream the files line by
+line, so the history never has to fit in memory.
+此模块在后台写入线程中将日志条目写入 JSON Lines 文件。条目通过队列交给写入线程，
+按批写入，每批只刷新一次；当前文件超过大小上限后轮转，只保留固定数量的旧文件。
+条目可以在序列化之前延迟一小段时间，期间合并进来的重复消息以最终计数写入。
+读取、导出和搜索都逐行流式读取文件，历史日志不需要全部放入内存。
+"""
+
+import os
+import json
+import time
+import queue
+import sys
+import tempfile
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, BinaryIO, Callable, Deque, Iterator, List, Optional, Tuple
+
+from .log_format import entry_to_json, format_entry
+
+if TYPE_CHECKING:
+    from .api import LogEntry, LogLevel
+
+DEFAULT_LOG_DIR = os.path.join(os.path.expanduser("~"), ".designer_editor", "logs")
+LOG_FILE_NAME = "editor.jsonl"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+WRITE_BATCH_SIZE = 1000
+TAIL_READ_SIZE = 64 * 1024
+
+# 导出格式
+EXPORT_JSONL = "jsonl"
+EXPORT_TEXT = "text"
+
+
+class _Barrier:
+    """写入线程处理到该位置时设置事件"""
+
+    def __init__(self):
+        self.event = threading.Event()
+
+
+_STOP = object()
+
+
+class LogPersistence:
+    """日志持久化类"""
+
+    def __init__(self, log_dir: str = DEFAULT_LOG_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 backup_count: int = DEFAULT_BACKUP_COUNT,
+                 write_delay: float = 0.0):
+        """
+        Args:
+            log_dir: 日志目录
+            max_bytes: 单个文件的大小上限
+            backup_count: 保留的旧文件数
+            write_delay: 条目提交后延迟写入的秒数
+        """
+        self.log_dir = os.path.abspath(log_dir)
+        self.log_path = os.path.join(self.log_dir, LOG_FILE_NAME)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.write_delay = write_delay
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        # 轮转和读取快照互斥，读取时文件不会被改名
+        self._files_lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """启动写入线程"""
+        if self._thread is not None:
+            return
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, entry: "LogEntry"):
+        """提交要写入的条目，可以从任意线程调用，不会阻塞"""
+        self._queue.put(entry)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待已提交的条目全部写入文件，最多需要额外等待 write_delay 秒
+
+        Returns:
+            bool: 是否在超时前完成；写入线程意外退出时，队列中还有未写入的条目则返回False
+        """
+        if self._thread is None:
+            return True
+        if not self._thread.is_alive():
+            return self._queue.empty()
+        barrier = _Barrier()
+        self._queue.put(barrier)
+        return barrier.event.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """写入剩余条目并停止写入线程"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        """
+        写入线程：取出已排队的条目，在 held 中停留 write_delay 秒后按批写入
+
+        等待点按顺序排在条目之后，因此在它之前提交的条目都写入后才会被设置；停止时立即写入所有条目。
+        """
+        held: Deque[Tuple[float, object]] = deque()
+        try:
+            try:
+                self._open()
+            except OSError as e:
+                # 写入每一批时再尝试打开
+                _report_error("打开日志文件失败", e)
+            running = True
+            while running:
+                timeout = max(0.0, held[0][0] - time.monotonic()) if held else None
+                try:
+                    received = [self._queue.get(timeout=timeout)]
+                except queue.Empty:
+                    received = []
+                while received and len(received) < WRITE_BATCH_SIZE:
+                    try:
+                        received.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                now = time.monotonic()
+                release = now + self.write_delay
+                for item in received:
+                    held.append((now if item is _STOP or isinstance(item, _Barrier) else release, item))
+                stopping = any(item is _STOP for item in received)
+                while running and held and (stopping or held[0][0] <= now):
+                    batch = []
+                    while held and len(batch) < WRITE_BATCH_SIZE and (stopping or held[0][0] <= now):
+                        batch.append(held.popleft()[1])
+                    try:
+                        running = self._write_batch(batch)
+                    except Exception as e:
+                        # 一批出错不能结束写入线程，否则之后提交的条目都会丢失
+                        _report_error("写入日志文件失败", e)
+                        running = not any(item is _STOP for item in batch)
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _write_batch(self, batch: list) -> bool:
+        """
+        写入一批条目
+
+        Returns:
+            bool: 是否继续运行
+        """
+        barriers = [item for item in batch if isinstance(item, _Barrier)]
+        running = not any(item is _STOP for item in batch)
+        try:
+            lines = []
+            for item in batch:
+                if item is not _STOP and not isinstance(item, _Barrier):
+                    # 无法序列化的条目单独跳过
+                    line = entry_to_json(item)
+                    if line is not None:
+                        lines.append(line)
+            if lines:
+                data = ("\n".join(lines) + "\n").encode("utf-8")
+                try:
+                    if self._file is None:
+                        self._open()
+                    self._file.write(data)
+                    self._file.flush()
+                    self._size += len(data)
+                    if self._size >= self.max_bytes:
+                        self._rotate()
+                except OSError as e:
+                    _report_error("写入日志文件失败", e)
+        finally:
+            # 出错时也要通知等待者，flush 不会一直等到超时
+            for barrier in barriers:
+                barrier.event.set()
+        return running
+
+    def _open(self):
+        self._file = open(self.log_path, "ab")
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        """轮转文件：editor.jsonl -> editor.jsonl.1 -> ... -> editor.jsonl.N"""
+        with self._files_lock:
+            self._file.close()
+            # 重新打开失败时下一批再尝试
+            self._file = None
+            try:
+                if self.backup_count == 0:
+                    os.remove(self.log_path)
+                else:
+                    oldest = self._backup_path(self.backup_count)
+                    if os.path.exists(oldest):
+                        os.remove(oldest)
+                    for index in range(self.backup_count - 1, -1, -1):
+                        source = self._backup_path(index)
+                        if os.path.exists(source):
+                            os.replace(source, self._backup_path(index + 1))
+            except OSError as e:
+                # 文件被占用时继续写入当前文件，下一批再尝试轮转
+                _report_error("轮转日志文件失败", e)
+            self._open()
+
+    def _backup_path(self, index: int) -> str:
+        return self.log_path if index == 0 else f"{self.log_path}.{index}"
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+
+    def log_files(self) -> List[str]:
+        """所有日志文件，从旧到新排列"""
+        return [path for path in (self._backup_path(index) for index in range(self.backup_count, -1, -1))
+                if os.path.exists(path)]
+
+    def last_seq(self) -> int:
+        """
+        已写入的最后一条记录的序号，用于在新的会话中继续编号
+
+        Returns:
+            int: 序号，没有记录时返回0
+        """
+        self.flush()
+        for path in reversed(self.log_files()):
+            try:
+                with open(path, "rb") as f:
+                    size = f.seek(0, os.SEEK_END)
+                    f.seek(max(0, size - TAIL_READ_SIZE))
+                    tail = f.read()
+            except OSError:
+                continue
+            for line in reversed(tail.split(b"\n")):
+                try:
+                    return int(json.loads(line)["seq"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return 0
+
+    def iter_records(self, level: Optional["LogLevel"] = None,
+                     source: Optional[str] = None) -> Iterator[dict]:
+        """
+        逐行读取已写入的记录，从旧到新
+
+        开始读取前等待已提交的条目写完，并记录各文件当时的大小，只读取到该位置。
+
+        Args:
+            level: 日志级别，None表示不过滤
+            source: 来源，None表示不过滤
+        """
+        level_name = level.name if level is not None else None
+        for line in self.iter_lines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if level_name is not None and record.get("level") != level_name:
+                continue
+            if source is not None and record.get("source", "") != source:
+                continue
+            yield record
+
+    def iter_entries(self, level: Optional["LogLevel"] = None,
+                     source: Optional[str] = None) -> Iterator["LogEntry"]:
+        """逐条读取已写入的日志条目，从旧到新"""
+        from .api import LogEntry
+
+        for record in self.iter_records(level, source):
+            try:
+                yield LogEntry.from_dict(record)
+            except (KeyError, ValueError):
+                continue
+
+    def export(self, export_path: str, fmt: Optional[str] = None,
+               level: Optional["LogLevel"] = None, source: Optional[str] = None,
+               progress: Optional[Callable[[int], None]] = None) -> int:
+        """
+        从日志文件流式导出
+
+        没有过滤条件的 JSON Lines 导出直接复制文件内容，不解析记录。
+
+        Args:
+            export_path: 导出文件路径
+            fmt: EXPORT_JSONL 或 EXPORT_TEXT，默认按扩展名判断
+            level: 日志级别，None表示不过滤
+            source: 来源，None表示不过滤
+            progress: 进度回调 progress(已导出条数)
+
+        Returns:
+            int: 导出的条目数
+        """
+        fmt = fmt or export_format_for(export_path)
+        if fmt == EXPORT_JSONL and level is None and source is None:
+            def write(f):
+                count = 0
+                for line in self.iter_lines():
+                    f.write(line)
+                    count += 1
+                    if progress and count % WRITE_BATCH_SIZE == 0:
+                        progress(count)
+                return count
+            return _write_atomic(export_path, write)
+        return write_entries(export_path, self.iter_entries(level, source), fmt, progress)
+
+    def iter_lines(self) -> Iterator[bytes]:
+        """
+        从旧到新读取所有文件中的完整行
+
+        写入线程刷新后，在轮转锁内打开所有文件并记录大小，之后的轮转和写入不影响本次读取。
+        """
+        self.flush()
+        files: List[Tuple[BinaryIO, int]] = []
+        try:
+            with self._files_lock:
+                for path in self.log_files():
+                    try:
+                        f = open(path, "rb")
+                    except FileNotFoundError:
+                        continue
+                    files.append((f, os.fstat(f.fileno()).st_size))
+            for f, size in files:
+                yield from _read_lines(f, size)
+        finally:
+            for f, _ in files:
+                f.close()
+
+
+def export_format_for(export_path: str) -> str:
+    """按扩展名选择导出格式"""
+    return EXPORT_JSONL if export_path.lower().endswith((".jsonl", ".json")) else EXPORT_TEXT
+
+
+def write_entries(export_path: str, entries, fmt: str = EXPORT_TEXT,
+                  progress: Optional[Callable[[int], None]] = None) -> int:
+    """
+    将条目写入导出文件
+
+    Args:
+        export_path: 导出文件路径
+        entries: 日志条目的可迭代对象
+        fmt: EXPORT_JSONL 或 EXPORT_TEXT
+        progress: 进度回调 progress(已导出条数)
+
+    Returns:
+        int: 导出的条目数
+    """
+    def write(f):
+        count = 0
+        for entry in entries:
+            if fmt == EXPORT_JSONL:
+                line = entry_to_json(entry)
+                if line is None:
+                    continue
+            else:
+                line = format_entry(entry)
+            f.write((line + "\n").encode("utf-8"))
+            count += 1
+            if progress and count % WRITE_BATCH_SIZE == 0:
+                progress(count)
+        return count
+    return _write_atomic(export_path, write)
+
+
+def _report_error(message: str, error: Exception):
+    """
+    报告写入线程的错误
+
+    不使用 logging：日志桥接处理器会把记录送回日志管理器并提交给本模块，
+    写入失败时会不断产生新的失败记录。
+    """
+    sys.stderr.write(f"{message}: {error}\n")
+
+
+def _write_atomic(export_path: str, write: Callable) -> int:
+    """先写临时文件再替换，导出失败不会留下不完整的文件"""
+    directory = os.path.dirname(os.path.abspath(export_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(export_path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            count = write(f)
+        os.replace(temp_path, export_path)
+        return count
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _read_lines(f: BinaryIO, size: int) -> Iterator[bytes]:
+    """读取文件前 size 字节中的完整行"""
+    remaining = size
+    for line in f:
+        if len(line) > remaining or not line.endswith(b"\n"):
+            break
+        remaining -= len(line)
+        yield line
@@ -0,0 +1,245 @@
+"""
+Log Search
+日志搜索
+
+This module searches log entries on a worker thread. The ring buffer is searched
+first, newest entries included, so matches that can be shown in the log view arrive
+immediately; the persisted log files are then streamed line by line for older history.
+Substring queries skip non-matching lines before parsing them. Matches are sent back to
+the UI thread in small batches, and starting a new search cancels the previous one.
+此模块在工作线程中搜索日志。先搜索内存中的环形缓冲区，可以在日志视图中定位的结果会立即返回；
+然后逐行读取持久化的日志文件搜索更早的历史。子串查询在解析之前跳过不匹配的行。
+搜索结果分小批送回UI线程，开始新的搜索会取消之前的搜索。
+"""
+
+import re
+import json
+import time
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from .api import LogManagerAPI, LogLevel, LogEntry
+
+MAX_RESULTS = 10000
+EMIT_INTERVAL = 0.05   # 秒
+EMIT_BATCH_SIZE = 500
+CANCEL_CHECK_INTERVAL = 1000
+
+
+@dataclass
+class LogSearchQuery:
+    """搜索条件"""
+    text: str
+    regex: bool = False
+    case_sensitive: bool = False
+    level: Optional[LogLevel] = None
+    include_history: bool = True
+
+
+@dataclass
+class LogSearchMatch:
+    """搜索结果"""
+    seq: int
+    level: LogLevel
+    source: str
+    message: str
+    timestamp: datetime
+    in_memory: bool   # 条目是否仍在环形缓冲区中，可以在视图中定位
+
+
+class LogSearchError(ValueError):
+    """搜索条件无效"""
+
+
+def compile_matcher(query: LogSearchQuery) -> Callable[[str], bool]:
+    """
+    根据搜索条件生成匹配函数
+
+    Raises:
+        LogSearchError: 正则表达式无效
+    """
+    if query.regex:
+        try:
+            pattern = re.compile(query.text, 0 if query.case_sensitive else re.IGNORECASE)
+        except re.error as e:
+            raise LogSearchError(f"无效的正则表达式: {str(e)}")
+        return lambda text: pattern.search(text) is not None
+    if query.case_sensitive:
+        needle = query.text
+        return lambda text: needle in text
+    needle = query.text.casefold()
+    return lambda text: needle in text.casefold()
+
+
+def _line_prefilter(query: LogSearchQuery) -> Optional[Callable[[str], bool]]:
+    """
+    子串查询在解析 JSON 之前检查原始行
+
+    只有不会被 JSON 转义的子串才能直接在行中查找。
+    """
+    if query.regex or not query.text:
+        return None
+    if any(ch in query.text for ch in '"\\') or any(ord(ch) < 0x20 for ch in query.text):
+        return None
+    if query.case_sensitive:
+        needle = query.text
+        return lambda line: needle in line
+    needle = query.text.casefold()
+    return lambda line: needle in line.casefold()
+
+
+class _SearchTask(QRunnable):
+    """搜索任务"""
+
+    def __init__(self, searcher: 'LogSearcher', generation: int, query: LogSearchQuery,
+                 matcher: Callable[[str], bool], cancel: threading.Event):
+        super().__init__()
+        self.searcher = searcher
+        self.generation = generation
+        self.query = query
+        self.matcher = matcher
+        self.cancel = cancel
+        self.count = 0
+        self._batch: List[LogSearchMatch] = []
+        self._last_emit = time.monotonic()
+
+    def run(self):
+        try:
+            first_seq = self._search_memory()
+            if self.query.include_history and not self._stopped():
+                self._search_history(first_seq)
+        except Exception as e:
+            self._emit("search_failed", self.generation, str(e))
+        finally:
+            self._flush()
+            self._emit("finished", self.generation, self.count, self.cancel.is_set())
+
+    def _search_memory(self) -> int:
+        """
+        搜索环形缓冲区，从新到旧
+
+        Returns:
+            int: 搜索开始时缓冲区中最旧条目的序号，历史文件只需要搜索更早的条目
+        """
+        store = self.searcher.api.get_store()
+        first_seq = store.first_seq
+        seqs = store.seqs(self.query.level)
+        matcher = self.matcher
+        for index in range(len(seqs) - 1, -1, -1):
+            if index % CANCEL_CHECK_INTERVAL == 0 and self._stopped():
+                break
+            entry = store.get(seqs[index])
+            if entry is None:
+                # 搜索过程中被淘汰，更早的条目也已被淘汰，由历史文件覆盖
+                first_seq = seqs[index] + 1
+                break
+            if matcher(entry.message) or (entry.source and matcher(entry.source)):
+                self._add(LogSearchMatch(entry.seq, entry.level, entry.source,
+                                         entry.message, entry.timestamp, True))
+        return first_seq
+
+    def _search_history(self, before_seq: int):
+        """搜索持久化的日志文件中序号小于 before_seq 的条目，从旧到新"""
+        persistence = self.searcher.api.get_persistence()
+        if persistence is None:
+            return
+        level_name = self.query.level.name if self.query.level is not None else None
+        prefilter = _line_prefilter(self.query)
+        matcher = self.matcher
+        for index, raw in enumerate(persistence.iter_lines()):
+            if index % CANCEL_CHECK_INTERVAL == 0 and self._stopped():
+                break
+            line = raw.decode("utf-8", errors="replace")
+            if prefilter is not None and not prefilter(line):
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("seq", 0) >= before_seq:
+                continue
+            if level_name is not None and record.get("level") != level_name:
+                continue
+            message = record.get("message", "")
+            source = record.get("source", "")
+            if not (matcher(message) or (source and matcher(source))):
+                continue
+            try:
+                entry = LogEntry.from_dict(record)
+            except (KeyError, ValueError):
+                continue
+            self._add(LogSearchMatch(entry.seq, entry.level, entry.source,
+                                     entry.message, entry.timestamp, False))
+
+    def _add(self, match: LogSearchMatch):
+        self._batch.append(match)
+        self.count += 1
+        if len(self._batch) >= EMIT_BATCH_SIZE or time.monotonic() - self._last_emit >= EMIT_INTERVAL:
+            self._flush()
+
+    def _flush(self):
+        if self._batch:
+            self._emit("matches_found", self.generation, self._batch)
+            self._batch = []
+        self._last_emit = time.monotonic()
+
+    def _emit(self, signal_name: str, *args):
+        try:
+            getattr(self.searcher, signal_name).emit(*args)
+        except RuntimeError:
+            # 搜索器已被销毁（例如面板关闭），停止搜索
+            self.cancel.set()
+
+    def _stopped(self) -> bool:
+        return self.cancel.is_set() or self.count >= MAX_RESULTS
+
+
+class LogSearcher(QObject):
+    """后台日志搜索器类"""
+
+    matches_found = pyqtSignal(int, list)     # 搜索编号, List[LogSearchMatch]
+    search_failed = pyqtSignal(int, str)      # 搜索编号, 错误信息
+    finished = pyqtSignal(int, int, bool)     # 搜索编号, 结果数, 是否被取消
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.api = LogManagerAPI.get_instance()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._generation = 0
+        self._cancel: Optional[threading.Event] = None
+
+    def search(self, query: LogSearchQuery) -> int:
+        """
+        开始搜索，正在进行的搜索会被取消
+
+        Returns:
+            int: 本次搜索的编号，结果信号中的编号不同时应忽略
+
+        Raises:
+            LogSearchError: 搜索条件无效
+        """
+        self.cancel()
+        matcher = compile_matcher(query)
+        self._generation += 1
+        self._cancel = threading.Event()
+        self._pool.start(_SearchTask(self, self._generation, query, matcher, self._cancel))
+        return self._generation
+
+    def cancel(self):
+        """取消正在进行的搜索"""
+        if self._cancel is not None:
+            self._cancel.set()
+            self._cancel = None
+
+    def generation(self) -> int:
+        """当前搜索的编号"""
+        return self._generation
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """等待搜索结束"""
+        return self._pool.waitForDone(msecs)
@@ -0,0 +1,253 @@
+"""
+Log Store
+日志存储
+
+This module keeps log entries in a fixed-capacity ring buffer. Every entry receives a
+monotonically increasing sequence number, and per-level and per-source indexes hold
+the sequence numbers of the entries in each group, so filtered views do not scan the
+whole buffer. Evicted entries can optionally be spilled to a JSON Lines file.
+此模块将日志条目保存在固定容量的环形缓冲区中。每个条目有单调递增的序号，
+按级别和来源建立的索引保存各组条目的序号，过滤时无需扫描整个缓冲区。
+被淘汰的条目可以选择写入 JSON Lines 文件。
+"""
+
+import os
+import sys
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, Iterator, List, Optional
+
+from .log_format import entry_to_json
+
+if TYPE_CHECKING:
+    from .api import LogEntry, LogLevel
+
+DEFAULT_CAPACITY = 100_000
+SPILL_BATCH_SIZE = 1000
+
+
+class LogStore:
+    """环形缓冲日志存储类"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, spill_path: Optional[str] = None):
+        """
+        Args:
+            capacity: 最多保存的条目数
+            spill_path: 被淘汰条目写入的文件，None表示直接丢弃
+        """
+        if capacity <= 0:
+            raise ValueError("容量必须大于0")
+        self._lock = threading.RLock()
+        self._capacity = capacity
+        self._buffer: List[Optional["LogEntry"]] = [None] * capacity
+        self._next_seq = 1
+        self._first_seq = 1
+        self._by_level: Dict["LogLevel", Deque[int]] = {}
+        self._by_source: Dict[str, Deque[int]] = {}
+        self._spill_path = spill_path
+        self._spill_buffer: List["LogEntry"] = []
+        self.evicted_count = 0
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    def append(self, entry: "LogEntry") -> "LogEntry":
+        """
+        添加条目并分配序号，缓冲区已满时淘汰最旧的条目
+
+        Returns:
+            LogEntry: 添加的条目
+        """
+        with self._lock:
+            if self._next_seq - self._first_seq >= self._capacity:
+                self._evict_oldest()
+            seq = self._next_seq
+            self._next_seq += 1
+            entry.seq = seq
+            self._buffer[seq % self._capacity] = entry
+            level_index = self._by_level.get(entry.level)
+            if level_index is None:
+                level_index = self._by_level[entry.level] = deque()
+            level_index.append(seq)
+            source_index = self._by_source.get(entry.source)
+            if source_index is None:
+                source_index = self._by_source[entry.source] = deque()
+            source_index.append(seq)
+            return entry
+
+    def clear(self):
+        """清空缓冲区，序号继续递增"""
+        with self._lock:
+            self._flush_spill()
+            self._buffer = [None] * self._capacity
+            self._first_seq = self._next_seq
+            self._by_level.clear()
+            self._by_source.clear()
+
+    def set_capacity(self, capacity: int):
+        """修改容量，缩小时淘汰最旧的条目"""
+        if capacity <= 0:
+            raise ValueError("容量必须大于0")
+        with self._lock:
+            while len(self) > capacity:
+                self._evict_oldest()
+            entries = [self._buffer[seq % self._capacity] for seq in range(self._first_seq, self._next_seq)]
+            self._capacity = capacity
+            self._buffer = [None] * capacity
+            for entry in entries:
+                self._buffer[entry.seq % capacity] = entry
+
+    def rebase(self, next_seq: int):
+        """
+        从 next_seq 开始重新编号，用于接续之前会话的序号
+
+        缓冲区中已有的条目按原顺序重新编号，调用方需要在视图创建之前调用。
+        """
+        with self._lock:
+            if next_seq <= self._first_seq:
+                return
+            entries = self.entries()
+            self._buffer = [None] * self._capacity
+            self._by_level.clear()
+            self._by_source.clear()
+            self._first_seq = self._next_seq = next_seq
+            for entry in entries:
+                self.append(entry)
+
+    def set_spill_path(self, spill_path: Optional[str]):
+        """设置被淘汰条目写入的文件"""
+        with self._lock:
+            self._flush_spill()
+            self._spill_path = spill_path
+
+    def flush(self):
+        """将缓存的淘汰条目写入文件"""
+        with self._lock:
+            self._flush_spill()
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def first_seq(self) -> int:
+        """缓冲区中最旧条目的序号"""
+        return self._first_seq
+
+    @property
+    def last_seq(self) -> int:
+        """缓冲区中最新条目的序号，为空时小于 first_seq"""
+        return self._next_seq - 1
+
+    def __len__(self) -> int:
+        return self._next_seq - self._first_seq
+
+    def get(self, seq: int) -> Optional["LogEntry"]:
+        """按序号获取条目，已淘汰时返回None"""
+        with self._lock:
+            if self._first_seq <= seq < self._next_seq:
+                return self._buffer[seq % self._capacity]
+            return None
+
+    def sources(self) -> List[str]:
+        """缓冲区中出现过的来源"""
+        with self._lock:
+            return sorted(self._by_source)
+
+    def count(self, level: Optional["LogLevel"] = None, source: Optional[str] = None) -> int:
+        """
+        统计条目数，只指定级别或来源时为O(1)
+        """
+        with self._lock:
+            if level is None and source is None:
+                return len(self)
+            if source is None:
+                return len(self._by_level.get(level, ()))
+            if level is None:
+                return len(self._by_source.get(source, ()))
+            return len(self._filtered_seqs(level, source))
+
+    def seqs(self, level: Optional["LogLevel"] = None, source: Optional[str] = None) -> List[int]:
+        """
+        获取符合条件的条目序号，按时间顺序排列
+
+        Args:
+            level: 日志级别，None表示不过滤
+            source: 来源，None表示不过滤
+        """
+        with self._lock:
+            if level is None and source is None:
+                return list(range(self._first_seq, self._next_seq))
+            if source is None:
+                return list(self._by_level.get(level, ()))
+            if level is None:
+                return list(self._by_source.get(source, ()))
+            return self._filtered_seqs(level, source)
+
+    def entries(self, level: Optional["LogLevel"] = None, source: Optional[str] = None) -> List["LogEntry"]:
+        """获取符合条件的条目，按时间顺序排列"""
+        with self._lock:
+            buffer, capacity = self._buffer, self._capacity
+            return [buffer[seq % capacity] for seq in self.seqs(level, source)]
+
+    def __iter__(self) -> Iterator["LogEntry"]:
+        return iter(self.entries())
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    def _filtered_seqs(self, level: "LogLevel", source: str) -> List[int]:
+        """同时按级别和来源过滤，遍历较小的索引"""
+        level_index = self._by_level.get(level)
+        source_index = self._by_source.get(source)
+        if not source_index or not level_index:
+            return []
+        buffer, capacity = self._buffer, self._capacity
+        if len(level_index) <= len(source_index):
+            return [seq for seq in level_index if buffer[seq % capacity].source == source]
+        return [seq for seq in source_index if buffer[seq % capacity].level is level]
+
+    def _evict_oldest(self):
+        """淘汰最旧的条目，各索引中它一定位于队首"""
+        seq = self._first_seq
+        slot = seq % self._capacity
+        entry = self._buffer[slot]
+        self._buffer[slot] = None
+        self._first_seq += 1
+        self.evicted_count += 1
+        if entry is None:
+            return
+        level_index = self._by_level[entry.level]
+        level_index.popleft()
+        if not level_index:
+            del self._by_level[entry.level]
+        source_index = self._by_source[entry.source]
+        source_index.popleft()
+        if not source_index:
+            del self._by_source[entry.source]
+        if self._spill_path:
+            self._spill_buffer.append(entry)
+            if len(self._spill_buffer) >= SPILL_BATCH_SIZE:
+                self._flush_spill()
+
+    def _flush_spill(self):
+        """批量写入被淘汰的条目"""
+        if not self._spill_buffer or not self._spill_path:
+            self._spill_buffer.clear()
+            return
+        entries, self._spill_buffer = self._spill_buffer, []
+        # 无法序列化的条目单独跳过，不影响同一批的其他条目
+        lines = [line for line in map(entry_to_json, entries) if line is not None]
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self._spill_path)), exist_ok=True)
+            with open(self._spill_path, "a", encoding="utf-8") as f:
+                f.write("".join(line + "\n" for line in lines))
+        except OSError as e:
+            # 不使用 logging：日志经桥接处理器回到日志存储，失败信息会再次触发写入
+            sys.stderr.write(f"写入淘汰日志失败: {str(e)}\n")
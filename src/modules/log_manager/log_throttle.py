@@ -0,0 +1,142 @@
+"""
+Log Throttle
+日志节流
+
+This module keeps repeated messages and noisy sources from flooding the log. Entries
+with the same level, source and message inside a fixed window after the first one are
+folded into that entry's repeat counter, and each source has a token bucket that drops
+entries beyond its rate and reports how many were suppressed once the source is
+allowed again. Each call costs a dictionary lookup and a little arithmetic.
+此模块防止重复消息和频繁输出的来源淹没日志。第一次出现后的固定时间窗口内，级别、来源和消息
+都相同的条目合并到该条目的重复计数中；每个来源有一个令牌桶，超出速率的条目被丢弃，
+来源恢复后报告被抑制的条数。每次调用的开销是一次字典查找和少量计算。
+"""
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .api import LogEntry, LogLevel
+
+DEFAULT_COALESCE_WINDOW = 1.0     # 秒
+DEFAULT_RATE = 200.0              # 每个来源每秒的条目数
+DEFAULT_BURST = 1000              # 每个来源允许的突发条目数
+SUPPRESSED_REPORT_INTERVAL = 1.0  # 持续超速时报告被抑制条数的间隔（秒）
+
+
+class _Bucket:
+    """令牌桶"""
+
+    __slots__ = ("tokens", "updated", "suppressed", "suppressed_since")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+        self.suppressed = 0
+        self.suppressed_since = now
+
+
+class LogThrottle:
+    """重复消息合并与来源限速"""
+
+    def __init__(self, coalesce_window: float = DEFAULT_COALESCE_WINDOW,
+                 rate: Optional[float] = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        """
+        Args:
+            coalesce_window: 合并重复消息的时间窗口（秒），0表示不合并
+            rate: 每个来源每秒允许的条目数，None表示不限速
+            burst: 每个来源允许的突发条目数
+        """
+        self.coalesce_window = coalesce_window
+        self.rate = rate
+        self.burst = burst
+        # (级别, 来源, 消息) -> (条目, 窗口结束时间)，按第一次出现的顺序排列
+        self._recent: Dict[Tuple["LogLevel", str, str], Tuple["LogEntry", float]] = {}
+        self._buckets: Dict[str, _Bucket] = {}
+        self._suppressing: Dict[str, _Bucket] = {}
+
+    def coalesce(self, level: "LogLevel", source: str, message: str, now: float) -> Optional["LogEntry"]:
+        """
+        查找窗口内相同的条目并增加其重复计数
+
+        Returns:
+            Optional[LogEntry]: 合并到的条目，没有时返回None
+        """
+        if not self.coalesce_window:
+            return None
+        self._expire(now)
+        found = self._recent.get((level, source, message))
+        if found is None:
+            return None
+        entry = found[0]
+        entry.repeat_count += 1
+        return entry
+
+    def track(self, entry: "LogEntry", now: float):
+        """记录新条目，窗口内相同的条目将合并到它"""
+        if self.coalesce_window:
+            self._recent[(entry.level, entry.source, entry.message)] = (entry, now + self.coalesce_window)
+
+    def allow(self, source: str, now: float) -> bool:
+        """
+        按来源限速
+
+        Returns:
+            bool: 是否允许添加，不允许时计入该来源被抑制的条数
+        """
+        if self.rate is None:
+            return True
+        bucket = self._buckets.get(source)
+        if bucket is None:
+            bucket = self._buckets[source] = _Bucket(float(self.burst), now)
+        else:
+            bucket.tokens = min(float(self.burst), bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+        if bucket.tokens >= 1.0:
+            bucket.tokens -= 1.0
+            return True
+        if not bucket.suppressed:
+            bucket.suppressed_since = now
+            self._suppressing[source] = bucket
+        bucket.suppressed += 1
+        return False
+
+    def take_suppressed(self, now: float, force: bool = False) -> List[Tuple[str, int]]:
+        """
+        取出已经恢复的来源被抑制的条数
+
+        持续超速的来源每 SUPPRESSED_REPORT_INTERVAL 秒最多报告一次。
+
+        Args:
+            now: 当前时间
+            force: 不论是否恢复都取出，用于关闭前汇总
+
+        Returns:
+            List[Tuple[str, int]]: (来源, 被抑制的条数)
+        """
+        if not self._suppressing:
+            return []
+        result = []
+        for source, bucket in list(self._suppressing.items()):
+            tokens = min(float(self.burst), bucket.tokens + (now - bucket.updated) * (self.rate or 0.0))
+            if force or (tokens >= 1.0 and now - bucket.suppressed_since >= SUPPRESSED_REPORT_INTERVAL):
+                result.append((source, bucket.suppressed))
+                bucket.suppressed = 0
+                del self._suppressing[source]
+        return result
+
+    def is_suppressing(self) -> bool:
+        """是否有来源正在被限速"""
+        return bool(self._suppressing)
+
+    def clear_recent(self):
+        """清除合并状态，之后的消息不再合并到之前的条目"""
+        self._recent.clear()
+
+    def _expire(self, now: float):
+        """移除窗口已结束的条目，字典按第一次出现的顺序排列，只需检查开头"""
+        recent = self._recent
+        while recent:
+            key = next(iter(recent))
+            if recent[key][1] > now:
+                break
+            del recent[key]
@@ -0,0 +1,144 @@
+"""
+Logging Bridge
+日志桥接
+
+This module forwards records from Python's logging package into LogManagerAPI. The
+handler converts each record to a LogEntry on the calling thread and puts it on the
+API's lock-free queue without taking the handler lock, so worker threads never block
+on the UI. A dispatcher living on the UI thread is woken once per batch and drains the
+queue on a short timer, adding the entries to the store and notifying the log panel.
+此模块将 Python logging 的记录转发到 LogManagerAPI。处理器在调用线程中将记录转换为日志条目，
+不获取处理器锁，直接放入API的无锁队列，因此工作线程不会因UI而阻塞。
+位于UI线程的分发器每批只被唤醒一次，通过短定时器取出队列中的条目，加入日志存储并通知日志面板。
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from .api import LogManagerAPI, LogLevel, LogEntry
+
+# 批量分发的间隔和每批最多处理的条目数
+DISPATCH_INTERVAL_MS = 50
+DISPATCH_BATCH_SIZE = 5000
+
+_MODULE_PREFIX = "modules."
+
+
+def level_for_record(levelno: int) -> LogLevel:
+    """logging 级别对应的日志级别"""
+    if levelno >= logging.CRITICAL:
+        return LogLevel.CRITICAL
+    if levelno >= logging.ERROR:
+        return LogLevel.ERROR
+    if levelno >= logging.WARNING:
+        return LogLevel.WARNING
+    if levelno >= logging.INFO:
+        return LogLevel.INFO
+    return LogLevel.DEBUG
+
+
+class LogManagerHandler(logging.Handler):
+    """将 logging 记录放入 LogManagerAPI 队列的处理器"""
+
+    def __init__(self, api: Optional[LogManagerAPI] = None, level: int = logging.NOTSET):
+        super().__init__(level)
+        self.api = api or LogManagerAPI.get_instance()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # 队列本身是线程安全的，不需要 Handler 的锁
+        result = self.filter(record)
+        if result:
+            self.emit(record)
+        return bool(result)
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.api.post_entry(self.to_entry(record))
+        except Exception:
+            self.handleError(record)
+
+    def to_entry(self, record: logging.LogRecord) -> LogEntry:
+        """将记录转换为日志条目，消息在调用线程中格式化"""
+        source = record.name
+        if source.startswith(_MODULE_PREFIX):
+            source = source[len(_MODULE_PREFIX):]
+        details = {
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            details["exception"] = logging.Formatter().formatException(record.exc_info)
+        return LogEntry(
+            level=level_for_record(record.levelno),
+            message=record.getMessage(),
+            timestamp=datetime.fromtimestamp(record.created),
+            source=source,
+            details=details,
+        )
+
+
+class LogDispatcher(QObject):
+    """在UI线程中批量取出队列条目的分发器"""
+
+    # 可以从任意线程发出，通过队列连接在UI线程中处理
+    _wakeup = pyqtSignal()
+
+    def __init__(self, api: Optional[LogManagerAPI] = None, parent=None):
+        super().__init__(parent)
+        self.api = api or LogManagerAPI.get_instance()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(DISPATCH_INTERVAL_MS)
+        self._timer.timeout.connect(self.dispatch)
+        self._wakeup.connect(self._schedule)
+        self.api.register_entries_pending_callback(self._wakeup.emit)
+        # 安装之前已经排队的条目
+        self._schedule()
+
+    def dispatch(self) -> int:
+        """处理一批排队的条目"""
+        self._timer.stop()
+        return self.api.process_pending(DISPATCH_BATCH_SIZE)
+
+    def _schedule(self):
+        if not self._timer.isActive():
+            self._timer.start()
+
+
+_handler: Optional[LogManagerHandler] = None
+_dispatcher: Optional[LogDispatcher] = None
+_install_lock = threading.Lock()
+
+
+def install_logging_bridge(level: int = logging.DEBUG,
+                           logger: Optional[logging.Logger] = None) -> LogManagerHandler:
+    """
+    将 logging 记录转发到日志管理器，需要在UI线程中、QApplication创建之后调用
+
+    Args:
+        level: 转发的最低级别
+        logger: 添加处理器的 logger，默认为根 logger
+
+    Returns:
+        LogManagerHandler: 处理器，重复调用时返回同一个
+    """
+    global _handler, _dispatcher
+    with _install_lock:
+        if _handler is None:
+            api = LogManagerAPI.get_instance()
+            _dispatcher = LogDispatcher(api)
+            _handler = LogManagerHandler(api)
+            (logger or logging.getLogger()).addHandler(_handler)
+        _handler.setLevel(level)
+        return _handler
+
+
+def get_dispatcher() -> Optional[LogDispatcher]:
+    """获取分发器，未安装时返回None"""
+    return _dispatcher
@@ -6,16 +6,22 @@ This module provides the main menu bar functionality.
 此模块提供主菜单栏功能。
 """
 
-from PyQt6.QtWidgets import QMenuBar, QMenu, QFileDialog, QMessageBox
+import os
+from dataclasses import fields
+from PyQt6.QtWidgets import QMenuBar, QMenu, QFileDialog, QMessageBox, QProgressDialog
 from PyQt6.QtGui import QIcon, QAction
 from PyQt6.QtCore import Qt, QTimer
 from .new_project_dialog import NewProjectDialog
 from ..file_manager.api import FileManagerAPI
+from ..file_manager.save_service import SaveService
+from ..file_manager.edit_journal import EditJournal
+from ..file_manager.project_watcher import ProjectWatcher
 from ..project_model.project_info_model import ProjectInfoModel
 from ..message_box.api import MessageBoxAPI
-from ..project_info.api import ProjectInfoAPI
+from ..project_info.api import ProjectInfoAPI, SceneProject
 from ..log_manager.api import LogManagerAPI
 from ..scene_editor.api import SceneEditorAPI
+from ..scene_editor.scene_manager import SceneManager
 from ..ai_assistant.api import AIAssistantAPI
 
 class MenuBar(QMenuBar):
@@ -26,8 +32,16 @@ class MenuBar(QMenuBar):
         self.file_manager = FileManagerAPI()
         self.current_project: ProjectInfoModel = None
         self.message_box_api = MessageBoxAPI()
+        self._saving_project_file = None
+        self._compacting_journal_file = None
+        self._opening_project_file = None
+        self._open_progress: QProgressDialog = None
+        self._open_errors = []
+        self.project_opener = None
+        self.save_service = SaveService.get_instance()
+        self.save_service.save_progress.connect(self._on_save_progress)
+        self.save_service.save_finished.connect(self._on_save_finished)
         self.setup_ui()
-        self.setup_styles()
     
     def setup_ui(self):
         """设置菜单栏界面"""
@@ -54,6 +68,11 @@ class MenuBar(QMenuBar):
         save_as_action.triggered.connect(self.show_save_as_dialog)
         file_menu.addAction(save_as_action)
         
+        # 编辑项目信息
+        edit_project_action = QAction("编辑项目信息", self)
+        edit_project_action.triggered.connect(self.show_edit_project_dialog)
+        file_menu.addAction(edit_project_action)
+        
         file_menu.addSeparator()
         
         # 退出
@@ -100,24 +119,28 @@ class MenuBar(QMenuBar):
         self.log_manager_window_action = QAction("日志管理", self)
         self.scene_editor_window_action = QAction("场景编辑", self)
         self.ai_assistant_window_action = QAction("AI助手", self)
+        self.profiler_window_action = QAction("性能分析", self)
         
         # 设置窗口动作为可选中，并默认选中
         self.project_info_window_action.setCheckable(True)
         self.log_manager_window_action.setCheckable(True)
         self.scene_editor_window_action.setCheckable(True)
         self.ai_assistant_window_action.setCheckable(True)
+        self.profiler_window_action.setCheckable(True)
         
         # 设置初始状态为选中
         self.project_info_window_action.setChecked(True)
         self.log_manager_window_action.setChecked(True)
         self.scene_editor_window_action.setChecked(True)
         self.ai_assistant_window_action.setChecked(True)
+        self.profiler_window_action.setChecked(True)
         
         # 添加四个窗口的开关API
         view_menu.addAction(self.project_info_window_action)
         view_menu.addAction(self.log_manager_window_action)
         view_menu.addAction(self.scene_editor_window_action)
         view_menu.addAction(self.ai_assistant_window_action)
+        view_menu.addAction(self.profiler_window_action)
 
         # 每个窗口的开关API的调用
         self.project_info_window_action.triggered.connect(
@@ -132,6 +155,9 @@ class MenuBar(QMenuBar):
         self.ai_assistant_window_action.triggered.connect(
             lambda checked: self.parent().get_assistant_dock().setVisible(checked)
         )
+        self.profiler_window_action.triggered.connect(
+            lambda checked: self.parent().get_profiler_dock().setVisible(checked)
+        )
         
         # 初始化窗口状态
         ProjectInfoAPI.get_instance().show_panel()
@@ -189,6 +215,33 @@ class MenuBar(QMenuBar):
             )
             if reply == QMessageBox.StandardButton.Yes:
                 self.show_save_as_dialog()
+                
+    def show_edit_project_dialog(self):
+        """显示编辑项目信息对话框，修改通过文件管理API写入编辑日志"""
+        if not self.current_project:
+            QMessageBox.warning(self, "警告", "没有正在编辑的项目！")
+            return
+            
+        dialog = NewProjectDialog(self)
+        dialog.setWindowTitle("编辑项目信息")
+        dialog.set_project_info(self.current_project)
+        if dialog.exec() != NewProjectDialog.DialogCode.Accepted:
+            return
+            
+        edited = dialog.get_project_info()
+        changes = {
+            f.name: getattr(edited, f.name)
+            for f in fields(ProjectInfoModel)
+            if getattr(edited, f.name) != getattr(self.current_project, f.name)
+        }
+        if not changes:
+            return
+        if not self.file_manager.update_project_info(self.current_project, changes):
+            QMessageBox.warning(self, "错误", "修改项目信息失败！")
+            return
+        main_window = self.parent()
+        if hasattr(main_window, 'project_info_panel'):
+            main_window.project_info_panel.update_project_info(self.current_project)
             
     def show_open_project_dialog(self):
         """显示打开项目对话框"""
@@ -200,17 +253,100 @@ class MenuBar(QMenuBar):
         )
         
         if file_path:
-            project_info = self.file_manager.load_project(file_path)
-            if project_info:
-                self.current_project = project_info
-                # 更新项目信息面板
-                main_window = self.parent()
-                if hasattr(main_window, 'project_info_panel'):
-                    main_window.project_info_panel.update_project_info(project_info)
-                QMessageBox.information(self, "成功", "项目加载成功！")
-            else:
-                QMessageBox.warning(self, "错误", "项目加载失败！")
+            self._start_project_open(file_path)
                 
+    def _start_project_open(self, project_path: str):
+        """在后台打开项目，项目信息读取后立即显示，场景和公式加载完成后逐个显示"""
+        project_dir = os.path.dirname(project_path)
+        # 切换项目前保存并释放上一个项目缓存的场景
+        current = ProjectInfoAPI.get_instance().get_current_project()
+        if current and os.path.abspath(current.project_dir) != os.path.abspath(project_dir):
+            SceneManager.get_instance().clear()
+        # 回放编辑日志会修改场景文件，必须在加载之前完成
+        self._open_journal(project_dir, ask_recover=True)
+        
+        if self.project_opener is None:
+            self.project_opener = self.file_manager.load_project_async(project_path)
+            self.project_opener.project_info_loaded.connect(self._on_project_info_loaded)
+            self.project_opener.scene_loaded.connect(self._on_project_scene_loaded)
+            self.project_opener.formula_loaded.connect(self._on_project_formula_loaded)
+            self.project_opener.file_failed.connect(self._on_project_file_failed)
+            self.project_opener.progress.connect(self._on_open_progress)
+            self.project_opener.finished.connect(self._on_open_finished)
+        else:
+            self.file_manager.load_project_async(project_path)
+        self._opening_project_file = project_path
+        self._open_errors = []
+        
+        if self._open_progress is None:
+            self._open_progress = QProgressDialog("正在打开项目...", "取消", 0, 0, self)
+            self._open_progress.setWindowTitle("打开项目")
+            self._open_progress.setWindowModality(Qt.WindowModality.WindowModal)
+            # 项目很小时加载很快完成，不显示进度对话框
+            self._open_progress.setMinimumDuration(500)
+            self._open_progress.setAutoClose(False)
+            self._open_progress.setAutoReset(False)
+            self._open_progress.canceled.connect(self.project_opener.cancel)
+        self._open_progress.setLabelText("正在打开项目...")
+        self._open_progress.setRange(0, 0)
+        self._open_progress.setValue(0)
+        self._show_status("正在打开项目...")
+        
+    def _on_project_info_loaded(self, project_path: str, project_info: ProjectInfoModel):
+        """项目描述文件读取完成，立即显示项目信息"""
+        if project_path != self._opening_project_file:
+            return
+        self.current_project = project_info
+        self._set_current_project_dir(project_path)
+        main_window = self.parent()
+        if hasattr(main_window, 'project_info_panel'):
+            main_window.project_info_panel.update_project_info(project_info)
+            
+    def _on_project_scene_loaded(self, name: str, scene):
+        """场景文件加载完成"""
+        SceneManager.get_instance().put(scene)
+        main_window = self.parent()
+        if hasattr(main_window, 'project_info_panel'):
+            main_window.project_info_panel.add_scene_item(name)
+            
+    def _on_project_formula_loaded(self, name: str, formula):
+        """公式文件加载完成"""
+        main_window = self.parent()
+        if hasattr(main_window, 'project_info_panel'):
+            main_window.project_info_panel.add_formula_item(name)
+            
+    def _on_project_file_failed(self, file_path: str, error: str):
+        """单个文件加载失败，打开结束后统一提示"""
+        self._open_errors.append(f"{os.path.basename(file_path)}: {error}")
+        
+    def _on_open_progress(self, done: int, total: int):
+        """后台打开进度"""
+        if self._open_progress is None or self._open_progress.wasCanceled():
+            return
+        self._open_progress.setRange(0, total)
+        self._open_progress.setValue(done)
+        self._open_progress.setLabelText(f"正在加载项目文件... {done}/{total}")
+        self._show_status(f"正在打开项目... {done}/{total}")
+        
+    def _on_open_finished(self, project_path: str, success: bool, error: str):
+        """后台打开完成"""
+        if project_path != self._opening_project_file:
+            return
+        self._opening_project_file = None
+        if self._open_progress is not None:
+            self._open_progress.reset()
+        if success:
+            self._show_status("项目加载成功", 3000)
+            if self._open_errors:
+                QMessageBox.warning(self, "警告", "部分文件加载失败：\n" + "\n".join(self._open_errors))
+            else:
+                QMessageBox.information(self, "成功", "项目加载成功！")
+        elif error == "已取消":
+            self._show_status("已取消打开项目，部分文件未加载", 3000)
+        else:
+            self._show_status("项目加载失败", 3000)
+            QMessageBox.warning(self, "错误", f"项目加载失败！\n{error}")
+            
     def save_current_project(self):
         """保存当前项目"""
         if not self.current_project:
@@ -222,10 +358,7 @@ class MenuBar(QMenuBar):
             self.show_save_as_dialog()
             return
             
-        if self.file_manager.save_project(self.current_project, current_path):
-            QMessageBox.information(self, "成功", "项目保存成功！")
-        else:
-            QMessageBox.warning(self, "错误", "项目保存失败！")
+        self._start_project_save(current_path)
             
     def show_save_as_dialog(self):
         """显示另存为对话框"""
@@ -241,10 +374,87 @@ class MenuBar(QMenuBar):
         )
         
         if file_path:
-            if self.file_manager.save_project(self.current_project, file_path):
-                QMessageBox.information(self, "成功", "项目保存成功！")
+            self._start_project_save(file_path)
+                
+    def _start_project_save(self, project_path: str):
+        """在后台保存当前项目，界面保持可操作"""
+        self._saving_project_file = self.file_manager.save_project_async(
+            self.current_project, project_path
+        )
+        self._show_status("正在保存项目...")
+        
+    def _on_save_progress(self, file_path: str, percent: int):
+        """后台保存进度"""
+        if file_path == self._saving_project_file:
+            self._show_status(f"正在保存项目... {percent}%")
+            
+    def _on_save_finished(self, file_path: str, success: bool, error: str):
+        """后台保存完成"""
+        if file_path == self._compacting_journal_file:
+            self._compacting_journal_file = None
+            if not success:
+                self._show_status("编辑日志合并失败", 3000)
+            return
+        if file_path != self._saving_project_file:
+            return
+        self._saving_project_file = None
+        if success:
+            self._set_current_project_dir(file_path)
+            # 显式保存后在后台将编辑日志合并到场景和蓝图文件
+            journal = self._open_journal(os.path.dirname(file_path))
+            self._compacting_journal_file = self.save_service.compact_journal(journal)
+            self._show_status("项目保存成功", 3000)
+            QMessageBox.information(self, "成功", "项目保存成功！")
+        else:
+            self._show_status("项目保存失败", 3000)
+            QMessageBox.warning(self, "错误", f"项目保存失败！\n{error}")
+            
+    def _show_status(self, message: str, timeout: int = 0):
+        """在主窗口状态栏显示消息"""
+        main_window = self.parent()
+        if hasattr(main_window, 'statusBar'):
+            main_window.statusBar().showMessage(message, timeout)
+            
+    def _set_current_project_dir(self, project_path: str):
+        """记录当前项目目录，供场景等模块定位项目文件"""
+        project = SceneProject()
+        project.project_dir = os.path.dirname(project_path)
+        ProjectInfoAPI.get_instance().set_current_project(project)
+        
+        # 监视项目目录的外部修改
+        watcher = ProjectWatcher.get_instance()
+        if watcher.project_dir() != os.path.abspath(project.project_dir):
+            watcher.start(project.project_dir)
+    
+    def _open_journal(self, project_dir: str, ask_recover: bool = False) -> EditJournal:
+        """
+        打开项目的编辑日志
+        
+        上次未正常合并的日志说明程序曾异常退出，ask_recover 为True时询问是否回放恢复。
+        """
+        journal = self.file_manager.get_journal()
+        if journal and os.path.abspath(journal.project_dir) == os.path.abspath(project_dir):
+            return journal
+        if journal:
+            journal.close()
+            
+        journal = EditJournal(project_dir)
+        if ask_recover and journal.has_pending():
+            reply = QMessageBox.question(
+                self,
+                "恢复未保存的修改",
+                f"检测到 {journal.pending_count} 条未保存的修改，是否恢复？",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply == QMessageBox.StandardButton.Yes:
+                if not journal.recover():
+                    QMessageBox.warning(self, "错误", "恢复未保存的修改失败！")
             else:
-                QMessageBox.warning(self, "错误", "项目保存失败！")
+                journal.discard()
+                
+        self.file_manager.set_journal(journal)
+        SceneEditorAPI.get_instance().set_journal(journal)
+        return journal
     
     def show_help(self):
         help_text = """
@@ -285,47 +495,6 @@ class MenuBar(QMenuBar):
         一个用于游戏设计的编辑器工具。
         """
         self.message_box_api.show_message("关于", about_text)
-    
-    def setup_styles(self):
-        """设置样式"""
-        self.setStyleSheet("""
-            QMenuBar {
-                background-color: #2b2b2b;
-                color: #ffffff;
-                border-bottom: 1px solid #3b3b3b;
-                font-size: 14px;
-            }
-            
-            QMenuBar::item {
-                padding: 4px 8px;
-                background-color: transparent;
-            }
-            
-            QMenuBar::item:selected {
-                background-color: #3b3b3b;
-            }
-            
-            QMenu {
-                background-color: #2b2b2b;
-                color: #ffffff;
-                border: 1px solid #3b3b3b;
-                font-size: 14px;
-            }
-            
-            QMenu::item {
-                padding: 6px 20px;
-            }
-            
-            QMenu::item:selected {
-                background-color: #3b3b3b;
-            }
-            
-            QMenu::separator {
-                height: 1px;
-                background-color: #3b3b3b;
-                margin: 4px 0;
-            }
-        """) 
 
     def restore_default_layout(self):
         """恢复默认布局"""
@@ -336,6 +505,7 @@ class MenuBar(QMenuBar):
         self.log_manager_window_action.setChecked(True)
         self.scene_editor_window_action.setChecked(True)
         self.ai_assistant_window_action.setChecked(True)
+        self.profiler_window_action.setChecked(True)
         
         # 显示所有面板
         ProjectInfoAPI.get_instance().show_panel()
@@ -350,6 +520,8 @@ class MenuBar(QMenuBar):
             main_window.removeDockWidget(main_window.get_assistant_dock())
         if hasattr(main_window, 'get_log_dock'):
             main_window.removeDockWidget(main_window.get_log_dock())
+        if hasattr(main_window, 'get_profiler_dock'):
+            main_window.removeDockWidget(main_window.get_profiler_dock())
             
         # 2. 确保场景编辑器作为中央部件
         if hasattr(main_window, 'get_scene_editor'):
@@ -394,6 +566,14 @@ class MenuBar(QMenuBar):
             log_dock.setMinimumHeight(height)
             log_dock.setMaximumHeight(height)
             main_window.resizeDocks([log_dock], [height], Qt.Orientation.Vertical)
+            
+            # 性能分析面板与日志面板叠放为标签页
+            if hasattr(main_window, 'get_profiler_dock'):
+                profiler_dock = main_window.get_profiler_dock()
+                profiler_dock.setVisible(True)
+                profiler_dock.setFloating(False)
+                main_window.tabifyDockWidget(log_dock, profiler_dock)
+                log_dock.raise_()
         
         # 6. 强制更新布局
         main_window.update()
@@ -19,10 +19,10 @@ class NewProjectDialog(QDialog):
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.setObjectName("NewProjectDialog")
         self.setWindowTitle("新建项目")
         self.setMinimumWidth(500)
         self.setup_ui()
-        self.setup_styles()
         
     def setup_ui(self):
         """设置界面"""
@@ -147,7 +147,35 @@ class NewProjectDialog(QDialog):
         )
         
         return project_info
-    
+
+    def set_project_info(self, project_info: ProjectInfoModel):
+        """
+        用已有项目信息填充对话框，用于编辑项目信息
+
+        Args:
+            project_info: 项目信息对象
+        """
+        self.name_edit.setText(project_info.name)
+        self.desc_edit.setPlainText(project_info.description)
+        self.type_combo.setCurrentIndex(
+            max(self.type_combo.findData(project_info.game_type.name), 0))
+        self.style_combo.setCurrentIndex(
+            max(self.style_combo.findData(project_info.game_style.name), 0))
+        self.time_combo.setCurrentIndex(
+            max(self.time_combo.findData(project_info.time_setting.name), 0))
+
+        platform_names = {platform.name for platform in project_info.target_platforms}
+        for i in range(self.platform_list.count()):
+            item = self.platform_list.item(i)
+            checked = item.data(Qt.ItemDataRole.UserRole) in platform_names
+            item.setCheckState(Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
+
+        audience_names = {audience.name for audience in project_info.target_audience}
+        for i in range(self.audience_list.count()):
+            item = self.audience_list.item(i)
+            checked = item.data(Qt.ItemDataRole.UserRole) in audience_names
+            item.setCheckState(Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
+
     def validate_input(self) -> bool:
         """验证输入"""
         if not self.name_edit.text():
@@ -169,122 +197,4 @@ class NewProjectDialog(QDialog):
     def accept(self):
         """重写accept方法，添加验证"""
         if self.validate_input():
-            super().accept()
-    
-    def setup_styles(self):
-        """设置样式"""
-        self.setStyleSheet("""
-            QDialog {
-                background-color: #2b2b2b;
-                color: #ffffff;
-            }
-            
-            QLabel {
-                color: #ffffff;
-                font-size: 14px;
-                padding: 4px 0;
-            }
-            
-            QLineEdit, QTextEdit, QComboBox {
-                background-color: #3b3b3b;
-                color: #ffffff;
-                border: 1px solid #4b4b4b;
-                border-radius: 4px;
-                padding: 6px;
-                font-size: 14px;
-                selection-background-color: #4b4b4b;
-                selection-color: #ffffff;
-            }
-            
-            QLineEdit:focus, QTextEdit:focus, QComboBox:focus {
-                border: 1px solid #5b5b5b;
-            }
-            
-            QComboBox::drop-down {
-                border: none;
-                width: 20px;
-            }
-            
-            QComboBox::down-arrow {
-                image: url(down_arrow.png);
-                width: 12px;
-                height: 12px;
-            }
-            
-            QComboBox QAbstractItemView {
-                background-color: #3b3b3b;
-                color: #ffffff;
-                border: 1px solid #4b4b4b;
-                selection-background-color: #4b4b4b;
-                selection-color: #ffffff;
-            }
-            
-            QListWidget {
-                background-color: #3b3b3b;
-                color: #ffffff;
-                border: 1px solid #4b4b4b;
-                border-radius: 4px;
-                font-size: 14px;
-            }
-            
-            QListWidget::item {
-                padding: 6px;
-                border-bottom: 1px solid #4b4b4b;
-            }
-            
-            QListWidget::item:selected {
-                background-color: #4b4b4b;
-                color: #ffffff;
-            }
-            
-            QListWidget::item:hover {
-                background-color: #4b4b4b;
-            }
-            
-            QPushButton {
-                background-color: #3b3b3b;
-                color: #ffffff;
-                border: 1px solid #4b4b4b;
-                border-radius: 4px;
-                padding: 8px 16px;
-                font-size: 14px;
-                min-width: 80px;
-            }
-            
-            QPushButton:hover {
-                background-color: #4b4b3b;
-            }
-            
-            QPushButton:pressed {
-                background-color: #5b5b5b;
-            }
-            
-            QPushButton:focus {
-                border: 1px solid #5b5b5b;
-            }
-            
-            QScrollBar:vertical {
-                border: none;
-                background-color: #3b3b3b;
-                width: 10px;
-                margin: 0px;
-            }
-            
-            QScrollBar::handle:vertical {
-                background-color: #4b4b4b;
-                min-height: 20px;
-                border-radius: 5px;
-            }
-            
-            QScrollBar::handle:vertical:hover {
-                background-color: #5b5b5b;
-            }
-            
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-            
-            QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {
-                background: none;
-            }
-        """) 
\ No newline at end of file
+            super().accept()
\ No newline at end of file
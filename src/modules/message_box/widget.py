@@ -15,6 +15,7 @@ class MessageBoxWidget(QDialog):
                  cancel_callback: Optional[Callable[[], None]] = None,
                  parent=None):
         super().__init__(parent)
+        self.setObjectName("MessageBox")
         self.callback = callback
         self.confirm_callback = confirm_callback
         self.cancel_callback = cancel_callback
@@ -36,13 +37,7 @@ class MessageBoxWidget(QDialog):
         message_label = QLabel(message)
         message_label.setWordWrap(True)
         message_label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        message_label.setStyleSheet("""
-            QLabel {
-                color: #ffffff;
-                font-size: 14px;
-                background: transparent;
-            }
-        """)
+        message_label.setObjectName("MessageBoxText")
         layout.addWidget(message_label)
         
         # 按钮区域
@@ -68,28 +63,6 @@ class MessageBoxWidget(QDialog):
         
         self.setLayout(layout)
         
-        # 设置窗口样式
-        self.setStyleSheet("""
-            QDialog {
-                background-color: #2b2b2b;
-                border: 1px solid #3b3b3b;
-            }
-            QPushButton {
-                background-color: #3b3b3b;
-                color: #ffffff;
-                border: none;
-                padding: 8px 16px;
-                font-size: 14px;
-                min-width: 80px;
-            }
-            QPushButton:hover {
-                background-color: #4b4b4b;
-            }
-            QPushButton:pressed {
-                background-color: #5b5b5b;
-            }
-        """)
-        
     def _on_ok(self):
         """确定按钮点击"""
         if self.callback:
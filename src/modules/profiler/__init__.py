@@ -0,0 +1,16 @@
+"""
+Profiler Module
+性能分析模块
+
+This module provides timing instrumentation and the profiler panel for the Designer Editor.
+此模块为设计器编辑器提供耗时统计和性能分析面板。
+"""
+
+from .api import ProfilerAPI, timed
+from .profiler_panel import ProfilerPanel
+
+__all__ = [
+    'ProfilerAPI',
+    'timed',
+    'ProfilerPanel'
+]
@@ -0,0 +1,170 @@
+"""
+Profiler API
+性能分析API接口
+
+This module provides the timing instrumentation for the editor's hot paths. `timed`
+works both as a decorator and as a context manager and records each duration into a
+per-name histogram. Profiling is off by default; while it is off an instrumented call
+costs one global flag check, so the instrumentation can stay in place permanently.
+此模块提供编辑器热点路径的计时工具。`timed` 既可以作为装饰器也可以作为上下文管理器使用，
+每次耗时记录到按名称区分的直方图中。性能分析默认关闭，关闭时被计时的调用只多一次全局标志检查，
+因此计时代码可以一直保留。
+"""
+
+import os
+import json
+import time
+import threading
+import functools
+from typing import Any, Callable, Dict, List, Optional
+
+from .histogram import Histogram
+
+# 全局开关，计时代码只检查这个变量
+_enabled = False
+
+
+class ProfilerAPI:
+    """性能分析API接口类"""
+    _instance = None
+
+    @classmethod
+    def get_instance(cls) -> 'ProfilerAPI':
+        """获取单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        """初始化性能分析器"""
+        if ProfilerAPI._instance is not None:
+            raise Exception("This class is a singleton!")
+        ProfilerAPI._instance = self
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self._panel = None
+        self.enabled_changed_callbacks = []
+
+    def is_enabled(self) -> bool:
+        """是否正在记录耗时"""
+        return _enabled
+
+    def set_enabled(self, enabled: bool):
+        """开启或关闭耗时记录"""
+        global _enabled
+        if _enabled == enabled:
+            return
+        _enabled = enabled
+        self._notify_enabled_changed(enabled)
+
+    def record(self, name: str, seconds: float):
+        """
+        记录一次耗时，可以从任意线程调用
+
+        Args:
+            name: 计时名称
+            seconds: 耗时（秒）
+        """
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram(name))
+        histogram.record(seconds)
+
+    def get_histogram(self, name: str) -> Optional[Histogram]:
+        """获取指定名称的直方图"""
+        return self._histograms.get(name)
+
+    def get_summaries(self) -> List[Dict[str, Any]]:
+        """所有计时名称的汇总统计，按名称排列"""
+        with self._lock:
+            histograms = sorted(self._histograms.values(), key=lambda h: h.name)
+        return [histogram.summary() for histogram in histograms]
+
+    def reset(self):
+        """清除所有记录"""
+        with self._lock:
+            self._histograms.clear()
+
+    def export_json(self, export_path: str) -> int:
+        """
+        导出所有直方图为JSON
+
+        Args:
+            export_path: 导出文件路径
+
+        Returns:
+            int: 导出的计时名称数
+        """
+        with self._lock:
+            histograms = sorted(self._histograms.values(), key=lambda h: h.name)
+        data = {
+            "exported_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "timings": [histogram.to_dict() for histogram in histograms],
+        }
+        directory = os.path.dirname(os.path.abspath(export_path))
+        os.makedirs(directory, exist_ok=True)
+        with open(export_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return len(histograms)
+
+    def set_panel(self, panel):
+        """设置性能分析面板"""
+        self._panel = panel
+
+    def get_panel(self):
+        """获取性能分析面板"""
+        return self._panel
+
+    def register_enabled_changed_callback(self, callback):
+        """注册开关变化回调"""
+        self.enabled_changed_callbacks.append(callback)
+
+    def _notify_enabled_changed(self, enabled: bool):
+        """通知开关变化"""
+        for callback in self.enabled_changed_callbacks:
+            callback(enabled)
+
+
+class timed:
+    """
+    计时装饰器和上下文管理器
+
+    用法：
+        @timed("场景.保存")
+        def save_scene(...): ...
+
+        with timed("项目树.重建"):
+            ...
+
+    未开启性能分析时不读取时钟。
+    """
+
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._start = 0.0
+
+    def __enter__(self) -> 'timed':
+        self._start = time.perf_counter() if _enabled else 0.0
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._start and _enabled:
+            ProfilerAPI.get_instance().record(self.name, time.perf_counter() - self._start)
+        return False
+
+    def __call__(self, func: Callable) -> Callable:
+        name = self.name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                ProfilerAPI.get_instance().record(name, time.perf_counter() - start)
+        return wrapper
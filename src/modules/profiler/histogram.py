@@ -0,0 +1,129 @@
+"""
+Histogram
+耗时直方图
+
+This module records durations into a fixed set of logarithmic buckets, from one
+microsecond to a hundred seconds with twenty buckets per decade, so every recording is
+a single increment and the memory per histogram is constant no matter how many samples
+it holds. Percentiles are estimated from the buckets with about 6% relative error.
+此模块将耗时记录到固定的对数分桶中，范围从1微秒到100秒，每个数量级20个桶，
+因此每次记录只是一次计数，无论样本有多少，每个直方图占用的内存都是固定的。
+百分位数根据分桶估算，相对误差约6%。
+"""
+
+import math
+import threading
+from typing import Any, Dict, List
+
+MIN_SECONDS = 1e-6
+MAX_SECONDS = 100.0
+BUCKETS_PER_DECADE = 20
+BUCKET_COUNT = int(math.log10(MAX_SECONDS / MIN_SECONDS) * BUCKETS_PER_DECADE) + 1
+
+
+def bucket_index(seconds: float) -> int:
+    """耗时所在的桶，超出范围的记入第一个或最后一个桶"""
+    if seconds <= MIN_SECONDS:
+        return 0
+    index = int(math.log10(seconds / MIN_SECONDS) * BUCKETS_PER_DECADE)
+    return index if index < BUCKET_COUNT else BUCKET_COUNT - 1
+
+
+def bucket_upper_bound(index: int) -> float:
+    """桶的上界（秒）"""
+    return MIN_SECONDS * 10 ** ((index + 1) / BUCKETS_PER_DECADE)
+
+
+def bucket_midpoint(index: int) -> float:
+    """桶的几何中点（秒），用作落在该桶中的样本的估计值"""
+    return MIN_SECONDS * 10 ** ((index + 0.5) / BUCKETS_PER_DECADE)
+
+
+class Histogram:
+    """固定对数分桶的耗时直方图，可以从多个线程记录"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._counts: List[int] = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        """记录一次耗时"""
+        index = bucket_index(seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds < self.min:
+                self.min = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """
+        估算百分位数
+
+        Args:
+            q: 0到100之间的百分位
+
+        Returns:
+            float: 耗时（秒），没有样本时返回0
+        """
+        with self._lock:
+            return self._percentile(q)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        汇总统计，耗时单位为毫秒
+
+        Returns:
+            Dict[str, Any]: name, count, total_ms, mean_ms, min_ms, p50_ms, p95_ms, p99_ms, max_ms
+        """
+        with self._lock:
+            count = self.count
+            return {
+                "name": self.name,
+                "count": count,
+                "total_ms": self.total * 1000,
+                "mean_ms": self.total / count * 1000 if count else 0.0,
+                "min_ms": self.min * 1000 if count else 0.0,
+                "p50_ms": self._percentile(50) * 1000,
+                "p95_ms": self._percentile(95) * 1000,
+                "p99_ms": self._percentile(99) * 1000,
+                "max_ms": self.max * 1000,
+            }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """汇总统计和非空的桶，用于导出"""
+        summary = self.summary()
+        with self._lock:
+            summary["buckets"] = [
+                {"le_ms": bucket_upper_bound(index) * 1000, "count": count}
+                for index, count in enumerate(self._counts) if count
+            ]
+        return summary
+
+    def reset(self):
+        """清除所有样本"""
+        with self._lock:
+            self._counts = [0] * BUCKET_COUNT
+            self.count = 0
+            self.total = 0.0
+            self.min = math.inf
+            self.max = 0.0
+
+    def _percentile(self, q: float) -> float:
+        """调用时需持有锁，返回所在桶的中点，并限制在最小值和最大值之间"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(max(bucket_midpoint(index), self.min), self.max)
+        return self.max
@@ -0,0 +1,147 @@
+"""
+Profiler Panel
+性能分析面板
+
+This module provides the panel that shows the timing histograms as a table of
+percentiles. The table is refreshed once a second while profiling is on and the panel
+is visible, and the histograms can be reset or exported as JSON.
+此模块提供以百分位表格显示耗时直方图的面板。性能分析开启且面板可见时每秒刷新一次，
+直方图可以清除或导出为JSON。
+"""
+
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QToolBar, QTableWidget,
+                             QTableWidgetItem, QHeaderView, QAbstractItemView, QFileDialog,
+                             QMessageBox)
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QAction
+
+from .api import ProfilerAPI
+
+# 表格列：(标题, 汇总字段, 是否为毫秒)
+COLUMNS = [
+    ("名称", "name", False),
+    ("次数", "count", False),
+    ("总计(ms)", "total_ms", True),
+    ("平均(ms)", "mean_ms", True),
+    ("p50(ms)", "p50_ms", True),
+    ("p95(ms)", "p95_ms", True),
+    ("p99(ms)", "p99_ms", True),
+    ("最大(ms)", "max_ms", True),
+]
+
+
+class ProfilerPanel(QWidget):
+    """性能分析面板类"""
+
+    REFRESH_INTERVAL_MS = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.api = ProfilerAPI.get_instance()
+        self.setup_ui()
+        self.setup_connections()
+
+    def setup_ui(self):
+        """设置用户界面"""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        toolbar = QToolBar()
+        toolbar.setObjectName("PanelToolBar")
+        self.enable_action = QAction("记录耗时", self)
+        self.enable_action.setCheckable(True)
+        self.enable_action.setChecked(self.api.is_enabled())
+        toolbar.addAction(self.enable_action)
+        toolbar.addSeparator()
+        self.refresh_action = QAction("刷新", self)
+        toolbar.addAction(self.refresh_action)
+        self.reset_action = QAction("清除", self)
+        toolbar.addAction(self.reset_action)
+        self.export_action = QAction("导出JSON", self)
+        toolbar.addAction(self.export_action)
+        layout.addWidget(toolbar)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels([title for title, _, _ in COLUMNS])
+        self.table.verticalHeader().hide()
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSortingEnabled(True)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for column in range(1, len(COLUMNS)):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.ResizeToContents)
+        layout.addWidget(self.table)
+
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setInterval(self.REFRESH_INTERVAL_MS)
+
+    def setup_connections(self):
+        """设置信号连接"""
+        self.enable_action.toggled.connect(self.api.set_enabled)
+        self.refresh_action.triggered.connect(self.refresh)
+        self.reset_action.triggered.connect(self._reset)
+        self.export_action.triggered.connect(self._export)
+        self._refresh_timer.timeout.connect(self.refresh)
+        self.api.register_enabled_changed_callback(self._handle_enabled_changed)
+
+    def refresh(self):
+        """按当前的直方图刷新表格"""
+        summaries = self.api.get_summaries()
+        sort_column = self.table.horizontalHeader().sortIndicatorSection()
+        sort_order = self.table.horizontalHeader().sortIndicatorOrder()
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(summaries))
+        for row, summary in enumerate(summaries):
+            for column, (_, key, is_ms) in enumerate(COLUMNS):
+                value = summary[key]
+                item = QTableWidgetItem()
+                if is_ms:
+                    item.setData(Qt.ItemDataRole.DisplayRole, round(value, 3))
+                else:
+                    item.setData(Qt.ItemDataRole.DisplayRole, value)
+                if column > 0:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(sort_column, sort_order)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._update_timer()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._refresh_timer.stop()
+
+    def _handle_enabled_changed(self, enabled: bool):
+        """开关变化时同步按钮状态"""
+        if self.enable_action.isChecked() != enabled:
+            self.enable_action.setChecked(enabled)
+        self._update_timer()
+
+    def _update_timer(self):
+        """只在记录耗时且面板可见时定时刷新"""
+        if self.api.is_enabled() and self.isVisible():
+            self._refresh_timer.start()
+        else:
+            self._refresh_timer.stop()
+
+    def _reset(self):
+        """清除所有记录"""
+        self.api.reset()
+        self.refresh()
+
+    def _export(self):
+        """导出直方图"""
+        export_path, _ = QFileDialog.getSaveFileName(
+            self, "导出性能数据", "profile.json", "JSON 文件 (*.json)"
+        )
+        if not export_path:
+            return
+        try:
+            self.api.export_json(export_path)
+        except OSError as e:
+            QMessageBox.warning(self, "错误", f"导出性能数据失败！\n{str(e)}")
@@ -0,0 +1,244 @@
+"""
+Stall Detector
+界面卡顿检测
+
+This module finds the handlers that freeze the UI. A timer on the UI thread records a
+heartbeat on every event-loop pass, and a watchdog thread checks how old the last beat
+is. Once it is older than the threshold the main thread is stuck in one handler, and
+the watchdog samples its Python stack through sys._current_frames() until the heartbeat
+resumes. Stalls are grouped by the most frequently sampled stack, and each one is
+reported to the log manager together with the duration statistics of its group. Code
+that holds the GIL for the whole stall (a single long C call) can only be sampled after
+it returns; pure Python code releases the GIL every few milliseconds.
+此模块用于找出导致界面冻结的处理函数。UI线程中的定时器在每次事件循环时记录心跳，
+监视线程检查最后一次心跳的时间。超过阈值说明主线程卡在某个处理函数中，监视线程通过
+sys._current_frames() 采样主线程的 Python 调用栈，直到心跳恢复。卡顿按采样最多的调用栈分组，
+每次卡顿连同该组的耗时统计一起报告给日志管理器。整个卡顿期间持有 GIL 的代码（单个耗时的 C 调用）
+只能在返回后采样；纯 Python 代码每隔几毫秒就会释放 GIL。
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QTimer
+
+from .api import ProfilerAPI
+from .histogram import Histogram
+
+DEFAULT_THRESHOLD_MS = 100
+MAX_HEARTBEAT_INTERVAL_MS = 50
+SAMPLE_INTERVAL = 0.01           # 卡顿期间的采样间隔（秒）
+HANG_REPORT_SECONDS = 2.0        # 卡顿超过该时间时先报告一次，不等待结束
+MAX_STACK_DEPTH = 40
+LOG_SOURCE = "卡顿检测"
+
+# 优先用项目源码中的函数表示卡顿位置
+_SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 调用栈中的一帧：(文件名, 行号, 函数名)
+Frame = Tuple[str, int, str]
+
+
+def format_frame(frame: Frame) -> str:
+    """调用栈帧的单行文本"""
+    filename, lineno, name = frame
+    if filename.startswith(_SOURCE_ROOT):
+        filename = os.path.relpath(filename, _SOURCE_ROOT)
+    return f"{filename}:{lineno} {name}"
+
+
+def stall_location(stack: Tuple[Frame, ...]) -> str:
+    """卡顿位置：调用栈中最内层的项目源码帧"""
+    for frame in reversed(stack):
+        if frame[0].startswith(_SOURCE_ROOT):
+            return format_frame(frame)
+    return format_frame(stack[-1]) if stack else "未知位置"
+
+
+class StallGroup:
+    """调用栈相同的一组卡顿"""
+
+    def __init__(self, stack: Tuple[Frame, ...]):
+        self.stack = stack
+        self.location = stall_location(stack)
+        self.durations = Histogram(self.location)
+
+    def summary(self) -> Dict[str, Any]:
+        """汇总统计，耗时单位为毫秒"""
+        summary = self.durations.summary()
+        summary["location"] = summary.pop("name")
+        summary["stack"] = [format_frame(frame) for frame in self.stack]
+        return summary
+
+
+class StallDetector(QObject):
+    """界面卡顿检测器类"""
+
+    def __init__(self, threshold_ms: int = DEFAULT_THRESHOLD_MS, parent=None):
+        """
+        Args:
+            threshold_ms: 主线程无响应多久算作卡顿（毫秒）
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self._main_ident = threading.main_thread().ident
+        self._last_beat = time.monotonic()
+        self._lock = threading.Lock()
+        self._groups: Dict[Tuple[Tuple[str, str], ...], StallGroup] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._beat)
+        self.set_threshold(threshold_ms)
+
+    def set_threshold(self, threshold_ms: int):
+        """设置卡顿阈值，心跳间隔随之调整"""
+        self.threshold = threshold_ms / 1000
+        interval_ms = max(1, min(MAX_HEARTBEAT_INTERVAL_MS, threshold_ms // 2))
+        self._timer.setInterval(interval_ms)
+        # 监视线程读取这个值，不调用定时器的方法
+        self._poll_interval = interval_ms / 1000
+
+    def start(self):
+        """开始检测，需要在UI线程中调用"""
+        if self._thread is not None:
+            return
+        self._last_beat = time.monotonic()
+        self._timer.start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="StallWatchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止检测"""
+        if self._thread is None:
+            return
+        self._timer.stop()
+        self._stop.set()
+        self._thread.join(1.0)
+        self._thread = None
+
+    def is_running(self) -> bool:
+        """是否正在检测"""
+        return self._thread is not None
+
+    def get_stalls(self) -> List[Dict[str, Any]]:
+        """各组卡顿的汇总统计，按总耗时从大到小排列"""
+        with self._lock:
+            groups = list(self._groups.values())
+        summaries = [group.summary() for group in groups]
+        summaries.sort(key=lambda summary: summary["total_ms"], reverse=True)
+        return summaries
+
+    def reset(self):
+        """清除已记录的卡顿"""
+        with self._lock:
+            self._groups.clear()
+
+    def _beat(self):
+        self._last_beat = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # 监视线程
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        """监视线程：心跳超过阈值未更新时开始采样"""
+        while not self._stop.wait(self._poll_interval):
+            beat = self._last_beat
+            if time.monotonic() - beat >= self.threshold:
+                self._sample_stall(beat)
+
+    def _sample_stall(self, beat: float):
+        """采样主线程的调用栈，直到心跳恢复"""
+        samples: Counter = Counter()
+        hang_reported = False
+        while self._last_beat == beat:
+            stack = self._main_stack()
+            if stack:
+                samples[stack] += 1
+            if not hang_reported and samples and time.monotonic() - beat >= HANG_REPORT_SECONDS:
+                hang_reported = True
+                self._report_hang(samples.most_common(1)[0][0], time.monotonic() - beat)
+            if self._stop.wait(SAMPLE_INTERVAL):
+                return
+        if samples:
+            self._record(samples.most_common(1)[0][0], self._last_beat - beat, sum(samples.values()))
+
+    def _main_stack(self) -> Tuple[Frame, ...]:
+        """主线程当前的调用栈，从外到内排列"""
+        frame = sys._current_frames().get(self._main_ident)
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            stack.append((code.co_filename, frame.f_lineno, code.co_name))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def _record(self, stack: Tuple[Frame, ...], duration: float, sample_count: int):
+        """按调用栈分组记录卡顿并报告"""
+        # 同一函数中不同行的采样属于同一组
+        signature = tuple((filename, name) for filename, _, name in stack)
+        with self._lock:
+            group = self._groups.get(signature)
+            if group is None:
+                group = self._groups[signature] = StallGroup(stack)
+        group.durations.record(duration)
+
+        profiler = ProfilerAPI.get_instance()
+        if profiler.is_enabled():
+            profiler.record("ui.stall", duration)
+
+        from ..log_manager.api import LogManagerAPI
+
+        summary = group.summary()
+        summary["samples"] = sample_count
+        LogManagerAPI.get_instance().warning(
+            f"界面卡顿 {duration * 1000:.0f} ms，位于 {group.location}"
+            f"（第 {summary['count']} 次，p50 {summary['p50_ms']:.0f} ms，"
+            f"p95 {summary['p95_ms']:.0f} ms，最长 {summary['max_ms']:.0f} ms）",
+            source=LOG_SOURCE,
+            details=summary,
+        )
+
+    def _report_hang(self, stack: Tuple[Frame, ...], elapsed: float):
+        """长时间无响应时先报告当前位置"""
+        from ..log_manager.api import LogManagerAPI
+
+        LogManagerAPI.get_instance().error(
+            f"界面已 {elapsed:.1f} 秒无响应，位于 {stall_location(stack)}",
+            source=LOG_SOURCE,
+            details={"stack": [format_frame(frame) for frame in stack]},
+        )
+
+
+_detector: Optional[StallDetector] = None
+
+
+def install_stall_detector(threshold_ms: Optional[int] = None) -> StallDetector:
+    """
+    创建并启动卡顿检测器，需要在UI线程中、QApplication创建之后调用
+
+    Args:
+        threshold_ms: 卡顿阈值（毫秒），None表示使用默认值或保持不变
+
+    Returns:
+        StallDetector: 检测器，重复调用时返回同一个
+    """
+    global _detector
+    if _detector is None:
+        _detector = StallDetector(threshold_ms or DEFAULT_THRESHOLD_MS)
+    elif threshold_ms is not None:
+        _detector.set_threshold(threshold_ms)
+    _detector.start()
+    return _detector
+
+
+def get_stall_detector() -> Optional[StallDetector]:
+    """获取卡顿检测器，未安装时返回None"""
+    return _detector
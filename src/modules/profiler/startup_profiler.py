@@ -0,0 +1,244 @@
+"""
+Startup Profiler
+启动性能分析
+
+This module measures how long the editor takes to show its first frame. Startup is
+divided into nested phases (creating the application, importing the main window,
+building each panel), and the first paint of the main window is detected with an
+event filter. Work that is not needed for the first frame, such as building docks that
+are hidden or not yet shown, can be deferred until after it. In profile mode an import
+hook additionally records the import time of every project module, both including and
+excluding the modules it imports, and the full breakdown is written to the log.
+此模块测量编辑器显示第一帧所需的时间。启动过程分为嵌套的阶段（创建应用程序、导入主窗口、
+创建各个面板），主窗口的首次绘制通过事件过滤器检测。第一帧不需要的工作，例如创建隐藏或
+尚未显示的停靠窗口，可以推迟到首次绘制之后。分析模式下还会通过导入钩子记录每个项目模块的导入时间
+（包含和不包含其导入的模块），完整的耗时明细写入日志。
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import contextlib
+import importlib.abc
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from PyQt6.QtCore import QObject, QEvent, QTimer
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ARGUMENT = "--profile-startup"
+PROFILE_ENVIRONMENT = "DESIGNER_EDITOR_PROFILE_STARTUP"
+# 只记录项目自己的模块
+IMPORT_PREFIXES = ("modules", "main_window", "src", "styles")
+REPORT_TOP_IMPORTS = 15
+LOG_SOURCE = "启动分析"
+
+
+@dataclass
+class StartupPhase:
+    """启动阶段"""
+    name: str
+    kind: str          # phase, panel 或 import
+    start_ms: float    # 相对于开始分析的时间
+    duration_ms: float
+    depth: int
+    self_ms: float = 0.0   # 仅导入：不包含其导入的模块的时间
+
+
+class _TimedLoader:
+    """记录 exec_module 耗时的加载器代理"""
+
+    def __init__(self, loader, finder: '_ImportTimer'):
+        self._loader = loader
+        self._finder = finder
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        finder = self._finder
+        finder.stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            duration = time.perf_counter() - start
+            nested = finder.stack.pop()
+            if finder.stack:
+                finder.stack[-1] += duration
+            finder.profiler.add_phase(module.__name__, "import", start, duration,
+                                      depth=len(finder.stack), self_seconds=duration - nested)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """为项目模块包装加载器的查找器，放在 sys.meta_path 的最前面"""
+
+    def __init__(self, profiler: 'StartupProfiler'):
+        self.profiler = profiler
+        self.stack: List[float] = []   # 每层导入中嵌套导入的总耗时
+
+    def find_spec(self, fullname, path, target=None):
+        if not fullname.startswith(IMPORT_PREFIXES):
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+
+class _FirstPaintFilter(QObject):
+    """主窗口收到第一个绘制事件后，在本次绘制完成时通知分析器"""
+
+    def __init__(self, profiler: 'StartupProfiler', parent=None):
+        super().__init__(parent)
+        self.profiler = profiler
+
+    def eventFilter(self, watched, event) -> bool:
+        if event.type() == QEvent.Type.Paint:
+            watched.removeEventFilter(self)
+            QTimer.singleShot(0, self.profiler._first_paint_done)
+        return False
+
+
+class StartupProfiler:
+    """启动性能分析类"""
+    _instance = None
+
+    @classmethod
+    def get_instance(cls) -> 'StartupProfiler':
+        """获取单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        """开始计时，应在程序入口尽早创建"""
+        if StartupProfiler._instance is not None:
+            raise Exception("This class is a singleton!")
+        StartupProfiler._instance = self
+        self._origin = time.perf_counter()
+        self._depth = 0
+        self._import_timer: Optional[_ImportTimer] = None
+        self._paint_filter: Optional[_FirstPaintFilter] = None
+        self._after_first_paint: List[Callable[[], None]] = []
+        self.phases: List[StartupPhase] = []
+        self.detailed = False
+        self.first_paint_ms: Optional[float] = None
+        self.deferred_done_ms: Optional[float] = None
+
+    @staticmethod
+    def requested() -> bool:
+        """命令行或环境变量是否要求分析启动过程"""
+        return PROFILE_ARGUMENT in sys.argv or bool(os.environ.get(PROFILE_ENVIRONMENT))
+
+    def enable_detailed(self):
+        """开启分析模式：记录每个项目模块的导入时间，启动后将完整明细写入日志"""
+        if self._import_timer is None:
+            self.detailed = True
+            self._import_timer = _ImportTimer(self)
+            sys.meta_path.insert(0, self._import_timer)
+
+    @contextlib.contextmanager
+    def phase(self, name: str, kind: str = "phase") -> Iterator[None]:
+        """
+        记录一个启动阶段，可以嵌套
+
+        Args:
+            name: 阶段名称
+            kind: phase 或 panel
+        """
+        depth = self._depth
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.add_phase(name, kind, start, time.perf_counter() - start, depth)
+
+    def add_phase(self, name: str, kind: str, start: float, seconds: float,
+                  depth: int = 0, self_seconds: float = 0.0):
+        """记录一个已完成的阶段，start 为 perf_counter 的时间"""
+        self.phases.append(StartupPhase(name, kind, (start - self._origin) * 1000,
+                                        seconds * 1000, depth, self_seconds * 1000))
+
+    def elapsed_ms(self) -> float:
+        """从开始计时到现在的毫秒数"""
+        return (time.perf_counter() - self._origin) * 1000
+
+    def watch_first_paint(self, window):
+        """检测窗口的首次绘制"""
+        if self.first_paint_ms is None and self._paint_filter is None:
+            self._paint_filter = _FirstPaintFilter(self, window)
+            window.installEventFilter(self._paint_filter)
+
+    def call_after_first_paint(self, callback: Callable[[], None]):
+        """首次绘制完成后调用，已经完成时在下一次事件循环中调用"""
+        if self.first_paint_ms is None:
+            self._after_first_paint.append(callback)
+        else:
+            QTimer.singleShot(0, callback)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """启动分析结果"""
+        return {
+            "first_paint_ms": self.first_paint_ms,
+            "deferred_done_ms": self.deferred_done_ms,
+            "phases": [asdict(phase) for phase in self.phases],
+        }
+
+    def export_json(self, export_path: str):
+        """导出启动分析结果为JSON"""
+        with open(export_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def _first_paint_done(self):
+        """首次绘制完成：执行推迟的工作，然后报告"""
+        self.first_paint_ms = self.elapsed_ms()
+        self._paint_filter = None
+        callbacks, self._after_first_paint = self._after_first_paint, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error("首次绘制后的任务失败: %s", e)
+        self.deferred_done_ms = self.elapsed_ms()
+        if self._import_timer is not None:
+            sys.meta_path.remove(self._import_timer)
+            self._import_timer = None
+        self._report()
+
+    def _report(self):
+        """将启动耗时写入日志"""
+        from ..log_manager.api import LogManagerAPI
+
+        api = LogManagerAPI.get_instance()
+        api.info(
+            f"启动完成：首次绘制 {self.first_paint_ms:.0f} ms，"
+            f"推迟的面板创建完成 {self.deferred_done_ms:.0f} ms",
+            source=LOG_SOURCE,
+            details={"phases": [asdict(phase) for phase in self.phases if phase.kind != "import"]},
+        )
+        if not self.detailed:
+            return
+        # 嵌套的阶段先结束，按开始时间排列后父阶段在前
+        for phase in sorted(self.phases, key=lambda phase: phase.start_ms):
+            if phase.kind != "import":
+                api.info(f"{'  ' * phase.depth}{phase.name}: {phase.duration_ms:.1f} ms "
+                         f"（开始于 {phase.start_ms:.0f} ms）", source=LOG_SOURCE)
+        imports = sorted((phase for phase in self.phases if phase.kind == "import"),
+                         key=lambda phase: phase.self_ms, reverse=True)
+        for phase in imports[:REPORT_TOP_IMPORTS]:
+            api.info(f"导入 {phase.name}: 自身 {phase.self_ms:.1f} ms，"
+                     f"含依赖 {phase.duration_ms:.1f} ms", source=LOG_SOURCE)
@@ -1,8 +1,13 @@
 """项目信息模块API"""
+import logging
 from enum import Enum
+from dataclasses import dataclass
 from typing import Optional, List
-import json
 import os
+from ..project_model.codec import get_codec, ENUM_BY_VALUE
+from ..file_manager.serializers import KIND_CONFIG, dump_file, load_file
+
+logger = logging.getLogger(__name__)
 
 class GameType(Enum):
     """游戏类型"""
@@ -37,43 +42,25 @@ class Platform(Enum):
     VR = "虚拟现实"
     AR = "增强现实"
 
+@dataclass
 class ProjectConfig:
     """项目配置"""
-    def __init__(self, name: str, game_type: GameType, platforms: List[Platform], 
-                 game_style: GameStyle, description: str = "", version: str = "1.0.0", 
-                 author: str = ""):
-        self.name = name
-        self.game_type = game_type
-        self.platforms = platforms
-        self.game_style = game_style
-        self.description = description
-        self.version = version
-        self.author = author
+    name: str
+    game_type: GameType
+    platforms: List[Platform]
+    game_style: GameStyle
+    description: str = ""
+    version: str = "1.0.0"
+    author: str = ""
         
     def to_dict(self) -> dict:
-        """转换为字典"""
-        return {
-            "name": self.name,
-            "game_type": self.game_type.value,
-            "platforms": [p.value for p in self.platforms],
-            "game_style": self.game_style.value,
-            "description": self.description,
-            "version": self.version,
-            "author": self.author
-        }
+        """转换为字典，project.json 中的枚举按值保存"""
+        return get_codec(ProjectConfig, ENUM_BY_VALUE).encode(self)
         
     @classmethod
     def from_dict(cls, data: dict) -> 'ProjectConfig':
         """从字典创建"""
-        return cls(
-            name=data["name"],
-            game_type=GameType(data["game_type"]),
-            platforms=[Platform(p) for p in data["platforms"]],
-            game_style=GameStyle(data["game_style"]),
-            description=data.get("description", ""),
-            version=data.get("version", "1.0.0"),
-            author=data.get("author", "")
-        )
+        return get_codec(cls, ENUM_BY_VALUE).decode(data)
 
 class SceneProject:
     """场景项目"""
@@ -92,12 +79,11 @@ class SceneProject:
             
             # 保存项目配置
             config_file = os.path.join(self.project_dir, "project.json")
-            with open(config_file, "w", encoding="utf-8") as f:
-                json.dump(self.config.to_dict(), f, ensure_ascii=False, indent=2)
+            dump_file(config_file, self.config.to_dict(), KIND_CONFIG)
                 
             return True
         except Exception as e:
-            print(f"保存项目失败: {str(e)}")
+            logger.error("保存项目失败: %s", e)
             return False
             
     def load(self) -> bool:
@@ -111,13 +97,11 @@ class SceneProject:
             if not os.path.exists(config_file):
                 return False
                 
-            with open(config_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                self.config = ProjectConfig.from_dict(data)
+            self.config = ProjectConfig.from_dict(load_file(config_file))
                 
             return True
         except Exception as e:
-            print(f"加载项目失败: {str(e)}")
+            logger.error("加载项目失败: %s", e)
             return False
 
 class ProjectInfoAPI:
@@ -139,6 +123,15 @@ class ProjectInfoAPI:
         self._current_project = None
         self._panel = None
         
+    @classmethod
+    def get_current_project(cls) -> Optional[SceneProject]:
+        """获取当前项目"""
+        return cls.get_instance()._current_project
+        
+    def set_current_project(self, project: Optional[SceneProject]):
+        """设置当前项目"""
+        self._current_project = project
+        
     def set_panel(self, panel):
         """设置面板"""
         self._panel = panel
@@ -14,6 +14,7 @@ from ..project_model.project_info_model import ProjectInfoModel
 from .tree_resources import TreeResources
 from .api import ProjectInfoAPI
 from .create_scene_panel import CreateScenePanel
+from ..profiler.api import timed
 
 class ProjectInfoPanel(QDockWidget):
     """项目信息面板类"""
@@ -37,23 +38,7 @@ class ProjectInfoPanel(QDockWidget):
         self.tree_widget.setColumnCount(1)
         self.tree_widget.setIndentation(20)
         
-        # 设置样式
-        self.tree_widget.setStyleSheet("""
-            QTreeWidget {
-                background-color: #2b2b2b;
-                color: #ffffff;
-                border: none;
-            }
-            QTreeWidget::item {
-                height: 25px;
-            }
-            QTreeWidget::item:hover {
-                background-color: #3c3c3c;
-            }
-            QTreeWidget::item:selected {
-                background-color: #4b4b4b;
-            }
-        """)
+        self.tree_widget.setObjectName("ProjectInfoTree")
         
         # 创建根节点
         self.root = QTreeWidgetItem(self.tree_widget)
@@ -69,6 +54,10 @@ class ProjectInfoPanel(QDockWidget):
         self.scenes_root.setText(0, "场景")
         self.scenes_root.setIcon(0, TreeResources.get_folder_icon())
         
+        self.formulas_root = QTreeWidgetItem(self.root)
+        self.formulas_root.setText(0, "公式")
+        self.formulas_root.setIcon(0, TreeResources.get_folder_icon())
+        
         # 在场景节点下右键添加场景面板
         self.create_scene_panel = CreateScenePanel()
         # 设置树形控件的上下文菜单策略
@@ -93,6 +82,7 @@ class ProjectInfoPanel(QDockWidget):
         """项目折叠时的处理"""
         item.setIcon(0, TreeResources.get_folder_icon())
         
+    @timed("project_info.update_tree")
     def update_project_info(self, project_info: ProjectInfoModel):
         """更新项目信息显示"""
         self.current_project = project_info
@@ -100,6 +90,7 @@ class ProjectInfoPanel(QDockWidget):
         # 清空现有项
         self.basic_info_root.takeChildren()
         self.scenes_root.takeChildren()
+        self.formulas_root.takeChildren()
         
         if project_info:
             # 更新根节点标题
@@ -126,16 +117,38 @@ class ProjectInfoPanel(QDockWidget):
                     item.setText(0, f"{label}：{display_value}")
                     item.setIcon(0, TreeResources.get_info_icon())
             
-            # 添加场景信息（如果有）
-            # 暂时添加一个默认场景作为示例
-            scene_item = QTreeWidgetItem(self.scenes_root)
-            scene_item.setText(0, "默认场景")
-            scene_item.setIcon(0, TreeResources.get_scene_icon())
+            # 场景和公式在后台加载完成后逐个添加
             
             # 展开所有节点
             self.root.setExpanded(True)
             self.basic_info_root.setExpanded(True)
             self.scenes_root.setExpanded(True)
+            self.formulas_root.setExpanded(True)
+            
+    def add_scene_item(self, name: str):
+        """添加场景项"""
+        self._add_file_item(self.scenes_root, name, TreeResources.get_scene_icon())
+        
+    def add_formula_item(self, name: str):
+        """添加公式项"""
+        self._add_file_item(self.formulas_root, name, TreeResources.get_info_icon())
+        
+    def _add_file_item(self, parent: QTreeWidgetItem, name: str, icon: QIcon):
+        """按名称顺序插入文件项，文件加载完成的顺序不固定"""
+        low, high = 0, parent.childCount()
+        while low < high:
+            middle = (low + high) // 2
+            if parent.child(middle).text(0) < name:
+                low = middle + 1
+            else:
+                high = middle
+        row = low
+        if row < parent.childCount() and parent.child(row).text(0) == name:
+            return
+        item = QTreeWidgetItem()
+        item.setText(0, name)
+        item.setIcon(0, icon)
+        parent.insertChild(row, item)
         
     def show_context_menu(self, position):
         """显示上下文菜单"""
@@ -6,9 +6,12 @@ This module provides resources for the tree widget.
 此模块提供树形控件的资源。
 """
 
+import logging
 from PyQt6.QtGui import QIcon, QPixmap, QPainter, QPen
 from PyQt6.QtCore import Qt
 
+logger = logging.getLogger(__name__)
+
 class TreeResources:
     """树形控件资源类"""
     
@@ -20,7 +23,7 @@ class TreeResources:
         icon_color = Qt.GlobalColor.white  # 使用白色
         margin = 4  # 边距
         
-        print("创建树形图标...")
+        logger.debug("创建树形图标...")
         
         # 创建展开图标（减号）
         open_icon = QPixmap(icon_size, icon_size)
@@ -39,7 +42,7 @@ class TreeResources:
         painter.drawLine(0, center, margin, center)  # 左侧连接线
         painter.drawLine(center, 0, center, icon_size)  # 竖线
         painter.end()
-        print("展开图标创建完成")
+        logger.debug("展开图标创建完成")
         
         # 创建折叠图标（加号）
         closed_icon = QPixmap(icon_size, icon_size)
@@ -54,7 +57,7 @@ class TreeResources:
         painter.drawLine(0, center, margin, center)  # 左侧连接线
         painter.drawLine(center, 0, center, icon_size)  # 竖线
         painter.end()
-        print("折叠图标创建完成")
+        logger.debug("折叠图标创建完成")
         
         # 创建更多分支图标（T形连接线）
         more_icon = QPixmap(icon_size, icon_size)
@@ -67,7 +70,7 @@ class TreeResources:
         painter.drawLine(0, center, icon_size, center)  # 横线
         painter.drawLine(center, 0, center, icon_size)  # 竖线
         painter.end()
-        print("更多分支图标创建完成")
+        logger.debug("更多分支图标创建完成")
         
         # 创建结束分支图标（L形线）
         end_icon = QPixmap(icon_size, icon_size)
@@ -80,7 +83,7 @@ class TreeResources:
         painter.drawLine(0, center, icon_size - margin, center)  # 横线
         painter.drawLine(center, 0, center, center)  # 上半部分竖线
         painter.end()
-        print("结束分支图标创建完成")
+        logger.debug("结束分支图标创建完成")
         
         icons = {
             'branch-open': QIcon(open_icon),
@@ -88,7 +91,7 @@ class TreeResources:
             'branch-more': QIcon(more_icon),
             'branch-end': QIcon(end_icon)
         }
-        print("所有图标创建完成")
+        logger.debug("所有图标创建完成")
         return icons
     
     @staticmethod
@@ -24,27 +24,13 @@ class ProjectInfoWidget(QWidget):
         
         # 标题标签
         self.title_label = QLabel("项目信息")
-        self.title_label.setStyleSheet("""
-            QLabel {
-                color: #ffffff;
-                font-size: 14px;
-                font-weight: bold;
-                padding: 4px;
-            }
-        """)
+        self.title_label.setObjectName("ProjectInfoTitle")
         layout.addWidget(self.title_label)
         
         # 信息编辑器
         self.info_edit = QTextEdit()
         self.info_edit.setReadOnly(True)
-        self.info_edit.setStyleSheet("""
-            QTextEdit {
-                background-color: #1e1e1e;
-                color: #ffffff;
-                border: 1px solid #3d3d3d;
-                font-size: 13px;
-            }
-        """)
+        self.info_edit.setObjectName("ProjectInfoText")
         layout.addWidget(self.info_edit)
     
     def update_info(self, project_data: dict):
@@ -9,6 +9,8 @@ This module provides the project tree widget implementation.
 from PyQt6.QtWidgets import QTreeWidget, QTreeWidgetItem
 from PyQt6.QtCore import Qt, pyqtSignal
 
+from ..profiler.api import timed
+
 class ProjectTreeWidget(QTreeWidget):
     """Project tree widget class."""
     
@@ -22,27 +24,13 @@ class ProjectTreeWidget(QTreeWidget):
     def setup_ui(self):
         """Set up the user interface."""
         self.setHeaderLabel("项目结构")
-        self.setStyleSheet("""
-            QTreeWidget {
-                background-color: #1e1e1e;
-                color: #ffffff;
-                border: 1px solid #3d3d3d;
-            }
-            QTreeWidget::item {
-                padding: 4px;
-            }
-            QTreeWidget::item:selected {
-                background-color: #0d47a1;
-            }
-            QTreeWidget::item:hover {
-                background-color: #2d2d2d;
-            }
-        """)
+        self.setObjectName("ProjectTree")
     
     def setup_connections(self):
         """Set up signal connections."""
         self.itemClicked.connect(self._handle_item_clicked)
     
+    @timed("project_tree.update_tree")
     def update_tree(self, structure: list):
         """Update tree with new structure."""
         self.clear()
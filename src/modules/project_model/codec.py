@@ -0,0 +1,316 @@
+"""
+Model Codec Module
+模型编解码模块
+
+This module generates specialised encode/decode functions for the dataclass models.
+Each dataclass is introspected once: field types are resolved, enum lookup tables are
+precomputed, and straight-line Python source is compiled with exec. The generated
+codecs are cached per class, so encoding and decoding no longer walk type information
+or go through per-field branches written by hand.
+此模块为数据类模型生成专用的编码和解码函数。每个数据类只分析一次：解析字段类型、
+预先建立枚举查找表，并用 exec 编译生成的直线代码。生成的编解码器按类缓存，
+编解码时不再遍历类型信息，也不需要逐字段手写分支。
+
+Enums are encoded by name by default (ENUM_BY_VALUE encodes by value). Decoding
+accepts both names and values, so files written by older versions still load.
+枚举默认按名称编码（ENUM_BY_VALUE 表示按值编码）。解码时名称和值都可以识别，
+旧版本写入的文件仍然可以加载。
+"""
+
+import logging
+import dataclasses
+import threading
+import typing
+from enum import Enum
+from typing import Any, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENUM_BY_NAME = "name"
+ENUM_BY_VALUE = "value"
+
+_NoneType = type(None)
+_MISSING = object()
+
+
+class ModelCodec:
+    """数据类编解码器"""
+
+    def __init__(self, cls: type, encode: Callable[[Any], dict], decode: Callable[[dict], Any], source: str):
+        self.cls = cls
+        self.encode = encode
+        self.decode = decode
+        # 生成的源代码，便于调试
+        self.source = source
+
+
+_codecs: Dict[Tuple[type, str], ModelCodec] = {}
+_lock = threading.RLock()
+
+
+def get_codec(cls: type, enum_by: str = ENUM_BY_NAME) -> ModelCodec:
+    """
+    获取数据类的编解码器，首次调用时生成
+
+    Args:
+        cls: 数据类
+        enum_by: 枚举的编码方式，ENUM_BY_NAME 或 ENUM_BY_VALUE
+
+    Returns:
+        ModelCodec: 编解码器
+    """
+    key = (cls, enum_by)
+    codec = _codecs.get(key)
+    if codec is None:
+        with _lock:
+            codec = _codecs.get(key)
+            if codec is None:
+                codec = _CodecBuilder(cls, enum_by).build()
+                _codecs[key] = codec
+    return codec
+
+
+def encode(obj: Any, enum_by: str = ENUM_BY_NAME) -> dict:
+    """将数据类对象编码为字典"""
+    return get_codec(type(obj), enum_by).encode(obj)
+
+
+def decode(cls: type, data: dict, enum_by: str = ENUM_BY_NAME) -> Any:
+    """从字典解码数据类对象"""
+    return get_codec(cls, enum_by).decode(data)
+
+
+def enum_table(enum_cls: type) -> Dict[Any, Enum]:
+    """枚举查找表，名称和值都映射到枚举成员，名称优先"""
+    table: Dict[Any, Enum] = {}
+    for member in enum_cls:
+        try:
+            table.setdefault(member.value, member)
+        except TypeError:
+            # 不可哈希的值只能按名称查找
+            pass
+    for member in enum_cls:
+        table[member.name] = member
+    return table
+
+
+def _invalid_enum(field_name: str, value: Any):
+    """可选字段中无法识别的枚举值按缺省处理"""
+    logger.warning("无效的%s: %s", field_name, value)
+    return None
+
+
+class _CodecBuilder:
+    """生成编解码函数的源代码"""
+
+    def __init__(self, cls: type, enum_by: str):
+        if not dataclasses.is_dataclass(cls):
+            raise TypeError(f"{cls.__name__} 不是数据类")
+        if enum_by not in (ENUM_BY_NAME, ENUM_BY_VALUE):
+            raise ValueError(f"未知的枚举编码方式: {enum_by}")
+        self.cls = cls
+        self.enum_by = enum_by
+        self.namespace: Dict[str, Any] = {
+            "_invalid_enum": _invalid_enum,
+            "_MISSING": _MISSING,
+        }
+        self._names: Dict[int, str] = {}
+
+    def build(self) -> ModelCodec:
+        hints = typing.get_type_hints(self.cls)
+        fields = [f for f in dataclasses.fields(self.cls) if f.init]
+        cls_name = self._bind(self.cls, "cls")
+
+        encode_items = []
+        decode_lines = []
+        args = []
+        for index, f in enumerate(fields):
+            tp = hints.get(f.name, Any)
+            encode_items.append(f"        {f.name!r}: {self._encode_expr(tp, 'obj.' + f.name, 0)},")
+            var = f"f{index}"
+            args.append(f"{f.name}={var}")
+            decode_lines.extend(self._decode_field(f, tp, var))
+
+        lines = ["def encode(obj):", "    return {"]
+        lines.extend(encode_items)
+        lines.append("    }")
+        lines.append("")
+        lines.append("def decode(data):")
+        if any("get(" in line for line in decode_lines):
+            lines.append("    get = data.get")
+        lines.extend(decode_lines)
+        if self._can_bypass_init(fields):
+            # 没有 __post_init__ 等额外逻辑时直接填充实例字典，跳过 __init__
+            items = ", ".join(f"{f.name!r}: f{index}" for index, f in enumerate(fields))
+            lines.append(f"    obj = _new({cls_name})")
+            lines.append(f"    obj.__dict__ = {{{items}}}")
+            lines.append("    return obj")
+            self.namespace["_new"] = object.__new__
+        else:
+            lines.append(f"    return {cls_name}({', '.join(args)})")
+        source = "\n".join(lines) + "\n"
+
+        exec(compile(source, f"<codec {self.cls.__qualname__}>", "exec"), self.namespace)
+        return ModelCodec(self.cls, self.namespace["encode"], self.namespace["decode"], source)
+
+    # ------------------------------------------------------------------
+    # 编码
+    # ------------------------------------------------------------------
+
+    def _encode_expr(self, tp: Any, expr: str, depth: int) -> str:
+        """生成编码表达式"""
+        inner, optional = _unwrap_optional(tp)
+        if optional:
+            plain = self._encode_expr(inner, expr, depth)
+            if plain == expr:
+                return expr
+            return f"(None if {expr} is None else {plain})"
+
+        origin = typing.get_origin(tp)
+        if _is_enum(tp):
+            # _name_/_value_ 是实例属性，比 name/value 描述符快
+            return f"{expr}._{self.enum_by}_"
+        if dataclasses.is_dataclass(tp):
+            return f"{self._bind(get_codec(tp, self.enum_by).encode, 'enc')}({expr})"
+        if origin in (list, tuple, set, frozenset):
+            item = (typing.get_args(tp) or (Any,))[0]
+            var = f"x{depth}"
+            item_expr = self._encode_expr(item, var, depth + 1)
+            if item_expr == var:
+                return f"list({expr})"
+            return f"[{item_expr} for {var} in {expr}]"
+        if origin is dict:
+            value = (typing.get_args(tp) or (Any, Any))[1]
+            key_var, value_var = f"k{depth}", f"v{depth}"
+            value_expr = self._encode_expr(value, value_var, depth + 1)
+            if value_expr == value_var:
+                return f"dict({expr})"
+            return f"{{{key_var}: {value_expr} for {key_var}, {value_var} in {expr}.items()}}"
+        return expr
+
+    # ------------------------------------------------------------------
+    # 解码
+    # ------------------------------------------------------------------
+
+    def _decode_field(self, f: dataclasses.Field, tp: Any, var: str) -> list:
+        """生成一个字段的解码语句"""
+        if f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING:
+            # 必填字段缺失时抛出 KeyError，与手写的 from_dict 一致
+            lines = [f"    {var} = data[{f.name!r}]"]
+            inner, optional = _unwrap_optional(tp)
+            value_expr = self._decode_value(inner, var, 0, f.name, optional)
+            if value_expr == var:
+                return lines
+            if optional:
+                lines.append(f"    if {var} is not None:")
+                lines.append(f"        {var} = {value_expr}")
+            else:
+                lines.append(f"    {var} = {value_expr}")
+            return lines
+
+        lines = [f"    {var} = get({f.name!r}, _MISSING)"]
+        if f.default is not dataclasses.MISSING:
+            default = self._bind(f.default, "default")
+            missing = f"{var} = {default}"
+        else:
+            missing = f"{var} = {self._bind(f.default_factory, 'factory')}()"
+        lines.append(f"    if {var} is _MISSING:")
+        lines.append(f"        {missing}")
+
+        inner, optional = _unwrap_optional(tp)
+        value_expr = self._decode_value(inner, var, 0, f.name, optional)
+        if value_expr == var:
+            return lines
+
+        lines.append("    else:")
+        if optional:
+            lines.append(f"        if {var} is not None:")
+            lines.append(f"            {var} = {value_expr}")
+        elif typing.get_origin(inner) in (list, tuple, set, frozenset):
+            # 旧版本把列表字段保存为单个值或null
+            lines.append(f"        if {var} is None:")
+            lines.append(f"            {var} = []")
+            lines.append(f"        elif not isinstance({var}, list):")
+            lines.append(f"            {var} = [{var}]")
+            lines.append(f"        {var} = {value_expr}")
+        else:
+            lines.append(f"        {var} = {value_expr}")
+        return lines
+
+    def _decode_value(self, tp: Any, expr: str, depth: int, field_name: str, optional: bool) -> str:
+        """生成解码表达式，expr 已保证不是缺省值"""
+        inner, inner_optional = _unwrap_optional(tp)
+        if inner_optional:
+            plain = self._decode_value(inner, expr, depth, field_name, True)
+            if plain == expr:
+                return expr
+            return f"(None if {expr} is None else {plain})"
+
+        origin = typing.get_origin(tp)
+        if _is_enum(tp):
+            table = self._bind(enum_table(tp), "table")
+            if optional:
+                return f"({table}.get({expr}) or _invalid_enum({field_name!r}, {expr}))"
+            return f"{table}[{expr}]"
+        if dataclasses.is_dataclass(tp):
+            return f"{self._bind(get_codec(tp, self.enum_by).decode, 'dec')}({expr})"
+        if origin in (list, tuple, set, frozenset):
+            item = (typing.get_args(tp) or (Any,))[0]
+            var = f"x{depth}"
+            factory = "list" if origin is list else self._bind(origin, "type")
+            if _is_enum(item):
+                # 列表中无法识别的枚举值直接跳过
+                table = self._bind(enum_table(item), "table")
+                items = f"[{table}[{var}] for {var} in {expr} if {var} in {table}]"
+            else:
+                item_expr = self._decode_value(item, var, depth + 1, field_name, False)
+                if item_expr == var:
+                    return f"{factory}({expr})"
+                items = f"[{item_expr} for {var} in {expr}]"
+            return items if origin is list else f"{factory}({items})"
+        if origin is dict:
+            value = (typing.get_args(tp) or (Any, Any))[1]
+            key_var, value_var = f"k{depth}", f"v{depth}"
+            value_expr = self._decode_value(value, value_var, depth + 1, field_name, False)
+            if value_expr == value_var:
+                return f"dict({expr})"
+            return f"{{{key_var}: {value_expr} for {key_var}, {value_var} in {expr}.items()}}"
+        return expr
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    def _can_bypass_init(self, fields: list) -> bool:
+        """数据类的 __init__ 只是逐字段赋值时可以跳过"""
+        params = getattr(self.cls, "__dataclass_params__", None)
+        return (
+            len(fields) == len(dataclasses.fields(self.cls))
+            and not hasattr(self.cls, "__post_init__")
+            and not hasattr(self.cls, "__slots__")
+            and params is not None and not params.frozen
+            and self.cls.__new__ is object.__new__
+        )
+
+    def _bind(self, value: Any, prefix: str) -> str:
+        """把对象放入生成代码的命名空间，返回引用名称"""
+        name = self._names.get(id(value))
+        if name is None:
+            name = f"_{prefix}{len(self._names)}"
+            self._names[id(value)] = name
+            self.namespace[name] = value
+        return name
+
+
+def _unwrap_optional(tp: Any) -> Tuple[Any, bool]:
+    """Optional[X] 返回 (X, True)，其他类型返回 (tp, False)"""
+    if typing.get_origin(tp) is typing.Union:
+        args = [arg for arg in typing.get_args(tp) if arg is not _NoneType]
+        if len(args) == 1 and len(typing.get_args(tp)) == 2:
+            return args[0], True
+        return Any, True
+    return tp, False
+
+
+def _is_enum(tp: Any) -> bool:
+    return isinstance(tp, type) and issubclass(tp, Enum)
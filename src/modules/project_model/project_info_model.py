@@ -9,6 +9,7 @@ This module defines the project info model class that stores and manages project
 from enum import Enum
 from dataclasses import dataclass, field
 from typing import Optional, List
+from .codec import get_codec
 
 class GameType(Enum):
     """游戏类型枚举"""
@@ -79,44 +80,16 @@ class ProjectInfoModel:
     target_platforms: List[TargetPlatform] = field(default_factory=list)
     game_style: Optional[GameStyle] = None
     time_setting: Optional[TimeSetting] = None
-    target_audience: Optional[TargetAudience] = None
+    target_audience: List[TargetAudience] = field(default_factory=list)
     
     def to_dict(self) -> dict:
-        """将项目信息模型转换为字典"""
-        return {
-            "name": self.name,
-            "description": self.description,
-            "game_type": self.game_type.name if self.game_type else None,
-            "target_platforms": [platform.name for platform in self.target_platforms],
-            "game_style": self.game_style.name if self.game_style else None,
-            "time_setting": self.time_setting.name if self.time_setting else None,
-            "target_audience": [audience.name for audience in self.target_audience] if self.target_audience else None
-        }
+        """将项目信息模型转换为字典，枚举按名称保存"""
+        return get_codec(ProjectInfoModel).encode(self)
     
     @classmethod
     def from_dict(cls, data: dict) -> 'ProjectInfoModel':
-        """从字典创建项目信息模型"""
-        project = cls(name=data["name"])
-        
-        if "description" in data:
-            project.description = data["description"]
-            
-        if "game_type" in data:
-            project.game_type = GameType(data["game_type"])
-            
-        if "target_platforms" in data:
-            project.target_platforms = [TargetPlatform(platform) for platform in data["target_platforms"]]
-            
-        if "game_style" in data:
-            project.game_style = GameStyle(data["game_style"])
-            
-        if "time_setting" in data:
-            project.time_setting = TimeSetting(data["time_setting"])
-            
-        if "target_audience" in data:
-            project.target_audience = TargetAudience(data["target_audience"])
-            
-        return project
+        """从字典创建项目信息模型，枚举可以是名称或值"""
+        return get_codec(cls).decode(data)
     
     def validate(self) -> bool:
         """验证项目信息模型的有效性"""
@@ -135,15 +108,7 @@ class ProjectInfoModel:
         if self.time_setting and not isinstance(self.time_setting, TimeSetting):
             return False
             
-        if self.target_audience and not isinstance(self.target_audience, TargetAudience):
+        if not all(isinstance(audience, TargetAudience) for audience in self.target_audience):
             return False
             
-        return True 
-    
-
-    
-    
-    
-    
-
-    
+        return True
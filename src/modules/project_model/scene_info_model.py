@@ -1,5 +1,6 @@
 from enum import Enum
 from dataclasses import dataclass
+from .codec import get_codec
 
 class SceneType(Enum):
     """主菜单，游戏场景，对话场景，战斗场景，过场动画，结束场景"""
@@ -54,6 +55,7 @@ class GameOperationContainer(SceneOperationContainer):
     
 
     
+@dataclass
 class SceneInfoModel:
     """场景信息模型类"""
     name: str
@@ -61,16 +63,13 @@ class SceneInfoModel:
     scene_type: SceneType
 
     def to_dict(self) -> dict:
-        """将项目信息模型转换为字典"""
-        return {
-            "name": self.name,
-            "scene_type": self.scene_type.name
-        }
+        """将场景信息模型转换为字典，枚举按名称保存"""
+        return get_codec(SceneInfoModel).encode(self)
     
     @classmethod
     def from_dict(cls, data: dict) -> 'SceneInfoModel':
-        """从字典创建场景信息模型"""
-        return cls(name=data["name"], scene_type=SceneType(data["scene_type"]))
+        """从字典创建场景信息模型，场景类型可以是名称或值"""
+        return get_codec(cls).decode(data)
     
     def validate(self) -> bool:
         """验证场景信息模型的有效性"""
@@ -6,13 +6,16 @@ This module provides the API interface for scene editing functionality.
 此模块提供场景编辑功能的API接口。
 """
 
+import logging
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass, field
 from enum import Enum
-import json
 import os
 from PyQt6.QtWidgets import QDockWidget
 from .scene_editor_panel import SceneEditorPanel
+from ..profiler.api import timed
+
+logger = logging.getLogger(__name__)
 
 class NodeType(Enum):
     """Scene node type enumeration."""
@@ -34,6 +37,36 @@ class SceneNode:
     properties: Dict[str, Any] = field(default_factory=dict)
     children: List['SceneNode'] = field(default_factory=list)
 
+    @property
+    def child_count(self) -> int:
+        """子节点数量"""
+        return len(self.children)
+
+    def to_dict(self) -> dict:
+        """将节点转换为字典"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "node_type": self.node_type.name,
+            "position": list(self.position),
+            "size": list(self.size),
+            "properties": self.properties,
+            "children": [child.to_dict() for child in self.children]
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SceneNode':
+        """从字典创建节点"""
+        return cls(
+            id=data["id"],
+            name=data["name"],
+            node_type=NodeType[data["node_type"]],
+            position=tuple(data.get("position", (0.0, 0.0))),
+            size=tuple(data.get("size", (100.0, 100.0))),
+            properties=data.get("properties", {}),
+            children=[cls.from_dict(child) for child in data.get("children", [])]
+        )
+
 @dataclass
 class Scene:
     """Scene data class."""
@@ -43,6 +76,52 @@ class Scene:
     grid_size: int = 20
     snap_to_grid: bool = True
 
+    def attach_reader(self, reader):
+        """记录懒加载场景使用的二进制读取器，场景关闭时一并关闭"""
+        self._reader = reader
+
+    def close(self, load_nodes: bool = True):
+        """
+        关闭场景映射的二进制文件，JSON场景无需关闭
+
+        Args:
+            load_nodes: 是否先加载尚未加载的节点；场景被丢弃时传False
+        """
+        reader = self.__dict__.pop("_reader", None)
+        if reader is None:
+            return
+        if load_nodes:
+            reader.detach()
+        else:
+            reader.close()
+
+    def __getstate__(self) -> dict:
+        """复制场景时不复制读取器"""
+        state = self.__dict__.copy()
+        state.pop("_reader", None)
+        return state
+
+    def to_dict(self) -> dict:
+        """将场景转换为字典"""
+        return {
+            "name": self.name,
+            "root_node": self.root_node.to_dict(),
+            "background_color": self.background_color,
+            "grid_size": self.grid_size,
+            "snap_to_grid": self.snap_to_grid
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Scene':
+        """从字典创建场景"""
+        return cls(
+            name=data["name"],
+            root_node=SceneNode.from_dict(data["root_node"]),
+            background_color=data.get("background_color", "#1e1e1e"),
+            grid_size=data.get("grid_size", 20),
+            snap_to_grid=data.get("snap_to_grid", True)
+        )
+
 @dataclass
 class NodeData:
     """节点数据类"""
@@ -77,7 +156,14 @@ class SceneEditorAPI:
         SceneEditorAPI._instance = self
         self.current_scene: Optional[Scene] = None
         self.scene_changed_callbacks = []
+        self.node_added_callbacks = []
+        self.node_removed_callbacks = []
+        self.node_updated_callbacks = []
         self._panel = None
+        self._journal = None
+        self._spatial_index = None
+        self._spatial_index_scene: Optional[Scene] = None
+        self._search_index = None
         
     def set_panel(self, panel):
         """Set the scene editor panel."""
@@ -120,6 +206,7 @@ class SceneEditorAPI:
         )
         scene = Scene(name=name, root_node=root_node)
         self.current_scene = scene
+        self._record_edit("create_scene", {"scene": scene.to_dict()})
         self._notify_scene_changed()
         return scene
     
@@ -132,6 +219,9 @@ class SceneEditorAPI:
         parent = self._find_node(self.current_scene.root_node, parent_id)
         if parent:
             parent.children.append(node)
+            self._index_subtree(node)
+            self._record_edit("add_node", {"parent_id": parent_id, "node": node.to_dict()})
+            self._notify_node_added(parent, len(parent.children) - 1, node)
             self._notify_scene_changed()
         return node
     
@@ -142,8 +232,19 @@ class SceneEditorAPI:
             
         node = self._find_node(self.current_scene.root_node, node_id)
         if node:
+            # 只应用真正改变的字段，没有变化时不记录日志也不发送通知
+            properties = {key: value for key, value in properties.items()
+                          if getattr(node, key, None) != value}
+            if not properties:
+                return True
             for key, value in properties.items():
                 setattr(node, key, value)
+            self._update_spatial_index(node, properties)
+            self._record_edit("update_node", {
+                "node_id": node_id,
+                "fields": self._encode_node_fields(properties)
+            })
+            self._notify_node_updated(node, properties)
             self._notify_scene_changed()
             return True
         return False
@@ -158,8 +259,203 @@ class SceneEditorAPI:
             node_id
         )
         if result:
+            parent, row, node = result
+            self._unindex_subtree(node)
+            self._record_edit("delete_node", {"node_id": node_id})
+            self._notify_node_removed(parent, row, node)
             self._notify_scene_changed()
-        return result
+            return True
+        return False
+    
+    def get_spatial_index(self):
+        """
+        获取当前场景的空间索引
+
+        索引在首次查询时建立，之后随节点的增删、移动和缩放同步更新。
+        """
+        from .spatial_index import QuadTree
+        
+        if not self.current_scene:
+            return None
+        if not self._has_spatial_index():
+            index = QuadTree()
+            stack = [self.current_scene.root_node]
+            while stack:
+                node = stack.pop()
+                self._insert_spatial(index, node)
+                stack.extend(node.children)
+            self._spatial_index = index
+            self._spatial_index_scene = self.current_scene
+        return self._spatial_index
+        
+    def query_nodes_in_rect(self, rect: Tuple[float, float, float, float],
+                            contained: bool = False) -> List[SceneNode]:
+        """
+        查询与矩形相交的节点
+
+        Args:
+            rect: 查询矩形 (left, top, right, bottom)
+            contained: 为True时只返回完全位于矩形内的节点
+        """
+        index = self.get_spatial_index()
+        return index.query_rect(rect, contained) if index else []
+        
+    def query_nodes_at(self, x: float, y: float) -> List[SceneNode]:
+        """查询包含某点的所有节点"""
+        index = self.get_spatial_index()
+        return index.query_point(x, y) if index else []
+        
+    def node_at(self, x: float, y: float) -> Optional[SceneNode]:
+        """获取鼠标位置下的节点，多个节点重叠时返回面积最小的节点"""
+        nodes = self.query_nodes_at(x, y)
+        if not nodes:
+            return None
+        return min(nodes, key=lambda node: node.size[0] * node.size[1])
+        
+    def nearest_nodes(self, x: float, y: float, k: int = 1,
+                      max_distance: float = float("inf")) -> List[SceneNode]:
+        """查询距离某点最近的k个节点，按距离从近到远排列"""
+        index = self.get_spatial_index()
+        if not index:
+            return []
+        return [node for _, node in index.nearest(x, y, k, max_distance)]
+        
+    def get_search_index(self):
+        """
+        获取当前项目的节点搜索索引
+
+        索引在首次使用时从 .index 目录加载，并按场景文件修改时间增量更新；
+        之后由场景修改通知和项目目录监视保持最新。
+        """
+        from modules.project_info.api import ProjectInfoAPI
+        from .search_index import SceneSearchIndex
+        
+        project = ProjectInfoAPI.get_current_project()
+        if not project:
+            return None
+        index = self._search_index
+        if index is None or index.project_dir != project.project_dir:
+            if index is not None:
+                index.detach()
+                index.save()
+            index = SceneSearchIndex(project.project_dir).open()
+            index.attach(self)
+            self._search_index = index
+        return index
+        
+    def search_nodes(self, name: Optional[str] = None, node_type: Optional[str] = None,
+                     prop_key: Optional[str] = None, prop_value: Optional[str] = None,
+                     scene: Optional[str] = None, limit: Optional[int] = None) -> list:
+        """
+        在项目所有场景中搜索节点
+
+        例如 search_nodes(node_type="BUTTON", prop_key="text", prop_value="开始")。
+        参数含义见 SceneSearchIndex.search。
+        """
+        index = self.get_search_index()
+        if index is None:
+            return []
+        return index.search(name, node_type, prop_key, prop_value, scene, limit)
+        
+    def save_search_index(self):
+        """保存搜索索引，退出程序前调用"""
+        if self._search_index is not None:
+            self._search_index.save()
+        
+    def _has_spatial_index(self) -> bool:
+        """当前场景的空间索引是否已经建立"""
+        return self._spatial_index is not None and self._spatial_index_scene is self.current_scene
+        
+    def _index_subtree(self, node: SceneNode):
+        """将节点及其子节点加入空间索引"""
+        if not self._has_spatial_index():
+            return
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self._insert_spatial(self._spatial_index, current)
+            stack.extend(current.children)
+            
+    @staticmethod
+    def _insert_spatial(index, node: SceneNode):
+        """将节点加入空间索引，位置或尺寸无效（例如场景文件中的 NaN）的节点不加入"""
+        from .spatial_index import node_rect
+        
+        try:
+            index.insert(node.id, node_rect(node.position, node.size), node)
+        except ValueError as e:
+            logger.warning("节点 %s 不加入空间索引: %s", node.id, e)
+            
+    def _unindex_subtree(self, node: SceneNode):
+        """从空间索引中移除节点及其子节点"""
+        if not self._has_spatial_index():
+            return
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self._spatial_index.remove(current.id)
+            stack.extend(current.children)
+            
+    def _update_spatial_index(self, node: SceneNode, fields: dict):
+        """节点字段修改后同步空间索引"""
+        from .spatial_index import node_rect
+        
+        if not self._has_spatial_index():
+            return
+        if "children" in fields or "id" in fields:
+            # 子树或节点键发生变化，下次查询时重建索引
+            self._spatial_index = None
+        elif "position" in fields or "size" in fields:
+            try:
+                self._spatial_index.update(node.id, node_rect(node.position, node.size), node)
+            except ValueError as e:
+                self._spatial_index.remove(node.id)
+                logger.warning("节点 %s 移出空间索引: %s", node.id, e)
+    
+    def set_journal(self, journal):
+        """设置编辑日志，场景和蓝图的修改会追加到日志中"""
+        self._journal = journal
+        
+    def get_journal(self):
+        """获取编辑日志"""
+        return self._journal
+        
+    def record_blueprint_edit(self, blueprint_name: str, op: str, payload: dict):
+        """记录蓝图编辑"""
+        from ..file_manager.edit_journal import JournalTarget
+        
+        if self._journal:
+            self._journal.record(JournalTarget.BLUEPRINT, op, blueprint_name, payload)
+            self._compact_journal_if_needed()
+            
+    def _record_edit(self, op: str, payload: dict):
+        """记录当前场景的编辑"""
+        from ..file_manager.edit_journal import JournalTarget
+        
+        if self._journal and self.current_scene:
+            self._journal.record(JournalTarget.SCENE, op, self.current_scene.name, payload)
+            self._compact_journal_if_needed()
+            
+    def _compact_journal_if_needed(self):
+        """日志记录过多时在后台合并到场景文件"""
+        from ..file_manager.save_service import SaveService
+        
+        if self._journal.needs_compaction():
+            SaveService.get_instance().compact_journal(self._journal)
+            
+    @staticmethod
+    def _encode_node_fields(fields: dict) -> dict:
+        """将节点字段转换为可JSON序列化的形式"""
+        encoded = {}
+        for key, value in fields.items():
+            if isinstance(value, Enum):
+                value = value.name
+            elif isinstance(value, tuple):
+                value = list(value)
+            elif key == "children":
+                value = [child.to_dict() for child in value]
+            encoded[key] = value
+        return encoded
     
     def register_scene_changed_callback(self, callback):
         """Register a callback for scene changes."""
@@ -169,6 +465,33 @@ class SceneEditorAPI:
         """Notify all registered callbacks about scene changes."""
         for callback in self.scene_changed_callbacks:
             callback()
+            
+    def register_node_added_callback(self, callback):
+        """注册节点添加回调，callback(parent, row, node)"""
+        self.node_added_callbacks.append(callback)
+        
+    def register_node_removed_callback(self, callback):
+        """注册节点删除回调，callback(parent, row, node)"""
+        self.node_removed_callbacks.append(callback)
+        
+    def register_node_updated_callback(self, callback):
+        """注册节点修改回调，callback(node, fields)"""
+        self.node_updated_callbacks.append(callback)
+        
+    def _notify_node_added(self, parent: SceneNode, row: int, node: SceneNode):
+        """通知节点已添加"""
+        for callback in self.node_added_callbacks:
+            callback(parent, row, node)
+            
+    def _notify_node_removed(self, parent: SceneNode, row: int, node: SceneNode):
+        """通知节点已删除"""
+        for callback in self.node_removed_callbacks:
+            callback(parent, row, node)
+            
+    def _notify_node_updated(self, node: SceneNode, fields: dict):
+        """通知节点已修改"""
+        for callback in self.node_updated_callbacks:
+            callback(node, fields)
     
     def _find_node(self, root: SceneNode, node_id: str) -> Optional[SceneNode]:
         """Find a node by its ID."""
@@ -180,82 +503,185 @@ class SceneEditorAPI:
                 return result
         return None
     
-    def _delete_node_recursive(self, root: SceneNode, node_id: str) -> bool:
-        """Delete a node recursively."""
+    def _delete_node_recursive(self, root: SceneNode, node_id: str) -> Optional[Tuple[SceneNode, int, SceneNode]]:
+        """Delete a node recursively, returning (parent, row, node)."""
         for i, child in enumerate(root.children):
             if child.id == node_id:
                 root.children.pop(i)
-                return True
-            if self._delete_node_recursive(child, node_id):
-                return True
-        return False
+                return root, i, child
+            result = self._delete_node_recursive(child, node_id)
+            if result:
+                return result
+        return None
     
     @staticmethod
-    def save_scene(scene: Scene) -> bool:
-        """保存场景"""
+    @timed("scene.save")
+    def save_scene(scene: Scene, use_binary: Optional[bool] = None) -> bool:
+        """
+        保存场景
+
+        Args:
+            scene: 场景对象
+            use_binary: 是否使用二进制格式，None表示沿用场景文件现有的格式
+        """
         try:
-            # 获取当前项目
-            from modules.project_info.api import ProjectInfoAPI
-            project = ProjectInfoAPI.get_current_project()
-            if not project:
+            from ..file_manager.atomic_writer import atomic_write
+            
+            scene_file = SceneEditorAPI.get_scene_file(scene.name, use_binary)
+            if not scene_file:
                 return False
                 
-            # 创建场景目录
-            scenes_dir = os.path.join(project.project_dir, "scenes")
-            os.makedirs(scenes_dir, exist_ok=True)
-            
-            # 保存场景文件
-            scene_file = os.path.join(scenes_dir, f"{scene.name}.json")
-            with open(scene_file, "w", encoding="utf-8") as f:
-                json.dump(scene.to_dict(), f, ensure_ascii=False, indent=2)
+            # 原子保存场景文件
+            data = SceneEditorAPI.serialize_scene(scene.to_dict(), scene_file)
+            SceneEditorAPI.release_scene_files(scene_file)
+            atomic_write(scene_file, data)
+            SceneEditorAPI.remove_stale_scene_file(scene_file)
                 
             return True
         except Exception as e:
-            print(f"保存场景失败: {str(e)}")
+            logger.error("保存场景失败: %s", e)
             return False
             
+    @staticmethod
+    def get_scene_file(name: str, use_binary: Optional[bool] = None) -> Optional[str]:
+        """
+        获取场景的保存路径
+
+        Args:
+            name: 场景名称
+            use_binary: 是否使用二进制格式，None表示沿用场景文件现有的格式
+
+        Returns:
+            Optional[str]: 场景文件路径，无当前项目时返回None
+        """
+        from .scene_binary import SCENE_BINARY_EXT, SCENE_JSON_EXT
+        
+        scenes_dir = SceneEditorAPI._get_scenes_dir()
+        if not scenes_dir:
+            return None
+            
+        binary_file = os.path.join(scenes_dir, f"{name}{SCENE_BINARY_EXT}")
+        if use_binary is None:
+            use_binary = os.path.exists(binary_file)
+        if use_binary:
+            return binary_file
+        return os.path.join(scenes_dir, f"{name}{SCENE_JSON_EXT}")
+        
+    @staticmethod
+    @timed("scene.serialize")
+    def serialize_scene(scene_data: dict, scene_file: str) -> bytes:
+        """按场景文件的格式序列化场景字典"""
+        from .scene_binary import SCENE_BINARY_EXT, encode_scene
+        from ..file_manager.serializers import KIND_SCENE, dumps
+        
+        if scene_file.endswith(SCENE_BINARY_EXT):
+            return encode_scene(scene_data)
+        # 大型场景按序列化策略压缩
+        return dumps(scene_data, KIND_SCENE)
+        
+    @staticmethod
+    def release_scene_files(scene_file: str):
+        """
+        释放映射着该场景两种格式文件的懒加载场景，写入或删除场景文件前在UI线程中调用
+
+        Args:
+            scene_file: 场景文件路径
+        """
+        from .scene_binary import SCENE_BINARY_EXT, release_scene_file
+        
+        release_scene_file(os.path.splitext(scene_file)[0] + SCENE_BINARY_EXT)
+        
+    @staticmethod
+    def remove_stale_scene_file(scene_file: str):
+        """删除另一种格式的旧场景文件，避免加载时读到过期数据"""
+        from .scene_binary import SCENE_BINARY_EXT, SCENE_JSON_EXT
+        
+        base, ext = os.path.splitext(scene_file)
+        stale_ext = SCENE_JSON_EXT if ext == SCENE_BINARY_EXT else SCENE_BINARY_EXT
+        stale_file = base + stale_ext
+        if os.path.exists(stale_file):
+            os.remove(stale_file)
+            
     @staticmethod
     def load_scene(name: str) -> Optional[Scene]:
-        """加载场景"""
+        """
+        加载场景
+
+        优先加载二进制场景文件，二进制场景通过mmap打开，
+        节点在访问对应子树时才会实例化。
+        """
         try:
-            # 获取当前项目
-            from modules.project_info.api import ProjectInfoAPI
-            project = ProjectInfoAPI.get_current_project()
-            if not project:
+            from .scene_binary import SCENE_BINARY_EXT, SCENE_JSON_EXT
+            
+            scenes_dir = SceneEditorAPI._get_scenes_dir()
+            if not scenes_dir:
                 return None
                 
-            # 加载场景文件
-            scene_file = os.path.join(project.project_dir, "scenes", f"{name}.json")
+            # 加载二进制场景文件
+            binary_file = os.path.join(scenes_dir, f"{name}{SCENE_BINARY_EXT}")
+            if os.path.exists(binary_file):
+                return SceneEditorAPI.load_scene_file(binary_file)
+                
+            # 加载JSON场景文件
+            scene_file = os.path.join(scenes_dir, f"{name}{SCENE_JSON_EXT}")
             if not os.path.exists(scene_file):
                 return None
-                
-            with open(scene_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return Scene.from_dict(data)
+            return SceneEditorAPI.load_scene_file(scene_file)
         except Exception as e:
-            print(f"加载场景失败: {str(e)}")
+            logger.error("加载场景失败: %s", e)
             return None
             
+    @staticmethod
+    @timed("scene.load")
+    def load_scene_file(scene_file: str) -> Optional[Scene]:
+        """
+        按扩展名加载场景文件，不依赖当前项目，可在后台线程中调用
+
+        Args:
+            scene_file: 场景文件路径
+
+        Returns:
+            Optional[Scene]: 场景对象
+        """
+        from .scene_binary import SCENE_BINARY_EXT, load_binary_scene
+        from ..file_manager.serializers import load_file
+        
+        if scene_file.endswith(SCENE_BINARY_EXT):
+            return load_binary_scene(scene_file)
+        return Scene.from_dict(load_file(scene_file))
+            
     @staticmethod
     def delete_scene(scene: Scene) -> bool:
         """删除场景"""
         try:
-            # 获取当前项目
-            from modules.project_info.api import ProjectInfoAPI
-            project = ProjectInfoAPI.get_current_project()
-            if not project:
+            from .scene_binary import SCENE_BINARY_EXT, SCENE_JSON_EXT
+            
+            scenes_dir = SceneEditorAPI._get_scenes_dir()
+            if not scenes_dir:
                 return False
                 
             # 删除场景文件
-            scene_file = os.path.join(project.project_dir, "scenes", f"{scene.name}.json")
-            if os.path.exists(scene_file):
-                os.remove(scene_file)
+            scene.close(load_nodes=False)
+            SceneEditorAPI.release_scene_files(os.path.join(scenes_dir, f"{scene.name}{SCENE_BINARY_EXT}"))
+            for ext in (SCENE_JSON_EXT, SCENE_BINARY_EXT):
+                scene_file = os.path.join(scenes_dir, f"{scene.name}{ext}")
+                if os.path.exists(scene_file):
+                    os.remove(scene_file)
                 
             return True
         except Exception as e:
-            print(f"删除场景失败: {str(e)}")
+            logger.error("删除场景失败: %s", e)
             return False
             
+    @staticmethod
+    def _get_scenes_dir() -> Optional[str]:
+        """获取当前项目的场景目录"""
+        from modules.project_info.api import ProjectInfoAPI
+        project = ProjectInfoAPI.get_current_project()
+        if not project:
+            return None
+        return os.path.join(project.project_dir, "scenes")
+            
     def get_nodes(self) -> List[NodeData]:
         """获取所有节点"""
         raise NotImplementedError
@@ -7,6 +7,7 @@ from ..project_model.blueprint_node_model import (
     BlueprintNode, BlueprintPin, BlueprintConnection,
     PinType, PinDirection
 )
+from ..profiler.api import timed
 
 class BlueprintPinItem(QGraphicsItem):
     """蓝图引脚图形项"""
@@ -23,6 +24,7 @@ class BlueprintPinItem(QGraphicsItem):
         return QRectF(-self.radius, -self.radius, 
                      self.radius * 2, self.radius * 2)
         
+    @timed("blueprint.paint_pin")
     def paint(self, painter: QPainter, option, widget=None):
         """绘制引脚"""
         pin_colors = {
@@ -99,6 +101,7 @@ class BlueprintNodeItem(QGraphicsItem):
         """返回节点边界矩形"""
         return QRectF(0, 0, self.node_width, self.node_height)
         
+    @timed("blueprint.paint_node")
     def paint(self, painter: QPainter, option, widget=None):
         """绘制节点"""
         # 绘制节点背景
@@ -174,6 +177,7 @@ class BlueprintConnectionItem(QGraphicsItem):
             abs(self.end_pos.y() - self.start_pos.y()) + 10
         )
         
+    @timed("blueprint.paint_connection")
     def paint(self, painter: QPainter, option, widget=None):
         """绘制连接线"""
         # 更新位置
@@ -200,6 +204,7 @@ class BlueprintEditor(QGraphicsScene):
         super().__init__(parent)
         self.nodes = {}  # 存储节点项
         self.connections = {}  # 存储连接项
+        self.blueprint_name = "main"  # 蓝图名称，对应 scripts/<名称>.blueprint.json
         
         # 网格设置
         self.grid_size = 20
@@ -215,6 +220,7 @@ class BlueprintEditor(QGraphicsScene):
         self.start_pin = None  # 起始引脚
         self.end_pin = None  # 结束引脚
         
+    @timed("blueprint.draw_background")
     def drawBackground(self, painter: QPainter, rect: QRectF):
         """绘制背景网格"""
         # 先调用父类方法绘制背景色
@@ -261,6 +267,16 @@ class BlueprintEditor(QGraphicsScene):
         node_item = BlueprintNodeItem(node)
         self.addItem(node_item)
         self.nodes[node.name] = node_item
+        self._record_edit("add_node", {
+            "name": node.name,
+            "node_type": node.node_type,
+            "position": list(node.position),
+            "pins": [
+                {"name": pin.name, "pin_type": pin.pin_type.value, "direction": pin.direction.value}
+                for pin in node.pins.values()
+            ],
+            "properties": dict(node.properties)
+        })
         return node_item
         
     def add_connection(self, connection: BlueprintConnection):
@@ -268,6 +284,7 @@ class BlueprintEditor(QGraphicsScene):
         connection_item = BlueprintConnectionItem(connection)
         self.addItem(connection_item)
         self.connections[connection] = connection_item
+        self._record_edit("add_connection", self._connection_payload(connection))
         return connection_item
         
     def remove_node(self, node_name: str):
@@ -276,6 +293,7 @@ class BlueprintEditor(QGraphicsScene):
             node_item = self.nodes[node_name]
             self.removeItem(node_item)
             del self.nodes[node_name]
+            self._record_edit("remove_node", {"name": node_name})
             
     def remove_connection(self, connection: BlueprintConnection):
         """移除连接"""
@@ -283,6 +301,23 @@ class BlueprintEditor(QGraphicsScene):
             connection_item = self.connections[connection]
             self.removeItem(connection_item)
             del self.connections[connection]
+            self._record_edit("remove_connection", self._connection_payload(connection))
+            
+    def _record_edit(self, op: str, payload: dict):
+        """将蓝图修改追加到编辑日志"""
+        from .api import SceneEditorAPI
+        
+        SceneEditorAPI.get_instance().record_blueprint_edit(self.blueprint_name, op, payload)
+        
+    @staticmethod
+    def _connection_payload(connection: BlueprintConnection) -> dict:
+        """连接的日志记录内容"""
+        return {
+            "output_node": connection.output_pin.node.name,
+            "output_pin": connection.output_pin.name,
+            "input_node": connection.input_pin.node.name,
+            "input_pin": connection.input_pin.name
+        }
         
     def mousePressEvent(self, event):
         """鼠标按下事件"""
@@ -0,0 +1,181 @@
+"""
+Property Binding Module
+属性绑定模块
+
+This module binds the node inspector editors to a SceneNode. Edits are debounced,
+only the fields that actually changed are collected, and they are applied through a
+single SceneEditorAPI.update_node call.
+此模块将节点属性编辑框绑定到场景节点。编辑经过防抖处理，只收集真正改变的字段，
+并通过一次 SceneEditorAPI.update_node 调用写回。
+"""
+
+import json
+from typing import Any, Callable, Dict, Optional, Set
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from .api import SceneEditorAPI, SceneNode, NodeType
+
+DESCRIPTION_KEY = "description"
+
+
+def format_properties(properties: Dict[str, Any]) -> str:
+    """将节点属性格式化为编辑框文本（不含描述）"""
+    shown = {key: value for key, value in properties.items() if key != DESCRIPTION_KEY}
+    if not shown:
+        return ""
+    return json.dumps(shown, ensure_ascii=False, indent=2)
+
+
+def parse_properties(text: str) -> Dict[str, Any]:
+    """
+    解析属性编辑框文本
+
+    Raises:
+        ValueError: 文本不是JSON对象
+    """
+    if not text.strip():
+        return {}
+    properties = json.loads(text)
+    if not isinstance(properties, dict):
+        raise ValueError("节点属性必须是JSON对象")
+    return properties
+
+
+class NodePropertyBinding(QObject):
+    """
+    节点属性绑定
+
+    编辑框通过 add_field 注册读取函数，内容改变时调用 mark_dirty。
+    停止输入 debounce_ms 毫秒后（或调用 flush 时）比较各字段与绑定时的值，
+    只把变化的部分合并为一次节点更新。
+    """
+
+    error_occurred = pyqtSignal(str)  # 属性解析失败等错误
+    node_updated = pyqtSignal(object, dict)  # 节点, 实际修改的字段
+
+    FIELD_NAME = "name"
+    FIELD_TYPE = "node_type"
+    FIELD_DESCRIPTION = "description"
+    FIELD_PROPERTIES = "properties"
+
+    def __init__(self, debounce_ms: int = 300, parent=None):
+        super().__init__(parent)
+        self._getters: Dict[str, Callable[[], Any]] = {}
+        self._node: Optional[SceneNode] = None
+        self._shown: Dict[str, Any] = {}
+        self._dirty: Set[str] = set()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def add_field(self, field_name: str, getter: Callable[[], Any]):
+        """注册字段的读取函数"""
+        self._getters[field_name] = getter
+
+    def bind(self, node: Optional[SceneNode]) -> Dict[str, Any]:
+        """
+        绑定节点，先提交上一个节点未提交的修改
+
+        Returns:
+            Dict[str, Any]: 各字段用于显示的值
+        """
+        self.flush()
+        self._node = node
+        self._shown = self.values_for(node) if node else {}
+        return dict(self._shown)
+
+    def node(self) -> Optional[SceneNode]:
+        """当前绑定的节点"""
+        return self._node
+
+    @staticmethod
+    def values_for(node: SceneNode) -> Dict[str, Any]:
+        """节点各字段在编辑框中显示的值"""
+        return {
+            NodePropertyBinding.FIELD_NAME: node.name,
+            NodePropertyBinding.FIELD_TYPE: node.node_type.name,
+            NodePropertyBinding.FIELD_DESCRIPTION: node.properties.get(DESCRIPTION_KEY, ""),
+            NodePropertyBinding.FIELD_PROPERTIES: format_properties(node.properties),
+        }
+
+    def mark_dirty(self, field_name: str):
+        """字段被编辑，重新开始防抖计时"""
+        if self._node is None:
+            return
+        self._dirty.add(field_name)
+        self._timer.start()
+
+    def has_pending(self) -> bool:
+        """是否有尚未提交的修改"""
+        return bool(self._dirty)
+
+    def flush(self) -> bool:
+        """
+        立即提交修改
+
+        Returns:
+            bool: 是否有字段被修改
+        """
+        self._timer.stop()
+        dirty, self._dirty = self._dirty, set()
+        node = self._node
+        if node is None or not dirty:
+            return False
+
+        # 只读取被编辑过的字段，并与绑定时显示的值比较
+        edited = {}
+        for field_name in dirty:
+            getter = self._getters.get(field_name)
+            if getter is None:
+                continue
+            value = getter()
+            if value != self._shown.get(field_name):
+                edited[field_name] = value
+        if not edited:
+            return False
+
+        try:
+            changes = self._build_changes(node, edited)
+        except ValueError as e:
+            self.error_occurred.emit(f"节点属性格式错误: {str(e)}")
+            # 解析失败的字段保留为待提交，其余字段仍然写回
+            self._dirty.add(self.FIELD_PROPERTIES)
+            edited.pop(self.FIELD_PROPERTIES, None)
+            changes = self._build_changes(node, edited)
+
+        self._shown.update(edited)
+        if not changes:
+            return False
+        if not SceneEditorAPI.get_instance().update_node(node.id, changes):
+            # 节点不在当前场景中时直接修改节点对象
+            for key, value in changes.items():
+                setattr(node, key, value)
+        self.node_updated.emit(node, changes)
+        return True
+
+    def _build_changes(self, node: SceneNode, edited: Dict[str, Any]) -> Dict[str, Any]:
+        """由编辑过的字段生成节点修改"""
+        changes = {}
+        if self.FIELD_NAME in edited:
+            changes["name"] = edited[self.FIELD_NAME]
+        if self.FIELD_TYPE in edited:
+            node_type = NodeType[edited[self.FIELD_TYPE]]
+            if node_type != node.node_type:
+                changes["node_type"] = node_type
+
+        if self.FIELD_PROPERTIES in edited or self.FIELD_DESCRIPTION in edited:
+            if self.FIELD_PROPERTIES in edited:
+                # 属性文本只在内容改变时解析
+                properties = parse_properties(edited[self.FIELD_PROPERTIES])
+            else:
+                properties = {key: value for key, value in node.properties.items()
+                              if key != DESCRIPTION_KEY}
+            description = edited.get(self.FIELD_DESCRIPTION,
+                                      node.properties.get(DESCRIPTION_KEY, ""))
+            if description:
+                properties[DESCRIPTION_KEY] = description
+            if properties != node.properties:
+                changes["properties"] = properties
+        return changes
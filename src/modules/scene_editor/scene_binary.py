@@ -0,0 +1,444 @@
+"""
+Scene Binary Format
+场景二进制格式
+
+This module implements a compact binary scene format with memory-mapped lazy loading.
+此模块实现紧凑的二进制场景格式，并通过内存映射按需加载节点。
+
+文件布局（小端序）:
+    文件头      固定长度，见 HEADER_FORMAT
+    字符串索引  (string_count + 1) 个 uint32 偏移
+    字符串数据  UTF-8 字节，所有字符串去重后存放一次
+    节点表      node_count 条定长记录，见 NODE_FORMAT
+
+节点按广度优先顺序存放，因此每个节点的子节点在节点表中是连续的，
+记录中只需保存 (first_child, child_count) 这一偏移范围。
+
+懒加载的场景在关闭前一直映射着场景文件。Windows上被映射的文件不能替换或删除，
+因此写入或删除场景文件前要先调用 release_scene_file，它会加载尚未加载的节点并关闭映射。
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import weakref
+from typing import Dict, List, Optional
+
+from .api import Scene, SceneNode, NodeType
+from ..file_manager.atomic_writer import atomic_write
+from ..file_manager.serializers import KIND_SCENE, dump_file, load_file
+
+SCENE_BINARY_EXT = ".bscene"
+SCENE_JSON_EXT = ".json"
+
+MAGIC = b"DSCB"
+VERSION = 1
+NO_STRING = 0xFFFFFFFF
+
+# magic, version, reserved, node_count, string_count,
+# string_index_offset, string_data_offset, node_table_offset,
+# name_sid, background_color_sid, grid_size, snap_to_grid
+HEADER_FORMAT = "<4sHHIIIIIIIiB3x"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# id_sid, name_sid, node_type_sid, properties_sid,
+# x, y, width, height, first_child, child_count
+NODE_FORMAT = "<IIII4dII"
+NODE_SIZE = struct.calcsize(NODE_FORMAT)
+
+_header_struct = struct.Struct(HEADER_FORMAT)
+_node_struct = struct.Struct(NODE_FORMAT)
+_offset_struct = struct.Struct("<I")
+
+# 正在被懒加载场景映射的文件：规范化路径 -> 读取器
+_mapped_readers: Dict[str, List['BinarySceneReader']] = {}
+_mapped_readers_lock = threading.Lock()
+
+
+def _path_key(file_path: str) -> str:
+    return os.path.normcase(os.path.abspath(file_path))
+
+
+class _StringTable:
+    """字符串驻留表"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._strings: List[bytes] = []
+
+    def intern(self, value: str) -> int:
+        """驻留字符串并返回其编号"""
+        sid = self._ids.get(value)
+        if sid is None:
+            sid = len(self._strings)
+            self._ids[value] = sid
+            self._strings.append(value.encode("utf-8"))
+        return sid
+
+    def encode(self) -> tuple:
+        """编码为 (索引字节, 数据字节)"""
+        offsets = [0]
+        for data in self._strings:
+            offsets.append(offsets[-1] + len(data))
+        index = struct.pack(f"<{len(offsets)}I", *offsets)
+        return index, b"".join(self._strings)
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+
+def _encode_properties(properties: dict) -> Optional[str]:
+    """将节点属性编码为紧凑JSON，空属性返回None"""
+    if not properties:
+        return None
+    return json.dumps(properties, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+def encode_scene(scene_data: dict) -> bytes:
+    """
+    将场景字典编码为二进制格式
+
+    Args:
+        scene_data: Scene.to_dict() 格式的场景字典
+
+    Returns:
+        bytes: 二进制场景数据
+    """
+    strings = _StringTable()
+
+    # 广度优先展开节点，保证兄弟节点连续存放
+    order = [scene_data["root_node"]]
+    first_child = []
+    i = 0
+    while i < len(order):
+        children = order[i].get("children", [])
+        first_child.append(len(order))
+        order.extend(children)
+        i += 1
+
+    records = bytearray(NODE_SIZE * len(order))
+    for index, node in enumerate(order):
+        position = node.get("position", (0.0, 0.0))
+        size = node.get("size", (100.0, 100.0))
+        properties = _encode_properties(node.get("properties"))
+        _node_struct.pack_into(
+            records, index * NODE_SIZE,
+            strings.intern(node["id"]),
+            strings.intern(node["name"]),
+            strings.intern(node["node_type"]),
+            strings.intern(properties) if properties is not None else NO_STRING,
+            float(position[0]), float(position[1]),
+            float(size[0]), float(size[1]),
+            first_child[index],
+            len(node.get("children", []))
+        )
+
+    name_sid = strings.intern(scene_data["name"])
+    background_sid = strings.intern(scene_data.get("background_color", "#1e1e1e"))
+    string_index, string_data = strings.encode()
+
+    string_index_offset = HEADER_SIZE
+    string_data_offset = string_index_offset + len(string_index)
+    # 节点表按8字节对齐，便于mmap读取
+    node_table_offset = (string_data_offset + len(string_data) + 7) & ~7
+    padding = node_table_offset - string_data_offset - len(string_data)
+
+    header = _header_struct.pack(
+        MAGIC, VERSION, 0,
+        len(order), len(strings),
+        string_index_offset, string_data_offset, node_table_offset,
+        name_sid, background_sid,
+        int(scene_data.get("grid_size", 20)),
+        1 if scene_data.get("snap_to_grid", True) else 0
+    )
+    return b"".join((header, string_index, string_data, b"\0" * padding, bytes(records)))
+
+
+def write_binary_scene(file_path: str, scene_data: dict):
+    """
+    写入二进制场景文件
+
+    以原子替换方式写入。映射着旧文件的场景会先被释放，需要在UI线程中调用。
+    """
+    data = encode_scene(scene_data)
+    release_scene_file(file_path)
+    atomic_write(file_path, data)
+
+
+def release_scene_file(file_path: str):
+    """
+    释放映射着场景文件的懒加载场景：加载其余节点后关闭映射
+
+    替换或删除场景文件之前调用。会实例化节点，需要在使用这些场景的UI线程中调用。
+
+    Args:
+        file_path: 场景文件路径
+    """
+    with _mapped_readers_lock:
+        readers = list(_mapped_readers.get(_path_key(file_path), ()))
+    for reader in readers:
+        reader.detach()
+
+
+class LazySceneNode(SceneNode):
+    """
+    按需加载子节点的场景节点
+
+    节点自身字段在创建时从映射文件读取，子节点列表在首次访问
+    children 时才实例化。
+    """
+
+    def __init__(self, reader: 'BinarySceneReader', index: int):
+        (id_sid, name_sid, type_sid, props_sid,
+         x, y, width, height, first_child, child_count) = reader.node_record(index)
+        self._reader: Optional['BinarySceneReader'] = reader
+        self._first_child = first_child
+        self._child_count = child_count
+        self._children: Optional[List[SceneNode]] = None
+        self.id = reader.string(id_sid)
+        self.name = reader.string(name_sid)
+        self.node_type = NodeType[reader.string(type_sid)]
+        self.position = (x, y)
+        self.size = (width, height)
+        self.properties = json.loads(reader.string(props_sid)) if props_sid != NO_STRING else {}
+        reader.track(self)
+
+    def __getstate__(self) -> dict:
+        """复制时先加载子节点，副本不引用映射文件"""
+        self.children
+        state = self.__dict__.copy()
+        state["_reader"] = None
+        return state
+
+    @property
+    def children(self) -> List[SceneNode]:
+        """子节点列表（首次访问时加载）"""
+        if self._children is None:
+            self._children = self._reader.load_nodes(self._first_child, self._child_count)
+        return self._children
+
+    @children.setter
+    def children(self, value: List[SceneNode]):
+        self._children = value
+
+    @property
+    def child_count(self) -> int:
+        """子节点数量，不会触发加载"""
+        if self._children is None:
+            return self._child_count
+        return len(self._children)
+
+    @property
+    def is_loaded(self) -> bool:
+        """子节点是否已经加载"""
+        return self._children is not None
+
+
+class BinarySceneReader:
+    """二进制场景读取器"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._nodes: List[weakref.ref] = []
+        self._registered = False
+        self._file = open(file_path, "rb")
+        try:
+            if os.fstat(self._file.fileno()).st_size < HEADER_SIZE:
+                raise ValueError(f"无效的二进制场景文件: {file_path}")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        (magic, version, _reserved,
+         self.node_count, self.string_count,
+         self._string_index_offset, self._string_data_offset, self._node_table_offset,
+         self._name_sid, self._background_sid,
+         self.grid_size, snap) = _header_struct.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"无效的二进制场景文件: {file_path}")
+        self.snap_to_grid = bool(snap)
+        self._strings: Dict[int, str] = {}
+
+    def __enter__(self) -> 'BinarySceneReader':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        """映射是否已关闭"""
+        return self._map.closed
+
+    def track(self, node: LazySceneNode):
+        """记录由本读取器创建的节点，释放文件时需要加载它们的子节点"""
+        self._nodes.append(weakref.ref(node))
+
+    def string(self, sid: int) -> str:
+        """读取字符串表中的字符串"""
+        value = self._strings.get(sid)
+        if value is None:
+            base = self._string_index_offset + sid * 4
+            start = _offset_struct.unpack_from(self._map, base)[0]
+            end = _offset_struct.unpack_from(self._map, base + 4)[0]
+            offset = self._string_data_offset
+            value = self._map[offset + start:offset + end].decode("utf-8")
+            self._strings[sid] = value
+        return value
+
+    def node_record(self, index: int) -> tuple:
+        """读取节点记录"""
+        return _node_struct.unpack_from(self._map, self._node_table_offset + index * NODE_SIZE)
+
+    def load_nodes(self, start: int, count: int) -> List[SceneNode]:
+        """实例化连续存放的一组节点"""
+        return [LazySceneNode(self, index) for index in range(start, start + count)]
+
+    def load_scene(self) -> Scene:
+        """
+        加载场景（只实例化根节点）
+
+        返回的场景持有本读取器，直到 Scene.close 或 release_scene_file 释放映射文件。
+        """
+        scene = Scene(
+            name=self.string(self._name_sid),
+            root_node=LazySceneNode(self, 0),
+            background_color=self.string(self._background_sid),
+            grid_size=self.grid_size,
+            snap_to_grid=self.snap_to_grid
+        )
+        scene.attach_reader(self)
+        with _mapped_readers_lock:
+            _mapped_readers.setdefault(_path_key(self.file_path), []).append(self)
+            self._registered = True
+        return scene
+
+    def read_scene_dict(self) -> dict:
+        """一次性读取完整场景字典"""
+        nodes = []
+        for index in range(self.node_count):
+            (id_sid, name_sid, type_sid, props_sid,
+             x, y, width, height, first_child, child_count) = self.node_record(index)
+            nodes.append({
+                "id": self.string(id_sid),
+                "name": self.string(name_sid),
+                "node_type": self.string(type_sid),
+                "position": [x, y],
+                "size": [width, height],
+                "properties": json.loads(self.string(props_sid)) if props_sid != NO_STRING else {},
+                "children": (first_child, child_count)
+            })
+        for node in nodes:
+            first_child, child_count = node["children"]
+            node["children"] = nodes[first_child:first_child + child_count]
+        return {
+            "name": self.string(self._name_sid),
+            "root_node": nodes[0],
+            "background_color": self.string(self._background_sid),
+            "grid_size": self.grid_size,
+            "snap_to_grid": self.snap_to_grid
+        }
+
+    def detach(self):
+        """加载所有节点尚未加载的子节点并关闭映射，之后节点不再依赖该文件"""
+        if self.closed:
+            return
+        # 加载子节点会创建新节点并追加到列表末尾，按下标遍历直到没有新节点
+        i = 0
+        while i < len(self._nodes):
+            node = self._nodes[i]()
+            i += 1
+            if node is not None:
+                node.children
+                node._reader = None
+        self.close()
+
+    def close(self):
+        """关闭映射文件，未加载的子节点之后无法再加载"""
+        if self._registered:
+            with _mapped_readers_lock:
+                key = _path_key(self.file_path)
+                readers = _mapped_readers.get(key, [])
+                if self in readers:
+                    readers.remove(self)
+                if not readers:
+                    _mapped_readers.pop(key, None)
+                self._registered = False
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+        self._nodes = []
+
+
+def load_binary_scene(file_path: str) -> Scene:
+    """以懒加载方式打开二进制场景文件，场景不再使用时调用 Scene.close 关闭文件"""
+    reader = BinarySceneReader(file_path)
+    try:
+        return reader.load_scene()
+    except Exception:
+        reader.close()
+        raise
+
+
+def convert_json_to_binary(json_path: str, binary_path: Optional[str] = None) -> str:
+    """
+    将JSON场景文件转换为二进制格式
+
+    Args:
+        json_path: JSON场景文件路径
+        binary_path: 输出路径，默认与输入同名
+
+    Returns:
+        str: 输出文件路径
+    """
+    if binary_path is None:
+        binary_path = os.path.splitext(json_path)[0] + SCENE_BINARY_EXT
+    scene_data = load_file(json_path)
+    write_binary_scene(binary_path, scene_data)
+    return binary_path
+
+
+def convert_binary_to_json(binary_path: str, json_path: Optional[str] = None) -> str:
+    """
+    将二进制场景文件转换为JSON格式
+
+    Args:
+        binary_path: 二进制场景文件路径
+        json_path: 输出路径，默认与输入同名
+
+    Returns:
+        str: 输出文件路径
+    """
+    if json_path is None:
+        json_path = os.path.splitext(binary_path)[0] + SCENE_JSON_EXT
+    with BinarySceneReader(binary_path) as reader:
+        scene_data = reader.read_scene_dict()
+    dump_file(json_path, scene_data, KIND_SCENE)
+    return json_path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行转换工具"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="场景文件格式转换")
+    parser.add_argument("mode", choices=["to-binary", "to-json"], help="转换方向")
+    parser.add_argument("source", help="输入文件")
+    parser.add_argument("target", nargs="?", help="输出文件")
+    args = parser.parse_args(argv)
+
+    if args.mode == "to-binary":
+        output = convert_json_to_binary(args.source, args.target)
+    else:
+        output = convert_binary_to_json(args.source, args.target)
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -94,26 +94,7 @@ class SceneEditorPanel(QWidget):
     def create_toolbar(self) -> QToolBar:
         """创建工具栏"""
         toolbar = QToolBar()
-        toolbar.setStyleSheet("""
-            QToolBar {
-                background-color: #2d2d2d;
-                border: none;
-                spacing: 4px;
-                padding: 4px;
-            }
-            QToolButton {
-                background-color: transparent;
-                border: none;
-                padding: 4px;
-                color: #ffffff;
-            }
-            QToolButton:hover {
-                background-color: #3d3d3d;
-            }
-            QToolButton:pressed {
-                background-color: #1e1e1e;
-            }
-        """)
+        toolbar.setObjectName("PanelToolBar")
         
         # 添加工具按钮
         select_button = QPushButton("选择")
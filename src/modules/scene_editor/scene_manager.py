@@ -0,0 +1,398 @@
+"""
+Scene Manager Module
+场景管理模块
+
+This module keeps recently used scenes, and optionally their graphics items, in an
+LRU cache bounded by an approximate memory budget. Dirty scenes are saved before
+they are evicted.
+此模块用LRU缓存保存最近使用的场景（以及可选的图形项），缓存总量受近似内存预算限制。
+被淘汰的场景如有未保存的修改会先保存。
+"""
+
+import logging
+import os
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .api import SceneEditorAPI, Scene
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+# 近似内存开销（字节），只用于缓存淘汰判断
+NODE_BASE_BYTES = 640
+GRAPHICS_ITEM_BYTES = 1024
+
+
+@dataclass
+class _CacheEntry:
+    """缓存项"""
+    scene: Scene
+    size: int = 0
+    dirty: bool = False
+    generation: int = 0
+    graphics: Any = None
+    graphics_size: int = 0
+
+
+def estimate_scene_size(scene: Scene) -> int:
+    """
+    估算场景占用的内存
+
+    只统计已实例化的节点，二进制场景中尚未加载的子树不计入。
+    """
+    size = sys.getsizeof(scene.name) + NODE_BASE_BYTES
+    stack = [scene.root_node]
+    while stack:
+        node = stack.pop()
+        size += NODE_BASE_BYTES + len(node.id) + len(node.name)
+        for key, value in node.properties.items():
+            size += len(key) + (len(value) if isinstance(value, str) else 16)
+        if getattr(node, "is_loaded", True):
+            stack.extend(node.children)
+    return size
+
+
+def estimate_graphics_size(graphics: Any) -> int:
+    """估算图形项占用的内存"""
+    if graphics is None:
+        return 0
+    if hasattr(graphics, "items"):
+        return len(graphics.items()) * GRAPHICS_ITEM_BYTES
+    if isinstance(graphics, (list, tuple)):
+        return len(graphics) * GRAPHICS_ITEM_BYTES
+    return GRAPHICS_ITEM_BYTES
+
+
+class SceneManager:
+    """场景管理器类"""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls) -> 'SceneManager':
+        """获取单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        if SceneManager._instance is not None:
+            raise Exception("This class is a singleton!")
+        SceneManager._instance = self
+        self.memory_budget = memory_budget
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._total_size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._saves = 0
+        self._edit_generation = 0
+        self._pending_saves: Dict[str, tuple] = {}   # 场景文件 -> (场景名称, 修改编号)
+        self._save_signal_connected = False
+        self.scene_evicted_callbacks = []
+
+        api = SceneEditorAPI.get_instance()
+        api.register_scene_changed_callback(self._on_scene_changed)
+        
+        from ..file_manager.project_watcher import ProjectWatcher
+        ProjectWatcher.get_instance().files_changed.connect(self._on_files_changed)
+
+    # ------------------------------------------------------------------
+    # 场景
+    # ------------------------------------------------------------------
+
+    def get_scene(self, name: str) -> Optional[Scene]:
+        """
+        获取场景，缓存未命中时从磁盘加载
+
+        Args:
+            name: 场景名称
+
+        Returns:
+            Optional[Scene]: 场景对象，加载失败返回None
+        """
+        entry = self._entries.get(name)
+        if entry is not None:
+            self._hits += 1
+            self._entries.move_to_end(name)
+            return entry.scene
+
+        self._misses += 1
+        scene = SceneEditorAPI.load_scene(name)
+        if scene:
+            self.put(scene)
+        return scene
+
+    def open_scene(self, name: str) -> Optional[Scene]:
+        """获取场景并设为场景编辑器的当前场景"""
+        api = SceneEditorAPI.get_instance()
+        previous = api.current_scene
+        scene = self.get_scene(name)
+        if scene is None:
+            return None
+        # 离开的场景可能已被编辑，切换时重新估算大小
+        if previous is not None and previous is not scene:
+            self._refresh_size(previous.name)
+        api.current_scene = scene
+        return scene
+
+    def put(self, scene: Scene, dirty: bool = False):
+        """将场景放入缓存"""
+        entry = self._entries.get(scene.name)
+        if entry is not None and entry.scene is not scene:
+            self._drop(scene.name)
+            entry = None
+        if entry is None:
+            entry = _CacheEntry(scene=scene)
+            self._entries[scene.name] = entry
+            self._set_size(entry, estimate_scene_size(scene))
+        if dirty:
+            self._touch(entry)
+        self._entries.move_to_end(scene.name)
+        self._evict()
+
+    def contains(self, name: str) -> bool:
+        """场景是否在缓存中"""
+        return name in self._entries
+
+    def mark_dirty(self, name: str):
+        """标记场景有未保存的修改"""
+        entry = self._entries.get(name)
+        if entry is not None:
+            self._touch(entry)
+
+    def edit_generation(self, name: str) -> int:
+        """
+        场景最近一次修改的编号，保存时在生成快照前记录
+
+        Args:
+            name: 场景名称
+
+        Returns:
+            int: 修改编号，场景不在缓存中时返回0
+        """
+        entry = self._entries.get(name)
+        return entry.generation if entry else 0
+
+    def mark_saved(self, name: str, generation: Optional[int] = None):
+        """
+        标记场景已保存
+
+        Args:
+            name: 场景名称
+            generation: 保存快照对应的修改编号，快照之后又有修改时场景仍然是未保存状态；
+                None表示场景当前的内容已经保存
+        """
+        entry = self._entries.get(name)
+        if entry is not None and (generation is None or generation == entry.generation):
+            entry.dirty = False
+
+    def is_dirty(self, name: str) -> bool:
+        """场景是否有未保存的修改"""
+        entry = self._entries.get(name)
+        return entry.dirty if entry else False
+
+    def remove(self, name: str, save: bool = True) -> bool:
+        """
+        从缓存中移除场景
+
+        Args:
+            name: 场景名称
+            save: 场景有未保存的修改时是否先保存
+
+        Returns:
+            bool: 是否已移除；场景不在缓存中，或需要保存但无法提交保存时返回False
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            return False
+        if save and entry.dirty and not self._save(entry):
+            return False
+        self._drop(name)
+        return True
+
+    def clear(self, save: bool = True):
+        """清空缓存"""
+        for name in list(self._entries):
+            self.remove(name, save)
+
+    # ------------------------------------------------------------------
+    # 图形项
+    # ------------------------------------------------------------------
+
+    def set_graphics(self, name: str, graphics: Any, size: Optional[int] = None):
+        """
+        缓存场景已经构建的图形项
+
+        Args:
+            name: 场景名称，场景必须已在缓存中
+            graphics: 图形项（例如 QGraphicsScene）
+            size: 占用内存，默认按图形项数量估算
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            return
+        entry.graphics = graphics
+        self._total_size -= entry.graphics_size
+        entry.graphics_size = estimate_graphics_size(graphics) if size is None else size
+        self._total_size += entry.graphics_size
+        self._evict()
+
+    def get_graphics(self, name: str) -> Any:
+        """获取缓存的图形项"""
+        entry = self._entries.get(name)
+        return entry.graphics if entry else None
+
+    # ------------------------------------------------------------------
+    # 统计与配置
+    # ------------------------------------------------------------------
+
+    def set_memory_budget(self, memory_budget: int):
+        """设置内存预算（字节）"""
+        self.memory_budget = memory_budget
+        self._evict()
+
+    def cached_scenes(self) -> List[str]:
+        """缓存中的场景，按最近使用从旧到新排列"""
+        return list(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        lookups = self._hits + self._misses
+        return {
+            "scenes": len(self._entries),
+            "size": self._total_size,
+            "memory_budget": self.memory_budget,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "evictions": self._evictions,
+            "saves": self._saves
+        }
+
+    def reset_stats(self):
+        """重置命中统计"""
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._saves = 0
+
+    def register_scene_evicted_callback(self, callback):
+        """注册场景淘汰回调，callback(scene_name)"""
+        self.scene_evicted_callbacks.append(callback)
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    def _on_scene_changed(self):
+        """当前场景被编辑"""
+        scene = SceneEditorAPI.get_instance().current_scene
+        if scene is None:
+            return
+        if scene.name in self._entries:
+            self.mark_dirty(scene.name)
+        else:
+            self.put(scene, dirty=True)
+
+    def _on_files_changed(self, events: list):
+        """场景文件被外部修改或删除时，丢弃没有未保存修改的缓存"""
+        from .scene_binary import SCENE_BINARY_EXT, SCENE_JSON_EXT
+        
+        current = SceneEditorAPI.get_instance().current_scene
+        for event, path in events:
+            name, ext = os.path.splitext(os.path.basename(path))
+            if ext not in (SCENE_BINARY_EXT, SCENE_JSON_EXT):
+                continue
+            if os.path.basename(os.path.dirname(path)) != "scenes":
+                continue
+            entry = self._entries.get(name)
+            if entry is not None and not entry.dirty and entry.scene is not current:
+                self._drop(name)
+
+    def _touch(self, entry: _CacheEntry):
+        """记录一次修改，修改编号全局递增，重新放入缓存的场景不会与旧编号混淆"""
+        self._edit_generation += 1
+        entry.generation = self._edit_generation
+        entry.dirty = True
+
+    def _refresh_size(self, name: str):
+        """重新估算场景大小"""
+        entry = self._entries.get(name)
+        if entry is not None:
+            self._set_size(entry, estimate_scene_size(entry.scene))
+            self._evict()
+
+    def _set_size(self, entry: _CacheEntry, size: int):
+        """更新缓存项大小"""
+        self._total_size += size - entry.size
+        entry.size = size
+
+    def _evict(self):
+        """超出内存预算时淘汰最久未使用的场景，当前场景不会被淘汰"""
+        current = SceneEditorAPI.get_instance().current_scene
+        for name in list(self._entries):
+            if self._total_size <= self.memory_budget or len(self._entries) <= 1:
+                break
+            entry = self._entries[name]
+            if entry.scene is current:
+                continue
+            # 无法提交保存时保留场景，未保存的修改不会随淘汰丢失
+            if entry.dirty and not self._save(entry):
+                continue
+            self._drop(name)
+            self._evictions += 1
+            for callback in self.scene_evicted_callbacks:
+                callback(name)
+
+    def _save(self, entry: _CacheEntry) -> bool:
+        """
+        保存场景，在后台写入文件
+
+        场景在保存完成后才标记为已保存，见 _on_save_finished。
+
+        Returns:
+            bool: 是否已提交保存
+        """
+        from ..file_manager.save_service import SaveService
+
+        service = SaveService.get_instance()
+        if not self._save_signal_connected:
+            service.save_finished.connect(self._on_save_finished)
+            self._save_signal_connected = True
+        name = entry.scene.name
+        # 修改编号在生成快照前记录，保存期间的修改不会被当作已保存
+        generation = entry.generation
+        scene_file = service.save_scene(entry.scene)
+        if not scene_file:
+            logger.error("无法提交场景保存，场景保留在缓存中: %s", name)
+            return False
+        self._pending_saves[scene_file] = (name, generation)
+        self._saves += 1
+        return True
+
+    def _on_save_finished(self, file_path: str, success: bool, error: str):
+        """后台保存场景完成"""
+        pending = self._pending_saves.pop(file_path, None)
+        if pending is None:
+            return
+        name, generation = pending
+        if success:
+            self.mark_saved(name, generation)
+        else:
+            logger.error("保存场景失败: %s, %s", name, error)
+
+    def _drop(self, name: str):
+        """移除缓存项，释放图形项并关闭场景映射的文件"""
+        entry = self._entries.pop(name)
+        # 仍是当前场景时先加载全部节点，否则场景已不再使用
+        entry.scene.close(load_nodes=entry.scene is SceneEditorAPI.get_instance().current_scene)
+        self._total_size -= entry.size + entry.graphics_size
+        graphics = entry.graphics
+        entry.graphics = None
+        if graphics is not None and hasattr(graphics, "deleteLater"):
+            graphics.deleteLater()
@@ -39,42 +39,7 @@ class ScenePanel(QWidget):
     def create_toolbar(self) -> QToolBar:
         """Create the toolbar."""
         toolbar = QToolBar()
-        toolbar.setStyleSheet("""
-            QToolBar {
-                background-color: #2d2d2d;
-                border: none;
-                spacing: 4px;
-                padding: 4px;
-            }
-            QToolButton {
-                background-color: transparent;
-                border: none;
-                padding: 4px;
-                color: #ffffff;
-            }
-            QToolButton:hover {
-                background-color: #3d3d3d;
-            }
-            QToolButton:pressed {
-                background-color: #1e1e1e;
-            }
-            QComboBox {
-                background-color: #3d3d3d;
-                border: 1px solid #4d4d4d;
-                border-radius: 3px;
-                color: #ffffff;
-                padding: 4px;
-                min-width: 100px;
-            }
-            QComboBox::drop-down {
-                border: none;
-            }
-            QComboBox::down-arrow {
-                image: url(down_arrow.png);
-                width: 12px;
-                height: 12px;
-            }
-        """)
+        toolbar.setObjectName("PanelToolBar")
         
         # 节点类型选择
         self.node_type_combo = QComboBox()
@@ -0,0 +1,306 @@
+"""
+Scene Tree Model
+场景树模型
+
+This module provides a lazy QAbstractItemModel backed directly by the scene tree.
+Children are populated in batches through canFetchMore/fetchMore, and node edits
+reported by SceneEditorAPI are applied as single-row inserts, removals and updates.
+此模块提供直接基于场景树的懒加载数据模型。子节点通过 canFetchMore/fetchMore 分批加入，
+SceneEditorAPI 通知的节点修改只会插入、删除或刷新对应的一行。
+"""
+
+from typing import Any, Dict, List, Optional
+
+from PyQt6.QtCore import QAbstractItemModel, QModelIndex, Qt
+
+from .api import SceneEditorAPI, Scene, SceneNode
+from ..profiler.api import timed
+
+
+class SceneTreeModel(QAbstractItemModel):
+    """
+    场景树模型
+
+    顶层只有一行，代表场景本身（对应根节点），其下是根节点的子节点。
+    模型不复制节点数据，索引的 internalPointer 就是 SceneNode 对象。
+    """
+
+    FETCH_BATCH_SIZE = 256
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._scene: Optional[Scene] = None
+        self._root: Optional[SceneNode] = None
+        self._fetched: Dict[int, int] = {}           # id(节点) -> 已加入模型的子节点数
+        self._children: Dict[int, List[SceneNode]] = {}  # id(节点) -> 已加入模型的子节点所在列表
+        self._parents: Dict[int, SceneNode] = {}     # id(节点) -> 父节点
+        self._rows: Dict[int, Dict[int, int]] = {}   # id(父节点) -> {id(子节点): 行号}
+        self._changing = False                       # 正在插入或删除行
+        self._removing = None                        # 正在删除的 (父节点, 行号, 节点)
+
+        api = SceneEditorAPI.get_instance()
+        api.register_node_added_callback(self._on_node_added)
+        api.register_node_removed_callback(self._on_node_removed)
+        api.register_node_updated_callback(self._on_node_updated)
+        self._callbacks = [(api.node_added_callbacks, self._on_node_added),
+                           (api.node_removed_callbacks, self._on_node_removed),
+                           (api.node_updated_callbacks, self._on_node_updated)]
+        # destroyed 发出时 PyQt 已不再调用本对象的槽，用不引用模型的闭包移除回调
+        callbacks = self._callbacks
+        self.destroyed.connect(lambda: SceneTreeModel._remove_callbacks(callbacks))
+
+    def detach(self):
+        """停止接收场景编辑器的节点修改通知"""
+        self._remove_callbacks(self._callbacks)
+
+    @staticmethod
+    def _remove_callbacks(callbacks: list):
+        """从 API 的回调列表中移除已注册的回调"""
+        while callbacks:
+            registered, callback = callbacks.pop()
+            if callback in registered:
+                registered.remove(callback)
+
+    @timed("scene_tree.set_scene")
+    def set_scene(self, scene: Optional[Scene]):
+        """设置要显示的场景"""
+        self.beginResetModel()
+        self._scene = scene
+        self._root = scene.root_node if scene else None
+        self._fetched.clear()
+        self._children.clear()
+        self._parents.clear()
+        self._rows.clear()
+        self.endResetModel()
+
+    def scene(self) -> Optional[Scene]:
+        """当前场景"""
+        return self._scene
+
+    def node_from_index(self, index: QModelIndex) -> Optional[SceneNode]:
+        """获取索引对应的节点"""
+        if not index.isValid():
+            return None
+        return index.internalPointer()
+
+    def index_for_node(self, node: SceneNode) -> QModelIndex:
+        """获取节点的索引，节点尚未加入模型时返回无效索引"""
+        if node is self._root:
+            return self.createIndex(0, 0, node)
+        parent = self._parents.get(id(node))
+        if parent is None:
+            return QModelIndex()
+        row = self._row_of(parent, node)
+        if row is None:
+            return QModelIndex()
+        return self.createIndex(row, 0, node)
+
+    # ------------------------------------------------------------------
+    # QAbstractItemModel 接口
+    # ------------------------------------------------------------------
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if column != 0 or row < 0:
+            return QModelIndex()
+        if not parent.isValid():
+            if self._root is not None and row == 0:
+                return self.createIndex(0, 0, self._root)
+            return QModelIndex()
+        parent_node = parent.internalPointer()
+        if row >= self._fetched.get(id(parent_node), 0):
+            return QModelIndex()
+        if self._removing and self._removing[0] is parent_node:
+            # 节点已从场景树删除但行尚未移除，按删除前的行号返回
+            _, removed_row, removed_node = self._removing
+            if row == removed_row:
+                return self.createIndex(row, 0, removed_node)
+            if row > removed_row:
+                return self.createIndex(row, 0, self._children[id(parent_node)][row - 1])
+        children = self._children[id(parent_node)]
+        if row >= len(children):
+            return QModelIndex()
+        return self.createIndex(row, 0, children[row])
+
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+        node = index.internalPointer()
+        if node is self._root:
+            return QModelIndex()
+        parent = self._parents.get(id(node))
+        if parent is None:
+            return QModelIndex()
+        return self.index_for_node(parent)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if not parent.isValid():
+            return 1 if self._root is not None else 0
+        return self._fetched.get(id(parent.internalPointer()), 0)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if not parent.isValid():
+            return self._root is not None
+        # child_count 不会触发二进制场景的子节点加载；
+        # 删除行的过程中场景树已经修改，已加载的行仍然算作子节点
+        node = parent.internalPointer()
+        return self._fetched.get(id(node), 0) > 0 or node.child_count > 0
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        if not parent.isValid():
+            return False
+        if self._changing:
+            # 场景树已经修改而模型尚未更新，此时不能按子节点数加载
+            return False
+        node = parent.internalPointer()
+        return self._fetched.get(id(node), 0) < node.child_count
+
+    def fetchMore(self, parent: QModelIndex):
+        if not parent.isValid():
+            return
+        node = parent.internalPointer()
+        start = self._fetched.get(id(node), 0)
+        end = min(node.child_count, start + self.FETCH_BATCH_SIZE)
+        if end <= start:
+            return
+        self.beginInsertRows(parent, start, end - 1)
+        children = self._children.setdefault(id(node), node.children)
+        rows = self._rows.get(id(node)) if start else self._rows.setdefault(id(node), {})
+        for row in range(start, end):
+            child = children[row]
+            self._parents[id(child)] = node
+            if rows is not None:
+                rows[id(child)] = row
+        self._fetched[id(node)] = end
+        self.endInsertRows()
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if node is self._root:
+                return self._scene.name
+            return node.name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{node.node_type.name} ({node.id})"
+        if role == Qt.ItemDataRole.UserRole:
+            return self._scene if node is self._root else node
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return "场景节点"
+        return None
+
+    # ------------------------------------------------------------------
+    # 场景修改通知
+    # ------------------------------------------------------------------
+
+    def _on_node_added(self, parent: SceneNode, row: int, node: SceneNode):
+        """节点添加后插入一行"""
+        if not self._is_in_model(parent):
+            return
+        fetched = self._fetched.get(id(parent), 0)
+        # 父节点的子节点尚未加载到新行之前时，留给 fetchMore 处理；
+        # 原本没有子节点的父节点直接插入，视图无需重新查询展开状态
+        if row > fetched or (fetched == 0 and parent.child_count > 1):
+            return
+        parent_index = self.index_for_node(parent)
+        self._changing = True
+        # beginInsertRows 期间视图会查询父节点和行号，此时模型仍按插入前的行数回答，
+        # 行号缓存在行数更新之后再更新
+        self.beginInsertRows(parent_index, row, row)
+        self._children.setdefault(id(parent), parent.children)
+        self._parents[id(node)] = parent
+        self._fetched[id(parent)] = fetched + 1
+        self._renumber_rows(parent, row)
+        self.endInsertRows()
+        self._changing = False
+
+    def _on_node_removed(self, parent: SceneNode, row: int, node: SceneNode):
+        """节点删除后移除一行"""
+        if not self._is_in_model(parent):
+            return
+        fetched = self._fetched.get(id(parent), 0)
+        if row >= fetched:
+            return
+        parent_index = self.index_for_node(parent)
+        self._changing = True
+        self._removing = (parent, row, node)
+        self.beginRemoveRows(parent_index, row, row)
+        self._removing = None
+        self._fetched[id(parent)] = fetched - 1
+        rows = self._rows.get(id(parent))
+        if rows is not None:
+            rows.pop(id(node), None)
+        self._renumber_rows(parent, row)
+        self._forget_subtree(node)
+        self.endRemoveRows()
+        self._changing = False
+
+    def _on_node_updated(self, node: SceneNode, fields: dict):
+        """节点修改后刷新对应的一行"""
+        if not self._is_in_model(node):
+            return
+        index = self.index_for_node(node)
+        if "children" in fields:
+            # 子节点列表被整体替换，清空已加载的子行，展开时重新加载；
+            # beginRemoveRows 期间仍按保存的旧列表回答查询
+            fetched = self._fetched.get(id(node), 0)
+            if fetched:
+                self._changing = True
+                self.beginRemoveRows(index, 0, fetched - 1)
+                old_children = self._children.pop(id(node))
+                self._fetched.pop(id(node), None)
+                self._rows.pop(id(node), None)
+                for child in old_children[:fetched]:
+                    self._forget_subtree(child)
+                self.endRemoveRows()
+                self._changing = False
+        if index.isValid():
+            self.dataChanged.emit(index, index)
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    def _is_in_model(self, node: SceneNode) -> bool:
+        """节点是否已在模型中"""
+        return node is self._root or id(node) in self._parents
+
+    def _row_of(self, parent: SceneNode, node: SceneNode) -> Optional[int]:
+        """节点在父节点下的行号，插入或删除后按需重建"""
+        rows = self._rows.get(id(parent))
+        if rows is None:
+            children = self._children.get(id(parent), [])
+            if self._removing and self._removing[0] is parent:
+                _, removed_row, removed_node = self._removing
+                children = children[:removed_row] + [removed_node] + children[removed_row:]
+            fetched = self._fetched.get(id(parent), 0)
+            rows = {id(child): row for row, child in enumerate(children[:fetched])}
+            self._rows[id(parent)] = rows
+        return rows.get(id(node))
+
+    def _renumber_rows(self, parent: SceneNode, start: int):
+        """插入或删除一行后，只更新行号缓存中从 start 开始受影响的行"""
+        rows = self._rows.get(id(parent))
+        if rows is None:
+            return
+        children = self._children[id(parent)]
+        for row in range(start, self._fetched.get(id(parent), 0)):
+            rows[id(children[row])] = row
+
+    def _forget_subtree(self, node: SceneNode):
+        """移除已删除子树的记录"""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self._parents.pop(id(current), None)
+            fetched = self._fetched.pop(id(current), 0)
+            children = self._children.pop(id(current), [])
+            self._rows.pop(id(current), None)
+            stack.extend(children[:fetched])
@@ -0,0 +1,484 @@
+"""
+Search Index Module
+搜索索引模块
+
+This module maintains a persistent, project-wide search index over the nodes of every
+scene in scenes/. Node names, node types and property keys/values are kept in inverted
+indexes, so queries such as "every BUTTON whose text property contains X" do not have
+to open and walk each scene.
+此模块为 scenes/ 下所有场景的节点维护持久化的项目级搜索索引。节点名称、节点类型、
+属性键和属性值都建立了倒排索引，查询时无需逐个打开并遍历场景。
+
+索引保存在 <项目目录>/.index/search_index.json 中，打开项目和监视到场景文件变化时按修改时间增量更新；
+编辑器中的修改通过场景修改通知实时更新到内存中的索引，这些场景不会再被磁盘上的文件覆盖。
+查询只读取内存中的索引，索引文件在打开项目、切换项目和退出程序时保存。
+"""
+
+import logging
+import os
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .api import SceneEditorAPI, Scene, SceneNode
+from ..file_manager.serializers import load_file
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = ".index"
+INDEX_FILE_NAME = "search_index.json"
+INDEX_VERSION = 1
+GRAM_SIZE = 3
+SCENE_EXTENSIONS = (".bscene", ".json")
+
+
+@dataclass
+class SearchResult:
+    """搜索结果"""
+    scene: str
+    node_id: str
+    name: str
+    node_type: str
+
+
+def _grams(text: str) -> Set[str]:
+    """文本的三元组（小写）"""
+    text = text.lower()
+    if len(text) < GRAM_SIZE:
+        return set()
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+def _property_text(value: Any) -> str:
+    """属性值用于搜索的文本"""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+class _GramIndex:
+    """三元组倒排索引，用于大小写不敏感的子串查询"""
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+
+    def add(self, doc: int, texts: Iterable[str]):
+        postings = self._postings
+        for text in texts:
+            text = text.lower()
+            for i in range(len(text) - GRAM_SIZE + 1):
+                docs = postings.get(text[i:i + GRAM_SIZE])
+                if docs is None:
+                    postings[text[i:i + GRAM_SIZE]] = {doc}
+                else:
+                    docs.add(doc)
+
+    def remove(self, doc: int, texts: Iterable[str]):
+        grams = set()
+        for text in texts:
+            grams |= _grams(text)
+        for gram in grams:
+            docs = self._postings.get(gram)
+            if docs is not None:
+                docs.discard(doc)
+                if not docs:
+                    del self._postings[gram]
+
+    def candidates(self, query: str) -> Optional[Set[int]]:
+        """
+        可能包含查询子串的文档
+
+        Returns:
+            Optional[Set[int]]: 候选文档，查询过短无法缩小范围时返回None
+        """
+        grams = _grams(query)
+        if not grams:
+            return None
+        result = None
+        # 从最短的倒排表开始求交集
+        for gram in sorted(grams, key=lambda g: len(self._postings.get(g, ()))):
+            docs = self._postings.get(gram)
+            if not docs:
+                return set()
+            result = set(docs) if result is None else result & docs
+            if not result:
+                break
+        return result
+
+
+class _KeyIndex:
+    """精确值倒排索引"""
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+
+    def add(self, doc: int, keys: Iterable[str]):
+        for key in keys:
+            self._postings.setdefault(key, set()).add(doc)
+
+    def remove(self, doc: int, keys: Iterable[str]):
+        for key in keys:
+            docs = self._postings.get(key)
+            if docs is not None:
+                docs.discard(doc)
+                if not docs:
+                    del self._postings[key]
+
+    def get(self, key: str) -> Set[int]:
+        return self._postings.get(key, set())
+
+
+class SceneSearchIndex:
+    """
+    项目级场景节点搜索索引
+
+    每个节点是一个文档，文档内容为 (场景名, 节点ID, 名称, 类型, {属性键: 属性文本})。
+    """
+
+    def __init__(self, project_dir: str):
+        self.project_dir = project_dir
+        self.scenes_dir = os.path.join(project_dir, "scenes")
+        self.index_path = os.path.join(project_dir, INDEX_DIR, INDEX_FILE_NAME)
+        self._docs: Dict[int, Tuple[str, str, str, str, Dict[str, str]]] = {}
+        self._doc_ids: Dict[Tuple[str, str], int] = {}
+        self._scene_docs: Dict[str, Set[int]] = {}
+        self._scene_mtimes: Dict[str, float] = {}
+        self._modified_scenes: Set[str] = set()     # 在编辑器中修改过的场景，以内存中的内容为准
+        self._next_doc = 0
+        self._names = _GramIndex()
+        self._values = _GramIndex()
+        self._types = _KeyIndex()
+        self._keys = _KeyIndex()
+        self._dirty = False
+        self._api: Optional[SceneEditorAPI] = None
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+
+    def open(self) -> 'SceneSearchIndex':
+        """加载持久化索引并按文件修改时间增量更新"""
+        self.load()
+        self.refresh()
+        self.save()
+        return self
+
+    def attach(self, api: SceneEditorAPI):
+        """接收场景编辑器的节点修改通知"""
+        self.detach()
+        self._api = api
+        api.register_node_added_callback(self._on_node_added)
+        api.register_node_removed_callback(self._on_node_removed)
+        api.register_node_updated_callback(self._on_node_updated)
+        
+        from ..file_manager.project_watcher import ProjectWatcher
+        ProjectWatcher.get_instance().files_changed.connect(self._on_files_changed)
+
+    def detach(self):
+        """停止接收节点修改通知"""
+        api = self._api
+        if api is None:
+            return
+        for callbacks, callback in ((api.node_added_callbacks, self._on_node_added),
+                                    (api.node_removed_callbacks, self._on_node_removed),
+                                    (api.node_updated_callbacks, self._on_node_updated)):
+            if callback in callbacks:
+                callbacks.remove(callback)
+        self._api = None
+        
+        from ..file_manager.project_watcher import ProjectWatcher
+        try:
+            ProjectWatcher.get_instance().files_changed.disconnect(self._on_files_changed)
+        except TypeError:
+            pass
+
+    def load(self) -> bool:
+        """加载持久化索引"""
+        if not os.path.exists(self.index_path):
+            return False
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                return False
+            for scene_name, scene in data.get("scenes", {}).items():
+                self._remove_scene(scene_name)
+                for node_id, name, node_type, properties in scene["nodes"]:
+                    self._add_doc(scene_name, node_id, name, node_type, properties)
+                self._scene_mtimes[scene_name] = scene["mtime"]
+            self._dirty = False
+            return True
+        except Exception as e:
+            logger.error("加载搜索索引失败: %s", e)
+            return False
+
+    def save(self) -> bool:
+        """保存索引"""
+        from ..file_manager.atomic_writer import atomic_write_json
+
+        if not self._dirty:
+            return True
+        try:
+            scenes = {}
+            for scene_name, docs in self._scene_docs.items():
+                scenes[scene_name] = {
+                    "mtime": self._scene_mtimes.get(scene_name, 0),
+                    "nodes": [
+                        [self._docs[doc][1], self._docs[doc][2], self._docs[doc][3], self._docs[doc][4]]
+                        for doc in sorted(docs)
+                    ]
+                }
+            atomic_write_json(self.index_path, {"version": INDEX_VERSION, "scenes": scenes}, indent=None)
+            self._dirty = False
+            return True
+        except Exception as e:
+            logger.error("保存搜索索引失败: %s", e)
+            return False
+
+    def refresh(self) -> int:
+        """
+        按场景文件修改时间增量更新索引
+
+        在编辑器中修改过的场景以内存中的索引为准，不会重新读取文件。更新只修改内存中的索引，
+        需要持久化时调用 save。
+
+        Returns:
+            int: 重新索引的场景数
+        """
+        files = self._scan_scene_files()
+        updated = 0
+        for scene_name in list(self._scene_docs):
+            if scene_name not in files and scene_name not in self._modified_scenes:
+                self._remove_scene(scene_name)
+                self._scene_mtimes.pop(scene_name, None)
+                self._dirty = True
+        for scene_name, (path, mtime) in files.items():
+            if scene_name in self._modified_scenes or self._scene_mtimes.get(scene_name) == mtime:
+                continue
+            scene_data = self._read_scene_file(path)
+            if scene_data is None:
+                continue
+            self.index_scene_dict(scene_data, scene_name)
+            self._scene_mtimes[scene_name] = mtime
+            updated += 1
+        return updated
+
+    # ------------------------------------------------------------------
+    # 建立索引
+    # ------------------------------------------------------------------
+
+    def index_scene_dict(self, scene_data: dict, scene_name: Optional[str] = None):
+        """为场景字典建立索引，替换该场景原有的条目"""
+        scene_name = scene_name or scene_data["name"]
+        self._remove_scene(scene_name)
+        stack = [scene_data["root_node"]]
+        while stack:
+            node = stack.pop()
+            self._add_doc(scene_name, node["id"], node["name"], node["node_type"],
+                          node.get("properties") or {})
+            stack.extend(node.get("children", []))
+        self._dirty = True
+
+    def index_scene(self, scene: Scene):
+        """为内存中的场景建立索引"""
+        self._remove_scene(scene.name)
+        self._index_subtree(scene.name, scene.root_node)
+        self._mark_scene_modified(scene.name)
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def search(self, name: Optional[str] = None, node_type: Optional[str] = None,
+               prop_key: Optional[str] = None, prop_value: Optional[str] = None,
+               scene: Optional[str] = None, limit: Optional[int] = None) -> List[SearchResult]:
+        """
+        搜索节点，所有条件同时满足
+
+        Args:
+            name: 名称包含的子串（不区分大小写）
+            node_type: 节点类型名称，例如 "BUTTON"
+            prop_key: 具有的属性键
+            prop_value: 属性值包含的子串（不区分大小写），指定 prop_key 时只匹配该属性
+            scene: 只搜索指定场景
+            limit: 最多返回的结果数
+
+        Returns:
+            List[SearchResult]: 搜索结果
+        """
+        candidates: Optional[Set[int]] = None
+
+        def narrow(docs: Optional[Set[int]]):
+            nonlocal candidates
+            if docs is None:
+                return
+            candidates = set(docs) if candidates is None else candidates & docs
+
+        if scene is not None:
+            narrow(self._scene_docs.get(scene, set()))
+        if node_type is not None:
+            narrow(self._types.get(node_type))
+        if prop_key is not None:
+            narrow(self._keys.get(prop_key))
+        if name:
+            narrow(self._names.candidates(name))
+        if prop_value:
+            narrow(self._values.candidates(prop_value))
+        if candidates is None:
+            candidates = set(self._docs)
+
+        name_query = name.lower() if name else None
+        value_query = prop_value.lower() if prop_value else None
+        results = []
+        for doc in sorted(candidates):
+            scene_name, node_id, node_name, doc_type, properties = self._docs[doc]
+            # 倒排索引只给出候选，逐个确认实际条件
+            if name_query and name_query not in node_name.lower():
+                continue
+            if value_query:
+                values = [properties.get(prop_key, "")] if prop_key is not None else properties.values()
+                if not any(value_query in value.lower() for value in values):
+                    continue
+            results.append(SearchResult(scene_name, node_id, node_name, doc_type))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def scene_names(self) -> List[str]:
+        """已索引的场景"""
+        return sorted(self._scene_docs)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ------------------------------------------------------------------
+    # 场景修改通知
+    # ------------------------------------------------------------------
+
+    def _current_scene_name(self) -> Optional[str]:
+        scene = self._api.current_scene if self._api else None
+        return scene.name if scene else None
+
+    def _on_files_changed(self, events: list):
+        """场景目录中的文件被外部修改时增量更新"""
+        scenes_dir = os.path.abspath(self.scenes_dir)
+        if any(os.path.dirname(path) == scenes_dir for _, path in events):
+            self.refresh()
+
+    def _on_node_added(self, parent: SceneNode, row: int, node: SceneNode):
+        scene_name = self._current_scene_name()
+        if scene_name:
+            self._index_subtree(scene_name, node)
+            self._mark_scene_modified(scene_name)
+
+    def _on_node_removed(self, parent: SceneNode, row: int, node: SceneNode):
+        scene_name = self._current_scene_name()
+        if not scene_name:
+            return
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self._remove_doc(scene_name, current.id)
+            stack.extend(current.children)
+        self._mark_scene_modified(scene_name)
+
+    def _on_node_updated(self, node: SceneNode, fields: dict):
+        scene_name = self._current_scene_name()
+        if not scene_name:
+            return
+        if "children" in fields or "id" in fields:
+            self.index_scene(self._api.current_scene)
+            return
+        if fields.keys() & {"name", "node_type", "properties"}:
+            self._remove_doc(scene_name, node.id)
+            self._add_doc(scene_name, node.id, node.name, node.node_type.name, node.properties)
+            self._mark_scene_modified(scene_name)
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    def _mark_scene_modified(self, scene_name: str):
+        """
+        内存中的场景与文件不一致
+
+        本次运行中刷新时不再读取该场景的文件；保存的索引中修改时间记为0，
+        下次打开项目时按文件重新建立索引。
+        """
+        self._modified_scenes.add(scene_name)
+        self._scene_mtimes[scene_name] = 0
+        self._dirty = True
+
+    def _index_subtree(self, scene_name: str, node: SceneNode):
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self._remove_doc(scene_name, current.id)
+            self._add_doc(scene_name, current.id, current.name, current.node_type.name,
+                          current.properties)
+            stack.extend(current.children)
+
+    def _add_doc(self, scene_name: str, node_id: str, name: str, node_type: str,
+                 properties: Dict[str, Any]):
+        doc = self._next_doc
+        self._next_doc += 1
+        texts = {key: _property_text(value) for key, value in properties.items()}
+        self._docs[doc] = (scene_name, node_id, name, node_type, texts)
+        self._doc_ids[(scene_name, node_id)] = doc
+        self._scene_docs.setdefault(scene_name, set()).add(doc)
+        self._names.add(doc, (name,))
+        self._values.add(doc, texts.values())
+        self._types.add(doc, (node_type,))
+        self._keys.add(doc, texts.keys())
+
+    def _remove_doc(self, scene_name: str, node_id: str):
+        doc = self._doc_ids.pop((scene_name, node_id), None)
+        if doc is None:
+            return
+        _, _, name, node_type, texts = self._docs.pop(doc)
+        self._scene_docs[scene_name].discard(doc)
+        self._names.remove(doc, (name,))
+        self._values.remove(doc, texts.values())
+        self._types.remove(doc, (node_type,))
+        self._keys.remove(doc, texts.keys())
+
+    def _remove_scene(self, scene_name: str):
+        docs = self._scene_docs.pop(scene_name, None)
+        if not docs:
+            return
+        for doc in docs:
+            _, node_id, name, node_type, texts = self._docs.pop(doc)
+            del self._doc_ids[(scene_name, node_id)]
+            self._names.remove(doc, (name,))
+            self._values.remove(doc, texts.values())
+            self._types.remove(doc, (node_type,))
+            self._keys.remove(doc, texts.keys())
+
+    def _scan_scene_files(self) -> Dict[str, Tuple[str, float]]:
+        """扫描场景目录，同名场景优先使用二进制文件"""
+        files: Dict[str, Tuple[str, float]] = {}
+        if not os.path.isdir(self.scenes_dir):
+            return files
+        with os.scandir(self.scenes_dir) as entries:
+            for entry in entries:
+                base, ext = os.path.splitext(entry.name)
+                if ext not in SCENE_EXTENSIONS or not entry.is_file():
+                    continue
+                if base in files and ext != SCENE_EXTENSIONS[0]:
+                    continue
+                files[base] = (entry.path, entry.stat().st_mtime)
+        return files
+
+    @staticmethod
+    def _read_scene_file(path: str) -> Optional[dict]:
+        """读取场景文件为字典"""
+        from .scene_binary import SCENE_BINARY_EXT, BinarySceneReader
+
+        try:
+            if path.endswith(SCENE_BINARY_EXT):
+                with BinarySceneReader(path) as reader:
+                    return reader.read_scene_dict()
+            return load_file(path)
+        except Exception as e:
+            logger.error("读取场景文件失败 %s: %s", path, e)
+            return None
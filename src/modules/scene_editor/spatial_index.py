@@ -0,0 +1,366 @@
+"""
+Spatial Index Module
+空间索引模块
+
+This module implements a loose quadtree over axis-aligned rectangles, used to answer
+region, point and nearest-neighbour queries on scene nodes without walking the tree.
+此模块实现基于轴对齐矩形的松散四叉树，用于在不遍历场景树的情况下查询区域、点和最近的节点。
+
+松散四叉树中每个格子的有效范围是其名义范围的两倍，物体按中心点归入格子，
+只要物体尺寸不超过格子的一半就能放入子格子。因此物体移动或缩放时
+大多只需原地更新，不会卡在格子边界上停留在很浅的层级。
+"""
+
+import heapq
+import math
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+Rect = Tuple[float, float, float, float]  # (left, top, right, bottom)
+
+# 根格子最多连续扩大的次数，超出时矩形的坐标或尺寸已经大到没有意义
+MAX_GROW_STEPS = 128
+
+
+def node_rect(position: Tuple[float, float], size: Tuple[float, float]) -> Rect:
+    """由位置和尺寸生成矩形"""
+    x, y = position
+    width, height = size
+    return (x, y, x + width, y + height)
+
+
+def _check_rect(rect: Rect):
+    """
+    检查矩形坐标
+
+    Raises:
+        ValueError: 坐标不是有限数（NaN 或无穷大），这样的矩形永远放不进任何格子
+    """
+    if not all(math.isfinite(value) for value in rect):
+        raise ValueError(f"矩形坐标必须是有限数: {rect}")
+
+
+def _point_rect_distance_sq(x: float, y: float, rect: Rect) -> float:
+    """点到矩形的距离平方，点在矩形内时为0"""
+    dx = max(rect[0] - x, 0.0, x - rect[2])
+    dy = max(rect[1] - y, 0.0, y - rect[3])
+    return dx * dx + dy * dy
+
+
+class _Cell:
+    """四叉树格子"""
+
+    __slots__ = ("cx", "cy", "half", "depth", "parent", "items", "children", "count")
+
+    def __init__(self, cx: float, cy: float, half: float, depth: int, parent: Optional['_Cell'] = None):
+        self.cx = cx
+        self.cy = cy
+        self.half = half
+        self.depth = depth
+        self.parent = parent
+        self.items: Dict[Any, Rect] = {}
+        self.children: Optional[List[Optional['_Cell']]] = None
+        self.count = 0  # 子树中的物体总数
+
+    def loose_rect(self) -> Rect:
+        """格子的有效范围（名义范围的两倍）"""
+        extent = self.half * 2
+        return (self.cx - extent, self.cy - extent, self.cx + extent, self.cy + extent)
+
+    def contains_center(self, x: float, y: float) -> bool:
+        """点是否在格子的名义范围内"""
+        return (self.cx - self.half <= x <= self.cx + self.half and
+                self.cy - self.half <= y <= self.cy + self.half)
+
+    def fits(self, rect: Rect) -> bool:
+        """矩形是否能放入此格子"""
+        x = (rect[0] + rect[2]) * 0.5
+        y = (rect[1] + rect[3]) * 0.5
+        return (self.contains_center(x, y) and
+                rect[2] - rect[0] <= self.half * 2 and
+                rect[3] - rect[1] <= self.half * 2)
+
+    def quadrant(self, x: float, y: float) -> int:
+        """点所在的子格子编号"""
+        return (1 if x >= self.cx else 0) | (2 if y >= self.cy else 0)
+
+    def child(self, index: int) -> '_Cell':
+        """获取子格子，不存在时创建"""
+        if self.children is None:
+            self.children = [None, None, None, None]
+        cell = self.children[index]
+        if cell is None:
+            quarter = self.half * 0.5
+            cell = _Cell(
+                self.cx + (quarter if index & 1 else -quarter),
+                self.cy + (quarter if index & 2 else -quarter),
+                quarter, self.depth + 1, self
+            )
+            self.children[index] = cell
+        return cell
+
+
+class QuadTree:
+    """
+    松散四叉树
+
+    物体以唯一的键标识，可以附带任意数据（例如场景节点）。
+    插入、删除和查询的时间复杂度与树深度成正比。
+    """
+
+    def __init__(self, bounds: Rect = (-1024.0, -1024.0, 1024.0, 1024.0),
+                 capacity: int = 16, max_depth: int = 16):
+        """
+        Args:
+            bounds: 初始范围，物体超出范围时根格子会自动扩大
+            capacity: 叶子格子的物体数超过该值时分裂
+            max_depth: 最大深度
+        """
+        half = max(bounds[2] - bounds[0], bounds[3] - bounds[1], 1.0) * 0.5
+        self._root = _Cell((bounds[0] + bounds[2]) * 0.5, (bounds[1] + bounds[3]) * 0.5, half, 0)
+        self.capacity = capacity
+        self.max_depth = max_depth
+        self._cells: Dict[Any, _Cell] = {}
+        self._data: Dict[Any, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._cells
+
+    def clear(self):
+        """清空索引"""
+        root = self._root
+        self._root = _Cell(root.cx, root.cy, root.half, 0)
+        self._cells.clear()
+        self._data.clear()
+
+    # ------------------------------------------------------------------
+    # 修改
+    # ------------------------------------------------------------------
+
+    def insert(self, key: Any, rect: Rect, data: Any = None):
+        """
+        插入物体，键已存在时等同于 update
+
+        Args:
+            key: 物体的唯一键
+            rect: 物体矩形 (left, top, right, bottom)
+            data: 附带数据，查询时返回
+
+        Raises:
+            ValueError: 矩形坐标不是有限数或超出可索引的范围
+        """
+        if key in self._cells:
+            self.update(key, rect, data)
+            return
+        _check_rect(rect)
+        for _ in range(MAX_GROW_STEPS):
+            if self._root.fits(rect):
+                break
+            self._grow(rect)
+        else:
+            raise ValueError(f"矩形超出可索引的范围: {rect}")
+        self._data[key] = data
+        self._insert_into(self._root, key, rect)
+
+    def remove(self, key: Any) -> bool:
+        """删除物体"""
+        cell = self._cells.pop(key, None)
+        if cell is None:
+            return False
+        del cell.items[key]
+        self._data.pop(key, None)
+        self._release(cell)
+        return True
+
+    def update(self, key: Any, rect: Rect, data: Any = None):
+        """
+        更新物体矩形
+
+        新矩形仍属于原来的格子时原地更新，否则重新插入。
+
+        Raises:
+            ValueError: 矩形坐标不是有限数或超出可索引的范围，此时物体保持原来的矩形
+        """
+        _check_rect(rect)
+        cell = self._cells.get(key)
+        if cell is None:
+            self.insert(key, rect, data)
+            return
+        if data is not None:
+            self._data[key] = data
+        if cell.fits(rect) and not self._fits_child(cell, rect):
+            cell.items[key] = rect
+            return
+        data = self._data[key]
+        old_rect = cell.items[key]
+        self.remove(key)
+        try:
+            self.insert(key, rect, data)
+        except ValueError:
+            self.insert(key, old_rect, data)
+            raise
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def get_rect(self, key: Any) -> Optional[Rect]:
+        """获取物体矩形"""
+        cell = self._cells.get(key)
+        return cell.items[key] if cell else None
+
+    def query_rect(self, rect: Rect, contained: bool = False) -> List[Any]:
+        """
+        查询与矩形相交的物体
+
+        Args:
+            rect: 查询矩形
+            contained: 为True时只返回完全位于矩形内的物体
+
+        Returns:
+            List[Any]: 物体附带的数据
+        """
+        left, top, right, bottom = rect
+        result = []
+        for key, item in self._iter_intersecting(rect):
+            if contained:
+                if item[0] >= left and item[1] >= top and item[2] <= right and item[3] <= bottom:
+                    result.append(self._data[key])
+            else:
+                result.append(self._data[key])
+        return result
+
+    def query_point(self, x: float, y: float) -> List[Any]:
+        """查询包含某点的物体"""
+        return [self._data[key] for key, _ in self._iter_intersecting((x, y, x, y))]
+
+    def nearest(self, x: float, y: float, k: int = 1,
+                max_distance: float = math.inf) -> List[Tuple[float, Any]]:
+        """
+        查询距离某点最近的k个物体
+
+        距离按点到物体矩形的最短距离计算，点在矩形内时距离为0。
+
+        Returns:
+            List[Tuple[float, Any]]: (距离, 附带数据)，按距离从近到远排列
+        """
+        if k <= 0 or not self._cells:
+            return []
+        limit = max_distance * max_distance
+        result = []
+        counter = 0
+        # 堆中同时存放格子和物体，格子的键是其有效范围到点的距离下界
+        heap = [(0.0, counter, self._root, None)]
+        while heap and len(result) < k:
+            distance, _, cell, key = heapq.heappop(heap)
+            if distance > limit:
+                break
+            if cell is None:
+                result.append((math.sqrt(distance), self._data[key]))
+                continue
+            for item_key, item in cell.items.items():
+                item_distance = _point_rect_distance_sq(x, y, item)
+                if item_distance <= limit:
+                    counter += 1
+                    heapq.heappush(heap, (item_distance, counter, None, item_key))
+            if cell.children:
+                for child in cell.children:
+                    if child is not None and child.count:
+                        counter += 1
+                        heapq.heappush(heap, (
+                            _point_rect_distance_sq(x, y, child.loose_rect()), counter, child, None
+                        ))
+        return result
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    def _iter_intersecting(self, rect: Rect) -> Iterator[Tuple[Any, Rect]]:
+        """遍历与矩形相交的物体"""
+        left, top, right, bottom = rect
+        stack = [self._root]
+        while stack:
+            cell = stack.pop()
+            for key, item in cell.items.items():
+                if item[0] <= right and item[2] >= left and item[1] <= bottom and item[3] >= top:
+                    yield key, item
+            if cell.children:
+                for child in cell.children:
+                    if child is None or not child.count:
+                        continue
+                    loose = child.loose_rect()
+                    if loose[0] <= right and loose[2] >= left and loose[1] <= bottom and loose[3] >= top:
+                        stack.append(child)
+
+    def _fits_child(self, cell: _Cell, rect: Rect) -> bool:
+        """矩形是否应下沉到子格子"""
+        if cell.children is None or cell.depth >= self.max_depth:
+            return False
+        return (rect[2] - rect[0] <= cell.half and rect[3] - rect[1] <= cell.half)
+
+    def _insert_into(self, cell: _Cell, key: Any, rect: Rect):
+        """从指定格子向下插入物体"""
+        x = (rect[0] + rect[2]) * 0.5
+        y = (rect[1] + rect[3]) * 0.5
+        while self._fits_child(cell, rect):
+            cell = cell.child(cell.quadrant(x, y))
+        cell.items[key] = rect
+        self._cells[key] = cell
+        self._add_count(cell, 1)
+        if (cell.children is None and len(cell.items) > self.capacity
+                and cell.depth < self.max_depth):
+            self._split(cell)
+
+    def _split(self, cell: _Cell):
+        """叶子格子物体过多时分裂，将能放入子格子的物体下移"""
+        cell.children = [None, None, None, None]
+        for key, rect in list(cell.items.items()):
+            if self._fits_child(cell, rect):
+                del cell.items[key]
+                self._add_count(cell, -1)
+                self._insert_into(cell, key, rect)
+
+    def _release(self, cell: _Cell):
+        """删除物体后更新计数并回收空的子树"""
+        self._add_count(cell, -1)
+        while cell is not None and cell.count == 0:
+            cell.children = None
+            parent = cell.parent
+            if parent is not None and parent.children is not None:
+                parent.children[parent.children.index(cell)] = None
+            cell = parent
+
+    @staticmethod
+    def _add_count(cell: Optional[_Cell], delta: int):
+        """更新格子及其所有祖先的物体计数"""
+        while cell is not None:
+            cell.count += delta
+            cell = cell.parent
+
+    def _grow(self, rect: Rect):
+        """向矩形方向扩大根格子，原根格子成为新根的一个子格子"""
+        old = self._root
+        x = (rect[0] + rect[2]) * 0.5
+        y = (rect[1] + rect[3]) * 0.5
+        cx = old.cx + (old.half if x >= old.cx else -old.half)
+        cy = old.cy + (old.half if y >= old.cy else -old.half)
+        root = _Cell(cx, cy, old.half * 2, 0)
+        root.count = old.count
+        if old.count:
+            root.children = [None, None, None, None]
+            root.children[root.quadrant(old.cx, old.cy)] = old
+            old.parent = root
+            self._shift_depth(old)
+        self._root = root
+
+    def _shift_depth(self, cell: _Cell):
+        """根格子扩大后子树深度加一"""
+        stack = [cell]
+        while stack:
+            current = stack.pop()
+            current.depth += 1
+            if current.children:
+                stack.extend(child for child in current.children if child is not None)
@@ -1,10 +1,14 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTreeWidget,
-                            QTreeWidgetItem, QPushButton, QLabel, QLineEdit,
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTreeView,
+                            QPushButton, QLabel, QLineEdit,
                             QTextEdit, QComboBox, QSplitter, QFormLayout)
-from PyQt6.QtCore import Qt, pyqtSignal
-from typing import Optional, List
+from PyQt6.QtCore import Qt, pyqtSignal, QModelIndex
+from typing import Optional, Any
 
 from .api import SceneEditorAPI, Scene, SceneNode, NodeType
+from .scene_tree_model import SceneTreeModel
+from .property_binding import NodePropertyBinding
+from .scene_manager import SceneManager
+from ..file_manager.save_service import SaveService
 
 class SceneEditorWidget(QWidget):
     """场景编辑窗口部件"""
@@ -16,6 +20,12 @@ class SceneEditorWidget(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._saving_scene_file = None
+        self._saving_scene = None    # (场景名称, 快照对应的修改编号)
+        self._showing_node = False
+        self.binding = NodePropertyBinding(parent=self)
+        self.binding.error_occurred.connect(self.error_occurred)
+        SaveService.get_instance().save_finished.connect(self._on_scene_save_finished)
         self._init_ui()
         
     def _init_ui(self):
@@ -40,10 +50,12 @@ class SceneEditorWidget(QWidget):
         # 主分割器
         splitter = QSplitter(Qt.Orientation.Horizontal)
         
-        # 场景树
-        self.scene_tree = QTreeWidget()
-        self.scene_tree.setHeaderLabels(["场景节点"])
-        self.scene_tree.itemSelectionChanged.connect(self._on_selection_changed)
+        # 场景树（模型按需加载子节点，打开大场景时不会一次性创建所有行）
+        self.scene_model = SceneTreeModel(self)
+        self.scene_tree = QTreeView()
+        self.scene_tree.setModel(self.scene_model)
+        self.scene_tree.setUniformRowHeights(True)
+        self.scene_tree.selectionModel().currentChanged.connect(self._on_selection_changed)
         
         # 节点属性编辑区
         self.node_edit = QWidget()
@@ -84,67 +96,70 @@ class SceneEditorWidget(QWidget):
         self.new_scene_btn.clicked.connect(self._on_new_scene)
         self.save_scene_btn.clicked.connect(self._on_save_scene)
         self.delete_scene_btn.clicked.connect(self._on_delete_scene)
-        self.node_name_edit.textChanged.connect(self._on_node_changed)
-        self.node_type_combo.currentTextChanged.connect(self._on_node_changed)
-        self.node_desc_edit.textChanged.connect(self._on_node_changed)
-        self.node_props_edit.textChanged.connect(self._on_node_changed)
+        
+        # 编辑框只标记修改的字段，停止输入后由 binding 一次性写回节点
+        binding = self.binding
+        binding.add_field(binding.FIELD_NAME, self.node_name_edit.text)
+        binding.add_field(binding.FIELD_TYPE, self.node_type_combo.currentText)
+        binding.add_field(binding.FIELD_DESCRIPTION, self.node_desc_edit.toPlainText)
+        binding.add_field(binding.FIELD_PROPERTIES, self.node_props_edit.toPlainText)
+        self.node_name_edit.textChanged.connect(lambda: self._on_node_changed(binding.FIELD_NAME))
+        self.node_type_combo.currentTextChanged.connect(lambda: self._on_node_changed(binding.FIELD_TYPE))
+        self.node_desc_edit.textChanged.connect(lambda: self._on_node_changed(binding.FIELD_DESCRIPTION))
+        self.node_props_edit.textChanged.connect(lambda: self._on_node_changed(binding.FIELD_PROPERTIES))
         
     def load_scene(self, scene: Optional[Scene] = None):
         """加载场景"""
-        self.scene_tree.clear()
+        self.binding.bind(None)
+        self.scene_model.set_scene(scene)
         
         if not scene:
             return
             
-        # 创建根节点
-        root = QTreeWidgetItem(self.scene_tree)
-        root.setText(0, scene.name)
-        root.setData(0, Qt.ItemDataRole.UserRole, scene)
-        
-        # 递归添加子节点
-        self._add_nodes_to_tree(root, scene.nodes)
-        
-        self.scene_tree.expandAll()
+        # 只展开场景行，更深的子节点在用户展开时才加载
+        self.scene_tree.expand(self.scene_model.index(0, 0))
         self.scene_loaded.emit()
         
-    def _add_nodes_to_tree(self, parent_item: QTreeWidgetItem, nodes: List[SceneNode]):
-        """递归添加节点到树中"""
-        for node in nodes:
-            item = QTreeWidgetItem(parent_item)
-            item.setText(0, node.name)
-            item.setData(0, Qt.ItemDataRole.UserRole, node)
-            self._add_nodes_to_tree(item, node.children)
+    def open_scene(self, name: str) -> bool:
+        """打开场景，最近使用的场景直接从缓存中取出"""
+        scene = SceneManager.get_instance().open_scene(name)
+        if not scene:
+            self.error_occurred.emit(f"打开场景失败: {name}")
+            return False
+        self.load_scene(scene)
+        return True
+        
+    def _selected_data(self) -> Any:
+        """获取当前选中行对应的场景或节点"""
+        index = self.scene_tree.currentIndex()
+        if not index.isValid():
+            return None
+        return self.scene_model.data(index, Qt.ItemDataRole.UserRole)
             
-    def _on_selection_changed(self):
+    def _on_selection_changed(self, current: QModelIndex, previous: QModelIndex):
         """选中节点改变"""
-        items = self.scene_tree.selectedItems()
-        if not items:
-            return
-            
-        node = items[0].data(0, Qt.ItemDataRole.UserRole)
-        if isinstance(node, SceneNode):
-            self.node_name_edit.setText(node.name)
-            self.node_type_combo.setCurrentText(node.type.name)
-            self.node_desc_edit.setText(node.description)
-            self.node_props_edit.setText(str(node.properties))
+        node = self.scene_model.data(current, Qt.ItemDataRole.UserRole)
+        values = self.binding.bind(node if isinstance(node, SceneNode) else None)
+        if values:
+            # 填充编辑框时不标记修改
+            self._showing_node = True
+            binding = self.binding
+            self.node_name_edit.setText(values[binding.FIELD_NAME])
+            self.node_type_combo.setCurrentText(values[binding.FIELD_TYPE])
+            self.node_desc_edit.setPlainText(values[binding.FIELD_DESCRIPTION])
+            self.node_props_edit.setPlainText(values[binding.FIELD_PROPERTIES])
+            self._showing_node = False
             
-    def _on_node_changed(self):
+    def _on_node_changed(self, field_name: str):
         """节点属性改变"""
-        items = self.scene_tree.selectedItems()
-        if not items:
+        if self._showing_node:
             return
-            
-        node = items[0].data(0, Qt.ItemDataRole.UserRole)
-        if isinstance(node, SceneNode):
-            node.name = self.node_name_edit.text()
-            node.type = NodeType[self.node_type_combo.currentText()]
-            node.description = self.node_desc_edit.toPlainText()
-            # TODO: 解析属性文本
+        self.binding.mark_dirty(field_name)
             
     def _on_new_scene(self):
         """新建场景"""
         try:
-            scene = SceneEditorAPI.create_scene("新场景")
+            scene = SceneEditorAPI.get_instance().create_scene("新场景")
             if scene:
                 self.load_scene(scene)
             else:
@@ -155,38 +170,54 @@ class SceneEditorWidget(QWidget):
     def _on_save_scene(self):
         """保存场景"""
         try:
-            items = self.scene_tree.selectedItems()
-            if not items:
+            scene = self._selected_data()
+            if scene is None:
                 self.error_occurred.emit("请先选择一个场景")
                 return
                 
-            scene = items[0].data(0, Qt.ItemDataRole.UserRole)
             if not isinstance(scene, Scene):
                 self.error_occurred.emit("选中的不是场景")
                 return
                 
-            if SceneEditorAPI.save_scene(scene):
-                self.scene_saved.emit()
-            else:
+            # 保存前提交尚未写回的属性修改
+            self.binding.flush()
+            
+            # 记录快照对应的修改编号，保存期间的新修改不会被标记为已保存
+            manager = SceneManager.get_instance()
+            self._saving_scene = (scene.name, manager.edit_generation(scene.name))
+            # 在后台序列化和写入，完成后通过 _on_scene_save_finished 通知
+            self._saving_scene_file = SaveService.get_instance().save_scene(scene)
+            if not self._saving_scene_file:
                 self.error_occurred.emit("保存场景失败")
         except Exception as e:
             self.error_occurred.emit(f"保存场景时出错: {str(e)}")
             
+    def _on_scene_save_finished(self, file_path: str, success: bool, error: str):
+        """后台保存场景完成"""
+        if file_path != self._saving_scene_file:
+            return
+        self._saving_scene_file = None
+        if success:
+            name, generation = self._saving_scene
+            SceneManager.get_instance().mark_saved(name, generation)
+            self.scene_saved.emit()
+        else:
+            self.error_occurred.emit(f"保存场景失败: {error}")
+            
     def _on_delete_scene(self):
         """删除场景"""
         try:
-            items = self.scene_tree.selectedItems()
-            if not items:
+            scene = self._selected_data()
+            if scene is None:
                 self.error_occurred.emit("请先选择一个场景")
                 return
                 
-            scene = items[0].data(0, Qt.ItemDataRole.UserRole)
             if not isinstance(scene, Scene):
                 self.error_occurred.emit("选中的不是场景")
                 return
                 
             if SceneEditorAPI.delete_scene(scene):
-                self.scene_tree.takeTopLevelItem(self.scene_tree.indexOfTopLevelItem(items[0]))
+                self.scene_model.set_scene(None)
             else:
                 self.error_occurred.emit("删除场景失败")
         except Exception as e:
@@ -1,29 +1,71 @@
-"""主题样式定义"""
+"""
+Theme
+主题样式
+
+This module defines the editor's themes and the ThemeManager that applies them. A theme
+is a single stylesheet set on the application, so Qt parses it once and resolves every
+widget against the same rules. Panels do not call setStyleSheet; widgets that need a
+different look get an object name, and the theme selects them with `#ObjectName`. The
+compiled stylesheet is cached, and applying the theme that is already active does
+nothing, because every setStyleSheet call on the application re-polishes all widgets.
+此模块定义编辑器的主题和应用主题的 ThemeManager。主题是设置在应用程序上的单个样式表，
+Qt 只解析一次，所有控件都按同一组规则匹配。面板不再调用 setStyleSheet；需要不同外观的控件
+设置对象名称，主题通过 `#对象名称` 选择它们。编译后的样式表会被缓存，重复应用当前主题时
+不做任何操作，因为每次在应用程序上调用 setStyleSheet 都会重新处理所有控件的样式。
+"""
+
+import re
+import logging
+from typing import Callable, Dict, List, Optional
+
+from PyQt6.QtWidgets import QApplication
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THEME = "dark"
 
 DARK_THEME = """
     /* 主窗口 */
-    QMainWindow, QWidget {
+    QMainWindow {
+        background-color: #1e1e1e;
+    }
+    QWidget {
         background-color: #2b2b2b;
         color: #e0e0e0;
     }
-    
+
     /* 菜单栏 */
     QMenuBar {
         background-color: #2b2b2b;
-        color: #e0e0e0;
+        color: #ffffff;
+        border-bottom: 1px solid #3b3b3b;
+        font-size: 14px;
+    }
+    QMenuBar::item {
+        padding: 4px 8px;
+        background-color: transparent;
     }
     QMenuBar::item:selected {
         background-color: #3b3b3b;
     }
     QMenu {
         background-color: #2b2b2b;
-        color: #e0e0e0;
+        color: #ffffff;
         border: 1px solid #3b3b3b;
+        font-size: 14px;
+    }
+    QMenu::item {
+        padding: 6px 20px;
     }
     QMenu::item:selected {
         background-color: #3b3b3b;
     }
-    
+    QMenu::separator {
+        height: 1px;
+        background-color: #3b3b3b;
+        margin: 4px 0;
+    }
+
     /* 工具栏 */
     QToolBar {
         background-color: #2b2b2b;
@@ -40,20 +82,26 @@ DARK_THEME = """
     QToolButton:hover {
         background-color: #3b3b3b;
     }
-    
+
     /* Dock窗口 */
     QDockWidget {
-        background-color: #2b2b2b;
-        color: #e0e0e0;
-        titlebar-close-icon: url(close.png);
-        titlebar-normal-icon: url(float.png);
+        background-color: #2d2d2d;
+        color: #ffffff;
+        border: 1px solid #3d3d3d;
     }
     QDockWidget::title {
-        background-color: #3b3b3b;
-        padding: 6px;
+        background-color: #2d2d2d;
+        color: #ffffff;
+        padding: 4px;
+    }
+    QDockWidget::close-button, QDockWidget::float-button {
+        background-color: transparent;
         border: none;
     }
-    
+    QDockWidget::close-button:hover, QDockWidget::float-button:hover {
+        background-color: #3d3d3d;
+    }
+
     /* 输入控件 */
     QLineEdit, QTextEdit, QComboBox {
         background-color: #1e1e1e;
@@ -65,7 +113,7 @@ DARK_THEME = """
     QLineEdit:focus, QTextEdit:focus {
         border: 1px solid #5b5b5b;
     }
-    
+
     /* 按钮 */
     QPushButton {
         background-color: #3b3b3b;
@@ -80,7 +128,7 @@ DARK_THEME = """
     QPushButton:pressed {
         background-color: #2b2b2b;
     }
-    
+
     /* 树形视图 */
     QTreeWidget {
         background-color: #1e1e1e;
@@ -90,13 +138,29 @@ DARK_THEME = """
     QTreeWidget::item:selected {
         background-color: #3b3b3b;
     }
-    
+
+    /* 表格和列表 */
+    QTableView, QListView {
+        background-color: #1e1e1e;
+        color: #e0e0e0;
+        border: 1px solid #3b3b3b;
+        selection-background-color: #3b3b3b;
+    }
+    QHeaderView::section {
+        background-color: #2b2b2b;
+        color: #e0e0e0;
+        border: none;
+        border-right: 1px solid #3b3b3b;
+        border-bottom: 1px solid #3b3b3b;
+        padding: 4px;
+    }
+
     /* 状态栏 */
     QStatusBar {
         background-color: #2b2b2b;
         color: #e0e0e0;
     }
-    
+
     /* 滚动条 */
     QScrollBar:vertical {
         background-color: #2b2b2b;
@@ -108,7 +172,394 @@ DARK_THEME = """
         min-height: 20px;
         border-radius: 6px;
     }
-    QScrollBar::handle:vertical:hover {
+    QScrollBar:horizontal {
+        background-color: #2b2b2b;
+        height: 12px;
+        margin: 0px;
+    }
+    QScrollBar::handle:horizontal {
+        background-color: #3b3b3b;
+        min-width: 20px;
+        border-radius: 6px;
+    }
+    QScrollBar::handle:hover {
+        background-color: #4b4b4b;
+    }
+    QScrollBar::add-line, QScrollBar::sub-line {
+        width: 0px;
+        height: 0px;
+    }
+    QScrollBar::add-page, QScrollBar::sub-page {
+        background: none;
+    }
+
+    /* 面板工具栏：日志、场景、场景编辑器和性能分析面板 */
+    QToolBar#PanelToolBar {
+        background-color: #2d2d2d;
+        border: none;
+        spacing: 4px;
+        padding: 4px;
+    }
+    QToolBar#PanelToolBar QToolButton {
+        background-color: transparent;
+        border: none;
+        padding: 4px;
+        color: #ffffff;
+    }
+    QToolBar#PanelToolBar QToolButton:hover {
+        background-color: #3d3d3d;
+    }
+    QToolBar#PanelToolBar QToolButton:pressed {
+        background-color: #1e1e1e;
+    }
+    QToolBar#PanelToolBar QComboBox {
+        background-color: #3d3d3d;
+        border: 1px solid #4d4d4d;
+        border-radius: 3px;
+        color: #ffffff;
+        padding: 4px;
+        min-width: 100px;
+    }
+    QToolBar#PanelToolBar QComboBox::drop-down {
+        border: none;
+    }
+
+    /* 日志视图 */
+    QTableView#LogView {
+        background-color: #1e1e1e;
+        color: #ffffff;
+        border: 1px solid #3d3d3d;
+        font-family: 'Consolas', monospace;
+        font-size: 13px;
+        padding: 8px;
+    }
+    QTextEdit#LogManagerText {
+        background-color: #1e1e1e;
+        color: #ffffff;
+        font-family: Consolas, Monaco, monospace;
+        font-size: 12px;
+    }
+
+    /* 项目树 */
+    QTreeWidget#ProjectInfoTree {
+        background-color: #2b2b2b;
+        color: #ffffff;
+        border: none;
+    }
+    QTreeWidget#ProjectInfoTree::item {
+        height: 25px;
+    }
+    QTreeWidget#ProjectInfoTree::item:hover {
+        background-color: #3c3c3c;
+    }
+    QTreeWidget#ProjectInfoTree::item:selected {
         background-color: #4b4b4b;
     }
-""" 
\ No newline at end of file
+    QTreeWidget#ProjectTree {
+        background-color: #1e1e1e;
+        color: #ffffff;
+        border: 1px solid #3d3d3d;
+    }
+    QTreeWidget#ProjectTree::item {
+        padding: 4px;
+    }
+    QTreeWidget#ProjectTree::item:selected {
+        background-color: #0d47a1;
+    }
+    QTreeWidget#ProjectTree::item:hover {
+        background-color: #2d2d2d;
+    }
+    QLabel#ProjectInfoTitle {
+        color: #ffffff;
+        font-size: 14px;
+        font-weight: bold;
+        padding: 4px;
+    }
+    QTextEdit#ProjectInfoText {
+        background-color: #1e1e1e;
+        color: #ffffff;
+        border: 1px solid #3d3d3d;
+        font-size: 13px;
+    }
+
+    /* AI助理 */
+    QTextEdit#AssistantChatHistory {
+        background-color: #1e1e1e;
+        color: #ffffff;
+        font-family: "Microsoft YaHei", "微软雅黑", sans-serif;
+        font-size: 12px;
+    }
+    QWidget#AssistantPanel, #AssistantPanel QWidget {
+        background-color: #2d2d2d;
+        color: #ffffff;
+    }
+    #AssistantPanel QLabel {
+        font-size: 13px;
+    }
+    #AssistantPanel QComboBox {
+        background-color: #333333;
+        border: 1px solid #444444;
+        border-radius: 4px;
+        padding: 5px;
+        min-height: 25px;
+    }
+    #AssistantPanel QComboBox::drop-down {
+        border: none;
+    }
+    #AssistantPanel QComboBox:on {
+        border: 1px solid #0d47a1;
+    }
+    #AssistantPanel QComboBox QAbstractItemView {
+        background-color: #333333;
+        border: 1px solid #444444;
+        selection-background-color: #0d47a1;
+    }
+    #AssistantPanel QTextEdit {
+        background-color: #1e1e1e;
+        border: 1px solid #3d3d3d;
+        border-radius: 4px;
+        padding: 5px;
+        font-size: 13px;
+    }
+    #AssistantPanel QTextEdit:focus {
+        border: 1px solid #0d47a1;
+    }
+    QPushButton#AssistantSendButton {
+        background-color: #0d47a1;
+        color: white;
+        border: none;
+        padding: 8px;
+        border-radius: 4px;
+    }
+    QPushButton#AssistantSendButton:hover {
+        background-color: #1565c0;
+    }
+    QPushButton#AssistantSendButton:pressed {
+        background-color: #0a3d91;
+    }
+
+    /* 信息窗口 */
+    QDialog#MessageBox {
+        background-color: #2b2b2b;
+        border: 1px solid #3b3b3b;
+    }
+    QLabel#MessageBoxText {
+        color: #ffffff;
+        font-size: 14px;
+        background: transparent;
+    }
+    #MessageBox QPushButton {
+        background-color: #3b3b3b;
+        color: #ffffff;
+        border: none;
+        border-radius: 0px;
+        padding: 8px 16px;
+        font-size: 14px;
+        min-width: 80px;
+    }
+    #MessageBox QPushButton:hover {
+        background-color: #4b4b4b;
+    }
+    #MessageBox QPushButton:pressed {
+        background-color: #5b5b5b;
+    }
+
+    /* 新建项目对话框 */
+    QDialog#NewProjectDialog {
+        background-color: #2b2b2b;
+        color: #ffffff;
+    }
+    #NewProjectDialog QLabel {
+        color: #ffffff;
+        font-size: 14px;
+        padding: 4px 0;
+    }
+    #NewProjectDialog QLineEdit, #NewProjectDialog QTextEdit, #NewProjectDialog QComboBox {
+        background-color: #3b3b3b;
+        color: #ffffff;
+        border: 1px solid #4b4b4b;
+        border-radius: 4px;
+        padding: 6px;
+        font-size: 14px;
+        selection-background-color: #4b4b4b;
+        selection-color: #ffffff;
+    }
+    #NewProjectDialog QLineEdit:focus, #NewProjectDialog QTextEdit:focus,
+    #NewProjectDialog QComboBox:focus {
+        border: 1px solid #5b5b5b;
+    }
+    #NewProjectDialog QComboBox::drop-down {
+        border: none;
+        width: 20px;
+    }
+    #NewProjectDialog QComboBox QAbstractItemView {
+        background-color: #3b3b3b;
+        color: #ffffff;
+        border: 1px solid #4b4b4b;
+        selection-background-color: #4b4b4b;
+        selection-color: #ffffff;
+    }
+    #NewProjectDialog QListWidget {
+        background-color: #3b3b3b;
+        color: #ffffff;
+        border: 1px solid #4b4b4b;
+        border-radius: 4px;
+        font-size: 14px;
+    }
+    #NewProjectDialog QListWidget::item {
+        padding: 6px;
+        border-bottom: 1px solid #4b4b4b;
+    }
+    #NewProjectDialog QListWidget::item:selected {
+        background-color: #4b4b4b;
+        color: #ffffff;
+    }
+    #NewProjectDialog QListWidget::item:hover {
+        background-color: #4b4b4b;
+    }
+    #NewProjectDialog QPushButton {
+        background-color: #3b3b3b;
+        color: #ffffff;
+        border: 1px solid #4b4b4b;
+        border-radius: 4px;
+        padding: 8px 16px;
+        font-size: 14px;
+        min-width: 80px;
+    }
+    #NewProjectDialog QPushButton:hover {
+        background-color: #4b4b3b;
+    }
+    #NewProjectDialog QPushButton:pressed {
+        background-color: #5b5b5b;
+    }
+    #NewProjectDialog QPushButton:focus {
+        border: 1px solid #5b5b5b;
+    }
+    #NewProjectDialog QScrollBar:vertical {
+        border: none;
+        background-color: #3b3b3b;
+        width: 10px;
+    }
+    #NewProjectDialog QScrollBar::handle:vertical {
+        background-color: #4b4b4b;
+        border-radius: 5px;
+    }
+    #NewProjectDialog QScrollBar::handle:vertical:hover {
+        background-color: #5b5b5b;
+    }
+"""
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+_PUNCTUATION_SPACE = re.compile(r"\s*([{};,])\s*")
+
+
+def compile_stylesheet(source: str) -> str:
+    """
+    去掉注释和多余的空白，得到设置到应用程序上的样式表
+
+    Args:
+        source: 主题样式表
+
+    Returns:
+        str: 编译后的样式表
+    """
+    stylesheet = _COMMENT.sub("", source)
+    stylesheet = _WHITESPACE.sub(" ", stylesheet)
+    return _PUNCTUATION_SPACE.sub(r"\1", stylesheet).strip()
+
+
+class ThemeManager:
+    """主题管理类"""
+    _instance = None
+
+    @classmethod
+    def get_instance(cls) -> 'ThemeManager':
+        """获取单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        if ThemeManager._instance is not None:
+            raise Exception("This class is a singleton!")
+        ThemeManager._instance = self
+        self._themes: Dict[str, str] = {DEFAULT_THEME: DARK_THEME}
+        self._compiled: Dict[str, str] = {}
+        self._current_theme: Optional[str] = None
+        self.theme_changed_callbacks: List[Callable[[str], None]] = []
+
+    def get_theme_names(self) -> List[str]:
+        """获取所有主题名称"""
+        return list(self._themes)
+
+    def get_current_theme(self) -> Optional[str]:
+        """获取当前应用的主题，尚未应用时返回None"""
+        return self._current_theme
+
+    def register_theme(self, name: str, stylesheet: str):
+        """
+        注册主题，同名主题会被替换
+
+        Args:
+            name: 主题名称
+            stylesheet: 主题样式表
+        """
+        self._themes[name] = stylesheet
+        self._compiled.pop(name, None)
+        if name == self._current_theme:
+            # 当前主题被替换时重新应用
+            self._current_theme = None
+            self.apply_theme(name)
+
+    def get_stylesheet(self, name: str = DEFAULT_THEME) -> str:
+        """
+        获取编译后的样式表，只在第一次获取时编译
+
+        Args:
+            name: 主题名称
+
+        Returns:
+            str: 编译后的样式表
+        """
+        stylesheet = self._compiled.get(name)
+        if stylesheet is None:
+            stylesheet = self._compiled[name] = compile_stylesheet(self._themes[name])
+        return stylesheet
+
+    def apply_theme(self, name: str = DEFAULT_THEME) -> bool:
+        """
+        将主题设置到应用程序上，需要在QApplication创建之后调用
+
+        Args:
+            name: 主题名称
+
+        Returns:
+            bool: 是否重新设置了样式表，主题已经应用时返回False
+        """
+        app = QApplication.instance()
+        if app is None:
+            logger.error("应用主题失败: QApplication尚未创建")
+            return False
+        if name not in self._themes:
+            logger.error("应用主题失败: 未知的主题 %s", name)
+            return False
+        stylesheet = self.get_stylesheet(name)
+        if name == self._current_theme and app.styleSheet() == stylesheet:
+            return False
+        app.setStyleSheet(stylesheet)
+        self._current_theme = name
+        self._notify_theme_changed(name)
+        return True
+
+    def register_theme_changed_callback(self, callback: Callable[[str], None]):
+        """注册主题变化回调"""
+        self.theme_changed_callbacks.append(callback)
+
+    def _notify_theme_changed(self, name: str):
+        """通知主题变化"""
+        for callback in self.theme_changed_callbacks:
+            try:
+                callback(name)
+            except Exception as e:
+                logger.error("主题变化回调失败: %s", e)
@@ -0,0 +1,143 @@
+"""
+Scene Tree Model Tests
+场景树模型测试
+
+Checks that SceneTreeModel keeps a consistent structure under QAbstractItemModelTester
+while nodes are added, removed and replaced through SceneEditorAPI, including when the
+current index of a view points below the edited parent.
+在 QAbstractItemModelTester 检查下，通过 SceneEditorAPI 添加、删除和替换节点时场景树模型的结构保持一致，
+包括视图的当前索引位于被修改节点之下的情况。
+
+    QT_QPA_PLATFORM=offscreen python -m pytest tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from PyQt6 import sip  # noqa: E402
+from PyQt6.QtCore import QItemSelectionModel, qInstallMessageHandler  # noqa: E402
+from PyQt6.QtTest import QAbstractItemModelTester  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QTreeView, QWidget  # noqa: E402
+
+from modules.scene_editor.api import NodeType, SceneEditorAPI, SceneNode  # noqa: E402
+from modules.scene_editor.scene_tree_model import SceneTreeModel  # noqa: E402
+
+_app = QApplication.instance() or QApplication(sys.argv)
+
+
+def _node(node_id: str) -> dict:
+    return {"id": node_id, "name": node_id, "node_type": NodeType.CONTAINER}
+
+
+class SceneTreeModelTest(unittest.TestCase):
+    """场景树模型测试"""
+
+    def setUp(self):
+        # 测试器以警告报告错误，收集后在 tearDown 中断言
+        self.failures = []
+        qInstallMessageHandler(
+            lambda mode, context, message: self.failures.append(message)
+            if context.category == "qt.modeltest" else None)
+        self.api = SceneEditorAPI.get_instance()
+        self.api.set_journal(None)
+        self.api.create_scene("test")
+        self.api.add_node("root", _node("p"))
+        self.api.add_node("p", _node("a"))
+        self.api.add_node("a", _node("g"))
+
+        self.model = SceneTreeModel()
+        self.model.set_scene(self.api.current_scene)
+        # 测试器在 modelReset 时先运行检查再结束重置状态，懒加载模型在此期间 fetchMore 会被误报，
+        # 因此在设置场景之后再创建
+        self.tester = QAbstractItemModelTester(
+            self.model, QAbstractItemModelTester.FailureReportingMode.Warning)
+        self.view = QTreeView()
+        self.view.setModel(self.model)
+        self.view.expandAll()
+
+    def tearDown(self):
+        qInstallMessageHandler(None)
+        self.model.detach()
+        self.assertEqual(self.failures, [])
+
+    def _find(self, node_id: str) -> SceneNode:
+        return self.api._find_node(self.api.current_scene.root_node, node_id)
+
+    def _set_current(self, node_id: str):
+        index = self.model.index_for_node(self._find(node_id))
+        self.assertTrue(index.isValid())
+        self.view.selectionModel().setCurrentIndex(
+            index, QItemSelectionModel.SelectionFlag.ClearAndSelect)
+
+    def _assert_rows_match_scene(self, parent: SceneNode):
+        for row, child in enumerate(parent.children):
+            index = self.model.index_for_node(child)
+            self.assertTrue(index.isValid(), child.id)
+            self.assertEqual(index.row(), row)
+            self.assertIs(self.model.node_from_index(index), child)
+
+    def test_add_sibling_while_grandchild_is_current(self):
+        self._set_current("g")
+        b = self.api.add_node("p", _node("b"))
+        self.assertTrue(self.model.index_for_node(b).isValid())
+        self._assert_rows_match_scene(self._find("p"))
+        self.assertIs(self.model.node_from_index(self.view.currentIndex()), self._find("g"))
+
+    def test_remove_sibling_while_grandchild_is_current(self):
+        self.api.add_node("p", _node("b"))
+        self.api.add_node("p", _node("c"))
+        self.view.expandAll()
+        self._set_current("g")
+        self.assertTrue(self.api.delete_node("b"))
+        self._assert_rows_match_scene(self._find("p"))
+        self.assertIs(self.model.node_from_index(self.view.currentIndex()), self._find("g"))
+
+    def test_remove_parent_of_current(self):
+        g = self._find("g")
+        self._set_current("g")
+        self.assertTrue(self.api.delete_node("a"))
+        self._assert_rows_match_scene(self._find("p"))
+        self.assertFalse(self.model.index_for_node(g).isValid())
+        self.assertIsNot(self.model.node_from_index(self.view.currentIndex()), g)
+
+    def test_add_many_children_keeps_rows(self):
+        self._set_current("g")
+        for i in range(50):
+            self.api.add_node("p", _node(f"n{i}"))
+            # 每次插入后查询，行号缓存保持建立状态
+            self.assertTrue(self.model.index_for_node(self._find(f"n{i}")).isValid())
+        self.assertTrue(self.api.delete_node("n10"))
+        self._assert_rows_match_scene(self._find("p"))
+
+    def test_detach_on_destroy(self):
+        api = self.api
+        model = SceneTreeModel()
+        self.assertIn(model._on_node_added, api.node_added_callbacks)
+        model.detach()
+        for callbacks in (api.node_added_callbacks, api.node_removed_callbacks,
+                          api.node_updated_callbacks):
+            self.assertFalse(any(getattr(c, "__self__", None) is model for c in callbacks))
+
+        parent = QWidget()
+        model = SceneTreeModel(parent)
+        callback = model._on_node_added
+        self.assertIn(callback, api.node_added_callbacks)
+        sip.delete(parent)
+        self.assertNotIn(callback, api.node_added_callbacks)
+
+    def test_replace_children_while_grandchild_is_current(self):
+        g = self._find("g")
+        self._set_current("g")
+        replacement = SceneNode(id="x", name="x", node_type=NodeType.CONTAINER)
+        self.assertTrue(self.api.update_node("p", {"children": [replacement]}))
+        self.assertFalse(self.model.index_for_node(g).isValid())
+        self.assertIsNot(self.model.node_from_index(self.view.currentIndex()), g)
+        self.view.expandAll()
+        self._assert_rows_match_scene(self._find("p"))
+
+
+if __name__ == "__main__":
+    unittest.main()